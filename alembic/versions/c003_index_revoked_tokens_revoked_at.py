@@ -0,0 +1,26 @@
+"""index_revoked_tokens_revoked_at
+
+Revision ID: c003_index_revoked_tokens_revoked_at
+Revises: c002_drop_jwt_keys_table
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+
+revision = "c003_index_revoked_tokens_revoked_at"
+down_revision = "c002_drop_jwt_keys_table"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Workers pull new revocations incrementally by revoked_at
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_revoked_tokens_revoked_at "
+        "ON revoked_tokens (revoked_at)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_revoked_tokens_revoked_at")
@@ -0,0 +1,63 @@
+"""add_checkpoint_tables
+
+Revision ID: c004_add_checkpoint_tables
+Revises: c003_index_revoked_tokens_revoked_at
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+
+revision = "c004_add_checkpoint_tables"
+down_revision = "c003_index_revoked_tokens_revoked_at"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Persistent LangGraph checkpointer (core/agents/checkpointer.py)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS checkpoints (
+            thread_id TEXT NOT NULL,
+            checkpoint_ns TEXT NOT NULL DEFAULT '',
+            checkpoint_id TEXT NOT NULL,
+            parent_checkpoint_id TEXT,
+            type TEXT NOT NULL,
+            checkpoint BYTEA NOT NULL,
+            metadata_type TEXT NOT NULL,
+            metadata BYTEA NOT NULL,
+            size_bytes INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+        )
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS checkpoint_blobs (
+            thread_id TEXT NOT NULL,
+            checkpoint_ns TEXT NOT NULL DEFAULT '',
+            channel TEXT NOT NULL,
+            version TEXT NOT NULL,
+            type TEXT NOT NULL,
+            blob BYTEA,
+            PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+        )
+    """)
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS checkpoint_writes (
+            thread_id TEXT NOT NULL,
+            checkpoint_ns TEXT NOT NULL DEFAULT '',
+            checkpoint_id TEXT NOT NULL,
+            task_id TEXT NOT NULL,
+            idx INTEGER NOT NULL,
+            channel TEXT NOT NULL,
+            type TEXT NOT NULL,
+            blob BYTEA,
+            task_path TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS checkpoint_writes")
+    op.execute("DROP TABLE IF EXISTS checkpoint_blobs")
+    op.execute("DROP TABLE IF EXISTS checkpoints")
@@ -0,0 +1,49 @@
+"""add_memory_jobs_table
+
+Revision ID: c005_add_memory_jobs_table
+Revises: c004_add_checkpoint_tables
+Create Date: 2026-10-18
+"""
+
+from alembic import op
+
+
+revision = "c005_add_memory_jobs_table"
+down_revision = "c004_add_checkpoint_tables"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Durable queue for background fact extraction / consolidation
+    op.execute("""
+        CREATE TABLE IF NOT EXISTS memory_jobs (
+            id BIGSERIAL PRIMARY KEY,
+            user_id VARCHAR(255) NOT NULL,
+            session_id VARCHAR(255),
+            kind VARCHAR(20) NOT NULL,
+            payload JSONB NOT NULL,
+            dedupe_key VARCHAR(255) NOT NULL UNIQUE,
+            provider VARCHAR(50),
+            model VARCHAR(100),
+            status VARCHAR(10) NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            available_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+            locked_at TIMESTAMP WITH TIME ZONE,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+            finished_at TIMESTAMP WITH TIME ZONE
+        )
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_memory_jobs_pending "
+        "ON memory_jobs (available_at, id) WHERE status = 'pending'"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_memory_jobs_user_pending "
+        "ON memory_jobs (user_id, id) WHERE status = 'pending'"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS memory_jobs")
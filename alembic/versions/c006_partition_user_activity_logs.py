@@ -0,0 +1,177 @@
+"""partition_user_activity_logs
+
+Revision ID: c006_partition_user_activity_logs
+Revises: c005_add_memory_jobs_table
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+revision = "c006_partition_user_activity_logs"
+down_revision = "c005_add_memory_jobs_table"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Violation-point decay (scripts/cron_governance.py) reads and writes this
+    op.execute(
+        "ALTER TABLE user_violation_points "
+        "ADD COLUMN IF NOT EXISTS last_decrement_at TIMESTAMPTZ"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_violation_points_positive "
+        "ON user_violation_points (last_decrement_at, last_violation_at) "
+        "INCLUDE (points) WHERE points > 0"
+    )
+
+    # Convert user_activity_logs into a monthly range-partitioned table without
+    # copying rows into new partitions: the existing table becomes the
+    # partition for everything before next month (user_activity_logs_legacy)
+    # and is dropped whole once all of it is past retention.
+    #
+    # The one possible rewrite is created_at TIMESTAMP -> TIMESTAMPTZ, needed
+    # so the parent's partition key matches schema.py.  PostgreSQL 12+ does
+    # that in place when the session TimeZone is UTC; under any other zone the
+    # naive values must be reinterpreted, which rewrites the legacy table once
+    # under an ACCESS EXCLUSIVE lock (a NOTICE says so).  Already-TIMESTAMPTZ
+    # columns are left alone.
+    op.execute("""
+        DO $$
+        DECLARE
+            month_start TIMESTAMP := date_trunc('month', now() AT TIME ZONE 'UTC');
+            legacy_upper TIMESTAMPTZ :=
+                (month_start + INTERVAL '1 month') AT TIME ZONE 'UTC';
+            id_seq TEXT;
+            lower_ts TIMESTAMP;
+        BEGIN
+            IF to_regclass('user_activity_logs') IS NULL OR EXISTS (
+                SELECT 1 FROM pg_partitioned_table
+                WHERE partrelid = to_regclass('user_activity_logs')
+            ) THEN
+                RETURN;
+            END IF;
+
+            ALTER TABLE user_activity_logs RENAME TO user_activity_logs_legacy;
+            ALTER INDEX IF EXISTS user_activity_logs_pkey
+                RENAME TO user_activity_logs_legacy_pkey;
+            ALTER INDEX IF EXISTS idx_user_activity_logs_user
+                RENAME TO idx_user_activity_logs_legacy_user;
+            ALTER INDEX IF EXISTS idx_user_activity_logs_type
+                RENAME TO idx_user_activity_logs_legacy_type;
+
+            IF (
+                SELECT data_type FROM information_schema.columns
+                WHERE table_schema = current_schema()
+                  AND table_name = 'user_activity_logs_legacy'
+                  AND column_name = 'created_at'
+            ) <> 'timestamp with time zone' THEN
+                IF current_setting('TimeZone') NOT IN ('UTC', 'Etc/UTC') THEN
+                    RAISE NOTICE
+                        'TimeZone is %, not UTC: converting created_at '
+                        'rewrites user_activity_logs_legacy',
+                        current_setting('TimeZone');
+                END IF;
+                ALTER TABLE user_activity_logs_legacy
+                    ALTER COLUMN created_at TYPE TIMESTAMPTZ
+                    USING created_at::TIMESTAMPTZ;
+            END IF;
+            UPDATE user_activity_logs_legacy
+                SET created_at = 'epoch' WHERE created_at IS NULL;
+            ALTER TABLE user_activity_logs_legacy
+                ALTER COLUMN created_at SET NOT NULL,
+                ALTER COLUMN created_at SET DEFAULT NOW();
+
+            CREATE TABLE user_activity_logs
+                (LIKE user_activity_logs_legacy INCLUDING DEFAULTS)
+                PARTITION BY RANGE (created_at);
+            ALTER TABLE user_activity_logs ADD PRIMARY KEY (id, created_at);
+            -- The id sequence must outlive the legacy partition
+            id_seq := pg_get_serial_sequence('user_activity_logs_legacy', 'id');
+            IF id_seq IS NOT NULL THEN
+                EXECUTE format(
+                    'ALTER SEQUENCE %s OWNED BY user_activity_logs.id', id_seq
+                );
+            END IF;
+
+            -- A validated CHECK matching the bound lets ATTACH skip its scan
+            EXECUTE format(
+                'ALTER TABLE user_activity_logs_legacy '
+                'ADD CONSTRAINT user_activity_logs_legacy_bound '
+                'CHECK (created_at < %L)',
+                legacy_upper
+            );
+            EXECUTE format(
+                'ALTER TABLE user_activity_logs ATTACH PARTITION '
+                'user_activity_logs_legacy FOR VALUES FROM (MINVALUE) TO (%L)',
+                legacy_upper
+            );
+            ALTER TABLE user_activity_logs_legacy
+                DROP CONSTRAINT user_activity_logs_legacy_bound;
+
+            FOR i IN 1..2 LOOP
+                lower_ts := month_start + make_interval(months => i);
+                EXECUTE format(
+                    'CREATE TABLE IF NOT EXISTS %I PARTITION OF user_activity_logs '
+                    'FOR VALUES FROM (%L) TO (%L)',
+                    'user_activity_logs_p' || to_char(lower_ts, 'YYYYMM'),
+                    lower_ts AT TIME ZONE 'UTC',
+                    (lower_ts + INTERVAL '1 month') AT TIME ZONE 'UTC'
+                );
+            END LOOP;
+            CREATE TABLE IF NOT EXISTS user_activity_logs_default
+                PARTITION OF user_activity_logs DEFAULT;
+        END $$;
+    """)
+    # On the parent; the legacy partition's equivalent indexes are attached
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_activity_logs_user "
+        "ON user_activity_logs (user_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_activity_logs_type "
+        "ON user_activity_logs (activity_type)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_activity_logs_created "
+        "ON user_activity_logs (created_at)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("""
+        DO $$
+        DECLARE
+            id_seq TEXT;
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM pg_partitioned_table
+                WHERE partrelid = to_regclass('user_activity_logs')
+            ) THEN
+                RETURN;
+            END IF;
+
+            CREATE TABLE user_activity_logs_flat
+                (LIKE user_activity_logs INCLUDING DEFAULTS);
+            INSERT INTO user_activity_logs_flat SELECT * FROM user_activity_logs;
+            id_seq := pg_get_serial_sequence('user_activity_logs', 'id');
+            IF id_seq IS NOT NULL THEN
+                EXECUTE format(
+                    'ALTER SEQUENCE %s OWNED BY user_activity_logs_flat.id', id_seq
+                );
+            END IF;
+            DROP TABLE user_activity_logs;
+            ALTER TABLE user_activity_logs_flat RENAME TO user_activity_logs;
+            ALTER TABLE user_activity_logs ADD PRIMARY KEY (id);
+        END $$;
+    """)
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_activity_logs_user "
+        "ON user_activity_logs (user_id)"
+    )
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_activity_logs_type "
+        "ON user_activity_logs (activity_type)"
+    )
+    op.execute("DROP INDEX IF EXISTS idx_user_violation_points_positive")
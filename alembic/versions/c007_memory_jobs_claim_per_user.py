@@ -0,0 +1,49 @@
+"""memory_jobs_claim_per_user
+
+Revision ID: c007_memory_jobs_claim_per_user
+Revises: c006_partition_user_activity_logs
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+revision = "c007_memory_jobs_claim_per_user"
+down_revision = "c006_partition_user_activity_logs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Dedupe only against jobs that have not failed, so a failed turn can be
+    # enqueued again before the purge removes it
+    op.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_memory_jobs_dedupe_active "
+        "ON memory_jobs (dedupe_key) WHERE status <> 'failed'"
+    )
+    op.execute(
+        "ALTER TABLE memory_jobs DROP CONSTRAINT IF EXISTS memory_jobs_dedupe_key_key"
+    )
+    # Claims skip users that already have a running batch
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS idx_memory_jobs_user_running "
+        "ON memory_jobs (user_id) WHERE status = 'running'"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS idx_memory_jobs_user_running")
+    # Failed duplicates would violate the full-column constraint
+    op.execute("""
+        DELETE FROM memory_jobs f
+        WHERE f.status = 'failed' AND EXISTS (
+            SELECT 1 FROM memory_jobs o
+            WHERE o.dedupe_key = f.dedupe_key
+              AND (o.status <> 'failed' OR o.id > f.id)
+        )
+    """)
+    op.execute(
+        "ALTER TABLE memory_jobs "
+        "ADD CONSTRAINT memory_jobs_dedupe_key_key UNIQUE (dedupe_key)"
+    )
+    op.execute("DROP INDEX IF EXISTS uq_memory_jobs_dedupe_active")
@@ -0,0 +1,27 @@
+"""checkpoint_write_time
+
+Revision ID: c008_checkpoint_write_time
+Revises: c007_memory_jobs_claim_per_user
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+
+revision = "c008_checkpoint_write_time"
+down_revision = "c007_memory_jobs_claim_per_user"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Write time (epoch seconds) for idle-thread cleanup in
+    # core/agents/checkpointer.py; existing rows start their clock now
+    op.execute(
+        "ALTER TABLE checkpoints ADD COLUMN IF NOT EXISTS "
+        "ts DOUBLE PRECISION NOT NULL DEFAULT EXTRACT(EPOCH FROM NOW())"
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE checkpoints DROP COLUMN IF EXISTS ts")
@@ -14,6 +14,7 @@ from typing import List, Optional
 
 import pandas as pd
 
+from analysis.screener_state import get_screener_state
 from data.data_fetcher import get_data_fetcher
 
 
@@ -30,10 +31,6 @@ def calculate_rsi_simple(series: pd.Series, period: int = 14) -> float:
 
 
 # Valid for 5 seconds (Real-time snapshot, short cache)
-_TICKER_CACHE = {
-    "okx": {"data": [], "timestamp": 0},
-    "binance": {"data": [], "timestamp": 0},
-}
 CACHE_SLAPSHOT_DURATION = 5
 
 
@@ -44,129 +41,41 @@ def screen_top_cryptos_light(
     target_symbols: Optional[List[str]] = None,
     market_pulse_data: dict = None,
 ):
+    """
+    成交量排行 / 涨幅榜 / 跌幅榜
 
-    # 1. Helper function
-    def safe_float(v, default=0.0):
-        try:
-            return float(v)
-        except (ValueError, TypeError):
-            return default
-
-    # 2. Get Data Fetcher
-    try:
-        fetcher = get_data_fetcher(exchange)
-    except Exception as e:
-        print(f"Error initializing fetcher: {e}")
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
-
-    # Define keys based on exchange
-    if exchange == "okx":
-        key_symbol = "instId"
-        key_last = "last"
-        key_vol = "volCcy24h"  # USDT volume usually
-    else:  # binance
-        key_symbol = "symbol"
-        key_last = "lastPrice"
-        key_vol = "quoteVolume"
-
-    # Check cache
-    now = time.time()
-    if exchange in _TICKER_CACHE and (
-        now - _TICKER_CACHE[exchange]["timestamp"] < CACHE_SLAPSHOT_DURATION
-    ):
-        usdt_tickers = _TICKER_CACHE[exchange]["data"]
-    else:
-        # Fetch fresh data
+    行情存放在 ScreenerState 的 NumPy 列数组中（见 analysis/screener_state.py）：
+    缓存过期时整批写入一次，排行以 argpartition 只排序前 K 名，
+    WebSocket 推送的 ticker 则直接更新对应的那一行。
+    """
+    state = get_screener_state(exchange)
+
+    # Refresh the arrays when the snapshot is stale
+    if time.time() - state.loaded_at >= CACHE_SLAPSHOT_DURATION:
         try:
-            raw_tickers = fetcher.get_tickers()
-            if not raw_tickers:
-                raw_tickers = []
+            fetcher = get_data_fetcher(exchange)
+        except Exception as e:
+            print(f"Error initializing fetcher: {e}")
+            return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
 
+        key_symbol = "instId" if exchange == "okx" else "symbol"
+        suffix = "-USDT" if exchange == "okx" else "USDT"
+        try:
+            raw_tickers = fetcher.get_tickers() or []
             # Filter for USDT pairs
-            usdt_tickers = []
-            suffix = "-USDT" if exchange == "okx" else "USDT"
-
-            for t in raw_tickers:
-                sym = t.get(key_symbol, "")
-                if sym.endswith(suffix):
-                    usdt_tickers.append(t)
-
-            # Update cache
-            _TICKER_CACHE[exchange] = {"data": usdt_tickers, "timestamp": now}
+            state.load_tickers(
+                t for t in raw_tickers if t.get(key_symbol, "").endswith(suffix)
+            )
         except Exception as e:
             print(f"Error fetching tickers: {e}")
             return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
 
-    # 3. Process ALL tickers to find Gainers/Losers
-    processed_all = []
-
-    for t in usdt_tickers:
-        symbol = t.get(key_symbol, "UNKNOWN")
-        # Standardize symbol for lookup (e.g. BTC-USDT -> BTC)
-        base_symbol = symbol.split("-")[0].upper()
-
-        last_price = safe_float(t.get(key_last, 0))
-        volume = safe_float(t.get(key_vol, 0))
-
-        # Calculate Change %
-        change_pct = 0.0
-        if exchange == "okx":
-            open_24h = safe_float(t.get("open24h", last_price))
-            if open_24h != 0:
-                change_pct = ((last_price - open_24h) / open_24h) * 100
-        else:
-            change_pct = safe_float(t.get("priceChangePercent", 0))
-
-        # Merge Market Pulse Signals and RSI if available
-        signals = []
-        rsi = 50.0
-
-        if market_pulse_data and base_symbol in market_pulse_data:
-            pulse = market_pulse_data[base_symbol]
-            if pulse:
-                signals = pulse.get("signals", [])
-                # Prefer Pulse RSI if available (it refers to 4h/1d usually), else 50
-                # Or keep 50 if we don't want to mix timeframe RSIs?
-                # Let's use Pulse RSI for better visual if available
-                if "indicators" in pulse and "rsi" in pulse["indicators"]:
-                    rsi = pulse["indicators"]["rsi"]
-
-        processed_all.append(
-            {
-                "Symbol": symbol,
-                "Close": last_price,
-                "price_change_24h": change_pct,
-                "Volume": volume,
-                "RSI_14": rsi,
-                "signals": signals,
-            }
-        )
-
-    if not processed_all:
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
-
-    df_all = pd.DataFrame(processed_all)
-
-    # 4. Generate Lists
-    # A. Volume Leaders (The main list)
-    if target_symbols and len(target_symbols) > 0:
-        target_set = set(target_symbols)
-        df_volume = df_all[df_all["Symbol"].isin(target_set)].copy()
-    else:
-        df_volume = df_all.sort_values(by="Volume", ascending=False).head(limit).copy()
-
-    # B. Top Gainers & Losers (Filter low volume garbage < 100k USDT)
-    min_vol = 100000
-    df_liquid = df_all[df_all["Volume"] > min_vol]
-
-    if df_liquid.empty:
-        df_liquid = df_all
-
-    df_gainers = (
-        df_liquid.sort_values(by="price_change_24h", ascending=False).head(5).copy()
-    )
-    df_losers = (
-        df_liquid.sort_values(by="price_change_24h", ascending=True).head(5).copy()
+    # Merge Market Pulse Signals and RSI into the rows shown
+    if market_pulse_data:
+        state.pulse = market_pulse_data
+
+    df_volume, df_gainers, df_losers = state.snapshot(
+        limit=limit, target_symbols=target_symbols
     )
 
     # Return: Summary(Vol), Gainers, Losers, Dummy
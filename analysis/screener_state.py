@@ -0,0 +1,292 @@
+"""
+Screener state held in preallocated NumPy arrays.
+
+One ``ScreenerState`` per exchange keeps every USDT pair's last price, 24h
+open, 24h change and 24h quote volume in column arrays, with a symbol -> row
+index.  A full ticker refresh is written into the arrays in one vectorized
+pass; a WebSocket tick rewrites a single row in O(1).  Volume leaders,
+gainers and losers are picked with ``np.argpartition`` (only the top K rows
+are sorted), and the chosen rows are cached until the next write, so
+repeated snapshots between ticks are free.
+"""
+
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+MIN_LIQUID_VOLUME = 100_000  # USDT; gainers/losers below this are noise
+TOP_MOVERS = 5
+INITIAL_CAPACITY = 1024
+
+SNAPSHOT_COLUMNS = [
+    "Symbol",
+    "Close",
+    "price_change_24h",
+    "Volume",
+    "RSI_14",
+    "signals",
+]
+
+# Ticker field names per exchange: symbol, last price, quote volume, 24h open
+_TICKER_KEYS = {
+    "okx": ("instId", "last", "volCcy24h", "open24h"),
+    "binance": ("symbol", "lastPrice", "quoteVolume", None),
+}
+
+
+def normalize_symbol(symbol: str) -> str:
+    """BTC-USDT / BTC/USDT / btcusdt -> BTCUSDT."""
+    return symbol.upper().replace("/", "").replace("-", "")
+
+
+def _column(tickers: List[dict], key: Optional[str]) -> np.ndarray:
+    """One ticker field as float64; missing or unparsable values become NaN."""
+    if key is None:
+        return np.full(len(tickers), np.nan)
+    values = [t.get(key) for t in tickers]
+    try:
+        return np.array(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values, dtype=object), errors="coerce").to_numpy(
+            dtype=np.float64
+        )
+
+
+def _top_k(values: np.ndarray, rows: np.ndarray, k: int) -> np.ndarray:
+    """Rows holding the k largest values, largest first."""
+    if k <= 0 or rows.size == 0:
+        return rows[:0]
+    candidates = values[rows]
+    if k < rows.size:
+        part = np.argpartition(-candidates, k - 1)[:k]
+    else:
+        part = np.arange(rows.size)
+    order = part[np.argsort(-candidates[part], kind="stable")]
+    return rows[order]
+
+
+class ScreenerState:
+    """Column arrays for one exchange's tickers; thread-safe."""
+
+    def __init__(self, exchange: str = "okx", capacity: int = INITIAL_CAPACITY):
+        self.exchange = exchange
+        self.size = 0
+        self.symbols: List[str] = []
+        self.index: Dict[str, int] = {}
+        self._raw_index: Dict[str, int] = {}
+        self._allocate(capacity)
+        # Market Pulse results keyed by base symbol (BTC), merged into snapshots
+        self.pulse: Dict[str, dict] = {}
+        self.loaded_at = 0.0
+        self.version = 0
+        self._lock = threading.Lock()
+        self._cache: Dict[tuple, Tuple[np.ndarray, ...]] = {}
+        self._cache_version = -1
+
+    def _allocate(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.price = np.zeros(capacity)
+        self.open = np.zeros(capacity)
+        self.change = np.zeros(capacity)
+        self.volume = np.zeros(capacity)
+        self.active = np.zeros(capacity, dtype=bool)
+
+    def _grow(self, needed: int) -> None:
+        if needed <= self.capacity:
+            return
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        old = (self.price, self.open, self.change, self.volume, self.active)
+        self._allocate(capacity)
+        for new, previous in zip(
+            (self.price, self.open, self.change, self.volume, self.active), old
+        ):
+            new[: self.size] = previous[: self.size]
+
+    def _row(self, symbol: str) -> int:
+        key = normalize_symbol(symbol)
+        row = self.index.get(key)
+        if row is None:
+            self._grow(self.size + 1)
+            row = self.index[key] = self.size
+            self.symbols.append(symbol)
+            self.size += 1
+        self._raw_index[symbol] = row
+        return row
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def load_tickers(self, tickers: Iterable[dict]) -> int:
+        """Replace the state with a full ticker refresh; returns the row count.
+
+        Rows are reused for symbols already known, so the index stays valid
+        for concurrent tick updates; symbols missing from the refresh drop out
+        of the rankings.
+        """
+        key_symbol, key_last, key_vol, key_open = _TICKER_KEYS.get(
+            self.exchange, _TICKER_KEYS["binance"]
+        )
+        tickers = [t for t in tickers if t.get(key_symbol)]
+        symbols = [str(t.get(key_symbol, "")) for t in tickers]
+        last = np.nan_to_num(_column(tickers, key_last))
+        volume = np.nan_to_num(_column(tickers, key_vol))
+        if key_open is not None:
+            # A missing open means no change, as with the per-row parser
+            opened = _column(tickers, key_open)
+            opened = np.where(np.isnan(opened), last, opened)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                change = np.where(opened != 0, (last - opened) / opened * 100, 0.0)
+        else:
+            change = np.nan_to_num(_column(tickers, "priceChangePercent"))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                opened = np.where(change != -100, last / (1 + change / 100), 0.0)
+
+        with self._lock:
+            # Known symbols cost one dict lookup; only new ones are normalized
+            raw_index = self._raw_index
+            rows = np.array(
+                [raw_index[s] if s in raw_index else self._row(s) for s in symbols],
+                dtype=np.int64,
+            )
+            self.active[: self.size] = False
+            if len(symbols):
+                self.price[rows] = last
+                self.open[rows] = opened
+                self.change[rows] = change
+                self.volume[rows] = volume
+                self.active[rows] = True
+            self.loaded_at = time.time()
+            self.version += 1
+        return len(symbols)
+
+    def update(
+        self,
+        symbol: str,
+        last: float,
+        open24h: Optional[float] = None,
+        volume: Optional[float] = None,
+    ) -> bool:
+        """Apply one tick to its row in place; False for unknown symbols."""
+        row = self.index.get(normalize_symbol(symbol))
+        if row is None:
+            return False
+        with self._lock:
+            self.price[row] = last
+            if open24h is not None:
+                self.open[row] = open24h
+            if volume is not None:
+                self.volume[row] = volume
+            opened = self.open[row]
+            self.change[row] = (last - opened) / opened * 100 if opened else 0.0
+            self.version += 1
+        return True
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _rows_for(self, symbols: Iterable[str]) -> np.ndarray:
+        """Active rows of symbols, in row order; unknown symbols are skipped."""
+        rows = {self.index.get(normalize_symbol(s)) for s in symbols}
+        rows.discard(None)
+        rows = np.array(sorted(rows), dtype=np.int64)
+        return rows[self.active[rows]]
+
+    def _rankings(
+        self, limit: int, min_volume: float, within: Optional[frozenset] = None
+    ) -> Tuple[np.ndarray, ...]:
+        key = (limit, min_volume, within)
+        if self._cache_version != self.version:
+            self._cache = {}
+            self._cache_version = self.version
+        cached = self._cache.get(key)
+        if cached is None:
+            if within is None:
+                rows = np.flatnonzero(self.active[: self.size])
+            else:
+                rows = self._rows_for(within)
+            liquid = rows[self.volume[rows] > min_volume]
+            if liquid.size == 0:
+                liquid = rows
+            cached = self._cache[key] = (
+                _top_k(self.volume, rows, limit),
+                _top_k(self.change, liquid, TOP_MOVERS),
+                _top_k(-self.change, liquid, TOP_MOVERS),
+            )
+        return cached
+
+    def _records(self, rows: np.ndarray) -> List[dict]:
+        records = []
+        for row in rows.tolist():
+            symbol = self.symbols[row]
+            pulse = self.pulse.get(symbol.split("-")[0].upper()) or {}
+            records.append(
+                {
+                    "Symbol": symbol,
+                    "Close": float(self.price[row]),
+                    "price_change_24h": float(self.change[row]),
+                    "Volume": float(self.volume[row]),
+                    "RSI_14": pulse.get("indicators", {}).get("rsi", 50.0),
+                    "signals": pulse.get("signals", []),
+                }
+            )
+        return records
+
+    def snapshot_records(
+        self,
+        limit: int = 10,
+        target_symbols: Optional[List[str]] = None,
+        min_volume: float = MIN_LIQUID_VOLUME,
+        within: Optional[Iterable[str]] = None,
+    ) -> Tuple[List[dict], List[dict], List[dict]]:
+        """(volume leaders or target_symbols, top gainers, top losers) as records.
+
+        With within, only those symbols are ranked (e.g. the ones receiving
+        live ticks, so rows last written by an older refresh cannot climb).
+        """
+        if within is not None:
+            within = frozenset(normalize_symbol(s) for s in within)
+        with self._lock:
+            if not self.active[: self.size].any():
+                return [], [], []
+            volume_rows, gainer_rows, loser_rows = self._rankings(
+                limit, min_volume, within
+            )
+            if target_symbols:
+                volume_rows = self._rows_for(target_symbols)
+            return (
+                self._records(volume_rows),
+                self._records(gainer_rows),
+                self._records(loser_rows),
+            )
+
+    def snapshot(
+        self,
+        limit: int = 10,
+        target_symbols: Optional[List[str]] = None,
+        min_volume: float = MIN_LIQUID_VOLUME,
+    ) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """snapshot_records as DataFrames (empty frames when nothing is loaded)."""
+        records = self.snapshot_records(limit, target_symbols, min_volume)
+        if not any(records):
+            return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+        return tuple(pd.DataFrame(r, columns=SNAPSHOT_COLUMNS) for r in records)
+
+
+_states: Dict[str, ScreenerState] = {}
+_states_lock = threading.Lock()
+
+
+def get_screener_state(exchange: str = "okx") -> ScreenerState:
+    """The process-wide state for an exchange."""
+    with _states_lock:
+        state = _states.get(exchange)
+        if state is None:
+            state = _states[exchange] = ScreenerState(exchange)
+        return state
@@ -89,10 +89,13 @@ async def _fetch_price(symbol: str, market: str) -> Optional[tuple]:
 
 async def _check_all_alerts():
     """Run one check cycle across all active alerts."""
-    from api.routers.notifications import push_notification_to_user
+    from api.routers.notifications import push_notifications_bulk
     from api.utils import run_sync
     from core.database import get_active_alerts, mark_alert_triggered
-    from core.database.notifications import create_notification
+    from core.database.notifications import (
+        create_notification,
+        create_notifications_bulk,
+    )
 
     alerts = await run_sync(get_active_alerts)
 
@@ -101,6 +104,8 @@ async def _check_all_alerts():
 
     logger.debug(f"Checking {len(alerts)} active alerts")
 
+    triggered_alerts = []
+    items = []
     for alert in alerts:
         prices = await _fetch_price(alert["symbol"], alert["market"])
         if prices is None:
@@ -112,33 +117,58 @@ async def _check_all_alerts():
         )
 
         if triggered:
-            body = build_alert_body(alert, current_price)
+            triggered_alerts.append(alert)
+            items.append(
+                {
+                    "user_id": alert["user_id"],
+                    "type": "price_alert",
+                    "title": f"🔔 {alert['symbol']} 價格警報",
+                    "body": build_alert_body(alert, current_price),
+                    "data": {
+                        "symbol": alert["symbol"],
+                        "market": alert["market"],
+                        "current_price": current_price,
+                        "alert_id": alert["id"],
+                    },
+                }
+            )
+
+    if not items:
+        return
+
+    try:
+        notifications = await run_sync(create_notifications_bulk, items)
+        delivered = triggered_alerts
+    except Exception as e:
+        # One bad row fails the whole multi-row INSERT; retry one by one so
+        # only the failing alerts stay untriggered for the next cycle
+        logger.warning(f"Bulk alert insert failed, retrying one by one: {e}")
+        notifications, delivered = [], []
+        for alert, item in zip(triggered_alerts, items):
             try:
                 notification = await run_sync(
-                    lambda: create_notification(
-                        user_id=alert["user_id"],
-                        notification_type="price_alert",
-                        title=f"🔔 {alert['symbol']} 價格警報",
-                        body=body,
-                        data={
-                            "symbol": alert["symbol"],
-                            "market": alert["market"],
-                            "current_price": current_price,
-                            "alert_id": alert["id"],
-                        },
-                    )
-                )
-                if notification:
-                    await push_notification_to_user(alert["user_id"], notification)
-                logger.info(
-                    f"Alert triggered: {alert['symbol']} ({alert['condition']} {alert['target']})"
+                    create_notification,
+                    item["user_id"],
+                    item["type"],
+                    item["title"],
+                    item["body"],
+                    item["data"],
                 )
             except Exception as e:
                 logger.error(f"Failed to send alert notification: {e}")
                 continue
+            if notification:
+                notifications.append(notification)
+            delivered.append(alert)
+
+    await push_notifications_bulk(notifications)
 
-            repeat = bool(alert.get("repeat"))
-            await run_sync(mark_alert_triggered, alert["id"], repeat)
+    for alert in delivered:
+        logger.info(
+            f"Alert triggered: {alert['symbol']} ({alert['condition']} {alert['target']})"
+        )
+        repeat = bool(alert.get("repeat"))
+        await run_sync(mark_alert_triggered, alert["id"], repeat)
 
 
 async def price_alert_check_task():
@@ -1,10 +1,7 @@
 import hashlib
-import json
 import logging
 import os
-import threading
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
 from typing import Optional, TypedDict
 
 import jwt
@@ -13,7 +10,9 @@ from fastapi import Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordBearer
 from jwt import ExpiredSignatureError, InvalidTokenError
 
+from core import principal_cache
 from core.orm.repositories import _normalize_membership_tier, user_repo
+from core.token_revocation import revoked_token_store
 
 load_dotenv()
 logger = logging.getLogger(__name__)
@@ -61,43 +60,9 @@ if len(SECRET_KEY) < 32:
     )
 
 
-# === Refresh Token Blacklist (in-memory + file-persisted) ===
-# In-memory for fast lookup; file-backed so revocations survive restarts.
-# Note: multi-process deployments (WEB_CONCURRENCY > 1) should use Redis
-# instead — set REDIS_URL and the rate limiter already uses it.
-_REVOKED_TOKENS_FILE = Path("data/revoked_tokens.json")
-_revoked_tokens: dict[str, str] = {}  # token_hash -> ISO expiry string
-_revoked_tokens_lock = threading.Lock()
-
-
-def _load_revoked_tokens() -> None:
-    """Load persisted revoked tokens from disk into memory on startup."""
-    try:
-        if _REVOKED_TOKENS_FILE.exists():
-            with open(_REVOKED_TOKENS_FILE, "r", encoding="utf-8") as f:
-                raw: dict = json.load(f)
-            now = datetime.now(timezone.utc)
-            # Only load non-expired entries
-            _revoked_tokens.update(
-                {h: exp for h, exp in raw.items()
-                 if datetime.fromisoformat(exp) > now}
-            )
-    except Exception as exc:
-        logger.warning("Failed to load revoked tokens from disk: %s", exc)
-
-
-def _save_revoked_tokens() -> None:
-    """Persist current revoked tokens to disk (must be called under lock)."""
-    try:
-        _REVOKED_TOKENS_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(_REVOKED_TOKENS_FILE, "w", encoding="utf-8") as f:
-            json.dump(_revoked_tokens, f)
-    except Exception as exc:
-        logger.warning("Failed to persist revoked tokens to disk: %s", exc)
-
-
-# Load existing revocations at import time
-_load_revoked_tokens()
+# === Refresh Token Blacklist ===
+# Shared across workers: local Bloom filter -> Redis SET EX -> revoked_tokens
+# table (see core/token_revocation.py). No file I/O on the request path.
 
 
 def _hash_token(token: str) -> str:
@@ -108,41 +73,21 @@ def _hash_token(token: str) -> str:
 def revoke_token(token: str, expires_at: Optional[datetime] = None) -> None:
     """Revoke a refresh token by adding its hash to the blacklist."""
     token_hash = _hash_token(token)
-    expiry = expires_at or (datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS))
-    with _revoked_tokens_lock:
-        _revoked_tokens[token_hash] = expiry.isoformat()
-        _save_revoked_tokens()
+    expiry = expires_at or (
+        datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    )
+    revoked_token_store.revoke(token_hash, expiry)
     logger.info(f"Token revoked: {token_hash[:16]}...")
 
 
 def is_token_revoked(token: str) -> bool:
-    """Check if a token has been revoked. Also auto-cleans expired entries."""
-    token_hash = _hash_token(token)
-    with _revoked_tokens_lock:
-        if token_hash in _revoked_tokens:
-            expiry = datetime.fromisoformat(_revoked_tokens[token_hash])
-            if expiry < datetime.now(timezone.utc):
-                del _revoked_tokens[token_hash]
-                _save_revoked_tokens()
-                return False
-            return True
-    return False
+    """Check if a token has been revoked."""
+    return revoked_token_store.is_revoked(_hash_token(token))
 
 
 def cleanup_expired_revoked_tokens() -> int:
     """Remove expired entries from the revoked tokens blacklist. Returns count removed."""
-    removed = 0
-    now = datetime.now(timezone.utc)
-    with _revoked_tokens_lock:
-        expired = [
-            h for h, exp in _revoked_tokens.items()
-            if datetime.fromisoformat(exp) < now
-        ]
-        for h in expired:
-            del _revoked_tokens[h]
-            removed += 1
-        if removed:
-            _save_revoked_tokens()
+    removed = revoked_token_store.rebuild()
     if removed:
         logger.info(f"Cleaned up {removed} expired revoked tokens")
     return removed
@@ -336,7 +281,7 @@ async def get_current_user(
 
     if user_id:
         try:
-            user = await user_repo.get_by_id(user_id)
+            user = await principal_cache.get_principal(user_id, user_repo.get_by_id)
             if user:
                 if not user.get("is_active", True):
                     raise HTTPException(
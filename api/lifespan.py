@@ -12,6 +12,8 @@ from api.alert_checker import price_alert_check_task
 from api.services import (
     funding_rate_update_task,
     load_market_pulse_cache,
+    start_market_pulse_sync,
+    stop_market_pulse_sync,
     update_market_pulse_task,
     update_screener_task,
 )
@@ -33,6 +35,11 @@ async def lifespan(app: FastAPI):
     _startup_mark("lifespan_enter")
     reset_db_ready_state()
 
+    # 讓 executor 執行緒中的同步 DB 呼叫能把工作送回本 loop 的 async engine
+    from core.database.bridge import bind_event_loop
+
+    bind_event_loop()
+
     async def _init_database_background():
         """Run DB initialization in background to avoid blocking readiness on startup."""
         skip_db_init = os.getenv("SKIP_DB_INIT", "false").lower() == "true"
@@ -115,6 +122,9 @@ async def lifespan(app: FastAPI):
     # [Optimization] Screener/Funding are now In-Memory Only, no DB load needed
     load_market_pulse_cache()  # Market Pulse remains persistent (slow updates)
     _startup_mark("market_pulse_cache_loaded")
+    # 之後只拉取其他進程更新過的 symbol（變更通知 + 定期比對索引）
+    start_market_pulse_sync()
+    _startup_mark("market_pulse_sync_started")
 
     # Startup: 啟動背景篩選器更新任務
     asyncio.create_task(update_screener_task())
@@ -153,6 +163,89 @@ async def lifespan(app: FastAPI):
         logger.warning("⚠️ Audit log cleanup task not available")
         _startup_mark("audit_cleanup_task_unavailable", status="warn")
 
+    # Startup: 啟動批次審計日誌寫入器
+    from core.audit import audit_sink
+
+    audit_sink.start()
+    _startup_mark("audit_sink_started")
+
+    # Startup: 啟動安全告警派送器（佇列 + 各通道工作者，避免阻塞請求）
+    from core.alert_dispatcher import get_alert_dispatcher
+
+    get_alert_dispatcher().start()
+    _startup_mark("alert_dispatcher_started")
+
+    # Startup: 同步已撤銷 refresh token 黑名單（Bloom filter 增量更新）
+    from core.token_revocation import revocation_sync_task
+
+    asyncio.create_task(revocation_sync_task())
+    _startup_mark("revoked_token_sync_scheduled")
+
+    # Startup: 載入可疑錢包查詢索引（Bloom filter + 前後綴索引）並增量同步
+    from core.scam_wallet_index import wallet_index_sync_task
+
+    asyncio.create_task(wallet_index_sync_task())
+    _startup_mark("wallet_index_sync_scheduled")
+
+    # Startup: 載入本地幣種註冊表（代號/別名/合約/交易所上架），過期時重建
+    from core.coin_registry import coin_registry_refresh_task
+
+    asyncio.create_task(coin_registry_refresh_task())
+    _startup_mark("coin_registry_refresh_scheduled")
+
+    # Startup: 各鏈鯨魚轉帳背景掃描（游標增量抓取，工具改查本地索引）
+    from core.whale_scanner import whale_scanner_task
+
+    asyncio.create_task(whale_scanner_task())
+    _startup_mark("whale_scanner_scheduled")
+
+    # Startup: 每日清理長期閒置的對話 checkpoint thread
+    from core.agents.checkpointer import checkpoint_cleanup_task
+
+    asyncio.create_task(checkpoint_cleanup_task())
+    _startup_mark("checkpoint_cleanup_scheduled")
+
+    # Startup: 在線程中預載 tiktoken 編碼（冷快取時會無逾時地下載 BPE 檔）；
+    # 載入完成前 event loop 上的 token 計數一律使用估算
+    from core.agents.context_budget import preload_encoders
+
+    async def _preload_tokenizers():
+        try:
+            loaded = await asyncio.to_thread(preload_encoders)
+            logger.info(f"✅ Context tokenizers loaded: {loaded}")
+        except Exception as e:
+            logger.warning(f"⚠️ Context tokenizer preload failed, estimating: {e}")
+
+    asyncio.create_task(_preload_tokenizers())
+    _startup_mark("context_tokenizer_preload_scheduled")
+
+    # Startup: 監聽系統配置版本（LISTEN/NOTIFY + 定期探測），讀取不再有 TTL
+    from core.database.system_config import start_config_watcher
+
+    start_config_watcher()
+    _startup_mark("config_watcher_started")
+
+    # Startup: 背景記憶工作（事實萃取 / 記憶整合）worker
+    from core.memory_worker import QUEUE_ENABLED, memory_worker_task
+
+    if QUEUE_ENABLED:
+        asyncio.create_task(memory_worker_task())
+        _startup_mark("memory_worker_scheduled")
+
+    # Startup: 訂閱跨 worker 的身分快取失效通知
+    from core.principal_cache import start_invalidation_listener
+
+    await start_invalidation_listener()
+    _startup_mark("principal_cache_listener_started")
+
+    # Startup: 訂閱跨 worker 的 LLM 金鑰快取失效通知（同時清掉 client 池中的舊 client）
+    from core.llm_client_pool import (
+        start_invalidation_listener as start_llm_key_listener,
+    )
+
+    await start_llm_key_listener()
+    _startup_mark("llm_key_listener_started")
+
     _startup_mark("startup_ready")
 
     yield
@@ -169,6 +262,53 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         logger.error(f"❌ 關閉 Ticker WebSocket 時出錯: {e}")
 
+    try:
+        from core.principal_cache import stop_invalidation_listener
+
+        await stop_invalidation_listener()
+    except Exception as e:
+        logger.error(f"❌ 停止身分快取失效監聽時出錯: {e}")
+
+    try:
+        from core.llm_client_pool import (
+            stop_invalidation_listener as stop_llm_key_listener,
+        )
+
+        await stop_llm_key_listener()
+    except Exception as e:
+        logger.error(f"❌ 停止 LLM 金鑰快取失效監聽時出錯: {e}")
+
+    try:
+        from core.database.system_config import stop_config_watcher
+
+        stop_config_watcher()
+    except Exception as e:
+        logger.error(f"❌ 停止配置監聽時出錯: {e}")
+
+    try:
+        stop_market_pulse_sync()
+    except Exception as e:
+        logger.error(f"❌ 停止 Market Pulse 同步時出錯: {e}")
+
+    # 送出尚未派送的安全告警與彙總
+    try:
+        from core.alert_dispatcher import get_alert_dispatcher
+
+        dispatcher = get_alert_dispatcher()
+        await dispatcher.stop()
+        logger.info("✅ Alert dispatcher drained: %s", dispatcher.metrics())
+    except Exception as e:
+        logger.error(f"❌ 排空安全告警佇列時出錯: {e}")
+
+    # 排空審計日誌佇列（需在關閉 async engine 之前）
+    try:
+        from core.audit import audit_sink
+
+        await audit_sink.stop()
+        logger.info("✅ Audit sink drained: %s", audit_sink.metrics())
+    except Exception as e:
+        logger.error(f"❌ 排空審計日誌佇列時出錯: {e}")
+
     # 關閉數據庫連接池
     try:
         from core.database import close_all_connections
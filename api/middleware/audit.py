@@ -8,7 +8,6 @@ Audit Logging Middleware - Optimized Dual-Layer Architecture
 这样既保留完整的调试能力，又避免数据库写入压力。
 """
 
-import asyncio
 import time
 from typing import Optional
 
@@ -108,27 +107,24 @@ async def audit_middleware(request: Request, call_next):
     needs_db = _is_sensitive_action(action, path, request.method)
 
     if needs_db:
+        # AuditLogger.log only enqueues onto the batched audit sink (core.audit)
         try:
-
-            async def _log_async():
-                AuditLogger.log(
-                    action=action,
-                    user_id=user.get("user_id") if user else None,
-                    username=user.get("username") if user else None,
-                    endpoint=str(request.url.path),
-                    method=request.method,
-                    ip_address=request.client.host if request.client else None,
-                    user_agent=request.headers.get("user-agent"),
-                    response_code=response.status_code,
-                    success=success,
-                    duration_ms=duration_ms,
-                    metadata={
-                        "source": "audit_middleware",
-                        "path": str(request.url.path),
-                    },
-                )
-
-            asyncio.get_running_loop().create_task(_log_async())
+            AuditLogger.log(
+                action=action,
+                user_id=user.get("user_id") if user else None,
+                username=user.get("username") if user else None,
+                endpoint=str(request.url.path),
+                method=request.method,
+                ip_address=request.client.host if request.client else None,
+                user_agent=request.headers.get("user-agent"),
+                response_code=response.status_code,
+                success=success,
+                duration_ms=duration_ms,
+                metadata={
+                    "source": "audit_middleware",
+                    "path": str(request.url.path),
+                },
+            )
         except Exception as e:
             logger.error(f"Database audit logging failed: {e}")
     else:
@@ -4,10 +4,16 @@ API Rate Limiting Middleware
 Implements per-IP and per-user rate limiting to prevent API abuse and DDoS attacks.
 
 Stage 2 Security: Added persistent rate limiting that survives server restarts.
+
+Limits use the moving-window (sliding log) strategy on a LeasedStorage backend
+(see api/middleware/rate_limit_storage.py): each worker decides most hits from
+a locally leased chunk of the quota, while the shared Redis (or, without
+Redis, a host-wide SQLite file) log keeps the global limit.
 """
 
 import json
 import logging
+import os
 import time
 from pathlib import Path
 from typing import Optional
@@ -20,6 +26,9 @@ from slowapi.util import get_remote_address
 
 from core.redis_url import resolve_redis_url
 
+# Registers the leased+* and sqlite:// storage schemes with limits
+from .rate_limit_storage import LeasedStorage  # noqa: F401
+
 logger = logging.getLogger(__name__)
 
 
@@ -41,20 +50,29 @@ def get_user_identifier(request: Request) -> str:
 
 
 # Initialize rate limiter
-# Prefer managed Redis from REDIS_URL/REDIS_HOST; fallback to in-memory only when missing.
+# Prefer managed Redis from REDIS_URL/REDIS_HOST; without it, share the quota
+# between the workers on this host through a SQLite file.
+# RATE_LIMIT_STORAGE_URI overrides both (e.g. "memory://" to disable leasing).
 _resolved_redis_url, _redis_source = resolve_redis_url()
 if _resolved_redis_url:
     REDIS_URL = _resolved_redis_url
     logger.info("Rate limiter storage configured via %s", _redis_source)
 else:
-    REDIS_URL = "memory://"
-    logger.warning("REDIS_URL/REDIS_HOST not set, rate limiter fallback to memory://")
+    REDIS_URL = "sqlite:///" + os.getenv(
+        "RATE_LIMIT_SQLITE_PATH", "data/rate_limits.sqlite3"
+    )
+    logger.warning(
+        "REDIS_URL/REDIS_HOST not set, rate limiter shared via %s (this host only)",
+        REDIS_URL,
+    )
+
+RATE_LIMIT_STORAGE_URI = os.getenv("RATE_LIMIT_STORAGE_URI") or f"leased+{REDIS_URL}"
 
 limiter = Limiter(
     key_func=get_user_identifier,
     default_limits=["1000/hour", "100/minute"],  # Global default limits
-    storage_uri=REDIS_URL,
-    strategy="fixed-window",  # Fixed window strategy
+    storage_uri=RATE_LIMIT_STORAGE_URI,
+    strategy="moving-window",  # Sliding log: no 2x burst at window edges
 )
 
 
@@ -180,7 +198,9 @@ class PersistentRateLimiter:
     File-based persistent rate limiter that survives server restarts.
 
     This provides a fallback for environments without Redis.
-    Rate limits are stored in a JSON file and loaded on startup.
+    Rate limits are stored in a JSON file and loaded on startup.  Hits are
+    written at most once per ``persist_interval`` seconds (call ``flush()``
+    before shutdown); resets and cleanups are written immediately.
 
     Usage:
         # Initialize
@@ -193,16 +213,22 @@ class PersistentRateLimiter:
             # Rate limit exceeded
     """
 
-    def __init__(self, storage_path: str = "data/rate_limits.json"):
+    def __init__(
+        self, storage_path: str = "data/rate_limits.json", persist_interval: float = 1.0
+    ):
         """
         Initialize the persistent rate limiter.
 
         Args:
             storage_path: Path to the JSON file for storing rate limit state
+            persist_interval: Minimum seconds between writes caused by hits
         """
         self.storage_path = Path(storage_path)
         self.storage_path.parent.mkdir(parents=True, exist_ok=True)
         self.state: dict = {}
+        self.persist_interval = persist_interval
+        self._last_saved = 0.0
+        self._dirty = False
         self._load_state()
 
     def _load_state(self):
@@ -217,6 +243,8 @@ class PersistentRateLimiter:
 
     def _save_state(self):
         """Save rate limit state to file."""
+        self._last_saved = time.monotonic()
+        self._dirty = False
         try:
             with open(self.storage_path, "w") as f:
                 json.dump(self.state, f)
@@ -224,6 +252,17 @@ class PersistentRateLimiter:
             # Rate limiting is a protection, not a requirement; log for debugging
             logger.debug("Failed to persist rate limit state to %s", self.storage_path)
 
+    def _save_state_throttled(self):
+        """Save unless the file was written less than persist_interval ago."""
+        self._dirty = True
+        if time.monotonic() - self._last_saved >= self.persist_interval:
+            self._save_state()
+
+    def flush(self):
+        """Write any hits not yet persisted."""
+        if self._dirty:
+            self._save_state()
+
     def check_limit(self, key: str, limit: int, window: int) -> bool:
         """
         Check if a request should be rate limited.
@@ -252,7 +291,7 @@ class PersistentRateLimiter:
 
         # Add current request timestamp
         self.state[key].append(now)
-        self._save_state()
+        self._save_state_throttled()
         return True
 
     def get_remaining(self, key: str, limit: int, window: int) -> int:
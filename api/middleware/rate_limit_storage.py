@@ -0,0 +1,357 @@
+"""
+Rate limit storage backends for slowapi / limits.
+
+``LeasedStorage`` (``leased+redis://``, ``leased+sqlite://``,
+``leased+memory://``) puts a per-key token bucket in front of a shared
+sliding-window log (the limits "moving-window" strategy: one timestamp per
+hit, so no interval of the window's length ever holds more than the limit).
+The first request for a key leases a chunk of the quota from the shared log
+(one Redis/SQLite round-trip); the following requests spend the chunk in
+memory.  Leased tokens are logged when they are leased, so every worker
+together still admits no more than the limit, and unused tokens lapse after a
+short lease TTL instead of being carried into later windows.  When the shared
+log refuses a lease the key is blocked locally until its oldest entry
+expires, so floods of denied requests do not reach the backend either.
+
+Small limits (auth, payments: below 1/LEASE_FRACTION requests per window)
+lease one token at a time, i.e. every hit is decided by the shared log.
+
+``SQLiteStorage`` (``sqlite:///path``) is the shared backend for hosts
+without Redis: all workers on the machine share one WAL-mode database file
+instead of each keeping its own ``memory://`` quota.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from limits.storage import Storage, storage_from_string
+from limits.storage.base import MovingWindowSupport
+
+# ── Configuration ────────────────────────────────────────────────────────────
+# A lease takes this share of the limit (1/10 of 100/minute = 10 tokens)
+LEASE_FRACTION = float(os.getenv("RATE_LIMIT_LEASE_FRACTION", "0.1"))
+LEASE_MAX = int(os.getenv("RATE_LIMIT_LEASE_MAX", "50"))
+# Leased tokens lapse after this share of the window (capped in seconds)
+LEASE_TTL_FRACTION = 0.05
+LEASE_TTL_MAX = float(os.getenv("RATE_LIMIT_LEASE_TTL_MAX", "2"))
+# Keys whose lease / block state is kept per worker
+LOCAL_KEYS_MAX = 10_000
+
+_SQLITE_CLEANUP_EVERY = 1000
+
+
+# ── Shared SQLite backend ────────────────────────────────────────────────────
+
+
+class SQLiteStorage(Storage, MovingWindowSupport):
+    """Hit log and counters in a SQLite file shared by the workers on one host."""
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str | None = None, wrap_exceptions: bool = False, **_):
+        path = urlparse(uri or "sqlite:///data/rate_limits.sqlite3").path
+        # sqlite:///relative/path and sqlite:////absolute/path
+        self.path = path[1:] if path.startswith("/") else path
+        if self.path not in ("", ":memory:"):
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._writes = 0
+        super().__init__(uri, wrap_exceptions=wrap_exceptions)
+        with self._conn() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rate_limit_log (
+                    key TEXT NOT NULL,
+                    ts REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_rate_limit_log_key_ts "
+                "ON rate_limit_log (key, ts)"
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS rate_limit_counters (
+                    key TEXT PRIMARY KEY,
+                    count INTEGER NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """
+            )
+
+    @property
+    def base_exceptions(self) -> type[Exception]:
+        return sqlite3.Error
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path or ":memory:", timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _wrote(self, conn: sqlite3.Connection, now: float) -> None:
+        self._writes += 1
+        if self._writes % _SQLITE_CLEANUP_EVERY == 0:
+            conn.execute("DELETE FROM rate_limit_log WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "DELETE FROM rate_limit_counters WHERE expires_at <= ?", (now,)
+            )
+
+    # Moving window (sliding log)
+
+    def acquire_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        if amount > limit:
+            return False
+        conn = self._conn()
+        now = time.time()
+        # BEGIN IMMEDIATE serialises check-and-insert across processes
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            (count,) = conn.execute(
+                "SELECT COUNT(*) FROM rate_limit_log WHERE key = ? AND ts > ?",
+                (key, now - expiry),
+            ).fetchone()
+            if count + amount > limit:
+                conn.rollback()
+                return False
+            conn.executemany(
+                "INSERT INTO rate_limit_log (key, ts, expires_at) VALUES (?, ?, ?)",
+                [(key, now, now + expiry)] * amount,
+            )
+            self._wrote(conn, now)
+            conn.commit()
+            return True
+        except BaseException:
+            conn.rollback()
+            raise
+
+    def get_moving_window(self, key: str, limit: int, expiry: int) -> Tuple[float, int]:
+        now = time.time()
+        oldest, count = (
+            self._conn()
+            .execute(
+                "SELECT MIN(ts), COUNT(*) FROM rate_limit_log WHERE key = ? AND ts > ?",
+                (key, now - expiry),
+            )
+            .fetchone()
+        )
+        return (oldest if count else now), count
+
+    # Fixed window counters
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        with self._conn() as conn:
+            (count,) = conn.execute(
+                """
+                INSERT INTO rate_limit_counters (key, count, expires_at)
+                VALUES (?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    count = CASE WHEN expires_at > ? THEN count + excluded.count
+                                 ELSE excluded.count END,
+                    expires_at = CASE WHEN expires_at > ? THEN expires_at
+                                      ELSE excluded.expires_at END
+                RETURNING count
+                """,
+                (key, amount, now + expiry, now, now),
+            ).fetchone()
+            self._wrote(conn, now)
+            return count
+
+    def get(self, key: str) -> int:
+        row = (
+            self._conn()
+            .execute(
+                "SELECT count FROM rate_limit_counters "
+                "WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+        return row[0] if row else 0
+
+    def get_expiry(self, key: str) -> float:
+        row = (
+            self._conn()
+            .execute("SELECT expires_at FROM rate_limit_counters WHERE key = ?", (key,))
+            .fetchone()
+        )
+        return row[0] if row else time.time()
+
+    def check(self) -> bool:
+        try:
+            self._conn().execute("SELECT 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> Optional[int]:
+        with self._conn() as conn:
+            removed = conn.execute("DELETE FROM rate_limit_log").rowcount
+            return removed + conn.execute("DELETE FROM rate_limit_counters").rowcount
+
+    def clear(self, key: str) -> None:
+        with self._conn() as conn:
+            conn.execute("DELETE FROM rate_limit_log WHERE key = ?", (key,))
+            conn.execute("DELETE FROM rate_limit_counters WHERE key = ?", (key,))
+
+
+# ── Leased local buckets ─────────────────────────────────────────────────────
+
+
+@dataclass
+class _Lease:
+    tokens: int = 0
+    size: int = 0
+    leased_at: float = 0.0
+    expires_at: float = 0.0
+    blocked_until: float = 0.0
+
+
+class LeasedStorage(Storage, MovingWindowSupport):
+    """Per-worker token buckets leasing quota from a shared sliding-window log."""
+
+    STORAGE_SCHEME = [
+        "leased+redis",
+        "leased+rediss",
+        "leased+sqlite",
+        "leased+memory",
+    ]
+
+    def __init__(
+        self, uri: str | None = None, wrap_exceptions: bool = False, **options
+    ):
+        self.shared = storage_from_string(
+            (uri or "leased+memory://").removeprefix("leased+"), **options
+        )
+        self._leases: "OrderedDict[str, _Lease]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, int] = {
+            "local_hits": 0,
+            "local_denials": 0,
+            "leases": 0,
+            "shared_denials": 0,
+        }
+        super().__init__(uri, wrap_exceptions=wrap_exceptions)
+
+    @property
+    def base_exceptions(self):
+        return self.shared.base_exceptions
+
+    @staticmethod
+    def lease_cap(limit: int, amount: int = 1) -> int:
+        return max(amount, min(LEASE_MAX, int(limit * LEASE_FRACTION)))
+
+    def lease_size(self, lease: _Lease, limit: int, expiry: int, amount: int) -> int:
+        """Tokens this worker is expected to spend within one lease TTL.
+
+        Sized from the rate the previous lease was spent at, so a quiet key
+        leases one token at a time and unused tokens rarely lapse.
+        """
+        cap = self.lease_cap(limit, amount)
+        if not lease.size:
+            return amount
+        spent = lease.size - lease.tokens
+        elapsed = max(time.monotonic() - lease.leased_at, 1e-3)
+        wanted = math.ceil(spent / elapsed * self.lease_ttl(expiry))
+        return max(amount, min(cap, wanted))
+
+    @staticmethod
+    def lease_ttl(expiry: int) -> float:
+        return min(LEASE_TTL_MAX, expiry * LEASE_TTL_FRACTION)
+
+    def _lease_for(self, key: str) -> _Lease:
+        lease = self._leases.get(key)
+        if lease is None:
+            lease = self._leases[key] = _Lease()
+            while len(self._leases) > LOCAL_KEYS_MAX:
+                self._leases.popitem(last=False)
+        else:
+            self._leases.move_to_end(key)
+        return lease
+
+    def acquire_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            lease = self._lease_for(key)
+            if lease.blocked_until > now:
+                self.stats["local_denials"] += 1
+                return False
+            if lease.expires_at > now and lease.tokens >= amount:
+                lease.tokens -= amount
+                self.stats["local_hits"] += 1
+                return True
+
+            size = self.lease_size(lease, limit, expiry, amount)
+
+        granted = self.shared.acquire_entry(key, limit, expiry, size)
+        if not granted and size > amount:
+            size = amount
+            granted = self.shared.acquire_entry(key, limit, expiry, size)
+        blocked_for = 0.0
+        if not granted:
+            # The log admits again once its oldest entry leaves the window
+            oldest, _ = self.shared.get_moving_window(key, limit, expiry)
+            blocked_for = max(0.0, oldest + expiry - time.time())
+
+        with self._lock:
+            lease = self._lease_for(key)
+            if granted:
+                self.stats["leases"] += 1
+                lease.size = size
+                lease.tokens = size - amount
+                lease.leased_at = now
+                lease.expires_at = now + self.lease_ttl(expiry)
+            else:
+                self.stats["shared_denials"] += 1
+                lease.blocked_until = now + blocked_for
+        return granted
+
+    def get_moving_window(self, key: str, limit: int, expiry: int) -> Tuple[float, int]:
+        oldest, count = self.shared.get_moving_window(key, limit, expiry)
+        # Tokens still sitting in this worker's lease are not used yet
+        with self._lock:
+            lease = self._leases.get(key)
+            unused = (
+                lease.tokens if lease and lease.expires_at > time.monotonic() else 0
+            )
+        return oldest, max(0, count - unused)
+
+    # Fixed-window operations go straight to the shared backend
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        return self.shared.incr(key, expiry, amount)
+
+    def get(self, key: str) -> int:
+        return self.shared.get(key)
+
+    def get_expiry(self, key: str) -> float:
+        return self.shared.get_expiry(key)
+
+    def check(self) -> bool:
+        return self.shared.check()
+
+    def reset(self) -> Optional[int]:
+        with self._lock:
+            self._leases.clear()
+        return self.shared.reset()
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._leases.pop(key, None)
+        self.shared.clear(key)
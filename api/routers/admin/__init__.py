@@ -1,6 +1,6 @@
 """
 Admin Panel Router Module
-Combines notifications, users, forum, config, and stats endpoints
+Combines notifications, users, forum, config, stats and query-stats endpoints
 """
 
 from fastapi import APIRouter
@@ -9,6 +9,7 @@ from .auth import verify_admin_key
 from .config import router as config_router
 from .forum import router as forum_router
 from .notifications import router as notifications_router
+from .queries import router as queries_router
 from .schemas import (
     BroadcastRequest,
     PostPinRequest,
@@ -28,6 +29,7 @@ router.include_router(users_router)
 router.include_router(forum_router)
 router.include_router(config_router)
 router.include_router(stats_router)
+router.include_router(queries_router)
 
 
 # Re-export all for backward compatibility
@@ -38,6 +40,7 @@ __all__ = [
     "forum_router",
     "config_router",
     "stats_router",
+    "queries_router",
     "verify_admin_key",
     "BroadcastRequest",
     "SetRoleRequest",
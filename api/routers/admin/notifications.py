@@ -3,18 +3,17 @@ Admin Notification Management
 Broadcast and notification history endpoints
 """
 
-import asyncio
 import json
 import logging
-import uuid
 
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy import func, select, text
 
 from api.deps import require_admin
-from api.routers.notifications import notification_manager, push_notification_to_user
-from core.orm import AdminBroadcast, Notification
+from api.routers.notifications import notification_manager, push_notifications_bulk
+from core.orm import AdminBroadcast
 from core.orm.config_repo import _write_audit_log
+from core.orm.notifications_repo import notifications_repo
 from core.orm.session import get_session_factory
 
 from .schemas import BroadcastRequest
@@ -41,46 +40,31 @@ async def broadcast_notification(
     if not user_ids:
         return {"success": True, "sent_count": 0, "online_count": 0}
 
-    sent_count = 0
+    admin_user_id = admin_user["user_id"]
 
-    factory = get_session_factory()
-    async with factory() as session:
-        notifications = [
-            Notification(
-                id=f"notif_{uuid.uuid4().hex[:12]}",
-                user_id=uid,
-                type=request.type,
-                title=request.title,
-                body=request.body,
-                data={"admin_user_id": admin_user["user_id"]},
-                is_read=False,
-            )
+    async def _report_progress(done: int, total: int):
+        logger.info("Broadcast progress: %d/%d notifications inserted", done, total)
+        await notification_manager.send_to_user(
+            admin_user_id,
+            {"type": "broadcast_progress", "done": done, "total": total},
+        )
+
+    created = await notifications_repo.create_notifications_bulk(
+        [
+            {
+                "user_id": uid,
+                "type": request.type,
+                "title": request.title,
+                "body": request.body,
+                "data": {"admin_user_id": admin_user_id},
+            }
             for uid in user_ids
-        ]
-        session.add_all(notifications)
-        await session.flush()
-        sent_count = len(notifications)
-
-    async def _push(uid):
-        if uid in notification_manager.active_connections:
-            try:
-                await push_notification_to_user(
-                    uid,
-                    {
-                        "type": request.type,
-                        "title": request.title,
-                        "body": request.body,
-                    },
-                )
-                return True
-            except Exception:
-                logger.debug(
-                    "Broadcast websocket push failed for user %s", uid, exc_info=True
-                )
-        return False
-
-    results = await asyncio.gather(*[_push(uid) for uid in user_ids])
-    online_count = sum(1 for r in results if r)
+        ],
+        on_progress=_report_progress,
+    )
+    sent_count = len(created)
+
+    online_count = await push_notifications_bulk(created)
 
     factory = get_session_factory()
     async with factory() as session:
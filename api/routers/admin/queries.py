@@ -0,0 +1,36 @@
+"""
+Admin Query Statistics
+Per-statement database timing endpoints
+"""
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+
+from api.deps import require_admin
+from core.database.query_stats import query_stats
+
+router = APIRouter(tags=["Admin - Queries"])
+
+
+@router.get("/db/queries")
+async def admin_query_stats(
+    limit: int = Query(50, ge=1, le=500),
+    order_by: Literal[
+        "total_ms", "calls", "p95_ms", "p99_ms", "rows", "pool_wait_ms", "errors"
+    ] = Query("total_ms"),
+    admin_user: dict = Depends(require_admin),
+):
+    """本 worker 的 SQL 指紋統計（次數、延遲分位數、回傳列數、連線池等待）"""
+    return {
+        "success": True,
+        "summary": query_stats.summary(),
+        "statements": query_stats.snapshot(limit=limit, order_by=order_by),
+    }
+
+
+@router.post("/db/queries/reset")
+async def admin_reset_query_stats(admin_user: dict = Depends(require_admin)):
+    """清空 SQL 指紋統計"""
+    query_stats.reset()
+    return {"success": True}
@@ -7,7 +7,16 @@ from fastapi import APIRouter, Depends, Query
 
 from api.deps import require_admin
 from api.utils import run_sync
+from core.audit import audit_sink
+from core.coin_registry import coin_registry
+from core.database.bridge import get_pool_stats
 from core.database.connection import get_connection
+from core.database.system_config import get_config_cache_stats
+from core.llm_client_pool import stats as llm_client_pool_stats
+from core.memory_worker import memory_worker
+from core.scam_wallet_index import wallet_index
+from core.token_revocation import revoked_token_store
+from core.whale_scanner import stats as whale_scanner_stats
 
 router = APIRouter(tags=["Admin - Stats"])
 
@@ -175,3 +184,57 @@ async def admin_stats_revenue(
 
     data = await run_sync(_query)
     return {"success": True, "data": data, "days": days}
+
+
+@router.get("/stats/db-pools")
+async def admin_db_pool_stats(admin_user: dict = Depends(require_admin)):
+    """本 worker 的資料庫連線池使用狀況（async engine + psycopg2）"""
+    return {"success": True, "pools": get_pool_stats()}
+
+
+@router.get("/stats/audit-sink")
+async def admin_audit_sink_stats(admin_user: dict = Depends(require_admin)):
+    """審計日誌批次寫入器的佇列深度、寫入與丟棄計數"""
+    return {"success": True, "audit_sink": audit_sink.metrics()}
+
+
+@router.get("/stats/revoked-tokens")
+async def admin_revoked_token_stats(admin_user: dict = Depends(require_admin)):
+    """撤銷 token 黑名單的 Bloom filter 命中、後端查詢與同步狀態"""
+    return {"success": True, "revoked_tokens": revoked_token_store.stats()}
+
+
+@router.get("/stats/memory-queue")
+async def admin_memory_queue_stats(admin_user: dict = Depends(require_admin)):
+    """背景記憶工作佇列深度、最舊待處理工作延遲與本 worker 的處理計數"""
+    return {"success": True, "memory_queue": await run_sync(memory_worker.metrics)}
+
+
+@router.get("/stats/wallet-index")
+async def admin_wallet_index_stats(admin_user: dict = Depends(require_admin)):
+    """可疑錢包查詢索引的項目數、Bloom filter 略過的查詢數與同步狀態"""
+    return {"success": True, "wallet_index": wallet_index.stats()}
+
+
+@router.get("/stats/config-cache")
+async def admin_config_cache_stats(admin_user: dict = Depends(require_admin)):
+    """系統配置快照的版本、監聽狀態與重新載入次數"""
+    return {"success": True, "config_cache": get_config_cache_stats()}
+
+
+@router.get("/stats/llm-clients")
+async def admin_llm_client_stats(admin_user: dict = Depends(require_admin)):
+    """LLM 金鑰快取與 client 池的命中、淘汰與大小"""
+    return {"success": True, "llm_clients": llm_client_pool_stats()}
+
+
+@router.get("/stats/coin-registry")
+async def admin_coin_registry_stats(admin_user: dict = Depends(require_admin)):
+    """本地幣種註冊表的幣種數、交易所上架數與最後更新時間"""
+    return {"success": True, "coin_registry": coin_registry.stats()}
+
+
+@router.get("/stats/whale-scanner")
+async def admin_whale_scanner_stats(admin_user: dict = Depends(require_admin)):
+    """各鏈鯨魚掃描器的游標、收錄數與索引大小"""
+    return {"success": True, "whale_scanner": whale_scanner_stats()}
@@ -11,6 +11,7 @@ from api.deps import get_current_user, require_admin
 from api.routers.notifications import notification_manager
 from api.utils import run_sync
 from core.database.connection import get_connection
+from core.principal_cache import invalidate_principal
 
 from .schemas import SetMembershipRequest, SetRoleRequest, SetStatusRequest
 
@@ -187,6 +188,7 @@ async def set_user_role(
     result = await run_sync(_update)
     if result is None:
         raise HTTPException(status_code=404, detail="User not found")
+    await invalidate_principal(user_id)
     return {"success": True, **result}
 
 
@@ -324,6 +326,7 @@ async def set_user_status(
     result = await run_sync(_update)
     if result is None:
         raise HTTPException(status_code=404, detail="User not found")
+    await invalidate_principal(user_id)
 
     # If suspending, push force-logout via WebSocket
     if not request.active:
@@ -6,6 +6,7 @@
 - 論壇管理 (P1)
 - 系統設定 (P1)
 - 統計儀表板 (P2)
+- SQL 指紋統計
 
 此文件為向後兼容的重新導出模組
 實際實現在 api/routers/admin/ 子目錄中
@@ -24,6 +25,7 @@ from api.routers.admin import (
     config_router,
     forum_router,
     notifications_router,
+    queries_router,
     router,
     stats_router,
     users_router,
@@ -36,6 +38,7 @@ __all__ = [
     "forum_router",
     "config_router",
     "stats_router",
+    "queries_router",
     "BroadcastRequest",
     "SetRoleRequest",
     "SetMembershipRequest",
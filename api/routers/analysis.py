@@ -27,14 +27,24 @@ from core.database import (
 from core.database import (
     clear_chat_history as db_clear_history,
 )
-from utils.user_client_factory import create_user_llm_client
+from core.llm_client_pool import get_user_llm_client
 
 router = APIRouter()
 
 ANALYSIS_TIMEOUT_SECONDS = 180
+STREAM_QUEUE_MAXSIZE = 64
 analysis_policy_resolver = AnalysisPolicyResolver()
 
 
+async def _take_pending(task: Optional[asyncio.Task]):
+    """取消仍在等待的 queue.get；若它已取到項目則回傳該項目，避免遺失"""
+    if task is None:
+        return None
+    task.cancel()
+    (result,) = await asyncio.gather(task, return_exceptions=True)
+    return None if isinstance(result, BaseException) else result
+
+
 class CreateSessionRequest(BaseModel):
     title: Optional[str] = None
 
@@ -162,7 +172,7 @@ async def analyze_crypto(
     處理分析請求，以串流 (SSE) 方式回傳結果。
 
     V4 整合：使用 V4 ManagerAgent 處理所有請求。
-    - 一般請求：invoke graph → SSE 串流最終回應
+    - 一般請求：invoke graph，synthesis 節點產生的 token 即時以 SSE 串流
     - HITL 模式：
         第一次觸發 interrupt() → SSE 回傳 {type: "hitl_question"}
         前端帶 resume_answer 重送 → Command(resume=...) 繼續 graph
@@ -176,7 +186,8 @@ async def analyze_crypto(
         )
 
     try:
-        user_client = create_user_llm_client(
+        user_client = get_user_llm_client(
+            user_id=current_user.get("user_id"),
             provider=credentials["provider"],
             api_key=credentials["api_key"],
             model=body.user_model,
@@ -212,6 +223,8 @@ async def analyze_crypto(
             user_tier=current_user.get("membership_tier", "free"),
             user_id=current_user.get("user_id"),
             session_id=body.session_id,
+            llm_provider=credentials["provider"],
+            llm_model=body.user_model,
         )
         config = {
             "configurable": {"thread_id": body.session_id},
@@ -266,6 +279,9 @@ async def analyze_crypto(
         async def event_generator_v4():
             try:
                 progress_queue = asyncio.Queue()
+                # 有界佇列：客戶端讀取過慢時，synthesis 節點的 put 會阻塞，
+                # 進而暫停讀取模型串流（背壓）
+                token_queue: asyncio.Queue = asyncio.Queue(maxsize=STREAM_QUEUE_MAXSIZE)
 
                 def on_progress(event):
                     asyncio.get_running_loop().call_soon_threadsafe(
@@ -273,6 +289,7 @@ async def analyze_crypto(
                     )
 
                 manager.progress_callback = on_progress
+                manager.stream_callback = token_queue.put
 
                 invoke_task = asyncio.create_task(
                     asyncio.wait_for(
@@ -280,24 +297,45 @@ async def analyze_crypto(
                         timeout=ANALYSIS_TIMEOUT_SECONDS,
                     )
                 )
+                progress_get = token_get = None
+                streamed = []
 
                 try:
                     while not invoke_task.done():
-                        queue_task = asyncio.create_task(progress_queue.get())
-                        done, pending = await asyncio.wait(
-                            [invoke_task, queue_task],
+                        progress_get = progress_get or asyncio.create_task(
+                            progress_queue.get()
+                        )
+                        token_get = token_get or asyncio.create_task(token_queue.get())
+                        done, _ = await asyncio.wait(
+                            [invoke_task, progress_get, token_get],
                             return_when=asyncio.FIRST_COMPLETED,
                         )
 
-                        if queue_task in done:
-                            event = queue_task.result()
+                        if progress_get in done:
+                            event = progress_get.result()
+                            progress_get = None
                             yield f"data: {json.dumps({'type': 'progress', 'data': event})}\n\n"
-                        else:
-                            queue_task.cancel()
+                        if token_get in done:
+                            delta = token_get.result()
+                            token_get = None
+                            streamed.append(delta)
+                            yield f"data: {json.dumps({'content': delta})}\n\n"
+
+                    late_event = await _take_pending(progress_get)
+                    late_delta = await _take_pending(token_get)
+                    progress_get = token_get = None
 
+                    events = [late_event] if late_event is not None else []
                     while not progress_queue.empty():
-                        event = progress_queue.get_nowait()
+                        events.append(progress_queue.get_nowait())
+                    for event in events:
                         yield f"data: {json.dumps({'type': 'progress', 'data': event})}\n\n"
+                    deltas = [late_delta] if late_delta else []
+                    while not token_queue.empty():
+                        deltas.append(token_queue.get_nowait())
+                    for delta in deltas:
+                        streamed.append(delta)
+                        yield f"data: {json.dumps({'content': delta})}\n\n"
 
                     result = await invoke_task
 
@@ -311,10 +349,12 @@ async def analyze_crypto(
                     response = result.get("final_response") or "（無回應）"
                     response_metadata = build_response_metadata(result, effective_mode)
 
-                    chunk_size = 50
-                    for i in range(0, len(response), chunk_size):
-                        yield f"data: {json.dumps({'content': response[i : i + chunk_size]})}\n\n"
-                        await asyncio.sleep(0.005)
+                    # 未串流的回應（如意圖節點直接回覆）一次送出；
+                    # 串流內容被後處理修改時（模式附註、清理標題），以最終版本覆蓋
+                    if not streamed:
+                        yield f"data: {json.dumps({'content': response})}\n\n"
+                    elif "".join(streamed) != response:
+                        yield f"data: {json.dumps({'type': 'content_replace', 'content_replace': response})}\n\n"
 
                     await run_sync(
                         lambda: save_chat_message(
@@ -351,6 +391,10 @@ async def analyze_crypto(
                     yield f"data: {json.dumps({'error': 'Internal server error. Please try again.', 'done': True})}\n\n"
                 finally:
                     manager.progress_callback = None
+                    manager.stream_callback = None
+                    for pending_get in (progress_get, token_get):
+                        if pending_get is not None:
+                            pending_get.cancel()
                     if not invoke_task.done():
                         logger.info(
                             f"[V4] Generator exiting, ensuring task cancelled for session {body.session_id}"
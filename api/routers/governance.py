@@ -281,8 +281,8 @@ async def vote_on_pending_report(
             else:
                 raise HTTPException(status_code=500, detail=f"投票失敗: {error}")
 
-        # Check if consensus is reached after this vote
-        consensus = await governance_repo.check_report_consensus(report_id)
+        # 共識由投票語句回傳的最新計數判定，不需再查一次
+        consensus = result["consensus"]
 
         response = {
             "success": True,
@@ -129,7 +129,7 @@ async def perform_deep_analysis(
         result["source_mode"] = "deep_analysis"
         result["analyzed_by"] = llm_provider
         MARKET_PULSE_CACHE[symbol] = result
-        await run_sync(save_market_pulse_cache)
+        await run_sync(save_market_pulse_cache, True, [symbol])
 
     return result
 
@@ -149,7 +149,7 @@ async def perform_on_demand_analysis(
     if result and "error" not in result:
         result["source_mode"] = "on_demand"
         MARKET_PULSE_CACHE[symbol] = result
-        asyncio.create_task(asyncio.to_thread(save_market_pulse_cache))
+        asyncio.create_task(asyncio.to_thread(save_market_pulse_cache, True, [symbol]))
         return result
 
     return None
@@ -64,6 +64,40 @@ class NotificationConnectionManager:
             except Exception as e:
                 logger.error("Failed to send notification to user %s: %s", user_id, e)
 
+    async def send_to_users(self, payloads: dict, batch_size: int = 200) -> int:
+        """
+        Fan out per-user payload lists to online users only.
+
+        Connections are snapshotted under a single lock acquisition, then sent
+        in concurrent batches of ``batch_size`` users.
+
+        Returns:
+            Number of users that had at least one open connection.
+        """
+        async with self._lock:
+            targets = [
+                (uid, self.active_connections[uid].copy(), items)
+                for uid, items in payloads.items()
+                if self.active_connections.get(uid)
+            ]
+
+        async def _send(uid, connections, items):
+            for connection in connections:
+                for data in items:
+                    try:
+                        await connection.send_json(data)
+                    except Exception as e:
+                        logger.error(
+                            "Failed to send notification to user %s: %s", uid, e
+                        )
+                        break
+
+        for start in range(0, len(targets), batch_size):
+            await asyncio.gather(
+                *[_send(*target) for target in targets[start : start + batch_size]]
+            )
+        return len(targets)
+
     def is_user_online(self, user_id: str) -> bool:
         return (
             user_id in self.active_connections
@@ -340,3 +374,17 @@ async def push_notification_to_user(user_id: str, notification: dict):
             "data": notification,
         },
     )
+
+
+async def push_notifications_bulk(notifications: list, batch_size: int = 200) -> int:
+    """Push many created notifications, grouped per user, to online users.
+
+    Returns:
+        Number of online users that received at least one notification.
+    """
+    payloads: dict = {}
+    for notification in notifications:
+        payloads.setdefault(notification["user_id"], []).append(
+            {"type": "notification", "data": notification}
+        )
+    return await notification_manager.send_to_users(payloads, batch_size=batch_size)
@@ -12,6 +12,7 @@ from api.middleware.rate_limit import limiter
 from core.orm.config_repo import config_repo
 from core.orm.repositories import user_repo
 from core.orm.scam_tracker_repo import scam_tracker_repo
+from core.scam_wallet_index import FULL_ADDRESS_LENGTH
 
 from .models import ScamReportCreate
 
@@ -54,14 +55,27 @@ async def list_scam_reports(
 
 @router.get("/search", response_model=dict)
 async def search_scam_wallet(
-    wallet_address: str = Query(..., description="錢包地址"),
+    wallet_address: str = Query(..., description="錢包地址（可為 GABC…WXYZ 截斷形式）"),
+    limit: int = Query(10, ge=1, le=50, description="截斷搜尋最多返回筆數"),
 ):
     """
     搜尋錢包是否被舉報
 
-    公開端點，返回該錢包的舉報詳情（如果存在）。
+    公開端點。完整地址返回該錢包的舉報詳情（如果存在）；
+    截斷地址（前綴、…後綴或 前綴…後綴）返回符合的舉報列表。
     """
     try:
+        if len(wallet_address.strip()) != FULL_ADDRESS_LENGTH:
+            reports = await scam_tracker_repo.search_wallets(
+                wallet_address, limit=limit
+            )
+            return {
+                "success": True,
+                "found": bool(reports),
+                "reports": reports,
+                "count": len(reports),
+            }
+
         report = await scam_tracker_repo.search_wallet(wallet_address)
 
         if report:
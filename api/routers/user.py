@@ -290,7 +290,8 @@ async def refresh_access_token(
     # Check if the refresh token has been revoked (e.g., from logout)
     from api.deps import is_token_revoked
 
-    if is_token_revoked(refresh_token_value):
+    # Bloom misses are free, but a "maybe" hits Redis / the DB: keep it off the loop
+    if await run_sync(is_token_revoked, refresh_token_value):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Refresh token has been revoked",
@@ -343,12 +344,28 @@ async def refresh_access_token(
 @limiter.limit("30/minute")
 async def logout(request: Request, response: Response):
     """Clear JWT cookies on logout and revoke refresh token."""
-    from api.deps import REFRESH_TOKEN_COOKIE, revoke_token
+    from api.deps import (
+        REFRESH_TOKEN_COOKIE,
+        get_token_from_cookie,
+        revoke_token,
+        verify_token,
+    )
+    from core.principal_cache import invalidate_principal
 
     # Revoke the refresh token to prevent token reuse after logout
     refresh_token_value = request.cookies.get(REFRESH_TOKEN_COOKIE)
     if refresh_token_value:
-        revoke_token(refresh_token_value)
+        await run_sync(revoke_token, refresh_token_value)
+
+    # Drop the cached principal so the next request re-reads the user
+    access_token_value = get_token_from_cookie(request)
+    if access_token_value:
+        try:
+            user_id = verify_token(access_token_value).get("sub")
+        except HTTPException:
+            user_id = None
+        if user_id:
+            await invalidate_principal(user_id)
 
     clear_token_cookies(response)
     return {"success": True}
@@ -3,10 +3,11 @@
 import asyncio
 import concurrent.futures
 from datetime import datetime, timedelta, timezone
-from typing import List
+from typing import Dict, List, Optional
 
 import numpy as np
 
+from analysis.screener_state import get_screener_state
 from api.utils import logger, run_sync
 
 # 專用背景任務 executor，避免佔用 user request 的 default thread pool
@@ -17,6 +18,15 @@ _background_executor = concurrent.futures.ThreadPoolExecutor(
 # 防止 screener 快速更新重疊執行
 _price_update_running = False
 
+# WebSocket ticker 推送後，最多每隔這麼久重新排行一次快取
+SCREENER_RERANK_INTERVAL = 1.0
+_screener_rerank_pending = False
+# 目前訂閱 ticker 的幣種；兩次完整分析之間只在這些幣種內重新排行
+_screener_ws_symbols: frozenset = frozenset()
+
+# 本進程持有的各 Market Pulse symbol 版本（見 core.database.market_pulse_store）
+_market_pulse_versions: Dict[str, int] = {}
+
 from analysis.market_pulse import get_market_pulse
 from api.globals import (
     ANALYSIS_STATUS,
@@ -35,7 +45,15 @@ from core.config import (
     SCREENER_UPDATE_INTERVAL_MINUTES,
     SUPPORTED_EXCHANGES,
 )
-from core.database import get_cache, set_cache
+from core.database import (
+    fetch_market_pulse_entries,
+    get_cache,
+    load_market_pulse_entries,
+    save_market_pulse_entries,
+    set_cache,
+    start_market_pulse_listener,
+    stop_market_pulse_listener,
+)
 from data.data_fetcher import get_data_fetcher
 from utils.okx_api_connector import OKXAPIConnector
 
@@ -46,31 +64,84 @@ def _market_pulse_cache_snapshot() -> dict:
     return dict(MARKET_PULSE_CACHE)
 
 
-def save_market_pulse_cache(silent=True):
-    """Save Market Pulse data to DB."""
+def save_market_pulse_cache(silent=True, symbols: Optional[List[str]] = None):
+    """Save Market Pulse data to DB, one entry per symbol (default: all cached)."""
     try:
-        set_cache("MARKET_PULSE", _market_pulse_cache_snapshot())
+        snapshot = _market_pulse_cache_snapshot()
+        if symbols is not None:
+            snapshot = {s: snapshot[s] for s in symbols if s in snapshot}
+        if not snapshot:
+            return
+        versions = save_market_pulse_entries(snapshot)
+        with market_pulse_lock:
+            _market_pulse_versions.update(versions)
         if not silent:
-            logger.info("Market Pulse cache saved to DB")
+            logger.info(f"Market Pulse cache saved to DB ({len(versions)} symbols)")
     except Exception as e:
         logger.error(f"Failed to save Market Pulse cache: {e}")
 
 
+def _apply_market_pulse_entries(entries: dict) -> int:
+    """把 store 讀出的 {symbol: {version, data}} 寫進進程內快取"""
+    with market_pulse_lock:
+        for symbol, record in entries.items():
+            MARKET_PULSE_CACHE[symbol] = record["data"]
+            _market_pulse_versions[symbol] = record["version"]
+    return len(entries)
+
+
 def load_market_pulse_cache():
     """Load Market Pulse data from DB."""
     try:
+        entries = load_market_pulse_entries()
+        if entries:
+            _apply_market_pulse_entries(entries)
+            logger.info(
+                f"Loaded Market Pulse cache from DB ({len(MARKET_PULSE_CACHE)} symbols)"
+            )
+            return
+
+        # 舊格式：整份 dict 存在單一 MARKET_PULSE key，載入後轉存為逐 symbol 格式
         data = get_cache("MARKET_PULSE")
         if data:
             with market_pulse_lock:
                 MARKET_PULSE_CACHE.clear()
                 MARKET_PULSE_CACHE.update(data)
             logger.info(
-                f"Loaded Market Pulse cache from DB ({len(MARKET_PULSE_CACHE)} symbols)"
+                f"Loaded legacy Market Pulse cache from DB ({len(MARKET_PULSE_CACHE)} symbols)"
             )
+            save_market_pulse_cache()
     except Exception as e:
         logger.error(f"Failed to load Market Pulse cache: {e}")
 
 
+def sync_market_pulse_cache(versions: Optional[Dict[str, int]] = None) -> int:
+    """
+    只拉取其他進程更新過的 symbol，回傳更新筆數
+
+    Args:
+        versions: 變更通知帶來的 {symbol: version}；None 表示比對索引
+    """
+    with market_pulse_lock:
+        # 只看版本：TTL 過期的 symbol 若未更新不重新拉取，以免舊資料被當成新的快取命中
+        known = dict(_market_pulse_versions)
+    if versions is None:
+        entries = load_market_pulse_entries(known)
+    else:
+        stale = [s for s, v in versions.items() if known.get(s) != v]
+        entries = fetch_market_pulse_entries(stale) if stale else {}
+    return _apply_market_pulse_entries(entries)
+
+
+def start_market_pulse_sync():
+    """訂閱 Market Pulse 變更通知（無 Redis 時定期比對索引）"""
+    start_market_pulse_listener(sync_market_pulse_cache)
+
+
+def stop_market_pulse_sync():
+    stop_market_pulse_listener()
+
+
 # --- Funding Rate Cache Persistence ---
 def save_funding_rate_cache(silent=True):
     """Save Funding Rate data to DB (Persistence)."""
@@ -332,34 +403,14 @@ async def refresh_all_market_pulse_data(target_symbols: List[str] = None):
     FIXED_SOURCES = ["google"]
     sem = asyncio.Semaphore(2)
 
-    # Batch saving optimization
-    unsaved_changes = 0
-    BATCH_SIZE = 10
-    save_lock = asyncio.Lock()
-
-    async def _safe_save_cache():
-        """Helper to save cache securely using lock"""
-        async with save_lock:
-            await run_sync(set_cache, "MARKET_PULSE", _market_pulse_cache_snapshot())
-            logger.info("💾 [Batch Save] Saved Market Pulse cache")
-
     async def _tracked_update(sym):
-        nonlocal unsaved_changes
         try:
             await update_single_market_pulse(sym, FIXED_SOURCES, semaphore=sem)
 
             if sym in MARKET_PULSE_CACHE:
                 MARKET_PULSE_CACHE[sym]["timestamp"] = window_start_iso
-
-                should_save = False
-                async with save_lock:
-                    unsaved_changes += 1
-                    if unsaved_changes >= BATCH_SIZE:
-                        should_save = True
-                        unsaved_changes = 0
-
-                if should_save:
-                    await _safe_save_cache()
+                # 逐 symbol 寫入：成本與追蹤的 symbol 總數無關
+                await run_sync(save_market_pulse_cache, True, [sym])
 
         finally:
             ANALYSIS_STATUS["completed"] += 1
@@ -370,9 +421,6 @@ async def refresh_all_market_pulse_data(target_symbols: List[str] = None):
 
     ANALYSIS_STATUS["is_running"] = False
     logger.info(f"✅ Market Pulse Analysis completed for {len(tasks)} symbols")
-
-    # Final save
-    save_market_pulse_cache(silent=False)
     return window_start_iso
 
 
@@ -431,10 +479,9 @@ async def trigger_on_demand_analysis(symbols: List[str]):
             # Re-use update_single_market_pulse
             await update_single_market_pulse(sym, FIXED_SOURCES, semaphore=sem)
 
-            # Simple in-memory update mark (save is handled by background loop occasionally, or next startup)
-            # But for good UX, let's update cache timestamp
             if sym in MARKET_PULSE_CACHE:
                 MARKET_PULSE_CACHE[sym]["timestamp"] = window_start.isoformat()
+                await run_sync(save_market_pulse_cache, True, [sym])
         except Exception as e:
             logger.error(f"On-demand analysis failed for {sym}: {e}")
 
@@ -804,35 +851,50 @@ async def run_screener_analysis():
 async def _screener_ticker_callback(symbol: str, parsed: dict):
     """
     OKX WebSocket ticker push callback。
-    每當 OKX 推送新 ticker 時直接更新 screener 快取，達到真正即時。
+    每次推送只更新 ScreenerState 中該幣種的那一列（O(1)），
+    快取中的排行則最多每 SCREENER_RERANK_INTERVAL 秒重新產生一次。
     """
-    data = cached_screener_result.get("data")
-    if not data:
+    global _screener_rerank_pending
+    if not cached_screener_result.get("data"):
         return
 
-    last = parsed.get("last", 0)
-    change = parsed.get("change24h", 0)
-    # 正規化：BTC-USDT / BTC / BTCUSDT 都統一比較
-    symbol_key = symbol.upper().replace("/", "").replace("-", "")
+    updated = get_screener_state("okx").update(
+        symbol,
+        parsed.get("last", 0),
+        open24h=parsed.get("open24h") or None,
+        volume=parsed.get("volCcy24h") or None,
+    )
+    if updated and not _screener_rerank_pending:
+        _screener_rerank_pending = True
+        asyncio.get_running_loop().call_later(
+            SCREENER_RERANK_INTERVAL, _rerank_screener_cache
+        )
 
-    all_list_names = [
-        "top_volume",
-        "top_gainers",
-        "top_losers",
-        "top_performers",
-        "oversold",
-        "overbought",
-    ]
-    for list_name in all_list_names:
-        for item in data.get(list_name) or []:
-            item_key = item.get("Symbol", "").upper().replace("/", "").replace("-", "")
-            if item_key == symbol_key:
-                item["Close"] = last
-                item["price_change_24h"] = change
 
-    cached_screener_result["data"]["last_updated"] = datetime.now(
-        timezone.utc
-    ).strftime("%Y-%m-%d %H:%M:%S")
+def _rerank_screener_cache():
+    """
+    以 ScreenerState 的最新行情重新產生成交量 / 漲幅 / 跌幅榜。
+    只有已訂閱的幣種會收到推送，其餘列停在上次完整分析的值，
+    因此只在訂閱集合內重新排序；榜單成員的變動交給下一次完整分析。
+    """
+    global _screener_rerank_pending
+    _screener_rerank_pending = False
+
+    data = cached_screener_result.get("data")
+    if not data or not _screener_ws_symbols:
+        return
+
+    top_volume, top_gainers, top_losers = get_screener_state("okx").snapshot_records(
+        limit=len(data.get("top_volume") or []) or 10,
+        within=_screener_ws_symbols,
+    )
+    if not top_volume and not top_gainers:
+        return
+
+    data["top_volume"] = top_volume
+    data["top_gainers"] = top_gainers
+    data["top_losers"] = top_losers
+    data["last_updated"] = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
 
 
 async def _subscribe_screener_symbols_to_ws():
@@ -840,6 +902,7 @@ async def _subscribe_screener_symbols_to_ws():
     將 screener 快取內的幣種訂閱到 OKX Ticker WebSocket，
     取代 REST polling，讓價格由 OKX 主動推送。
     """
+    global _screener_ws_symbols
     from data.okx_websocket import okx_ticker_ws_manager
 
     data = cached_screener_result.get("data")
@@ -867,6 +930,7 @@ async def _subscribe_screener_symbols_to_ws():
 
     await okx_ticker_ws_manager.unsubscribe_all()
     await okx_ticker_ws_manager.subscribe_many(list(symbols), _screener_ticker_callback)
+    _screener_ws_symbols = frozenset(symbols)
     logger.info(f"[Screener WS] 已訂閱 {len(symbols)} 個即時 ticker：{symbols}")
 
 
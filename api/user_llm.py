@@ -3,14 +3,19 @@
 from typing import Optional
 
 from api.utils import logger
-from core.orm.user_api_keys_repo import SUPPORTED_PROVIDERS, user_api_keys_repo
+from core.llm_client_pool import get_user_api_keys
+from core.orm.user_api_keys_repo import SUPPORTED_PROVIDERS
 
 
 async def resolve_user_llm_credentials(
     current_user: Optional[dict],
     preferred_provider: Optional[str] = None,
 ) -> Optional[dict]:
-    """Resolve an authenticated user's LLM provider + decrypted API key."""
+    """Resolve an authenticated user's LLM provider + decrypted API key.
+
+    All of the user's keys come from one cached lookup (see
+    core/llm_client_pool.py) instead of one query per provider tried.
+    """
     if not current_user:
         return None
 
@@ -33,8 +38,9 @@ async def resolve_user_llm_credentials(
         if provider not in providers:
             providers.append(provider)
 
+    keys = await get_user_api_keys(user_id)
     for provider in providers:
-        api_key = await user_api_keys_repo.get_user_api_key(user_id, provider)
+        api_key = keys.get(provider)
         if api_key:
             return {"provider": provider, "api_key": api_key}
 
@@ -144,6 +144,13 @@ class LanguageAwareLLM:
             self._llm.invoke, self._inject_language(messages), **kwargs
         )
 
+    async def astream(self, messages, **kwargs):
+        if not hasattr(self._llm, "astream"):
+            yield await self.ainvoke(messages, **kwargs)
+            return
+        async for chunk in self._llm.astream(self._inject_language(messages), **kwargs):
+            yield chunk
+
     def bind_tools(self, tools, **kwargs):
         """Delegate bind_tools but preserve language injection in the returned wrapper."""
         bound = self._llm.bind_tools(tools, **kwargs)
@@ -163,6 +170,8 @@ def bootstrap(
     user_tier: str = "free",
     user_id: Optional[str] = None,
     session_id: Optional[str] = None,
+    llm_provider: Optional[str] = None,
+    llm_model: Optional[str] = None,
 ) -> ManagerAgent:
     user_tier = normalize_membership_tier(user_tier)
     PromptRegistry.load()
@@ -186,6 +195,8 @@ def bootstrap(
     if existing_entry is not None:
         existing, _ = existing_entry
         existing.llm = lang_llm
+        existing.llm_provider = llm_provider
+        existing.llm_model = llm_model
         existing.user_tier = user_tier
         existing.user_id = user_id or "anonymous"
         if hasattr(existing, "tool_access_resolver"):
@@ -1084,6 +1095,9 @@ def bootstrap(
     )
     # Share the same TokenTracker so manager sees combined cost
     manager._token_tracker = token_tracker
+    # Background memory jobs rebuild the client from the user's stored key
+    manager.llm_provider = llm_provider
+    manager.llm_model = llm_model
     while len(_manager_cache) >= MAX_CACHE_SIZE:
         _manager_cache.popitem(last=False)
     _manager_cache[cache_key] = (manager, time.time())
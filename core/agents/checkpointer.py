@@ -0,0 +1,949 @@
+"""
+Persistent, bounded LangGraph checkpointer.
+
+Replaces the per-session ``MemorySaver`` objects the manager used to keep in a
+FIFO dict.  One ``PersistentCheckpointSaver`` is shared by the whole worker;
+``ScopedCheckpointer`` pins every call to a ``user_id:session_id`` thread so
+sessions stay isolated exactly as before.
+
+Storage (Postgres via the psycopg2 pool, or a SQLite file / ``:memory:``):
+  checkpoints        one row per checkpoint (without channel values)
+  checkpoint_blobs   channel values, written only for channels whose version
+                     changed in that step (deltas)
+  checkpoint_writes  pending writes of the in-flight step
+
+Bounds:
+  - at most CHECKPOINT_KEEP_LAST checkpoints per thread, and no more than
+    CHECKPOINT_THREAD_MAX_BYTES of them (the latest is always kept); older
+    checkpoints, their writes and unreferenced blob versions are deleted in
+    the same transaction as the put
+  - a hot LRU of the latest checkpoint per thread, capped by entry count and
+    CHECKPOINT_HOT_MAX_BYTES of serialized state, serves resumes without a
+    blob round-trip; on the shared Postgres backend an entry written or
+    checked against the head within CHECKPOINT_HOT_TRUST_SECONDS is served
+    as is, older ones are re-checked with one head-id query
+  - threads with no new checkpoint for CHECKPOINT_IDLE_DAYS are dropped by
+    ``checkpoint_cleanup_task`` (started from api/lifespan.py)
+
+Backend failures are logged and the hot entry keeps the run going, so a
+database outage degrades to the old in-memory behaviour instead of failing
+the request.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_BACKEND = os.getenv("CHECKPOINT_BACKEND", "postgres").lower()
+CHECKPOINT_SQLITE_PATH = os.getenv("CHECKPOINT_SQLITE_PATH", "data/checkpoints.db")
+CHECKPOINT_KEEP_LAST = int(os.getenv("CHECKPOINT_KEEP_LAST", "5"))
+CHECKPOINT_THREAD_MAX_BYTES = int(
+    os.getenv("CHECKPOINT_THREAD_MAX_BYTES", str(2 * 1024 * 1024))
+)
+CHECKPOINT_HOT_MAX_ENTRIES = int(os.getenv("CHECKPOINT_HOT_MAX_ENTRIES", "2048"))
+CHECKPOINT_HOT_MAX_BYTES = int(
+    os.getenv("CHECKPOINT_HOT_MAX_BYTES", str(64 * 1024 * 1024))
+)
+CHECKPOINT_HOT_TRUST_SECONDS = float(os.getenv("CHECKPOINT_HOT_TRUST_SECONDS", "5"))
+CHECKPOINT_IDLE_DAYS = float(os.getenv("CHECKPOINT_IDLE_DAYS", "30"))
+CHECKPOINT_CLEANUP_INTERVAL = float(
+    os.getenv("CHECKPOINT_CLEANUP_INTERVAL", str(24 * 3600))
+)
+
+Typed = Tuple[str, bytes]
+
+# Same tables as core/database/schema.create_checkpoint_tables, SQLite types
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    ts REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS checkpoint_blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS checkpoint_writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+# ============================================================================
+# Backends
+# ============================================================================
+
+
+class _SQLiteBackend:
+    """Single connection guarded by a lock; works with ``:memory:`` too."""
+
+    shared = False
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SQLITE_SCHEMA)
+        columns = {
+            row[1] for row in self._conn.execute("PRAGMA table_info(checkpoints)")
+        }
+        if "ts" not in columns:
+            # Files from before idle-thread cleanup: start their clock now
+            with self._conn:
+                self._conn.execute(
+                    "ALTER TABLE checkpoints ADD COLUMN ts REAL NOT NULL DEFAULT 0"
+                )
+                self._conn.execute("UPDATE checkpoints SET ts = ?", (time.time(),))
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def sql(statement: str) -> str:
+        return statement.replace("%s", "?")
+
+    @contextmanager
+    def cursor(self):
+        with self._lock:
+            cur = self._conn.cursor()
+            try:
+                yield cur
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            finally:
+                cur.close()
+
+
+class _PostgresBackend:
+    """Uses the shared psycopg2 pool; tables come from init_db."""
+
+    shared = True
+
+    @staticmethod
+    def sql(statement: str) -> str:
+        return statement
+
+    @contextmanager
+    def cursor(self):
+        from core.database.connection import get_connection
+
+        conn = get_connection()
+        try:
+            with conn.cursor() as cur:
+                yield cur
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+
+# ============================================================================
+# Hot LRU
+# ============================================================================
+
+
+@dataclass
+class _HotEntry:
+    checkpoint_id: str
+    parent_checkpoint_id: Optional[str]
+    checkpoint: Typed  # without channel_values
+    metadata: Typed
+    channels: Dict[str, Tuple[str, Typed]]  # channel -> (version, typed value)
+    writes: Dict[Tuple[str, int], Tuple[str, str, Typed, str]] = field(
+        default_factory=dict
+    )
+    # time.monotonic() when this was last known to be the thread's head
+    verified_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def size(self) -> int:
+        return (
+            len(self.checkpoint[1])
+            + len(self.metadata[1])
+            + sum(len(v[1][1]) for v in self.channels.values())
+            + sum(len(w[2][1]) for w in self.writes.values())
+        )
+
+
+class _HotCache:
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], _HotEntry]" = OrderedDict()
+        self._sizes: Dict[Tuple[str, str], int] = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[_HotEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Tuple[str, str], entry: _HotEntry) -> None:
+        self.pop(key)
+        size = entry.size
+        if size > self.max_bytes:
+            return
+        self._entries[key] = entry
+        self._sizes[key] = size
+        self.bytes += size
+        while self._entries and (
+            len(self._entries) > self.max_entries or self.bytes > self.max_bytes
+        ):
+            old_key, _ = self._entries.popitem(last=False)
+            self.bytes -= self._sizes.pop(old_key)
+
+    def resize(self, key: Tuple[str, str]) -> None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.put(key, entry)
+
+    def pop(self, key: Tuple[str, str]) -> None:
+        if self._entries.pop(key, None) is not None:
+            self.bytes -= self._sizes.pop(key)
+
+    def pop_thread(self, thread_id: str) -> None:
+        self.pop_threads({thread_id})
+
+    def pop_threads(self, thread_ids: set) -> None:
+        for key in [k for k in self._entries if k[0] in thread_ids]:
+            self.pop(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# ============================================================================
+# Saver
+# ============================================================================
+
+
+def _thread_ns(config: RunnableConfig) -> Tuple[str, str]:
+    configurable = config["configurable"]
+    return configurable["thread_id"], configurable.get("checkpoint_ns", "")
+
+
+def _config(thread_id: str, ns: str, checkpoint_id: Optional[str]) -> Optional[dict]:
+    if not checkpoint_id:
+        return None
+    return {
+        "configurable": {
+            "thread_id": thread_id,
+            "checkpoint_ns": ns,
+            "checkpoint_id": checkpoint_id,
+        }
+    }
+
+
+class PersistentCheckpointSaver(BaseCheckpointSaver[str]):
+    """Delta-writing, bounded checkpointer; see module docstring."""
+
+    def __init__(
+        self,
+        backend: Any,
+        *,
+        keep_last: int = CHECKPOINT_KEEP_LAST,
+        thread_max_bytes: int = CHECKPOINT_THREAD_MAX_BYTES,
+        hot_max_entries: int = CHECKPOINT_HOT_MAX_ENTRIES,
+        hot_max_bytes: int = CHECKPOINT_HOT_MAX_BYTES,
+        hot_trust_seconds: float = CHECKPOINT_HOT_TRUST_SECONDS,
+        serde: Any = None,
+    ) -> None:
+        super().__init__(serde=serde)
+        self.backend = backend
+        self.hot_trust_seconds = hot_trust_seconds
+        self.keep_last = max(1, keep_last)
+        self.thread_max_bytes = thread_max_bytes
+        self._hot = _HotCache(hot_max_entries, hot_max_bytes)
+        self._lock = threading.RLock()
+        self.backend_errors = 0
+
+    # ── Helpers ──────────────────────────────────────────────────────────────
+
+    def _exec(self, cur, statement: str, params: tuple = ()) -> None:
+        cur.execute(self.backend.sql(statement), params)
+
+    def _tuple_from_hot(self, thread_id: str, ns: str, entry: _HotEntry):
+        checkpoint: Checkpoint = self.serde.loads_typed(entry.checkpoint)
+        channel_values = {
+            ch: self.serde.loads_typed(typed)
+            for ch, (_v, typed) in entry.channels.items()
+            if typed[0] != "empty"
+        }
+        return CheckpointTuple(
+            config=_config(thread_id, ns, entry.checkpoint_id),
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=self.serde.loads_typed(entry.metadata),
+            parent_config=_config(thread_id, ns, entry.parent_checkpoint_id),
+            pending_writes=[
+                (task_id, ch, self.serde.loads_typed(typed))
+                for task_id, ch, typed, _path in entry.writes.values()
+            ],
+        )
+
+    def _load_entry(self, cur, thread_id: str, ns: str, row: tuple) -> _HotEntry:
+        checkpoint_id, parent_id, ck_type, ck_blob, md_type, md_blob = row
+        checkpoint_typed = (ck_type, bytes(ck_blob))
+        versions = self.serde.loads_typed(checkpoint_typed)["channel_versions"]
+
+        channels: Dict[str, Tuple[str, Typed]] = {}
+        if versions:
+            self._exec(
+                cur,
+                "SELECT channel, version, type, blob FROM checkpoint_blobs "
+                "WHERE thread_id = %s AND checkpoint_ns = %s AND ("
+                + " OR ".join(["(channel = %s AND version = %s)"] * len(versions))
+                + ")",
+                (thread_id, ns, *[x for kv in versions.items() for x in kv]),
+            )
+            for channel, version, typ, blob in cur.fetchall():
+                channels[channel] = (version, (typ, bytes(blob or b"")))
+
+        self._exec(
+            cur,
+            "SELECT task_id, idx, channel, type, blob, task_path "
+            "FROM checkpoint_writes "
+            "WHERE thread_id = %s AND checkpoint_ns = %s AND checkpoint_id = %s "
+            "ORDER BY task_id, idx",
+            (thread_id, ns, checkpoint_id),
+        )
+        writes = {
+            (task_id, idx): (task_id, channel, (typ, bytes(blob or b"")), path)
+            for task_id, idx, channel, typ, blob, path in cur.fetchall()
+        }
+        return _HotEntry(
+            checkpoint_id=checkpoint_id,
+            parent_checkpoint_id=parent_id,
+            checkpoint=checkpoint_typed,
+            metadata=(md_type, bytes(md_blob)),
+            channels=channels,
+            writes=writes,
+        )
+
+    _SELECT_CHECKPOINT = (
+        "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+        "metadata_type, metadata FROM checkpoints "
+        "WHERE thread_id = %s AND checkpoint_ns = %s"
+    )
+
+    def _head_id(self, thread_id: str, ns: str) -> Optional[str]:
+        with self.backend.cursor() as cur:
+            self._exec(
+                cur,
+                "SELECT checkpoint_id FROM checkpoints "
+                "WHERE thread_id = %s AND checkpoint_ns = %s "
+                "ORDER BY checkpoint_id DESC LIMIT 1",
+                (thread_id, ns),
+            )
+            row = cur.fetchone()
+        return row[0] if row else None
+
+    def _prune(self, cur, thread_id: str, ns: str, newest: Checkpoint) -> None:
+        """Keep the newest checkpoints within count and byte budgets."""
+        self._exec(
+            cur,
+            "SELECT checkpoint_id, size_bytes FROM checkpoints "
+            "WHERE thread_id = %s AND checkpoint_ns = %s "
+            "ORDER BY checkpoint_id DESC LIMIT %s",
+            (thread_id, ns, self.keep_last + 1),
+        )
+        rows = cur.fetchall()
+        kept, total = 0, 0
+        for _checkpoint_id, size in rows[: self.keep_last]:
+            if kept and total + size > self.thread_max_bytes:
+                break
+            kept += 1
+            total += size
+        if len(rows) <= kept:
+            return
+
+        boundary_id = rows[kept - 1][0]
+        if boundary_id == newest["id"]:
+            boundary_versions = newest["channel_versions"]
+        else:
+            self._exec(
+                cur,
+                "SELECT type, checkpoint FROM checkpoints "
+                "WHERE thread_id = %s AND checkpoint_ns = %s AND checkpoint_id = %s",
+                (thread_id, ns, boundary_id),
+            )
+            typ, blob = cur.fetchone()
+            boundary_versions = self.serde.loads_typed((typ, bytes(blob)))[
+                "channel_versions"
+            ]
+
+        for table in ("checkpoints", "checkpoint_writes"):
+            self._exec(
+                cur,
+                f"DELETE FROM {table} WHERE thread_id = %s AND checkpoint_ns = %s "
+                "AND checkpoint_id < %s",
+                (thread_id, ns, boundary_id),
+            )
+        # Versions are zero-padded and increase per channel, so anything older
+        # than what the oldest kept checkpoint references is unreachable
+        for channel, version in boundary_versions.items():
+            self._exec(
+                cur,
+                "DELETE FROM checkpoint_blobs WHERE thread_id = %s "
+                "AND checkpoint_ns = %s AND channel = %s AND version < %s",
+                (thread_id, ns, channel, version),
+            )
+
+    # ── Sync API ─────────────────────────────────────────────────────────────
+
+    def get_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id, ns = _thread_ns(config)
+        checkpoint_id = get_checkpoint_id(config)
+
+        with self._lock:
+            hot = self._hot.get((thread_id, ns))
+        if hot is not None:
+            if checkpoint_id == hot.checkpoint_id:
+                return self._tuple_from_hot(thread_id, ns, hot)
+            if checkpoint_id is None:
+                # Another worker may have advanced a shared thread; an entry
+                # checked (or written) moments ago is trusted without a query
+                fresh = time.monotonic() - hot.verified_at < self.hot_trust_seconds
+                if not fresh:
+                    try:
+                        fresh = (
+                            not self.backend.shared
+                            or self._head_id(thread_id, ns) == hot.checkpoint_id
+                        )
+                        if fresh:
+                            hot.verified_at = time.monotonic()
+                    except Exception as exc:
+                        self._on_backend_error("head lookup", exc)
+                        fresh = True
+                if fresh:
+                    return self._tuple_from_hot(thread_id, ns, hot)
+
+        try:
+            with self.backend.cursor() as cur:
+                if checkpoint_id:
+                    self._exec(
+                        cur,
+                        self._SELECT_CHECKPOINT + " AND checkpoint_id = %s",
+                        (thread_id, ns, checkpoint_id),
+                    )
+                else:
+                    self._exec(
+                        cur,
+                        self._SELECT_CHECKPOINT
+                        + " ORDER BY checkpoint_id DESC LIMIT 1",
+                        (thread_id, ns),
+                    )
+                row = cur.fetchone()
+                if row is None:
+                    return None
+                entry = self._load_entry(cur, thread_id, ns, row)
+        except Exception as exc:
+            self._on_backend_error("load", exc)
+            return None
+
+        if checkpoint_id is None:
+            with self._lock:
+                self._hot.put((thread_id, ns), entry)
+        return self._tuple_from_hot(thread_id, ns, entry)
+
+    def list(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> Iterator[CheckpointTuple]:
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = %s")
+            params.append(config["configurable"]["thread_id"])
+            ns = config["configurable"].get("checkpoint_ns")
+            if ns is not None:
+                clauses.append("checkpoint_ns = %s")
+                params.append(ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = %s")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < %s")
+            params.append(before_id)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+
+        with self.backend.cursor() as cur:
+            self._exec(
+                cur,
+                "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+                "type, checkpoint, metadata_type, metadata FROM checkpoints"
+                + where
+                + " ORDER BY checkpoint_id DESC",
+                tuple(params),
+            )
+            rows = cur.fetchall()
+            results = []
+            for thread_id, ns, *row in rows:
+                if filter:
+                    metadata = self.serde.loads_typed((row[4], bytes(row[5])))
+                    if not all(metadata.get(k) == v for k, v in filter.items()):
+                        continue
+                if limit is not None and len(results) >= limit:
+                    break
+                results.append(
+                    (thread_id, ns, self._load_entry(cur, thread_id, ns, tuple(row)))
+                )
+
+        for thread_id, ns, entry in results:
+            yield self._tuple_from_hot(thread_id, ns, entry)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id, ns = _thread_ns(config)
+        parent_id = config["configurable"].get("checkpoint_id")
+        c = checkpoint.copy()
+        values: dict[str, Any] = c.pop("channel_values")  # type: ignore[misc]
+
+        # Delta: serialize only channels whose version moved this step
+        delta: Dict[str, Tuple[str, Typed]] = {
+            k: (
+                v,
+                self.serde.dumps_typed(values[k]) if k in values else ("empty", b""),
+            )
+            for k, v in new_versions.items()
+        }
+        checkpoint_typed = self.serde.dumps_typed(c)
+        metadata_typed = self.serde.dumps_typed(
+            get_checkpoint_metadata(config, metadata)
+        )
+        size = (
+            len(checkpoint_typed[1])
+            + len(metadata_typed[1])
+            + sum(len(t[1]) for _v, t in delta.values())
+        )
+
+        try:
+            with self.backend.cursor() as cur:
+                for channel, (version, (typ, blob)) in delta.items():
+                    self._exec(
+                        cur,
+                        "INSERT INTO checkpoint_blobs "
+                        "(thread_id, checkpoint_ns, channel, version, type, blob) "
+                        "VALUES (%s, %s, %s, %s, %s, %s) ON CONFLICT DO NOTHING",
+                        (thread_id, ns, channel, version, typ, blob),
+                    )
+                self._exec(
+                    cur,
+                    "INSERT INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, "
+                    "parent_checkpoint_id, type, checkpoint, metadata_type, metadata, "
+                    "size_bytes, ts) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s) "
+                    "ON CONFLICT (thread_id, checkpoint_ns, checkpoint_id) DO UPDATE "
+                    "SET type = EXCLUDED.type, checkpoint = EXCLUDED.checkpoint, "
+                    "metadata_type = EXCLUDED.metadata_type, "
+                    "metadata = EXCLUDED.metadata, size_bytes = EXCLUDED.size_bytes, "
+                    "ts = EXCLUDED.ts",
+                    (
+                        thread_id,
+                        ns,
+                        checkpoint["id"],
+                        parent_id,
+                        checkpoint_typed[0],
+                        checkpoint_typed[1],
+                        metadata_typed[0],
+                        metadata_typed[1],
+                        size,
+                        time.time(),
+                    ),
+                )
+                self._prune(cur, thread_id, ns, checkpoint)
+        except Exception as exc:
+            self._on_backend_error("put", exc)
+
+        # Hot entry holds the full state: reuse unchanged channel blobs from
+        # the parent when it is cached, serialize the rest
+        with self._lock:
+            parent = self._hot.get((thread_id, ns))
+            channels: Dict[str, Tuple[str, Typed]] = {}
+            for k, version in c["channel_versions"].items():
+                if k in delta:
+                    channels[k] = delta[k]
+                elif (
+                    parent is not None and parent.channels.get(k, (None,))[0] == version
+                ):
+                    channels[k] = parent.channels[k]
+                elif k in values:
+                    channels[k] = (version, self.serde.dumps_typed(values[k]))
+            self._hot.put(
+                (thread_id, ns),
+                _HotEntry(
+                    checkpoint_id=checkpoint["id"],
+                    parent_checkpoint_id=parent_id,
+                    checkpoint=checkpoint_typed,
+                    metadata=metadata_typed,
+                    channels=channels,
+                ),
+            )
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id, ns = _thread_ns(config)
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows: List[Tuple[Tuple[str, int], Tuple[str, str, Typed, str]]] = []
+        for idx, (channel, value) in enumerate(writes):
+            key = (task_id, WRITES_IDX_MAP.get(channel, idx))
+            rows.append(
+                (key, (task_id, channel, self.serde.dumps_typed(value), task_path))
+            )
+
+        try:
+            with self.backend.cursor() as cur:
+                for (tid, idx), (_t, channel, (typ, blob), path) in rows:
+                    # Regular writes are idempotent; special ones (errors,
+                    # interrupts, resumes) overwrite
+                    conflict = (
+                        "DO NOTHING"
+                        if idx >= 0
+                        else "DO UPDATE SET channel = EXCLUDED.channel, "
+                        "type = EXCLUDED.type, blob = EXCLUDED.blob"
+                    )
+                    self._exec(
+                        cur,
+                        "INSERT INTO checkpoint_writes (thread_id, checkpoint_ns, "
+                        "checkpoint_id, task_id, idx, channel, type, blob, task_path) "
+                        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) "
+                        "ON CONFLICT (thread_id, checkpoint_ns, checkpoint_id, "
+                        f"task_id, idx) {conflict}",
+                        (
+                            thread_id,
+                            ns,
+                            checkpoint_id,
+                            tid,
+                            idx,
+                            channel,
+                            typ,
+                            blob,
+                            path,
+                        ),
+                    )
+        except Exception as exc:
+            self._on_backend_error("put_writes", exc)
+
+        with self._lock:
+            entry = self._hot.get((thread_id, ns))
+            if entry is not None and entry.checkpoint_id == checkpoint_id:
+                for key, value in rows:
+                    if key[1] >= 0 and key in entry.writes:
+                        continue
+                    entry.writes[key] = value
+                self._hot.resize((thread_id, ns))
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._hot.pop_thread(thread_id)
+        with self.backend.cursor() as cur:
+            for table in ("checkpoints", "checkpoint_blobs", "checkpoint_writes"):
+                self._exec(
+                    cur, f"DELETE FROM {table} WHERE thread_id = %s", (thread_id,)
+                )
+
+    def delete_idle_threads(self, max_idle_seconds: float, batch: int = 500) -> int:
+        """Drop threads with no checkpoint newer than max_idle_seconds."""
+        cutoff = time.time() - max_idle_seconds
+        removed = 0
+        while True:
+            with self.backend.cursor() as cur:
+                self._exec(
+                    cur,
+                    "SELECT thread_id FROM checkpoints GROUP BY thread_id "
+                    "HAVING MAX(ts) < %s LIMIT %s",
+                    (cutoff, batch),
+                )
+                idle = [row[0] for row in cur.fetchall()]
+                if idle:
+                    marks = ", ".join(["%s"] * len(idle))
+                    for table in (
+                        "checkpoints",
+                        "checkpoint_blobs",
+                        "checkpoint_writes",
+                    ):
+                        self._exec(
+                            cur,
+                            f"DELETE FROM {table} WHERE thread_id IN ({marks})",
+                            tuple(idle),
+                        )
+            with self._lock:
+                self._hot.pop_threads(set(idle))
+            removed += len(idle)
+            if len(idle) < batch:
+                return removed
+
+    # ── Async API ────────────────────────────────────────────────────────────
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        thread_id, ns = _thread_ns(config)
+        if not self.backend.shared:
+            with self._lock:
+                hot = self._hot.get((thread_id, ns))
+            checkpoint_id = get_checkpoint_id(config)
+            if hot is not None and checkpoint_id in (None, hot.checkpoint_id):
+                return self._tuple_from_hot(thread_id, ns, hot)
+        from api.utils import run_sync
+
+        return await run_sync(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        from api.utils import run_sync
+
+        items = await run_sync(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        from api.utils import run_sync
+
+        return await run_sync(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        from api.utils import run_sync
+
+        return await run_sync(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        from api.utils import run_sync
+
+        return await run_sync(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: str | None, channel: None) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # ── Introspection ────────────────────────────────────────────────────────
+
+    def _on_backend_error(self, op: str, exc: Exception) -> None:
+        self.backend_errors += 1
+        fallback = (
+            "thread starts without a checkpoint"
+            if op == "load"
+            else "using hot cache only"
+        )
+        logger.warning(
+            "[Checkpointer] %s failed, %s: %s: %s",
+            op,
+            fallback,
+            type(exc).__name__,
+            exc,
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": type(self.backend).__name__,
+                "hot_entries": len(self._hot),
+                "hot_bytes": self._hot.bytes,
+                "hot_hits": self._hot.hits,
+                "hot_misses": self._hot.misses,
+                "backend_errors": self.backend_errors,
+                "keep_last": self.keep_last,
+                "thread_max_bytes": self.thread_max_bytes,
+            }
+
+
+class ScopedCheckpointer(BaseCheckpointSaver[str]):
+    """View of a shared saver pinned to one thread id.
+
+    Every config is rewritten to ``thread_id``, so a graph compiled with this
+    checkpointer can only read and write its own session's checkpoints.
+    """
+
+    def __init__(self, saver: PersistentCheckpointSaver, thread_id: str):
+        super().__init__(serde=saver.serde)
+        self.saver = saver
+        self.thread_id = thread_id
+
+    def _scope(self, config: RunnableConfig | None) -> RunnableConfig:
+        scoped = dict(config or {})
+        configurable = dict(scoped.get("configurable") or {})
+        configurable["thread_id"] = self.thread_id
+        configurable.setdefault("checkpoint_ns", "")
+        scoped["configurable"] = configurable
+        return scoped
+
+    def get_tuple(self, config):
+        return self.saver.get_tuple(self._scope(config))
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        return self.saver.list(
+            self._scope(config), filter=filter, before=before, limit=limit
+        )
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        return self.saver.put(self._scope(config), checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        return self.saver.put_writes(self._scope(config), writes, task_id, task_path)
+
+    def delete_thread(self, thread_id):
+        return self.saver.delete_thread(self.thread_id)
+
+    async def aget_tuple(self, config):
+        return await self.saver.aget_tuple(self._scope(config))
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        async for item in self.saver.alist(
+            self._scope(config), filter=filter, before=before, limit=limit
+        ):
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await self.saver.aput(
+            self._scope(config), checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return await self.saver.aput_writes(
+            self._scope(config), writes, task_id, task_path
+        )
+
+    async def adelete_thread(self, thread_id):
+        return await self.saver.adelete_thread(self.thread_id)
+
+    def get_next_version(self, current, channel):
+        return self.saver.get_next_version(current, channel)
+
+
+# ============================================================================
+# Shared instance
+# ============================================================================
+
+_saver: Optional[PersistentCheckpointSaver] = None
+_saver_lock = threading.Lock()
+
+
+def get_checkpoint_saver() -> PersistentCheckpointSaver:
+    """Return this worker's shared saver (backend from CHECKPOINT_BACKEND)."""
+    global _saver
+    if _saver is None:
+        with _saver_lock:
+            if _saver is None:
+                if CHECKPOINT_BACKEND == "sqlite":
+                    backend = _SQLiteBackend(CHECKPOINT_SQLITE_PATH)
+                else:
+                    backend = _PostgresBackend()
+                _saver = PersistentCheckpointSaver(backend)
+    return _saver
+
+
+async def checkpoint_cleanup_task() -> None:
+    """Drop idle threads every CHECKPOINT_CLEANUP_INTERVAL seconds."""
+    # Workers start together; spread their first runs out
+    await asyncio.sleep(CHECKPOINT_CLEANUP_INTERVAL * random.uniform(0.5, 1.0))
+    while True:
+        try:
+            removed = await asyncio.to_thread(
+                get_checkpoint_saver().delete_idle_threads,
+                CHECKPOINT_IDLE_DAYS * 86400,
+            )
+            if removed:
+                logger.info("[Checkpointer] Dropped %d idle threads", removed)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("[Checkpointer] Idle thread cleanup failed: %s", exc)
+        await asyncio.sleep(CHECKPOINT_CLEANUP_INTERVAL)
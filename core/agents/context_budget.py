@@ -1,20 +1,58 @@
 """
 Context budget enforcement for manager prompt assembly.
 
-Prevents history slot in the LLM prompt from exceeding CONTEXT_CHAR_BUDGET chars.
-When the raw history is too long, serve CompactPrompt (Goal/Progress/OpenQ/NextSteps)
-instead.
+The history slot in the LLM prompt is budgeted in tokens, sized from the
+model's context window (``ModelInfo.context_window``).  Token counts come from
+tiktoken when the model's encoding can be loaded, and otherwise from a
+script-aware estimate (one token per CJK character, ~4 characters per token
+for everything else), so Traditional Chinese sessions are no longer 2-3x over
+budget while English sessions lose history early.
+
+When the raw history is too long, serve CompactPrompt (Goal/Progress/OpenQ/
+NextSteps) if one exists, else a ``HistoryWindow``: the most recent lines
+within budget, with older lines folded into a rolling summary as they fall
+out of the window.
 """
 
 from __future__ import annotations
 
+import asyncio
+import logging
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
 
-# Total chars allocated to the history slot in the manager intent-understanding prompt.
-# Derived from: typical model context ~128k tokens ≈ 500k chars; history slot ≤ 1.2% of that.
-# Adjust when switching to a smaller model.
+# Legacy character budget; still used to flag oversized LLM responses.
 CONTEXT_CHAR_BUDGET: int = 6_000
 
+# History slot ≤ 1.2% of the model's context window, capped so 1M-token
+# models do not drag whole sessions into every routing prompt.
+# A 128K window gives 1536 tokens ≈ the old 6000-char budget in English.
+HISTORY_TOKEN_SHARE = float(os.getenv("CONTEXT_HISTORY_TOKEN_SHARE", "0.012"))
+HISTORY_TOKEN_CAP = int(os.getenv("CONTEXT_HISTORY_TOKEN_CAP", "4000"))
+# Share of the history budget the rolling summary may take
+SUMMARY_SHARE = 0.25
+# Each summarised line keeps at most this many tokens
+SUMMARY_LINE_TOKENS = 48
+# "auto" uses tiktoken when it can load the encoding; "estimate" never does
+TOKENIZER_MODE = os.getenv("CONTEXT_TOKENIZER", "auto")
+
+_TOKEN_CACHE_SIZE = 4096
+_SUMMARY_HEADER = "[Earlier in this session]"
+
+# Hangul jamo, CJK radicals → unified ideographs (incl. kana), hangul
+# syllables, compatibility ideographs / forms, full-width forms, CJK ext. B+
+_WIDE_CHARS = re.compile(
+    "[\u1100-\u11ff\u2e80-\u9fff\ua960-\ua97f\uac00-\ud7ff"
+    "\uf900-\ufaff\ufe30-\ufe4f\uff00-\uffef\U00020000-\U0003ffff]"
+)
+
 
 @dataclass
 class CompactPrompt:
@@ -26,9 +64,298 @@ class CompactPrompt:
     next_steps: str = ""
 
 
-def history_exceeds_budget(history: str) -> bool:
-    """Return True if history string exceeds CONTEXT_CHAR_BUDGET chars."""
-    return len(history) > CONTEXT_CHAR_BUDGET
+# ── Token counting ───────────────────────────────────────────────────────────
+
+
+def estimate_tokens(text: str) -> int:
+    """Script-aware token estimate that does not need a tokenizer.
+
+    CJK ideographs, kana, hangul and full-width forms are about one token each
+    in current BPE vocabularies; other text averages ~4 characters per token.
+    """
+    if not text:
+        return 0
+    wide = len(_WIDE_CHARS.findall(text))
+    return wide + math.ceil((len(text) - wide) / 4)
+
+
+_encoders: Dict[str, Optional[Callable[[str], list]]] = {}
+_encoders_lock = threading.Lock()
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def _encoder(name: str) -> Optional[Callable[[str], list]]:
+    """tiktoken ``encode`` for *name*, or None (resolved once per process).
+
+    On a cold cache tiktoken downloads the BPE file without a timeout, so it
+    is never loaded from the event loop: there the estimate is used until
+    ``preload_encoders`` (run in a thread at startup) has resolved it.
+    """
+    if name == "estimate" or TOKENIZER_MODE == "estimate":
+        return None
+    if name in _encoders:
+        return _encoders[name]
+    if _on_event_loop():
+        return None
+    with _encoders_lock:
+        if name not in _encoders:
+            try:
+                import tiktoken
+
+                _encoders[name] = tiktoken.get_encoding(name).encode
+            except Exception as exc:  # not installed, or BPE file not downloadable
+                logger.info(
+                    "[ContextBudget] tiktoken %s unavailable, estimating: %s",
+                    name,
+                    exc,
+                )
+                _encoders[name] = None
+    return _encoders[name]
+
+
+def preload_encoders() -> Dict[str, bool]:
+    """Resolve every model's tiktoken encoding; blocking, run off the loop."""
+    from .model_router import _MODEL_COSTS
+
+    names = {info.tokenizer for info in _MODEL_COSTS.values()} - {"estimate"}
+    return {name: _encoder(name) is not None for name in sorted(names)}
+
+
+class _TokenCountCache:
+    """LRU of token counts keyed by (tokenizer, text)."""
+
+    def __init__(self, maxsize: int = _TOKEN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[int]:
+        with self._lock:
+            count = self._entries.get(key)
+            if count is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return count
+
+    def put(self, key: Tuple[str, str], count: int) -> None:
+        with self._lock:
+            self._entries[key] = count
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+_token_counts = _TokenCountCache()
+
+
+def _tokenizer_for(model: Optional[str]) -> str:
+    from .model_router import ModelRouter
+
+    return ModelRouter.get_token_info(model).tokenizer
+
+
+def _count(text: str, tokenizer: str) -> int:
+    encode = _encoder(tokenizer)
+    return len(encode(text)) if encode else estimate_tokens(text)
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Token count of *text* for *model* (cached per distinct text)."""
+    if not text:
+        return 0
+    tokenizer = _tokenizer_for(model)
+    if _encoder(tokenizer) is None:
+        # Keyed as estimates so they are not reused once the encoder loads
+        tokenizer = "estimate"
+    key = (tokenizer, text)
+    count = _token_counts.get(key)
+    if count is None:
+        count = _count(text, tokenizer)
+        _token_counts.put(key, count)
+    return count
+
+
+def history_token_budget(model: Optional[str] = None) -> int:
+    """Tokens allotted to the history slot for *model*."""
+    from .model_router import ModelRouter
+
+    window = ModelRouter.get_token_info(model).context_window
+    return min(HISTORY_TOKEN_CAP, int(window * HISTORY_TOKEN_SHARE))
+
+
+def history_tokens(history: str, model: Optional[str] = None) -> int:
+    """Token count of a multi-line history, summed per line.
+
+    Lines repeat from turn to turn, so per-line counts hit the cache where a
+    count of the joined string never would; one token is added per newline.
+    """
+    if not history:
+        return 0
+    lines = history.split("\n")
+    return sum(count_tokens(line, model) for line in lines) + len(lines) - 1
+
+
+def history_exceeds_budget(history: str, model: Optional[str] = None) -> bool:
+    """Return True if history exceeds the model's history token budget."""
+    return history_tokens(history, model) > history_token_budget(model)
+
+
+def _truncate_head(text: str, max_tokens: int, model: Optional[str]) -> str:
+    """Longest prefix of *text* (plus an ellipsis) within *max_tokens*."""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    # Probe prefixes uncached so they do not evict real per-message counts
+    tokenizer = _tokenizer_for(model)
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if _count(text[:mid] + "…", tokenizer) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo] + "…" if lo else ""
+
+
+def truncate_to_budget(
+    history: str, max_tokens: int, model: Optional[str] = None
+) -> str:
+    """Keep the most recent whole lines of *history* within *max_tokens*."""
+    kept: List[str] = []
+    used = 0
+    for line in reversed(history.split("\n")):
+        cost = count_tokens(line, model) + 1
+        if used + cost > max_tokens:
+            if not kept:
+                kept.append(_truncate_head(line, max_tokens - 1, model))
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(reversed(kept))
+
+
+# ── Rolling history window ───────────────────────────────────────────────────
+
+
+class HistoryWindow:
+    """Token-budgeted view of one session's history, updated incrementally.
+
+    ``sync`` receives the caller's recent history lines each turn (a sliding
+    window over the chat log).  Only lines not seen in the previous call are
+    counted and appended; when the window exceeds its budget the oldest lines
+    are moved into a rolling summary of clipped lines, which itself is kept
+    within ``SUMMARY_SHARE`` of the budget.  The rendered string is reused
+    until something changes.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int,
+        model: Optional[str] = None,
+        session_id: Optional[str] = None,
+    ):
+        self.max_tokens = max_tokens
+        self.model = model
+        self.session_id = session_id
+        self._recent: List[Tuple[str, int]] = []
+        self._recent_tokens = 0
+        self._summary: List[Tuple[str, int]] = []
+        self._summary_tokens = 0
+        self._last_lines: List[str] = []
+        self._rendered: Optional[str] = None
+
+    def _overlap(self, lines: List[str]) -> int:
+        """Length of the longest suffix of the previous input that *lines*
+        starts with."""
+        prev = self._last_lines
+        for start in range(len(prev)):
+            size = len(prev) - start
+            if prev[start:] == lines[:size]:
+                return size
+        return 0
+
+    def _summary_budget(self) -> int:
+        return int(self.max_tokens * SUMMARY_SHARE)
+
+    def _push_summary(self, line: str) -> None:
+        clipped = _truncate_head(line, SUMMARY_LINE_TOKENS, self.model)
+        if not clipped:
+            return
+        entry = f"- {clipped}"
+        cost = count_tokens(entry, self.model) + 1
+        self._summary.append((entry, cost))
+        self._summary_tokens += cost
+        while self._summary and self._summary_tokens > self._summary_budget():
+            _, dropped = self._summary.pop(0)
+            self._summary_tokens -= dropped
+
+    def _summary_cost(self) -> int:
+        if not self._summary:
+            return 0
+        return self._summary_tokens + count_tokens(_SUMMARY_HEADER, self.model) + 1
+
+    def _append(self, line: str) -> None:
+        cost = count_tokens(line, self.model) + 1
+        if cost > self.max_tokens:
+            line = _truncate_head(line, self.max_tokens - 1, self.model)
+            cost = count_tokens(line, self.model) + 1
+        self._recent.append((line, cost))
+        self._recent_tokens += cost
+        while (
+            len(self._recent) > 1
+            and self._recent_tokens + self._summary_cost() > self.max_tokens
+        ):
+            evicted, evicted_cost = self._recent.pop(0)
+            self._recent_tokens -= evicted_cost
+            self._push_summary(evicted)
+        if self._recent_tokens + self._summary_cost() > self.max_tokens:
+            # A single oversized line: it alone takes the budget
+            self._summary.clear()
+            self._summary_tokens = 0
+
+    def reset(self) -> None:
+        self._recent.clear()
+        self._recent_tokens = 0
+        self._summary.clear()
+        self._summary_tokens = 0
+        self._last_lines = []
+        self._rendered = None
+
+    def sync(self, lines: List[str]) -> str:
+        """Merge the caller's latest history lines and render the window."""
+        if not lines:
+            self.reset()
+            return ""
+        new = lines[self._overlap(lines) :]
+        self._last_lines = list(lines)
+        if new or self._rendered is None:
+            for line in new:
+                self._append(line)
+            self._rendered = self._render()
+        return self._rendered
+
+    def _render(self) -> str:
+        parts = []
+        if self._summary:
+            parts.append(_SUMMARY_HEADER)
+            parts.extend(entry for entry, _ in self._summary)
+        parts.extend(line for line, _ in self._recent)
+        return "\n".join(parts)
+
+    @property
+    def tokens(self) -> int:
+        """Budgeted token total of the rendered window."""
+        return self._recent_tokens + self._summary_cost()
 
 
 def format_compact_state(cp: CompactPrompt) -> str:
@@ -30,7 +30,6 @@ from core.agents.manager._main import (  # noqa: F401
     _extract_model_name_for_manager,
     _get_checkpointer,
     _get_history_for_prompt,
-    _per_user_checkpointer,
     _read_compact_for_manager,
     _run_background,
     _TracedGraph,
@@ -49,7 +48,6 @@ __all__ = [
     "_extract_model_name_for_manager",
     "_get_checkpointer",
     "_get_history_for_prompt",
-    "_per_user_checkpointer",
     "_read_compact_for_manager",
     "_run_background",
     "_background_tasks",
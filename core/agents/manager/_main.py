@@ -11,25 +11,26 @@ ManagerAgent class.
 from __future__ import annotations
 
 import asyncio
-import threading
 import time
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
 
-from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, StateGraph
 
 from api.utils import logger
 from core.agents.context_budget import (
-    CONTEXT_CHAR_BUDGET,
     CompactPrompt,
+    HistoryWindow,
     format_compact_state,
     history_exceeds_budget,
+    history_token_budget,
+    truncate_to_budget,
 )
 from core.database.experiences import ExperienceStore
 from core.tools.universal_resolver import UniversalSymbolResolver
 
 from ..agent_registry import AgentRegistry
 from ..analysis_policy import AnalysisPolicyResolver
+from ..checkpointer import ScopedCheckpointer, get_checkpoint_saver
 from ..models import ManagerState
 from ..router import AgentRouter
 from ..tool_access_resolver import ToolAccessResolver
@@ -81,22 +82,13 @@ def _extract_model_name_for_manager(llm: Any) -> str:
     )
 
 
-_per_user_checkpointer: Dict[str, MemorySaver] = {}
-_CHECKPOINTER_MAX = 512
-_checkpointer_lock = threading.Lock()
+def _get_checkpointer(user_id: str, session_id: str) -> ScopedCheckpointer:
+    """Return a per-session view of the shared persistent checkpointer.
 
-
-def _get_checkpointer(user_id: str, session_id: str) -> MemorySaver:
-    """Return a per-session checkpointer to prevent cross-user state leakage."""
-    key = f"{user_id}:{session_id}"
-    with _checkpointer_lock:
-        if key not in _per_user_checkpointer:
-            _per_user_checkpointer[key] = MemorySaver()
-            if len(_per_user_checkpointer) > _CHECKPOINTER_MAX:
-                # Remove oldest entry (FIFO, not true LRU but better than arbitrary)
-                oldest_key = next(iter(_per_user_checkpointer))
-                _per_user_checkpointer.pop(oldest_key, None)
-        return _per_user_checkpointer[key]
+    The thread id is pinned to ``user_id:session_id`` to prevent cross-user
+    state leakage.
+    """
+    return ScopedCheckpointer(get_checkpoint_saver(), f"{user_id}:{session_id}")
 
 
 # Memory consolidation trigger threshold
@@ -135,13 +127,16 @@ def _get_history_for_prompt(
     raw_history: str,
     user_id: str,
     session_id: str,
+    model: Optional[str] = None,
+    window: Optional[HistoryWindow] = None,
 ) -> str:
-    """Return history string for LLM prompt, respecting CONTEXT_CHAR_BUDGET.
+    """Return history string for LLM prompt, within the model's token budget.
 
     Priority:
       1. raw_history within budget → return as-is
       2. over budget + compact state available → return formatted compact block
-      3. over budget + no compact state → truncate raw history to budget
+      3. over budget + rolling ``window`` → recent lines + summary of older ones
+      4. otherwise → keep the most recent lines that fit the budget
     """
     import sys
 
@@ -153,13 +148,14 @@ def _get_history_for_prompt(
     _rcfm = facade._read_compact_for_manager if facade else _read_compact_for_manager
     _fcs = facade.format_compact_state if facade else format_compact_state
 
-    if not _hEB(raw_history):
+    if not _hEB(raw_history, model):
         return raw_history
     compact = _rcfm(user_id, session_id)
     if compact is not None:
         return _fcs(compact)
-    # Fallback: truncate to budget (tail — keep most recent)
-    return raw_history[-CONTEXT_CHAR_BUDGET:]
+    if window is not None:
+        return window.sync(raw_history.split("\n"))
+    return truncate_to_budget(raw_history, history_token_budget(model), model)
 
 
 # ============================================================================
@@ -243,6 +239,9 @@ class ManagerAgent(
         session_id: Optional[str] = None,
     ):
         self.llm = llm_client
+        # LLM 供應商與模型名稱；背景記憶工作以此重建用戶的 LLM client
+        self.llm_provider: Optional[str] = None
+        self.llm_model: Optional[str] = None
         self.agent_registry = agent_registry
         self.tool_registry = tool_registry
         self.web_mode = web_mode
@@ -262,9 +261,13 @@ class ManagerAgent(
 
         # 長期記憶存儲（延遲初始化）
         self._memory_store = None
+        # Prompt 歷史的 token 預算視窗（session / 模型改變時重建）
+        self._history_window: Optional[HistoryWindow] = None
 
         # 進度回調
         self.progress_callback: Optional[Callable] = None
+        # async (delta: str) -> None；由 SSE 端點設定，用於串流最終回應
+        self.stream_callback: Optional[Callable[[str], Awaitable[None]]] = None
 
         # 記憶整合控制（nanobot 風格）
         self._consolidating = False  # 是否正在整合中
@@ -3,6 +3,7 @@ Manager Agent - LLM Routing and Invocation
 
 Contains LLM invocation and model routing:
 - _llm_invoke: Invoke LLM with task_type routing
+- _llm_stream: Invoke LLM and forward deltas to stream_callback
 - _get_routed_llm: Get appropriate LLM for task type
 - _create_model_instance: Create new LLM instance for a model name
 - _parse_json_response: Parse and validate JSON response
@@ -24,6 +25,16 @@ from utils.user_client_factory import explain_llm_exception
 from .mixin_base import ManagerAgentMixin
 
 
+def _content_text(content: Any) -> str:
+    """Flatten list-style message content (e.g. Gemini parts) to text."""
+    if isinstance(content, list):
+        return "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    return content
+
+
 class LLMInvokeMixin(ManagerAgentMixin):
     """LLM routing and invocation for ManagerAgent."""
 
@@ -45,41 +56,68 @@ class LLMInvokeMixin(ManagerAgentMixin):
                 response = await llm.ainvoke(messages)
             else:
                 response = await asyncio.to_thread(llm.invoke, messages)
-            content = response.content
-            if isinstance(content, list):
-                content = "".join(
-                    part.get("text", "") if isinstance(part, dict) else str(part)
-                    for part in content
-                )
-            if len(content) >= CONTEXT_CHAR_BUDGET * 0.95:
-                logger.warning(
-                    f"[Manager] Response near context budget: {len(content)} chars (budget: {CONTEXT_CHAR_BUDGET})"
-                )
+            content = _content_text(response.content)
+            self._record_llm_response(llm, content, response)
+            return content
+        except Exception as e:
+            raise RuntimeError(explain_llm_exception(e)) from e
 
-            # 記錄 token usage
-            if hasattr(response, "usage_metadata") and response.usage_metadata:
-                from ..token_tracker import TokenUsage
-                from ._main import _extract_model_name_for_manager
-
-                usage = response.usage_metadata
-                model_name = _extract_model_name_for_manager(llm)
-                self._token_tracker.record(
-                    TokenUsage(
-                        model=model_name,
-                        prompt_tokens=usage.get("input_tokens", 0),
-                        completion_tokens=usage.get("output_tokens", 0),
-                        total_tokens=usage.get("total_tokens", 0),
-                    )
-                )
-            if self._token_tracker.is_over_budget():
-                logger.warning(
-                    f"[Manager] Token budget exceeded: ${self._token_tracker.total_cost():.4f}"
-                )
+    async def _llm_stream(self, prompt: str, task_type: Optional[str] = None) -> str:
+        """調用 LLM 並將增量輸出即時送往 stream_callback，回傳完整內容。
 
-            return content
+        stream_callback 是 async 函式，慢速客戶端會讓 await 阻塞，
+        從而暫停讀取模型串流（背壓）。沒有 callback 或模型不支援
+        astream 時退回 _llm_invoke。
+        """
+        llm = self._get_routed_llm(task_type) if task_type else self.llm
+        stream_callback = getattr(self, "stream_callback", None)
+        if stream_callback is None or not hasattr(llm, "astream"):
+            return await self._llm_invoke(prompt, task_type=task_type)
+
+        messages = [HumanMessage(content=prompt)]
+        parts = []
+        aggregate = None
+        try:
+            async for chunk in llm.astream(messages):
+                aggregate = chunk if aggregate is None else aggregate + chunk
+                delta = _content_text(chunk.content)
+                if delta:
+                    parts.append(delta)
+                    await stream_callback(delta)
         except Exception as e:
             raise RuntimeError(explain_llm_exception(e)) from e
 
+        content = "".join(parts)
+        self._record_llm_response(llm, content, aggregate)
+        return content
+
+    def _record_llm_response(self, llm: Any, content: str, response: Any) -> None:
+        """記錄 token usage 並檢查 context / 成本預算"""
+        if len(content) >= CONTEXT_CHAR_BUDGET * 0.95:
+            logger.warning(
+                f"[Manager] Response near context budget: {len(content)} chars (budget: {CONTEXT_CHAR_BUDGET})"
+            )
+
+        # 記錄 token usage
+        if getattr(response, "usage_metadata", None):
+            from ..token_tracker import TokenUsage
+            from ._main import _extract_model_name_for_manager
+
+            usage = response.usage_metadata
+            model_name = _extract_model_name_for_manager(llm)
+            self._token_tracker.record(
+                TokenUsage(
+                    model=model_name,
+                    prompt_tokens=usage.get("input_tokens", 0),
+                    completion_tokens=usage.get("output_tokens", 0),
+                    total_tokens=usage.get("total_tokens", 0),
+                )
+            )
+        if self._token_tracker.is_over_budget():
+            logger.warning(
+                f"[Manager] Token budget exceeded: ${self._token_tracker.total_cost():.4f}"
+            )
+
     def _get_routed_llm(self, task_type: str):
         """Return an LLM instance appropriate for the given task type.
 
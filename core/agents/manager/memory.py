@@ -3,8 +3,10 @@ Manager Agent - Memory System
 
 Contains short-term and long-term memory management:
 - _get_memory: Get or create short-term memory
+- _get_history_window: Token-budgeted prompt history window for the session
 - get_long_term_memory_context: Get long-term memory context for LLM prompt
 - _track_conversation: Track conversation and trigger consolidation
+- _enqueue_facts_background: Queue fact extraction for the memory worker
 - _extract_facts_background: Background fact extraction (nanoclaw style)
 - _record_experience_background: Background experience recording
 - check_idle_consolidation: Check if idle consolidation is needed
@@ -18,10 +20,12 @@ Contains short-term and long-term memory management:
 
 from __future__ import annotations
 
+import asyncio
 import time
 from typing import List, Optional
 
 from api.utils import logger
+from core.agents.context_budget import HistoryWindow, history_token_budget
 
 from ..models import ShortTermMemory
 from .mixin_base import ManagerAgentMixin
@@ -36,6 +40,20 @@ class MemoryMixin(ManagerAgentMixin):
             self._memory_cache[session_id] = ShortTermMemory()
         return self._memory_cache[session_id]
 
+    def _get_history_window(self, model: Optional[str] = None) -> HistoryWindow:
+        """取得目前 session 的 prompt 歷史視窗（增量更新，session 或模型變更時重建）"""
+        window = getattr(self, "_history_window", None)
+        budget = history_token_budget(model)
+        if (
+            window is None
+            or window.session_id != self.session_id
+            or window.model != model
+            or window.max_tokens != budget
+        ):
+            window = HistoryWindow(budget, model, self.session_id)
+            self._history_window = window
+        return window
+
     def get_long_term_memory_context(self) -> str:
         """獲取長期記憶上下文（用於 LLM prompt）"""
         try:
@@ -120,7 +138,7 @@ class MemoryMixin(ManagerAgentMixin):
         if _rb:
             try:
                 _rb(
-                    self._extract_facts_background(
+                    self._enqueue_facts_background(
                         user_message, assistant_response, turn_index, tools_used
                     )
                 )
@@ -168,6 +186,42 @@ class MemoryMixin(ManagerAgentMixin):
                     self._background_memory_consolidation_unlocked()
                 )
 
+    async def _enqueue_facts_background(
+        self,
+        user_message: str,
+        assistant_response: str,
+        turn_index: int,
+        tools_used: Optional[List[str]] = None,
+    ) -> None:
+        """
+        將事實萃取排入 memory_jobs，由 core/memory_worker 合併多輪後執行
+
+        佇列停用或寫入失敗時退回原本的即時萃取。
+        """
+        from core.memory_worker import QUEUE_ENABLED, enqueue_turn
+
+        if QUEUE_ENABLED and self._get_memory_store():
+            from api.utils import run_sync
+
+            try:
+                await run_sync(
+                    enqueue_turn,
+                    self.user_id,
+                    self.session_id,
+                    user_message,
+                    assistant_response,
+                    turn_index,
+                    tools_used,
+                    getattr(self, "llm_provider", None),
+                    getattr(self, "llm_model", None),
+                )
+                return
+            except Exception as e:
+                logger.warning(f"[Manager] enqueue fact extraction failed: {e}")
+        await self._extract_facts_background(
+            user_message, assistant_response, turn_index, tools_used
+        )
+
     async def _extract_facts_background(
         self,
         user_message: str,
@@ -425,6 +479,29 @@ class MemoryMixin(ManagerAgentMixin):
                     }
                 )
 
+            # === 交給背景 worker：index 於整合完成後由 worker 推進 ===
+            from core.memory_worker import QUEUE_ENABLED, enqueue_consolidation
+
+            if QUEUE_ENABLED:
+                from api.utils import run_sync
+
+                try:
+                    await run_sync(
+                        enqueue_consolidation,
+                        self.user_id,
+                        self.session_id,
+                        formatted_messages,
+                        0 if archive_all else start_idx,
+                        len(memory.conversation_history),
+                        archive_all,
+                        getattr(self, "llm_provider", None),
+                        getattr(self, "llm_model", None),
+                    )
+                    logger.info("[Manager] Consolidation queued")
+                    return True
+                except Exception as e:
+                    logger.warning(f"[Manager] enqueue consolidation failed: {e}")
+
             # === MemoryStore 負責執行整合 ===
             success = await memory_store.consolidate(
                 messages_to_consolidate=formatted_messages,
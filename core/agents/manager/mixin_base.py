@@ -28,6 +28,7 @@ class ManagerAgentMixin:
         - _memory_cache: Dict[str, ShortTermMemory]
         - _memory_store: Optional[MemoryStore]
         - progress_callback: Optional[Callable]
+        - stream_callback: Optional[Callable[[str], Awaitable[None]]]
         - _consolidating: bool
         - _consolidation_lock: asyncio.Lock
         - _last_consolidated_index: int
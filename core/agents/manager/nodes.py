@@ -36,14 +36,6 @@ class NodesMixin(ManagerAgentMixin):
         )  # prompt injection 防護（不修改 state 原始 query）
         history = state.get("history", "")
 
-        from ._main import _get_history_for_prompt
-
-        history = _get_history_for_prompt(
-            history,
-            user_id=self.user_id or "anonymous",
-            session_id=self.session_id,
-        )
-
         # ✅ 修復：每次請求開始時從 state 同步 session_id
         # bootstrap 複用 Manager 時 session_id 可能是上一個請求的
         state_session_id = state.get("session_id")
@@ -52,6 +44,18 @@ class NodesMixin(ManagerAgentMixin):
             self._memory_store = None  # 讓 MemoryStore 重新初始化
             logger.debug(f"[Manager] session_id synced to: {state_session_id}")
 
+        from ._main import _extract_model_name_for_manager, _get_history_for_prompt
+
+        # 歷史依模型的 token 預算裁切（在 session 同步後，視窗才對應正確的 session）
+        model_name = _extract_model_name_for_manager(self.llm)
+        history = _get_history_for_prompt(
+            history,
+            user_id=self.user_id or "anonymous",
+            session_id=self.session_id,
+            model=model_name,
+            window=self._get_history_window(model_name),
+        )
+
         # 閒置整合檢查（在新對話開始時自動檢查）
         if self.check_idle_consolidation():
             logger.info("[Manager] Auto-triggering idle consolidation")
@@ -605,7 +609,7 @@ class NodesMixin(ManagerAgentMixin):
                 history=history or "（無歷史記錄）",
             )
             try:
-                response = await self._llm_invoke(prompt, task_type="deep_analysis")
+                response = await self._llm_stream(prompt, task_type="deep_analysis")
                 await self._track_conversation(
                     user_message=current_query,
                     assistant_response=response,
@@ -669,7 +673,7 @@ class NodesMixin(ManagerAgentMixin):
         )
 
         try:
-            response = await self._llm_invoke(prompt, task_type="deep_analysis")
+            response = await self._llm_stream(prompt, task_type="deep_analysis")
             response = self._finalize_mode_response(
                 response=response,
                 analysis_mode=analysis_mode,
@@ -24,6 +24,8 @@ class ModelInfo:
     cost_per_1k_output: float  # USD per 1K output tokens
     tier: str  # "free", "premium"
     quality: int  # 1-10, higher is better
+    context_window: int = 128_000  # max input tokens
+    tokenizer: str = "estimate"  # tiktoken encoding name, or "estimate"
 
 
 # Reference costs (approximate, for budget estimation)
@@ -35,6 +37,7 @@ _MODEL_COSTS: dict[str, ModelInfo] = {
         cost_per_1k_output=0.0,
         tier="free",
         quality=6,
+        context_window=1_048_576,
     ),
     "gpt-5-mini": ModelInfo(
         name="gpt-5-mini",
@@ -43,6 +46,8 @@ _MODEL_COSTS: dict[str, ModelInfo] = {
         cost_per_1k_output=0.60,
         tier="free",
         quality=7,
+        context_window=400_000,
+        tokenizer="o200k_base",
     ),
     "gpt-4o": ModelInfo(
         name="gpt-4o",
@@ -51,6 +56,8 @@ _MODEL_COSTS: dict[str, ModelInfo] = {
         cost_per_1k_output=1.00,
         tier="premium",
         quality=8,
+        context_window=128_000,
+        tokenizer="o200k_base",
     ),
     "gpt-5.2-pro": ModelInfo(
         name="gpt-5.2-pro",
@@ -59,6 +66,8 @@ _MODEL_COSTS: dict[str, ModelInfo] = {
         cost_per_1k_output=10.00,
         tier="premium",
         quality=9,
+        context_window=400_000,
+        tokenizer="o200k_base",
     ),
     "gemini-3.1-pro-preview": ModelInfo(
         name="gemini-3.1-pro-preview",
@@ -67,6 +76,7 @@ _MODEL_COSTS: dict[str, ModelInfo] = {
         cost_per_1k_output=5.00,
         tier="premium",
         quality=8,
+        context_window=1_048_576,
     ),
 }
 
@@ -140,6 +150,26 @@ class ModelRouter:
             return _MODEL_COSTS[cls.DEFAULT_MODEL]
         return info
 
+    @classmethod
+    def get_token_info(cls, model_name: Optional[str]) -> ModelInfo:
+        """Return metadata used for prompt token budgeting.
+
+        Unlike ``get_model_info`` this does not warn on unknown names: user
+        supplied model ids are common here, and they get the ``ModelInfo``
+        defaults (128K window, estimated token counts).
+        """
+        info = _MODEL_COSTS.get(model_name or "")
+        if info is None:
+            return ModelInfo(
+                name=model_name or "",
+                provider="",
+                cost_per_1k_input=0.0,
+                cost_per_1k_output=0.0,
+                tier="free",
+                quality=0,
+            )
+        return info
+
     @classmethod
     def check_budget(
         cls,
@@ -5,20 +5,98 @@ Dispatches security alerts to multiple channels:
 - Telegram (for instant notifications)
 - Email (for detailed alerts)
 
+Delivery is asynchronous once ``start()`` has been called on the app's event
+loop (see api/lifespan.py): ``send()`` only enqueues, from the loop or from
+any thread, and never waits on Telegram or SMTP.  Each channel has a bounded
+queue drained by its own worker pool; a worker that finds several alerts
+waiting sends them as one message, and failed sends are retried with
+exponential backoff.  Repeats of an alert (same channel, severity and title)
+within ALERT_COALESCE_WINDOW seconds are held back and sent as one digest
+when the window closes.  Before ``start()`` (scripts, tests) ``send()``
+delivers synchronously as it always did.
+
 Configuration via environment variables:
 - TELEGRAM_BOT_TOKEN: Bot token for Telegram
 - TELEGRAM_CHAT_ID: Chat ID to send messages to
+- TELEGRAM_API_BASE_URL: Bot API base URL (default https://api.telegram.org/bot)
 - SMTP_HOST, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD: Email configuration
+- SMTP_STARTTLS: Upgrade the SMTP connection with STARTTLS (default true)
 - ADMIN_EMAIL: Email address to receive alerts
+- ALERT_QUEUE_MAXSIZE, ALERT_WORKERS_TELEGRAM, ALERT_WORKERS_EMAIL,
+  ALERT_BATCH_SIZE, ALERT_MAX_RETRIES, ALERT_RETRY_BASE_SECONDS,
+  ALERT_COALESCE_WINDOW: Queueing, batching, retry and digest tuning
 """
 
+import asyncio
+import html
 import os
+import random
 import smtplib
+import time
+from dataclasses import dataclass
 from email.mime.text import MIMEText
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from api.utils import logger
 
+ALERT_QUEUE_MAXSIZE = int(os.getenv("ALERT_QUEUE_MAXSIZE", "1000"))
+ALERT_BATCH_SIZE = int(os.getenv("ALERT_BATCH_SIZE", "20"))
+ALERT_MAX_RETRIES = int(os.getenv("ALERT_MAX_RETRIES", "4"))
+ALERT_RETRY_BASE_SECONDS = float(os.getenv("ALERT_RETRY_BASE_SECONDS", "1.0"))
+ALERT_RETRY_MAX_SECONDS = 60.0
+ALERT_COALESCE_WINDOW = float(os.getenv("ALERT_COALESCE_WINDOW", "60"))
+ALERT_WORKERS = {
+    "telegram": int(os.getenv("ALERT_WORKERS_TELEGRAM", "2")),
+    "email": int(os.getenv("ALERT_WORKERS_EMAIL", "2")),
+}
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+_EMOJI = {"low": "🔵", "medium": "🟡", "high": "🟠", "critical": "🔴"}
+_SEVERITY_RANK = {severity: rank for rank, severity in enumerate(_EMOJI)}
+
+
+@dataclass
+class Alert:
+    """One queued alert; ``repeats`` > 0 marks a coalesced digest."""
+
+    channel: str
+    severity: str
+    title: str
+    message: str
+    repeats: int = 0
+    window: float = 0.0
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        return (self.channel, self.severity, self.title)
+
+    @property
+    def digest_title(self) -> str:
+        if not self.repeats:
+            return self.title
+        return f"{self.title} (×{self.repeats} more in {self.window:.0f}s)"
+
+
+def _truncate_escaped(text: str, limit: int) -> str:
+    """Cut HTML-escaped text to *limit* chars without splitting an entity."""
+    if len(text) <= limit:
+        return text
+    text = text[:limit]
+    amp = text.rfind("&", max(0, limit - 5))
+    if amp != -1 and ";" not in text[amp:]:
+        text = text[:amp]
+    return text
+
+
+class AlertDeliveryError(Exception):
+    """A send attempt failed; ``retryable`` is False for permanent errors."""
+
+    def __init__(self, message: str, retryable: bool = True, retry_after: float = 0.0):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
 
 class AlertDispatcher:
     """
@@ -29,11 +107,22 @@ class AlertDispatcher:
     unconfigured channels.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        maxsize: int = ALERT_QUEUE_MAXSIZE,
+        workers: Optional[Dict[str, int]] = None,
+        batch_size: int = ALERT_BATCH_SIZE,
+        max_retries: int = ALERT_MAX_RETRIES,
+        retry_base: float = ALERT_RETRY_BASE_SECONDS,
+        coalesce_window: float = ALERT_COALESCE_WINDOW,
+    ):
         """Initialize alert dispatcher with environment configuration."""
         # Telegram configuration
         self.telegram_bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
         self.telegram_chat_id = os.getenv("TELEGRAM_CHAT_ID")
+        self.telegram_base_url = (
+            os.getenv("TELEGRAM_API_BASE_URL") or "https://api.telegram.org/bot"
+        )
 
         # Email configuration
         self.smtp_config = {
@@ -41,6 +130,7 @@ class AlertDispatcher:
             "port": int(os.getenv("SMTP_PORT", "587")),
             "username": os.getenv("SMTP_USERNAME"),
             "password": os.getenv("SMTP_PASSWORD"),
+            "starttls": os.getenv("SMTP_STARTTLS", "true").lower() != "false",
         }
         self.admin_email = os.getenv("ADMIN_EMAIL")
 
@@ -62,6 +152,40 @@ class AlertDispatcher:
                 "⚠️ No alert channels configured. Set TELEGRAM_BOT_TOKEN or SMTP_* variables."
             )
 
+        # Async delivery (started by start())
+        self.maxsize = maxsize
+        self.workers = {**ALERT_WORKERS, **(workers or {})}
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_base = retry_base
+        self.coalesce_window = coalesce_window
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._http: Any = None
+        # Open coalescing windows: key -> held-back repeats (None until one arrives)
+        self._windows: Dict[Tuple[str, str, str], Optional[Alert]] = {}
+        self._window_timers: Dict[Tuple[str, str, str], asyncio.TimerHandle] = {}
+        self._last_drop_log = 0.0
+        self.stats = {
+            "enqueued": 0,
+            "coalesced": 0,
+            "sent": 0,
+            "messages": 0,
+            "retries": 0,
+            "failed": 0,
+            "dropped": 0,
+        }
+
+    def _configured(self, channel: str) -> bool:
+        return {"telegram": self.has_telegram, "email": self.has_email}.get(
+            channel, False
+        )
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
     def send(self, channel: str, severity: str, title: str, message: str) -> bool:
         """
         Send alert to specified channel.
@@ -73,57 +197,339 @@ class AlertDispatcher:
             message: Alert message body
 
         Returns:
-            True if alert was sent successfully, False otherwise
+            When running: True if the alert was accepted for delivery.
+            Otherwise: True if the alert was sent successfully.
         """
-        if channel == "telegram":
-            return self._send_telegram(severity, title, message)
-        elif channel == "email":
-            return self._send_email(severity, title, message)
-        else:
+        if channel not in ("telegram", "email"):
             logger.warning(f"Unknown alert channel: {channel}")
             return False
+        if not self._configured(channel):
+            return False
+        alert = Alert(channel, severity, title, message)
+        if not self.running or self._loop.is_closed():
+            return self._deliver_sync(alert)
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        if current is self._loop:
+            return self._submit(alert)
+        self._loop.call_soon_threadsafe(self._submit, alert)
+        return True
 
-    def _send_telegram(self, severity: str, title: str, message: str) -> bool:
+    def send_critical(self, title: str, message: str) -> bool:
         """
-        Send alert via Telegram bot.
+        Send a critical severity alert to all configured channels.
 
         Args:
-            severity: Severity level
             title: Alert title
             message: Alert message
 
         Returns:
-            True if sent successfully
+            True if at least one channel accepted (or, when not running,
+            delivered) the alert
         """
-        if not self.has_telegram:
-            return False
+        success = False
+
+        if self.has_telegram:
+            if self.send("telegram", "critical", title, message):
+                success = True
 
-        # Map severity to emoji
-        emoji_map = {"low": "🔵", "medium": "🟡", "high": "🟠", "critical": "🔴"}
-        emoji = emoji_map.get(severity, "⚪")
+        if self.has_email:
+            if self.send("email", "critical", title, message):
+                success = True
+
+        return success
 
-        # Format message with HTML
-        formatted_message = (
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def start(self) -> None:
+        """Start the per-channel worker pools on the running loop (idempotent)."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queues = {}
+        self._tasks = []
+        for channel, count in self.workers.items():
+            if not self._configured(channel):
+                continue
+            self._queues[channel] = asyncio.Queue(maxsize=self.maxsize)
+            for i in range(max(1, count)):
+                self._tasks.append(
+                    self._loop.create_task(
+                        self._worker(channel), name=f"alert-{channel}-{i}"
+                    )
+                )
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Send pending digests, drain the queues, then stop the workers."""
+        if not self.running:
+            return
+        for key in list(self._window_timers):
+            self._close_window(key)
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(q.join() for q in self._queues.values())), timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Alert dispatcher drain timed out with %d alerts queued",
+                sum(q.qsize() for q in self._queues.values()),
+            )
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "queue_depth": {ch: q.qsize() for ch, q in self._queues.items()},
+            "open_windows": len(self._windows),
+            "running": self.running,
+        }
+
+    # ------------------------------------------------------------------
+    # Queueing and coalescing (on the owning loop only)
+    # ------------------------------------------------------------------
+
+    def _submit(self, alert: Alert) -> bool:
+        key = alert.key
+        if self.coalesce_window > 0 and key in self._windows:
+            held = self._windows[key]
+            if held is None:
+                held = self._windows[key] = Alert(*key, message=alert.message)
+            held.repeats += 1
+            held.message = alert.message
+            self.stats["coalesced"] += 1
+            return True
+        if self.coalesce_window > 0:
+            self._windows[key] = None
+            self._window_timers[key] = self._loop.call_later(
+                self.coalesce_window, self._close_window, key
+            )
+        return self._put(alert)
+
+    def _close_window(self, key: Tuple[str, str, str]) -> None:
+        timer = self._window_timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        held = self._windows.pop(key, None)
+        if held is not None:
+            held.window = self.coalesce_window
+            self._put(held)
+
+    def _put(self, alert: Alert) -> bool:
+        try:
+            self._queues[alert.channel].put_nowait(alert)
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            now = time.monotonic()
+            if now - self._last_drop_log > 10:
+                self._last_drop_log = now
+                logger.warning(
+                    "Alert queue for %s full (%d), dropping alerts (dropped=%d)",
+                    alert.channel,
+                    self.maxsize,
+                    self.stats["dropped"],
+                )
+            return False
+        self.stats["enqueued"] += 1
+        return True
+
+    async def _worker(self, channel: str) -> None:
+        queue = self._queues[channel]
+        carry: List[Alert] = []
+        while True:
+            pending = carry or [await queue.get()]
+            while len(pending) < self.batch_size and not queue.empty():
+                pending.append(queue.get_nowait())
+            # Whatever does not fit in one message goes out next round
+            size = self._batch_fit(channel, pending)
+            batch, carry = pending[:size], pending[size:]
+            try:
+                await self._deliver_with_retry(channel, batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _deliver_with_retry(self, channel: str, batch: List[Alert]) -> None:
+        deliver = self._asend_telegram if channel == "telegram" else self._asend_email
+        for attempt in range(self.max_retries + 1):
+            try:
+                await deliver(batch)
+                self.stats["sent"] += len(batch)
+                self.stats["messages"] += 1
+                return
+            except Exception as e:
+                retryable = getattr(e, "retryable", True)
+                if not retryable and len(batch) > 1:
+                    # One bad alert must not sink the ones it was batched with
+                    logger.warning(
+                        f"{channel} rejected a batch of {len(batch)} alerts ({e}); "
+                        "resending them one at a time"
+                    )
+                    for alert in batch:
+                        await self._deliver_with_retry(channel, [alert])
+                    return
+                if not retryable or attempt == self.max_retries:
+                    self.stats["failed"] += len(batch)
+                    logger.error(
+                        f"Failed to send {len(batch)} {channel} alert(s) "
+                        f"after {attempt + 1} attempt(s): {e}"
+                    )
+                    return
+                delay = min(ALERT_RETRY_MAX_SECONDS, self.retry_base * 2**attempt)
+                delay = max(
+                    getattr(e, "retry_after", 0.0), delay * random.uniform(0.5, 1)
+                )
+                self.stats["retries"] += 1
+                logger.debug(
+                    f"{channel} alert send failed ({e}); retry in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+
+    # ------------------------------------------------------------------
+    # Formatting
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _format_telegram_one(alert: Alert) -> str:
+        emoji = _EMOJI.get(alert.severity, "⚪")
+        # Titles and bodies carry user input (IPs, paths, payloads); escape
+        # them for parse_mode=HTML, then cut the escaped body so the limit
+        # holds for what Telegram actually receives
+        title = html.escape(alert.digest_title, quote=False)
+        message = _truncate_escaped(
+            html.escape(alert.message, quote=False),
+            TELEGRAM_MESSAGE_LIMIT - len(title) - 100,
+        )
+        return (
             f"{emoji} <b>{title}</b>\n\n"
             f"{message}\n\n"
-            f"<i>Severity: {severity.upper()}</i>"
+            f"<i>Severity: {alert.severity.upper()}</i>"
         )
 
-        url = f"https://api.telegram.org/bot{self.telegram_bot_token}/sendMessage"
+    def _format_telegram(self, batch: List[Alert]) -> str:
+        return "\n\n".join(self._format_telegram_one(alert) for alert in batch)
+
+    def _batch_fit(self, channel: str, pending: List[Alert]) -> int:
+        """How many of the pending alerts go into one message (at least one)."""
+        if channel != "telegram":
+            return len(pending)
+        size = len(self._format_telegram_one(pending[0]))
+        count = 1
+        for alert in pending[1:]:
+            size += 2 + len(self._format_telegram_one(alert))
+            if size > TELEGRAM_MESSAGE_LIMIT:
+                break
+            count += 1
+        return count
+
+    def _build_email(self, batch: List[Alert]) -> MIMEText:
+        if len(batch) == 1:
+            alert = batch[0]
+            subject = f"[{alert.severity.upper()}] {alert.digest_title}"
+            body = alert.message
+        else:
+            top = max(batch, key=lambda a: _SEVERITY_RANK.get(a.severity, -1))
+            subject = f"[{top.severity.upper()}] {len(batch)} security alerts"
+            body = "\n\n".join(
+                f"[{a.severity.upper()}] {a.digest_title}\n{a.message}" for a in batch
+            )
+        msg = MIMEText(body, "plain", "utf-8")
+        msg["Subject"] = subject
+        msg["From"] = self.smtp_config["username"]
+        msg["To"] = self.admin_email
+        return msg
+
+    # ------------------------------------------------------------------
+    # Transports
+    # ------------------------------------------------------------------
+
+    def _telegram_request(self, batch: List[Alert]) -> Tuple[str, Dict[str, Any]]:
+        url = f"{self.telegram_base_url}{self.telegram_bot_token}/sendMessage"
+        return url, {
+            "chat_id": self.telegram_chat_id,
+            "text": self._format_telegram(batch),
+            "parse_mode": "HTML",
+        }
+
+    @staticmethod
+    def _check_telegram_response(response: Any) -> None:
+        if response.status_code == 429:
+            try:
+                retry_after = float(
+                    response.json().get("parameters", {}).get("retry_after", 0)
+                )
+            except Exception:
+                retry_after = 0.0
+            raise AlertDeliveryError("Telegram rate limited", retry_after=retry_after)
+        if 400 <= response.status_code < 500:
+            raise AlertDeliveryError(
+                f"Telegram rejected alert: HTTP {response.status_code}",
+                retryable=False,
+            )
+        response.raise_for_status()
+
+    async def _asend_telegram(self, batch: List[Alert]) -> None:
+        import httpx
+
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=10.0)
+        url, payload = self._telegram_request(batch)
+        response = await self._http.post(url, json=payload)
+        self._check_telegram_response(response)
+        logger.debug(f"Telegram alert sent: {batch[0].title}")
+
+    async def _asend_email(self, batch: List[Alert]) -> None:
+        # smtplib blocks; the channel's worker count bounds these threads
+        await asyncio.to_thread(self._smtp_send, self._build_email(batch))
+        logger.debug(f"Email alert sent: {batch[0].title}")
+
+    def _smtp_send(self, msg: MIMEText) -> None:
+        with smtplib.SMTP(
+            self.smtp_config["host"], self.smtp_config["port"], timeout=10
+        ) as server:
+            if self.smtp_config["starttls"]:
+                server.starttls()
+            if self.smtp_config["password"]:
+                server.login(self.smtp_config["username"], self.smtp_config["password"])
+            server.send_message(msg)
+
+    def _deliver_sync(self, alert: Alert) -> bool:
+        if alert.channel == "telegram":
+            return self._send_telegram(alert.severity, alert.title, alert.message)
+        return self._send_email(alert.severity, alert.title, alert.message)
+
+    def _send_telegram(self, severity: str, title: str, message: str) -> bool:
+        """
+        Send alert via Telegram bot, blocking until it is delivered.
+
+        Args:
+            severity: Severity level
+            title: Alert title
+            message: Alert message
+
+        Returns:
+            True if sent successfully
+        """
+        if not self.has_telegram:
+            return False
 
         try:
             import httpx
 
+            url, payload = self._telegram_request(
+                [Alert("telegram", severity, title, message)]
+            )
             with httpx.Client(timeout=10.0) as client:
-                response = client.post(
-                    url,
-                    json={
-                        "chat_id": self.telegram_chat_id,
-                        "text": formatted_message,
-                        "parse_mode": "HTML",
-                    },
-                )
-                response.raise_for_status()
+                self._check_telegram_response(client.post(url, json=payload))
 
             logger.debug(f"Telegram alert sent: {title}")
             return True
@@ -137,7 +543,7 @@ class AlertDispatcher:
 
     def _send_email(self, severity: str, title: str, message: str) -> bool:
         """
-        Send alert via email.
+        Send alert via email, blocking until it is delivered.
 
         Args:
             severity: Severity level
@@ -150,19 +556,10 @@ class AlertDispatcher:
         if not self.has_email:
             return False
 
-        # Create message
-        msg = MIMEText(message, "plain", "utf-8")
-        msg["Subject"] = f"[{severity.upper()}] {title}"
-        msg["From"] = self.smtp_config["username"]
-        msg["To"] = self.admin_email
-
         try:
-            with smtplib.SMTP(
-                self.smtp_config["host"], self.smtp_config["port"], timeout=10
-            ) as server:
-                server.starttls()
-                server.login(self.smtp_config["username"], self.smtp_config["password"])
-                server.send_message(msg)
+            self._smtp_send(
+                self._build_email([Alert("email", severity, title, message)])
+            )
 
             logger.debug(f"Email alert sent: {title}")
             return True
@@ -171,29 +568,6 @@ class AlertDispatcher:
             logger.error(f"Failed to send email alert: {e}")
             return False
 
-    def send_critical(self, title: str, message: str) -> bool:
-        """
-        Send a critical severity alert to all configured channels.
-
-        Args:
-            title: Alert title
-            message: Alert message
-
-        Returns:
-            True if at least one channel succeeded
-        """
-        success = False
-
-        if self.has_telegram:
-            if self._send_telegram("critical", title, message):
-                success = True
-
-        if self.has_email:
-            if self._send_email("critical", title, message):
-                success = True
-
-        return success
-
 
 # ============================================================================
 # Convenience Functions
@@ -223,7 +597,7 @@ def send_security_alert(
         channel: Alert channel (telegram or email)
 
     Returns:
-        True if alert was sent successfully
+        True if alert was accepted (or, before start(), sent successfully)
     """
     dispatcher = get_alert_dispatcher()
     return dispatcher.send(channel, severity, title, message)
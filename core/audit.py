@@ -3,18 +3,216 @@ Comprehensive Audit Logging System
 
 Logs all sensitive operations for security monitoring, compliance, and debugging.
 Supports both automatic middleware-based logging and manual action logging.
+
+Writes go through ``audit_sink``: a bounded asyncio queue drained by a single
+writer task that inserts rows in batches (every AUDIT_BATCH_SIZE records or
+AUDIT_FLUSH_INTERVAL_MS, whichever comes first).  When the queue is full new
+records are dropped and counted instead of blocking the request path.
 """
 
+import asyncio
 import json
+import os
+import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from fastapi import Request
+from sqlalchemy import insert
 
 from api.utils import logger
 from core.orm import AuditLog
 from core.orm.session import get_session_factory
 
+AUDIT_QUEUE_MAXSIZE = int(os.getenv("AUDIT_QUEUE_MAXSIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+AUDIT_FLUSH_INTERVAL_MS = int(os.getenv("AUDIT_FLUSH_INTERVAL_MS", "500"))
+
+
+def _payload_to_row(payload: tuple) -> Dict[str, Any]:
+    """Map an AuditLogger._prepare_payload tuple to audit_logs column values."""
+    return {
+        "user_id": payload[0],
+        "username": payload[1],
+        "action": payload[2],
+        "resource_type": payload[3],
+        "resource_id": payload[4],
+        "endpoint": payload[5],
+        "method": payload[6],
+        "ip_address": payload[7],
+        "user_agent": payload[8],
+        "request_data": json.loads(payload[9]) if payload[9] else None,
+        "response_code": payload[10],
+        "success": payload[11],
+        "error_message": payload[12],
+        "duration_ms": payload[13],
+        "metadata_": json.loads(payload[14]) if payload[14] else None,
+    }
+
+
+async def _insert_rows(rows: List[Dict[str, Any]]) -> None:
+    factory = get_session_factory()
+    async with factory() as session:
+        await session.execute(insert(AuditLog), rows)
+        await session.commit()
+
+
+class AuditSink:
+    """
+    Bounded, batched audit-log writer.
+
+    ``submit()`` never blocks: it enqueues from the owning loop or hands the
+    row over thread-safely from executor threads, and drops (counting it)
+    when the queue is full.  One writer task flushes multi-row INSERTs.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = AUDIT_QUEUE_MAXSIZE,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval_ms: int = AUDIT_FLUSH_INTERVAL_MS,
+    ):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._last_drop_log = 0.0
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "failed": 0,
+            "batches": 0,
+            "high_water": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return self._writer is not None and not self._writer.done()
+
+    def start(self) -> None:
+        """Start the writer task on the running loop (idempotent)."""
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._writer = self._loop.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Flush everything queued, then stop the writer."""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._drain_then_stop(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Audit sink drain timed out with %d records queued",
+                self._queue.qsize(),
+            )
+            self._writer.cancel()
+        self._writer = None
+
+    async def _drain_then_stop(self) -> None:
+        # The sentinel queues behind pending rows (waiting for room if full).
+        await self._queue.put(None)
+        await self._writer
+
+    def submit(self, row: Dict[str, Any]) -> bool:
+        """
+        Enqueue one audit row without blocking.
+
+        Returns:
+            False when the sink is not running (caller should write directly)
+            or the row was dropped because the queue is full.
+        """
+        if not self.running or self._loop.is_closed():
+            return False
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        if current is self._loop:
+            return self._put(row)
+        self._loop.call_soon_threadsafe(self._put, row)
+        return True
+
+    def _put(self, row: Dict[str, Any]) -> bool:
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self._bump("dropped")
+            now = time.monotonic()
+            if now - self._last_drop_log > 10:
+                self._last_drop_log = now
+                logger.warning(
+                    "Audit queue full (%d), dropping records (dropped=%d)",
+                    self.maxsize,
+                    self.stats["dropped"],
+                )
+            return False
+        self._bump("enqueued")
+        depth = self._queue.qsize()
+        if depth > self.stats["high_water"]:
+            self.stats["high_water"] = depth
+        return True
+
+    def _bump(self, key: str, amount: int = 1) -> None:
+        # Only called on the owning loop, so no lock is needed.
+        self.stats[key] += amount
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_maxsize": self.maxsize,
+            "running": self.running,
+        }
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch = [first]
+            deadline = self._loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+        # Drain anything that arrived after the sentinel.
+        leftover = []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                leftover.append(item)
+        for start in range(0, len(leftover), self.batch_size):
+            await self._flush(leftover[start : start + self.batch_size])
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            await _insert_rows(batch)
+            self._bump("written", len(batch))
+            self._bump("batches")
+        except Exception as e:
+            self._bump("failed", len(batch))
+            logger.error(f"Failed to write {len(batch)} audit log records: {e}")
+
+
+audit_sink = AuditSink()
+
 
 class AuditLogger:
     """
@@ -145,8 +343,6 @@ class AuditLogger:
             duration_ms: Request processing time in milliseconds
             metadata: Additional context-specific data
         """
-        import asyncio
-
         try:
             payload = AuditLogger._prepare_payload(
                 action=action,
@@ -166,35 +362,14 @@ class AuditLogger:
                 metadata=metadata,
             )
 
-            async def _write_async():
-                factory = get_session_factory()
-                async with factory() as session:
-                    session.add(
-                        AuditLog(
-                            user_id=payload[0],
-                            username=payload[1],
-                            action=payload[2],
-                            resource_type=payload[3],
-                            resource_id=payload[4],
-                            endpoint=payload[5],
-                            method=payload[6],
-                            ip_address=payload[7],
-                            user_agent=payload[8],
-                            request_data=json.loads(payload[9]) if payload[9] else None,
-                            response_code=payload[10],
-                            success=payload[11],
-                            error_message=payload[12],
-                            duration_ms=payload[13],
-                            metadata_=json.loads(payload[14]) if payload[14] else None,
-                        )
-                    )
-                    await session.commit()
-
-            try:
-                loop = asyncio.get_running_loop()
-                loop.create_task(_write_async())
-            except RuntimeError:
-                asyncio.run(_write_async())
+            row = _payload_to_row(payload)
+            if not audit_sink.submit(row) and not audit_sink.running:
+                # No writer (scripts / tests without lifespan): write directly.
+                try:
+                    loop = asyncio.get_running_loop()
+                    loop.create_task(_insert_rows([row]))
+                except RuntimeError:
+                    asyncio.run(_insert_rows([row]))
 
             normalized_action = AuditLogger._normalize_action(action)
             if normalized_action in AuditLogger.SENSITIVE_ACTIONS:
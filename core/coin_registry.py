@@ -0,0 +1,406 @@
+"""
+Local registry of crypto assets: ids, symbols, aliases, chains, contracts
+and exchange listings.
+
+Symbol resolution used to go to CoinGecko ``/search`` (and then
+``/coins/{id}``) for every query, and the OKX/Binance data fetchers checked
+availability against ``/public/instruments`` / ``/exchangeInfo`` before each
+kline request.  This module keeps all of that in one SQLite file:
+
+  coins      CoinGecko id, symbol, name, market-cap rank
+  aliases    lowercase CoinGecko id and name → coin id
+  contracts  coin id, chain, contract address (from ``include_platform``)
+  listings   exchange, instrument, base, quote (Binance spot, OKX spot)
+
+Each process loads the file once into dict indexes — exact symbol, alias,
+contract, instrument, and a prefix index holding the best-ranked coins for
+every prefix up to PREFIX_MAX characters — so lookups are O(1) and never
+touch the network.
+
+``coin_registry_refresh_task`` (started from api/lifespan.py) loads the
+file, rebuilds it from the upstream APIs when it is older than
+COIN_REGISTRY_REFRESH_HOURS, and reloads when another worker replaced it.
+A flock on ``<path>.lock`` keeps workers from refreshing at the same time
+(where fcntl exists; elsewhere concurrent refreshes are merely redundant);
+the new file is written beside the old one and swapped in with os.replace.
+Until a registry file exists every lookup misses (``is_listed`` returns
+None), and callers fall back to their network paths.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import httpx
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process refresh lock
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# ── Configuration ────────────────────────────────────────────────────────────
+REGISTRY_PATH = Path(os.getenv("COIN_REGISTRY_PATH", "data/coin_registry.sqlite3"))
+REFRESH_HOURS = float(os.getenv("COIN_REGISTRY_REFRESH_HOURS", "12"))
+# How often workers look at the file for a newer copy or a due refresh
+CHECK_INTERVAL = float(os.getenv("COIN_REGISTRY_CHECK_INTERVAL", "300"))
+# Coins ranked at or above this count as well-known symbols for the resolver
+MAJOR_RANK = int(os.getenv("COIN_REGISTRY_MAJOR_RANK", "100"))
+PREFIX_MAX = 8
+PREFIX_BUCKET = 10
+# /coins/markets pages (250 coins each) fetched for market-cap ranks
+RANK_PAGES = 4
+
+COINGECKO_BASE = "https://api.coingecko.com/api/v3"
+BINANCE_EXCHANGE_INFO = "https://api.binance.com/api/v3/exchangeInfo"
+OKX_INSTRUMENTS = "https://www.okx.com/api/v5/public/instruments"
+
+_SCHEMA = """
+CREATE TABLE coins (id TEXT PRIMARY KEY, symbol TEXT NOT NULL, name TEXT NOT NULL,
+                    rank INTEGER);
+CREATE TABLE aliases (alias TEXT NOT NULL, coin_id TEXT NOT NULL);
+CREATE TABLE contracts (coin_id TEXT NOT NULL, chain TEXT NOT NULL,
+                        address TEXT NOT NULL);
+CREATE TABLE listings (exchange TEXT NOT NULL, instrument TEXT NOT NULL,
+                       base TEXT NOT NULL, quote TEXT NOT NULL);
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+_UNRANKED = 1 << 30
+
+
+class Coin(NamedTuple):
+    id: str
+    symbol: str
+    name: str
+    rank: Optional[int]
+    platforms: Dict[str, str]
+
+
+class CoinRegistry:
+    """In-memory indexes over the registry file."""
+
+    def __init__(self, path: Path = REGISTRY_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._loaded_mtime: Optional[float] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self.refreshed_at: Optional[float] = None
+        self._by_id: Dict[str, Coin] = {}
+        self._by_symbol: Dict[str, List[Coin]] = {}
+        self._by_alias: Dict[str, List[Coin]] = {}
+        self._by_contract: Dict[str, Tuple[Coin, str]] = {}
+        self._by_prefix: Dict[str, List[Coin]] = {}
+        # exchange -> {instrument: base}
+        self._listings: Dict[str, Dict[str, str]] = {}
+        # exchange -> {base}
+        self._listed_bases: Dict[str, set] = {}
+
+    # ── Loading ──────────────────────────────────────────────────────────
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_mtime is not None
+
+    def file_mtime(self) -> Optional[float]:
+        try:
+            return self.path.stat().st_mtime
+        except OSError:
+            return None
+
+    def load(self) -> bool:
+        """(Re)build the indexes from the file; False if there is none."""
+        mtime = self.file_mtime()
+        if mtime is None:
+            return False
+
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        try:
+            platforms: Dict[str, Dict[str, str]] = {}
+            for coin_id, chain, address in conn.execute(
+                "SELECT coin_id, chain, address FROM contracts"
+            ):
+                platforms.setdefault(coin_id, {})[chain] = address
+            coins = [
+                Coin(coin_id, symbol, name, rank, platforms.get(coin_id, {}))
+                for coin_id, symbol, name, rank in conn.execute(
+                    "SELECT id, symbol, name, rank FROM coins"
+                )
+            ]
+            aliases = conn.execute("SELECT alias, coin_id FROM aliases").fetchall()
+            listings = conn.execute(
+                "SELECT exchange, instrument, base FROM listings"
+            ).fetchall()
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+        finally:
+            conn.close()
+
+        coins.sort(key=lambda c: (c.rank or _UNRANKED, c.id))
+        by_id = {c.id: c for c in coins}
+        by_symbol: Dict[str, List[Coin]] = {}
+        by_contract: Dict[str, Tuple[Coin, str]] = {}
+        by_prefix: Dict[str, List[Coin]] = {}
+        for coin in coins:
+            by_symbol.setdefault(coin.symbol, []).append(coin)
+            for chain, address in coin.platforms.items():
+                by_contract.setdefault(address.lower(), (coin, chain))
+            keys = {coin.symbol.lower()}
+            if coin.rank is not None:
+                keys.add(coin.name.lower())
+            for key in keys:
+                for n in range(1, min(len(key), PREFIX_MAX) + 1):
+                    bucket = by_prefix.setdefault(key[:n], [])
+                    if len(bucket) < PREFIX_BUCKET and coin not in bucket:
+                        bucket.append(coin)
+
+        by_alias: Dict[str, List[Coin]] = {}
+        for alias, coin_id in aliases:
+            coin = by_id.get(coin_id)
+            if coin is not None:
+                by_alias.setdefault(alias, []).append(coin)
+        for matches in by_alias.values():
+            matches.sort(key=lambda c: (c.rank or _UNRANKED, c.id))
+
+        by_listing: Dict[str, Dict[str, str]] = {}
+        listed_bases: Dict[str, set] = {}
+        for exchange, instrument, base in listings:
+            by_listing.setdefault(exchange, {})[instrument] = base
+            listed_bases.setdefault(exchange, set()).add(base)
+
+        with self._lock:
+            self._by_id = by_id
+            self._by_symbol = by_symbol
+            self._by_alias = by_alias
+            self._by_contract = by_contract
+            self._by_prefix = by_prefix
+            self._listings = by_listing
+            self._listed_bases = listed_bases
+            self.refreshed_at = float(meta.get("refreshed_at", mtime))
+            self._loaded_mtime = mtime
+        logger.info(
+            "[CoinRegistry] Loaded %d coins, %d listings",
+            len(by_id),
+            sum(len(v) for v in by_listing.values()),
+        )
+        return True
+
+    def reload_if_changed(self) -> bool:
+        mtime = self.file_mtime()
+        if mtime is None or mtime == self._loaded_mtime:
+            return False
+        return self.load()
+
+    # ── Lookups ──────────────────────────────────────────────────────────
+
+    def get(self, coin_id: str) -> Optional[Coin]:
+        return self._by_id.get(coin_id)
+
+    def by_symbol(self, symbol: str) -> List[Coin]:
+        """Every coin using symbol, best market-cap rank first."""
+        return self._by_symbol.get(symbol.strip().upper(), [])
+
+    def resolve(self, query: str) -> Optional[Coin]:
+        """Best coin for a symbol, CoinGecko id, name or contract address."""
+        q = query.strip()
+        if not q:
+            return None
+        matches = self._by_symbol.get(q.upper()) or self._by_alias.get(q.lower())
+        if matches:
+            return matches[0]
+        hit = self._by_contract.get(q.lower())
+        return hit[0] if hit else None
+
+    def by_contract(self, address: str) -> Optional[Tuple[Coin, str]]:
+        """(coin, chain) for a contract address."""
+        return self._by_contract.get(address.strip().lower())
+
+    def search(self, prefix: str, limit: int = PREFIX_BUCKET) -> List[Coin]:
+        """Best-ranked coins whose symbol (or ranked name) starts with prefix."""
+        p = prefix.strip().lower()
+        if not p:
+            return []
+        bucket = self._by_prefix.get(p[:PREFIX_MAX], [])
+        if len(p) > PREFIX_MAX:
+            bucket = [
+                c
+                for c in bucket
+                if c.symbol.lower().startswith(p) or c.name.lower().startswith(p)
+            ]
+        return bucket[:limit]
+
+    def is_major(self, symbol: str) -> bool:
+        """True if the best coin for symbol is in the top MAJOR_RANK."""
+        matches = self.by_symbol(symbol)
+        return bool(matches) and (matches[0].rank or _UNRANKED) <= MAJOR_RANK
+
+    def is_listed(self, exchange: str, instrument: str) -> Optional[bool]:
+        """Whether instrument trades on exchange; None without listing data."""
+        listings = self._listings.get(exchange.lower())
+        if not listings:
+            return None
+        return instrument.upper() in listings
+
+    def listed_on(self, symbol: str) -> List[str]:
+        """Exchanges with a spot market for base asset symbol."""
+        base = symbol.strip().upper()
+        return sorted(e for e, bases in self._listed_bases.items() if base in bases)
+
+    def stats(self) -> dict:
+        return {
+            "path": str(self.path),
+            "loaded": self.loaded,
+            "refreshed_at": self.refreshed_at,
+            "coins": len(self._by_id),
+            "prefix_keys": len(self._by_prefix),
+            "listings": {e: len(v) for e, v in self._listings.items()},
+        }
+
+    # ── Refresh ──────────────────────────────────────────────────────────
+
+    def is_stale(self, max_age: float = REFRESH_HOURS * 3600) -> bool:
+        mtime = self.file_mtime()
+        return mtime is None or time.time() - mtime > max_age
+
+    def refresh(self, client: Optional[httpx.Client] = None) -> bool:
+        """Rebuild the file from upstream; False if another worker holds the lock."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path.with_suffix(".lock"), "w") as lock_file:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            own_client = client is None
+            client = client or httpx.Client(timeout=30)
+            try:
+                coins = _fetch_coins(client)
+                ranks = _fetch_ranks(client)
+                listings = list(_fetch_listings(client))
+            finally:
+                if own_client:
+                    client.close()
+            self._write(coins, ranks, listings)
+        return self.load()
+
+    def _write(
+        self,
+        coins: List[dict],
+        ranks: Dict[str, int],
+        listings: List[Tuple[str, str, str, str]],
+    ) -> None:
+        tmp = self.path.with_suffix(".tmp")
+        tmp.unlink(missing_ok=True)
+        conn = sqlite3.connect(tmp)
+        try:
+            conn.executescript(_SCHEMA)
+            conn.executemany(
+                "INSERT OR REPLACE INTO coins VALUES (?, ?, ?, ?)",
+                (
+                    (c["id"], c["symbol"].upper(), c["name"], ranks.get(c["id"]))
+                    for c in coins
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO aliases VALUES (?, ?)",
+                (
+                    (alias, c["id"])
+                    for c in coins
+                    for alias in {c["id"].lower(), c["name"].lower()}
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO contracts VALUES (?, ?, ?)",
+                (
+                    (c["id"], chain, address)
+                    for c in coins
+                    for chain, address in (c.get("platforms") or {}).items()
+                    if chain and address
+                ),
+            )
+            conn.executemany("INSERT INTO listings VALUES (?, ?, ?, ?)", listings)
+            conn.execute(
+                "INSERT INTO meta VALUES ('refreshed_at', ?)", (str(time.time()),)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp, self.path)
+
+
+def _fetch_coins(client: httpx.Client) -> List[dict]:
+    resp = client.get(
+        f"{COINGECKO_BASE}/coins/list", params={"include_platform": "true"}
+    )
+    resp.raise_for_status()
+    return [c for c in resp.json() if c.get("id") and c.get("symbol")]
+
+
+def _fetch_ranks(client: httpx.Client) -> Dict[str, int]:
+    ranks: Dict[str, int] = {}
+    for page in range(1, RANK_PAGES + 1):
+        try:
+            resp = client.get(
+                f"{COINGECKO_BASE}/coins/markets",
+                params={
+                    "vs_currency": "usd",
+                    "order": "market_cap_desc",
+                    "per_page": 250,
+                    "page": page,
+                },
+            )
+            resp.raise_for_status()
+        except httpx.HTTPError as exc:
+            # Ranks only order matches; keep what we have
+            logger.warning("[CoinRegistry] Rank page %d failed: %s", page, exc)
+            break
+        for row in resp.json():
+            if row.get("market_cap_rank"):
+                ranks[row["id"]] = row["market_cap_rank"]
+    return ranks
+
+
+def _fetch_listings(client: httpx.Client) -> Iterable[Tuple[str, str, str, str]]:
+    try:
+        resp = client.get(BINANCE_EXCHANGE_INFO)
+        resp.raise_for_status()
+        for s in resp.json().get("symbols", []):
+            if s.get("status") == "TRADING":
+                yield ("binance", s["symbol"], s["baseAsset"], s["quoteAsset"])
+    except httpx.HTTPError as exc:
+        logger.warning("[CoinRegistry] Binance listings unavailable: %s", exc)
+
+    try:
+        resp = client.get(OKX_INSTRUMENTS, params={"instType": "SPOT"})
+        resp.raise_for_status()
+        for s in resp.json().get("data", []):
+            if s.get("state") == "live":
+                yield ("okx", s["instId"], s["baseCcy"], s["quoteCcy"])
+    except httpx.HTTPError as exc:
+        logger.warning("[CoinRegistry] OKX listings unavailable: %s", exc)
+
+
+coin_registry = CoinRegistry()
+
+
+async def coin_registry_refresh_task() -> None:
+    """Load the registry, then keep it fresh and in step with other workers."""
+    while True:
+        try:
+            await asyncio.to_thread(coin_registry.reload_if_changed)
+            if coin_registry.is_stale():
+                await asyncio.to_thread(coin_registry.refresh)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("[CoinRegistry] Refresh failed: %s", exc)
+        await asyncio.sleep(CHECK_INTERVAL)
@@ -108,6 +108,21 @@ _EXPORTS: Dict[str, Tuple[str, str]] = {
     "get_cache": (".cache", "get_cache"),
     "delete_cache": (".cache", "delete_cache"),
     "clear_all_cache": (".cache", "clear_all_cache"),
+    # market pulse (per-symbol entries)
+    "save_market_pulse_entries": (".market_pulse_store", "save_market_pulse_entries"),
+    "fetch_market_pulse_entries": (
+        ".market_pulse_store",
+        "fetch_market_pulse_entries",
+    ),
+    "load_market_pulse_entries": (".market_pulse_store", "load_market_pulse_entries"),
+    "start_market_pulse_listener": (
+        ".market_pulse_store",
+        "start_market_pulse_listener",
+    ),
+    "stop_market_pulse_listener": (
+        ".market_pulse_store",
+        "stop_market_pulse_listener",
+    ),
     # system config
     "get_config": (".system_config", "get_config"),
     "get_all_configs": (".system_config", "get_all_configs"),
@@ -132,6 +147,7 @@ _EXPORTS: Dict[str, Tuple[str, str]] = {
     # notifications
     "create_notifications_table": (".notifications", "create_notifications_table"),
     "create_notification": (".notifications", "create_notification"),
+    "create_notifications_bulk": (".notifications", "create_notifications_bulk"),
     "get_notifications": (".notifications", "get_notifications"),
     "mark_notification_as_read": (".notifications", "mark_notification_as_read"),
     "mark_all_as_read": (".notifications", "mark_all_as_read"),
@@ -10,6 +10,8 @@ Key features:
 - Consistent error handling
 - Automatic row-to-dict conversion
 - Transaction management (commit/rollback)
+- Optional routing onto the shared async engine (DB_UNIFIED_ENGINE=true,
+  see core.database.bridge)
 """
 
 from contextlib import contextmanager
@@ -17,6 +19,7 @@ from typing import Dict, List, Optional
 
 import psycopg2
 
+from . import bridge
 from .connection import get_connection
 
 # ============================================================================
@@ -48,6 +51,16 @@ class ValidationError(DatabaseError):
     pass
 
 
+def _integrity_error(e: Exception) -> DatabaseError:
+    """Map a driver IntegrityError to the matching DatabaseError subclass."""
+    message = str(e).lower()
+    if "duplicate" in message or "unique" in message:
+        return DuplicateRecordError(str(e))
+    elif "foreign key" in message:
+        return RecordNotFoundError(str(e))
+    return DatabaseError(f"Integrity error: {e}")
+
+
 # ============================================================================
 # Database Base Class
 # ============================================================================
@@ -105,6 +118,9 @@ class DatabaseBase:
         Raises:
             DatabaseError: On database errors
         """
+        if DatabaseBase._use_unified_engine():
+            return DatabaseBase._run_unified(bridge.aquery_one, sql, params)
+        bridge.record_route("legacy")
         with DatabaseBase() as db:
             return db._query_one(sql, params)
 
@@ -123,6 +139,9 @@ class DatabaseBase:
         Raises:
             DatabaseError: On database errors
         """
+        if DatabaseBase._use_unified_engine():
+            return DatabaseBase._run_unified(bridge.aquery_all, sql, params)
+        bridge.record_route("legacy")
         with DatabaseBase() as db:
             return db._query_all(sql, params)
 
@@ -143,9 +162,74 @@ class DatabaseBase:
             DuplicateRecordError: On integrity constraint violations
             RecordNotFoundError: On foreign key violations
         """
+        if DatabaseBase._use_unified_engine():
+            return DatabaseBase._run_unified(bridge.aexecute, sql, params)
+        bridge.record_route("legacy")
         with DatabaseBase() as db:
             return db._execute(sql, params)
 
+    # ========================================================================
+    # Async Static Methods (shared SQLAlchemy engine)
+    # ========================================================================
+
+    @staticmethod
+    async def aquery_one(sql: str, params: Optional[tuple] = None) -> Optional[Dict]:
+        """Async query_one on the shared async engine (no thread hop)."""
+        bridge.record_route("async")
+        return await DatabaseBase._await_unified(bridge.aquery_one(sql, params))
+
+    @staticmethod
+    async def aquery_all(sql: str, params: Optional[tuple] = None) -> List[Dict]:
+        """Async query_all on the shared async engine (no thread hop)."""
+        bridge.record_route("async")
+        return await DatabaseBase._await_unified(bridge.aquery_all(sql, params))
+
+    @staticmethod
+    async def aexecute(sql: str, params: Optional[tuple] = None) -> int:
+        """Async execute on the shared async engine (no thread hop)."""
+        bridge.record_route("async")
+        return await DatabaseBase._await_unified(bridge.aexecute(sql, params))
+
+    # ========================================================================
+    # Unified Engine Routing
+    # ========================================================================
+
+    @staticmethod
+    def _use_unified_engine() -> bool:
+        """
+        Route static calls onto the async engine when enabled.
+
+        Calls made directly on the engine's event loop keep the psycopg2 path,
+        since blocking there on the loop's own work would deadlock.
+        """
+        return bridge.unified_engine_enabled() and not bridge.on_engine_loop()
+
+    @staticmethod
+    def _run_unified(coro_fn, sql: str, params: Optional[tuple]):
+        """Sync shim: run a bridge coroutine on the engine loop."""
+        bridge.record_route("async")
+        try:
+            return bridge.run_on_engine_loop(coro_fn, sql, params)
+        except DatabaseError:
+            raise
+        except Exception as e:
+            raise DatabaseBase._map_unified_error(e)
+
+    @staticmethod
+    async def _await_unified(coro):
+        try:
+            return await coro
+        except Exception as e:
+            raise DatabaseBase._map_unified_error(e)
+
+    @staticmethod
+    def _map_unified_error(e: Exception) -> DatabaseError:
+        from sqlalchemy.exc import IntegrityError
+
+        if isinstance(e, IntegrityError):
+            return _integrity_error(e)
+        return DatabaseError(f"Database error: {e}")
+
     # ========================================================================
     # Instance Methods (for context manager usage)
     # ========================================================================
@@ -186,11 +270,7 @@ class DatabaseBase:
             return cursor.rowcount
         except psycopg2.IntegrityError as e:
             self.connection.rollback()
-            if "duplicate" in str(e).lower() or "unique" in str(e).lower():
-                raise DuplicateRecordError(str(e))
-            elif "foreign key" in str(e).lower():
-                raise RecordNotFoundError(str(e))
-            raise DatabaseError(f"Integrity error: {e}")
+            raise _integrity_error(e)
         except Exception as e:
             self.connection.rollback()
             raise DatabaseError(f"Database error: {e}")
@@ -42,6 +42,11 @@ consumption and adds operational complexity.
           and drops one pool consumer.
 
     Phase 3 — Single Pool
+        • ``DB_UNIFIED_ENGINE=true`` routes ``DatabaseBase.query_one`` /
+          ``query_all`` / ``execute`` onto the async engine (section 3 below).
+          Sync callers go through ``run_on_engine_loop()``; scripts without a
+          running app get a private loop thread.  ``get_pool_stats()`` reports
+          both pools so the switch can be verified per worker.
         • Once all modules use ``core.orm``, remove the psycopg2 pool entirely
           (``core.database/connection.py`` ThreadedConnectionPool).
         • Keep ``core.database/schema.py`` for DDL / migrations only.
@@ -59,9 +64,22 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import os
+import re
+import threading
 from contextlib import asynccontextmanager
 from functools import partial
-from typing import TYPE_CHECKING, Any, AsyncGenerator, Callable, TypeVar
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncGenerator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    TypeVar,
+)
 
 if TYPE_CHECKING:
     from sqlalchemy.ext.asyncio import AsyncSession
@@ -162,3 +180,226 @@ async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
 
     async with get_async_session() as session:
         yield session
+
+
+# ---------------------------------------------------------------------------
+# 3. Route raw-SQL helpers onto the shared async engine (Phase 3)
+# ---------------------------------------------------------------------------
+
+# psycopg2 placeholders: literal "%%", named "%(name)s" and positional "%s"
+_PLACEHOLDER_RE = re.compile(r"%%|%\((\w+)\)s|%s")
+
+_bound_loop: Optional[asyncio.AbstractEventLoop] = None
+_portal_loop: Optional[asyncio.AbstractEventLoop] = None
+_portal_lock = threading.Lock()
+_route_counts = {"async": 0, "legacy": 0}
+
+
+def unified_engine_enabled() -> bool:
+    """Whether DatabaseBase should use the async engine instead of psycopg2."""
+    return os.getenv("DB_UNIFIED_ENGINE", "false").lower() == "true"
+
+
+def to_sqlalchemy_sql(
+    sql: str, params: Optional[tuple | list | dict] = None
+) -> tuple[str, Dict[str, Any]]:
+    """
+    Convert a psycopg2-style statement into ``text()`` SQL with named binds.
+
+    ``%s`` becomes ``:p0, :p1 …``, ``%(name)s`` becomes ``:name`` and ``%%``
+    becomes ``%``.  Statements already using ``:name`` binds pass through.
+    """
+    if isinstance(params, dict):
+        bound: Dict[str, Any] = dict(params)
+        positional = None
+    else:
+        bound = {}
+        positional = list(params or ())
+    position = 0
+
+    def _replace(match: re.Match) -> str:
+        nonlocal position
+        if match.group(0) == "%%":
+            return "%"
+        if match.group(1):
+            return f":{match.group(1)}"
+        if positional is None:
+            raise ValueError("positional %s placeholder used with dict params")
+        if position >= len(positional):
+            raise ValueError("more %s placeholders than parameters")
+        name = f"p{position}"
+        bound[name] = positional[position]
+        position += 1
+        return f":{name}"
+
+    return _PLACEHOLDER_RE.sub(_replace, sql), bound
+
+
+async def aquery_one(
+    sql: str, params: Optional[tuple | dict] = None
+) -> Optional[Dict[str, Any]]:
+    """Async ``DatabaseBase.query_one`` on the shared SQLAlchemy engine."""
+    from sqlalchemy import text
+
+    from core.orm.session import get_session_factory
+
+    statement, bound = to_sqlalchemy_sql(sql, params)
+    async with get_session_factory()() as session:
+        result = await session.execute(text(statement), bound)
+        row = result.mappings().first()
+        await session.commit()
+        return dict(row) if row is not None else None
+
+
+async def aquery_all(
+    sql: str, params: Optional[tuple | dict] = None
+) -> List[Dict[str, Any]]:
+    """Async ``DatabaseBase.query_all`` on the shared SQLAlchemy engine."""
+    from sqlalchemy import text
+
+    from core.orm.session import get_session_factory
+
+    statement, bound = to_sqlalchemy_sql(sql, params)
+    async with get_session_factory()() as session:
+        result = await session.execute(text(statement), bound)
+        rows = [dict(row) for row in result.mappings().all()]
+        await session.commit()
+        return rows
+
+
+async def aexecute(sql: str, params: Optional[tuple | dict] = None) -> int:
+    """Async ``DatabaseBase.execute``; returns the affected row count."""
+    from sqlalchemy import text
+
+    from core.orm.session import get_session_factory
+
+    statement, bound = to_sqlalchemy_sql(sql, params)
+    async with get_session_factory()() as session:
+        try:
+            result = await session.execute(text(statement), bound)
+            await session.commit()
+            return result.rowcount
+        except Exception:
+            await session.rollback()
+            raise
+
+
+def bind_event_loop(loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+    """
+    Register the application's event loop as the owner of the async engine.
+
+    asyncpg connections belong to the loop that opened them, so sync callers
+    running in executor threads must submit work back to this loop.  Call
+    from the FastAPI lifespan (or any long-lived async entry point).
+    """
+    global _bound_loop
+    _bound_loop = loop or asyncio.get_running_loop()
+
+
+def _get_portal_loop() -> asyncio.AbstractEventLoop:
+    """Start (once) a private loop thread for processes without a bound loop."""
+    global _portal_loop
+    if _portal_loop is None:
+        with _portal_lock:
+            if _portal_loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="db-engine-loop", daemon=True
+                )
+                thread.start()
+                _portal_loop = loop
+    return _portal_loop
+
+
+def _engine_loop() -> asyncio.AbstractEventLoop:
+    if (
+        _bound_loop is not None
+        and _bound_loop.is_running()
+        and not _bound_loop.is_closed()
+    ):
+        return _bound_loop
+    return _get_portal_loop()
+
+
+def on_engine_loop() -> bool:
+    """True when the caller runs on the loop that owns the async engine."""
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    if _bound_loop is not None and _bound_loop.is_running():
+        return running is _bound_loop
+    return running is _portal_loop
+
+
+def run_on_engine_loop(
+    coro_fn: Callable[..., Awaitable[T]], *args: Any, timeout: float | None = None
+) -> T:
+    """
+    Sync shim: run ``coro_fn(*args)`` on the engine's loop and wait for it.
+
+    Raises:
+        RuntimeError: When called from the engine loop itself (it would
+            deadlock); await the coroutine directly instead.
+    """
+    if on_engine_loop():
+        raise RuntimeError(
+            "run_on_engine_loop() called on the engine event loop; await instead"
+        )
+    if timeout is None:
+        timeout = float(os.getenv("DB_STATEMENT_TIMEOUT", "30000")) / 1000 + 5
+    future = asyncio.run_coroutine_threadsafe(coro_fn(*args), _engine_loop())
+    return future.result(timeout)
+
+
+def record_route(kind: str) -> None:
+    """Count which backend served a DatabaseBase call (``async``/``legacy``)."""
+    _route_counts[kind] = _route_counts.get(kind, 0) + 1
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Pool utilisation for both database stacks in this worker.
+
+    Returns:
+        Dict with ``async_engine`` / ``psycopg2`` sections (``None`` when the
+        pool has not been created), ``total_connections`` held by this worker,
+        whether the unified engine is enabled and per-backend call counts.
+    """
+    from core.database import connection as _connection
+    from core.orm import session as _session
+
+    async_stats = None
+    engine = _session._async_engine
+    if engine is not None:
+        pool = engine.sync_engine.pool
+        async_stats = {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+        }
+
+    legacy_stats = None
+    legacy_pool = _connection._connection_pool
+    if legacy_pool is not None:
+        legacy_stats = {
+            "min": legacy_pool.minconn,
+            "max": legacy_pool.maxconn,
+            "checked_out": len(legacy_pool._used),
+            "idle": len(legacy_pool._pool),
+        }
+
+    total = 0
+    if async_stats:
+        total += async_stats["checked_out"] + async_stats["checked_in"]
+    if legacy_stats:
+        total += legacy_stats["checked_out"] + legacy_stats["idle"]
+
+    return {
+        "unified_engine": unified_engine_enabled(),
+        "async_engine": async_stats,
+        "psycopg2": legacy_stats,
+        "total_connections": total,
+        "routed_calls": dict(_route_counts),
+    }
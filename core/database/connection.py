@@ -13,6 +13,8 @@ from urllib.parse import quote
 import psycopg2
 from psycopg2 import pool
 
+from .bridge import unified_engine_enabled
+from .query_stats import TimedConnection, TimedCursor, note_pool_wait
 from .schema import (
     create_all_tables,
     format_reconcile_summary,
@@ -241,19 +243,23 @@ def init_connection_pool():
     if _connection_pool is None:
         with _pool_lock:
             if _connection_pool is None:
+                # 統一引擎模式下 DatabaseBase 走 async engine，psycopg2 池不預先佔用連線
+                min_size = 0 if unified_engine_enabled() else MIN_POOL_SIZE
                 for attempt in range(POOL_INIT_MAX_RETRIES):
                     try:
                         # 使用 ThreadedConnectionPool 替代 SimpleConnectionPool
                         # ThreadedConnectionPool 是線程安全的，適用於多線程環境
                         _connection_pool = psycopg2.pool.ThreadedConnectionPool(
-                            MIN_POOL_SIZE,
+                            min_size,
                             MAX_POOL_SIZE,
                             database_url,
+                            connection_factory=TimedConnection,
+                            cursor_factory=TimedCursor,
                             **CONNECTION_OPTIONS,
                         )
                         logger.info(
                             "Database connection pool initialized (min=%d, max=%d)",
-                            MIN_POOL_SIZE,
+                            min_size,
                             MAX_POOL_SIZE,
                         )
                         break
@@ -318,7 +324,9 @@ def get_connection():
     for attempt in range(MAX_RETRIES):
         raw_conn = None
         try:
+            wait_started = time.perf_counter()
             raw_conn = _connection_pool.getconn()
+            wait_ms = (time.perf_counter() - wait_started) * 1000
 
             if raw_conn.closed:
                 try:
@@ -364,6 +372,7 @@ def get_connection():
                 last_error = health_error
                 continue
 
+            note_pool_wait(raw_conn, wait_ms)
             return PooledConnection(raw_conn, _connection_pool)
 
         except pool.PoolError as e:
@@ -13,6 +13,9 @@ This module is split into submodules for better organization:
 """
 
 from .activity import (
+    delete_activity_logs_before,
+    drop_expired_activity_log_partitions,
+    ensure_activity_log_partitions,
     get_user_activity_logs,
     log_activity,
 )
@@ -97,6 +100,9 @@ __all__ = [
     # Activity
     "log_activity",
     "get_user_activity_logs",
+    "ensure_activity_log_partitions",
+    "drop_expired_activity_log_partitions",
+    "delete_activity_logs_before",
     # Helpers
     "get_content_author",
     "get_report_statistics",
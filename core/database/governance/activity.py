@@ -1,13 +1,28 @@
 """
 Activity Logging Functions
-Log and retrieve user activities
+Log and retrieve user activities, and maintain the log's monthly partitions
+
+user_activity_logs is range-partitioned by month on created_at
+(user_activity_logs_pYYYYMM, plus a DEFAULT partition and, on databases
+migrated in place, user_activity_logs_legacy holding everything before the
+migration).  Retention drops whole partitions; only the partition that
+straddles the cutoff is deleted from, in id-range chunks.
 """
 
 import json
-from typing import Dict, List
+import re
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional, Tuple
 
 from ..connection import get_connection
 
+# Partitions created ahead of the current month
+ACTIVITY_LOG_MONTHS_AHEAD = 2
+# Rows per DELETE when trimming a partition that straddles the cutoff
+ACTIVITY_LOG_DELETE_CHUNK = 10_000
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
 
 def log_activity(
     db,
@@ -137,3 +152,125 @@ def get_user_activity_logs(
     finally:
         if not db:
             conn.close()
+
+
+def _add_months(day: date, months: int) -> date:
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def _parse_bound(value: str) -> Optional[datetime]:
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return datetime.fromisoformat(value.strip("'"))
+
+
+def is_activity_log_partitioned(c) -> bool:
+    c.execute(
+        "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+        "WHERE partrelid = to_regclass('user_activity_logs'))"
+    )
+    return bool(c.fetchone()[0])
+
+
+def list_activity_log_partitions(
+    c,
+) -> List[Tuple[str, Optional[datetime], Optional[datetime]]]:
+    """(name, lower, upper) for each range partition; None is MINVALUE/MAXVALUE."""
+    c.execute("""
+        SELECT child.relname, pg_get_expr(child.relpartbound, child.oid)
+        FROM pg_inherits i
+        JOIN pg_class child ON child.oid = i.inhrelid
+        WHERE i.inhparent = to_regclass('user_activity_logs')
+    """)
+    partitions = []
+    for name, bound in c.fetchall():
+        match = _BOUND_RE.search(bound or "")
+        if match:
+            lower, upper = (_parse_bound(v) for v in match.groups())
+            partitions.append((name, lower, upper))
+    return sorted(
+        partitions, key=lambda p: p[2] or datetime.max.replace(tzinfo=timezone.utc)
+    )
+
+
+def ensure_activity_log_partitions(
+    c, months_ahead: int = ACTIVITY_LOG_MONTHS_AHEAD, today: Optional[date] = None
+) -> List[str]:
+    """Create monthly partitions through months_ahead; returns the new ones.
+
+    Months already covered (e.g. by the legacy partition) are skipped.  No-op
+    while user_activity_logs is not partitioned.
+    """
+    if not is_activity_log_partitioned(c):
+        return []
+    uppers = [u for _, _, u in list_activity_log_partitions(c) if u is not None]
+    covered_until = max(uppers) if uppers else None
+
+    month = (today or datetime.now(timezone.utc).date()).replace(day=1)
+    created = []
+    for i in range(months_ahead + 1):
+        lower, upper = _add_months(month, i), _add_months(month, i + 1)
+        lower_ts = datetime(lower.year, lower.month, 1, tzinfo=timezone.utc)
+        if covered_until is not None and lower_ts < covered_until:
+            continue
+        name = f"user_activity_logs_p{lower:%Y%m}"
+        c.execute(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF user_activity_logs "
+            f"FOR VALUES FROM ('{lower} 00:00:00+00') TO ('{upper} 00:00:00+00')"
+        )
+        created.append(name)
+    return created
+
+
+def drop_expired_activity_log_partitions(c, cutoff: datetime) -> List[Tuple[str, int]]:
+    """Detach and drop partitions whose rows are all older than cutoff.
+
+    Returns (name, estimated rows) per dropped partition; the estimate is the
+    planner's reltuples, since counting would scan what is being dropped.
+    """
+    if not is_activity_log_partitioned(c):
+        return []
+    dropped = []
+    for name, _, upper in list_activity_log_partitions(c):
+        if upper is None or upper > cutoff:
+            continue
+        c.execute(
+            "SELECT GREATEST(reltuples, 0)::BIGINT FROM pg_class "
+            "WHERE oid = to_regclass(%s)",
+            (name,),
+        )
+        rows = c.fetchone()[0]
+        c.execute(f"ALTER TABLE user_activity_logs DETACH PARTITION {name}")
+        c.execute(f"DROP TABLE {name}")
+        dropped.append((name, rows))
+    return dropped
+
+
+def delete_activity_logs_before(
+    conn, cutoff: datetime, chunk_size: int = ACTIVITY_LOG_DELETE_CHUNK
+) -> int:
+    """Delete rows older than cutoff in id-range chunks, committing each.
+
+    Each chunk is its own short transaction, so no statement holds row locks
+    on more than chunk_size ids at a time.
+    """
+    c = conn.cursor()
+    c.execute(
+        "SELECT MIN(id), MAX(id) FROM user_activity_logs WHERE created_at < %s",
+        (cutoff,),
+    )
+    low, high = c.fetchone()
+    conn.commit()
+    if low is None:
+        return 0
+    deleted = 0
+    for start in range(low, high + 1, chunk_size):
+        c.execute(
+            "DELETE FROM user_activity_logs "
+            "WHERE id >= %s AND id < %s AND created_at < %s",
+            (start, start + chunk_size, cutoff),
+        )
+        deleted += c.rowcount
+        conn.commit()
+    return deleted
@@ -6,6 +6,8 @@ Add points, track violations, and apply suspensions
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
 
+from core.principal_cache import invalidate_principal_sync
+
 from ..connection import get_connection
 from .activity import log_activity
 from .constants import SUSPENSION_DURATIONS, VIOLATION_ACTIONS, VIOLATION_LEVELS
@@ -292,7 +294,10 @@ def apply_suspension(db, user_id: str, action: str) -> bool:
         )
 
         conn.commit()
-        return c.rowcount > 0
+        applied = c.rowcount > 0
+        if applied:
+            invalidate_principal_sync(user_id)
+        return applied
     except Exception:
         conn.rollback()
         return False
@@ -0,0 +1,298 @@
+"""
+Market Pulse persistence — one entry per symbol
+
+Layout (same stores as ``core.database.cache``: Redis under the
+``stock_agent:`` prefix, system_cache rows in the DB):
+
+    MARKET_PULSE:<SYMBOL>   {"version": v, "updated_at": iso, "data": {...}}
+    MARKET_PULSE:index      {symbol: version}   (Redis hash / DB JSON row)
+
+Versions are microsecond epoch stamps, so the index doubles as the
+last-updated time of every symbol.
+
+Write path: only the symbols that changed — their entries, their index
+fields, and a ``{symbol: version}`` delta published on ``market_pulse:delta``.
+Redis is best-effort and self-expiring (REDIS_TTL, so symbols no longer
+tracked drop out); the DB is always written (entries and index merge in one
+statement) and stays the complete record.
+
+Read path: readers remember the version of every symbol they hold.  A delta
+notification names the symbols to re-fetch; a periodic index probe catches
+missed notifications (and covers deployments without Redis).  Either way only
+changed symbols are fetched (MGET / ``key = ANY``), never the whole set.
+The index read merges the Redis hash with the DB row, so a Redis restart or
+flush (after which the hash only holds what was written since) never hides
+symbols.
+
+The legacy whole-dict ``MARKET_PULSE`` key is left untouched; callers read
+it once to migrate when no index exists yet.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, Mapping, Optional
+
+from . import cache as _cache
+from .base import DatabaseBase
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "MARKET_PULSE:"
+INDEX_KEY = "MARKET_PULSE:index"
+DELTA_CHANNEL = "market_pulse:delta"
+PROBE_INTERVAL = float(os.getenv("MARKET_PULSE_PROBE_INTERVAL", "60"))
+# Entries are rewritten every refresh window (4 h); a day covers missed ones
+REDIS_TTL = int(os.getenv("MARKET_PULSE_REDIS_TTL", "86400"))
+
+_version_lock = threading.Lock()
+_last_version = 0
+
+
+def entry_key(symbol: str) -> str:
+    return f"{KEY_PREFIX}{symbol}"
+
+
+def _next_version() -> int:
+    """Microsecond timestamp, strictly increasing within this process."""
+    global _last_version
+    with _version_lock:
+        _last_version = max(time.time_ns() // 1000, _last_version + 1)
+        return _last_version
+
+
+def _redis():
+    _cache._init_redis()
+    return _cache._redis_client if _cache._redis_available else None
+
+
+# ── Writes ─────────────────────────────────────────────────────────────────────
+
+
+def save_market_pulse_entries(entries: Mapping[str, dict]) -> Dict[str, int]:
+    """
+    Persist *entries* ({symbol: pulse data}) and announce them.
+
+    Returns the version assigned to each symbol.
+    """
+    if not entries:
+        return {}
+    records = {}
+    for symbol, data in entries.items():
+        version = _next_version()
+        records[symbol] = {
+            "version": version,
+            "updated_at": datetime.fromtimestamp(
+                version / 1e6, tz=timezone.utc
+            ).isoformat(),
+            "data": data,
+        }
+    payloads = {s: json.dumps(r, ensure_ascii=False) for s, r in records.items()}
+    versions = {s: r["version"] for s, r in records.items()}
+
+    r = _redis()
+    if r is not None:
+        try:
+            pipe = r.pipeline(transaction=False)
+            for symbol, payload in payloads.items():
+                pipe.setex(_cache._redis_key(entry_key(symbol)), REDIS_TTL, payload)
+            pipe.hset(_cache._redis_key(INDEX_KEY), mapping=versions)
+            pipe.expire(_cache._redis_key(INDEX_KEY), REDIS_TTL)
+            pipe.execute()
+        except Exception as exc:
+            logger.warning("Redis Market Pulse write failed: %s", exc)
+
+    # Entries and their index fields in one statement, so readers never see
+    # an index version whose entry is missing
+    DatabaseBase.execute(
+        """
+        WITH entries AS (
+            INSERT INTO system_cache (key, value, updated_at)
+            SELECT k, v, NOW() FROM unnest(%s::text[], %s::text[]) AS t(k, v)
+            ON CONFLICT(key) DO UPDATE SET
+                value = EXCLUDED.value,
+                updated_at = EXCLUDED.updated_at
+        )
+        INSERT INTO system_cache (key, value, updated_at)
+        VALUES (%s, %s, NOW())
+        ON CONFLICT(key) DO UPDATE SET
+            value = (
+                COALESCE(NULLIF(system_cache.value, '')::jsonb, '{}'::jsonb)
+                || EXCLUDED.value::jsonb
+            )::text,
+            updated_at = EXCLUDED.updated_at
+    """,
+        (
+            [entry_key(s) for s in payloads],
+            list(payloads.values()),
+            INDEX_KEY,
+            json.dumps(versions),
+        ),
+    )
+
+    if r is not None:
+        try:
+            r.publish(DELTA_CHANNEL, json.dumps(versions))
+        except Exception as exc:
+            logger.warning("Market Pulse delta publish failed: %s", exc)
+    return versions
+
+
+# ── Reads ──────────────────────────────────────────────────────────────────────
+
+
+def load_market_pulse_index() -> Dict[str, int]:
+    """
+    {symbol: version} for every stored symbol.
+
+    The DB row is complete; the Redis hash may be missing symbols (restart,
+    flush, expiry) but can be ahead of a lagging DB write, so the two are
+    merged and the newer version wins.
+    """
+    index = {s: int(v) for s, v in (_cache._db_get(INDEX_KEY) or {}).items()}
+    r = _redis()
+    if r is not None:
+        try:
+            for symbol, version in r.hgetall(_cache._redis_key(INDEX_KEY)).items():
+                index[symbol] = max(int(version), index.get(symbol, 0))
+        except Exception as exc:
+            logger.warning("Redis Market Pulse index read failed: %s", exc)
+    return index
+
+
+def fetch_market_pulse_entries(symbols: Iterable[str]) -> Dict[str, dict]:
+    """Stored records ({version, updated_at, data}) for *symbols*."""
+    symbols = list(dict.fromkeys(symbols))
+    if not symbols:
+        return {}
+    found: Dict[str, dict] = {}
+
+    r = _redis()
+    if r is not None:
+        try:
+            values = r.mget([_cache._redis_key(entry_key(s)) for s in symbols])
+            for symbol, value in zip(symbols, values):
+                if value is not None:
+                    found[symbol] = json.loads(value)
+        except Exception as exc:
+            logger.warning("Redis Market Pulse MGET failed: %s", exc)
+
+    missing = [s for s in symbols if s not in found]
+    if missing:
+        rows = DatabaseBase.query_all(
+            "SELECT key, value FROM system_cache WHERE key = ANY(%s)",
+            ([entry_key(s) for s in missing],),
+        )
+        for row in rows:
+            try:
+                found[row["key"][len(KEY_PREFIX) :]] = json.loads(row["value"])
+            except (json.JSONDecodeError, TypeError) as exc:
+                logger.warning("DB Market Pulse read error for %s: %s", row["key"], exc)
+    return found
+
+
+def load_market_pulse_entries(
+    known: Optional[Mapping[str, int]] = None,
+) -> Dict[str, dict]:
+    """
+    Records whose stored version differs from *known* ({symbol: version}).
+
+    With no *known* versions every stored symbol is returned.
+    """
+    known = known or {}
+    index = load_market_pulse_index()
+    changed = [s for s, v in index.items() if known.get(s) != v]
+    return fetch_market_pulse_entries(changed)
+
+
+# ── Delta listener ─────────────────────────────────────────────────────────────
+
+
+class _DeltaListener:
+    """
+    Calls ``on_delta(versions)`` for every published delta and
+    ``on_delta(None)`` every PROBE_INTERVAL seconds (index probe).
+    """
+
+    def __init__(self, on_delta: Callable[[Optional[Dict[str, int]]], None]):
+        self.on_delta = on_delta
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _call(self, versions: Optional[Dict[str, int]]) -> None:
+        try:
+            self.on_delta(versions)
+        except Exception as exc:
+            logger.warning("Market Pulse sync failed: %s", exc)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            pubsub = None
+            try:
+                r = _redis()
+                if r is None:
+                    raise RuntimeError("Redis unavailable")
+                pubsub = r.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(DELTA_CHANNEL)
+                # Deltas published before the subscription
+                self._call(None)
+                next_probe = time.monotonic() + PROBE_INTERVAL
+                while not self._stop.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self._call(
+                            {s: int(v) for s, v in json.loads(message["data"]).items()}
+                        )
+                    if time.monotonic() >= next_probe:
+                        self._call(None)
+                        next_probe = time.monotonic() + PROBE_INTERVAL
+            except Exception as exc:
+                logger.debug("Market Pulse Pub/Sub unavailable, probing only: %s", exc)
+                if self._stop.wait(PROBE_INTERVAL):
+                    break
+                self._call(None)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="market-pulse-listener", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+_listener: Optional[_DeltaListener] = None
+
+
+def start_market_pulse_listener(
+    on_delta: Callable[[Optional[Dict[str, int]]], None],
+) -> None:
+    """Start the delta/probe thread for this process (idempotent)."""
+    global _listener
+    if _listener is not None:
+        return
+    _listener = _DeltaListener(on_delta)
+    _listener.start()
+    logger.info("Market Pulse listener started (probe every %ss)", PROBE_INTERVAL)
+
+
+def stop_market_pulse_listener() -> None:
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
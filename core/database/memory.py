@@ -8,6 +8,7 @@
 Reference: https://github.com/HKUDS/nanobot
 """
 
+import asyncio
 import json
 import logging
 import re
@@ -419,21 +420,28 @@ class MemoryStore:
             for r in (results or [])
         }
 
-    def write_facts(self, facts: list) -> None:
+    def write_facts(self, facts: list) -> int:
         """
         寫入結構化事實（upsert，新事實新增、已有的更新）
 
+        與現有事實相同的項目略過；沒有任何變動時不寫 DB、也不清記憶快取。
+
         Args:
             facts: [{'key': str, 'value': str, 'confidence': str, 'source_turn': int}]
+
+        Returns:
+            實際新增或變更的事實數
         """
         if not facts:
-            return
+            return 0
+        changed = 0
         for fact in facts:
             key = fact.get("key", "").strip()
             value = str(fact.get("value", "")).strip()
             if not key or not value:
                 continue
-            DatabaseBase.execute(
+            # 值與信心度都沒變時 WHERE 不成立，rowcount 為 0
+            if DatabaseBase.execute(
                 """
                 INSERT INTO user_facts (user_id, key, value, confidence, source_turn, updated_at)
                 VALUES (%s, %s, %s, %s, %s, NOW())
@@ -443,6 +451,8 @@ class MemoryStore:
                     confidence = EXCLUDED.confidence,
                     source_turn = EXCLUDED.source_turn,
                     updated_at = NOW()
+                WHERE user_facts.value IS DISTINCT FROM EXCLUDED.value
+                   OR user_facts.confidence IS DISTINCT FROM EXCLUDED.confidence
                 """,
                 (
                     self.user_id,
@@ -451,8 +461,11 @@ class MemoryStore:
                     fact.get("confidence", "high"),
                     fact.get("source_turn"),
                 ),
-            )
-        _invalidate_memory_cache(self.scope)
+            ):
+                changed += 1
+        if changed:
+            _invalidate_memory_cache(self.scope)
+        return changed
 
     def facts_to_text(self) -> str:
         """將結構化事實格式化為 LLM 可讀的文字"""
@@ -487,18 +500,51 @@ class MemoryStore:
             llm: LangChain LLM 實例
             tools_used: 本輪使用的工具列表
         """
+        return await self.extract_facts_from_turns(
+            [
+                {
+                    "user_message": user_message,
+                    "assistant_message": assistant_message,
+                    "turn_index": turn_index,
+                    "tools_used": tools_used,
+                }
+            ],
+            llm,
+        )
+
+    async def extract_facts_from_turns(self, turns: List[Dict[str, Any]], llm: Any) -> bool:
+        """
+        從多輪對話中一次萃取結構化事實（背景 worker 合併同一用戶的待處理輪次）
+
+        Args:
+            turns: [{'user_message', 'assistant_message', 'turn_index', 'tools_used'}]
+            llm: LangChain LLM 實例
+        """
         from langchain_core.messages import HumanMessage
 
-        existing_facts = self.facts_to_text()
+        if not turns:
+            return True
 
-        tools_section = ""
-        if tools_used:
-            tools_section = f"\n本輪使用工具：{', '.join(tools_used)}"
+        existing_facts = self.facts_to_text()
+        turn_index = turns[-1]["turn_index"]
+
+        blocks = []
+        for turn in turns:
+            tools_section = ""
+            if turn.get("tools_used"):
+                tools_section = f"\n本輪使用工具：{', '.join(turn['tools_used'])}"
+            block = (
+                f"使用者說：{turn['user_message']}\n"
+                f"助手回覆：{turn['assistant_message']}{tools_section}"
+            )
+            if len(turns) > 1:
+                block = f"### 第 {turn['turn_index']} 輪\n{block}"
+            blocks.append(block)
+        max_facts = min(3 * len(turns), 10)
 
         prompt = f"""從以下最新對話輪次中提取重要事實。只提取「明確說出的」事實，不推斷。
 
-使用者說：{user_message}
-助手回覆：{assistant_message}{tools_section}
+{chr(10).join(blocks)}
 
 已存在事實（避免重複）：
 {existing_facts}
@@ -515,10 +561,13 @@ class MemoryStore:
 - key 用 snake_case 英文
 - confidence: high=使用者明確說出, medium=可推斷, low=不確定
 - 無新事實則回覆 {{"facts": []}}
-- 最多 3 個事實"""
+- 最多 {max_facts} 個事實"""
 
         try:
-            response = llm.invoke([HumanMessage(content=prompt)])
+            # LLM client 是同步呼叫，移到 thread 避免阻塞 event loop
+            response = await asyncio.to_thread(
+                llm.invoke, [HumanMessage(content=prompt)]
+            )
             raw = response.content
             if isinstance(raw, list):
                 raw = "".join(
@@ -537,9 +586,10 @@ class MemoryStore:
             facts = result.get("facts", [])
 
             if facts:
-                self.write_facts(facts)
+                changed = self.write_facts(facts)
                 logger.info(
-                    f"[MemoryStore] Extracted {len(facts)} facts at turn {turn_index}"
+                    f"[MemoryStore] Extracted {len(facts)} facts "
+                    f"({changed} changed) from {len(turns)} turns at turn {turn_index}"
                 )
 
             return True
@@ -601,6 +651,33 @@ class MemoryStore:
         # DB 寫入成功後才更新本地
         self._last_consolidated_index = index
 
+    def advance_consolidated_index(self, index: int) -> bool:
+        """
+        背景整合完成後推進索引（只前進、不後退）
+
+        使用者已切換到其他 session 時（user_memory_cache.session_id 不同）不覆寫，
+        避免舊 session 的整合結果蓋掉新 session 剛歸零的索引。
+
+        Returns:
+            是否有更新
+        """
+        updated = DatabaseBase.execute(
+            """
+            INSERT INTO user_memory_cache (user_id, session_id, last_consolidated_index, updated_at)
+            VALUES (%s, %s, %s, NOW())
+            ON CONFLICT (user_id)
+            DO UPDATE SET
+                last_consolidated_index = GREATEST(
+                    user_memory_cache.last_consolidated_index,
+                    EXCLUDED.last_consolidated_index
+                ),
+                updated_at = NOW()
+            WHERE user_memory_cache.session_id = EXCLUDED.session_id
+            """,
+            (self.user_id, self.session_id, index),
+        )
+        return updated > 0
+
     # ==================== 記憶整合 ====================
 
     async def consolidate(
@@ -676,7 +753,9 @@ Respond in this exact JSON format:
             # 調用 LLM
             from langchain_core.messages import HumanMessage
 
-            response = llm.invoke([HumanMessage(content=prompt)])
+            response = await asyncio.to_thread(
+                llm.invoke, [HumanMessage(content=prompt)]
+            )
             content = response.content
             if isinstance(content, list):
                 content = "".join(
@@ -0,0 +1,202 @@
+"""
+記憶背景工作佇列資料庫操作
+
+memory_jobs 表是事實萃取 / 記憶整合的持久佇列：
+- 對話請求只負責 enqueue，LLM 呼叫由 core/memory_worker 的 worker 執行
+- dedupe_key 在未失敗的工作間唯一：重試同一輪對話不會重複排入，
+  已 failed 的工作則不擋重新排入
+- 以 FOR UPDATE SKIP LOCKED 領取，多個 worker / process 可並行而不互搶；
+  同一用戶同時只會被一個 worker 處理
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from .base import DatabaseBase, transaction
+
+
+def enqueue_memory_job(
+    user_id: str,
+    session_id: str,
+    kind: str,
+    payload: Dict[str, Any],
+    dedupe_key: str,
+    provider: Optional[str] = None,
+    model: Optional[str] = None,
+) -> bool:
+    """排入一筆工作；dedupe_key 已有未失敗的工作時忽略，回傳是否新增"""
+    return (
+        DatabaseBase.execute(
+            """
+            INSERT INTO memory_jobs
+                (user_id, session_id, kind, payload, dedupe_key, provider, model)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (dedupe_key) WHERE status <> 'failed' DO NOTHING
+            """,
+            (
+                user_id,
+                session_id,
+                kind,
+                json.dumps(payload, ensure_ascii=False),
+                dedupe_key,
+                provider,
+                model,
+            ),
+        )
+        > 0
+    )
+
+
+def claim_memory_jobs(limit: int = 20, max_users: int = 5) -> List[Dict[str, Any]]:
+    """
+    領取一位用戶的待處理工作（最多 limit 筆），狀態改為 running
+
+    先以最舊的待處理工作決定用戶，再領取該用戶其餘的待處理工作，
+    讓 worker 能把多輪對話合併成一次 LLM 呼叫。
+
+    同一用戶同時只會有一批 running：已有 running 工作的用戶不會被選中，
+    選定用戶時另取 transaction 級 advisory lock，避免兩個 worker
+    在彼此 commit 前同時領到同一用戶。沒有可領取的工作時回傳空 list。
+    """
+    with transaction() as conn:
+        cursor = conn.cursor()
+        try:
+            skipped: List[str] = []
+            user_id = None
+            for _ in range(max_users):
+                cursor.execute(
+                    """
+                    SELECT user_id FROM memory_jobs m
+                    WHERE status = 'pending' AND available_at <= NOW()
+                      AND user_id <> ALL(%s)
+                      AND NOT EXISTS (
+                          SELECT 1 FROM memory_jobs r
+                          WHERE r.user_id = m.user_id AND r.status = 'running'
+                      )
+                    ORDER BY id
+                    LIMIT 1
+                    FOR UPDATE SKIP LOCKED
+                    """,
+                    (skipped,),
+                )
+                head = cursor.fetchone()
+                if head is None:
+                    return []
+                # 持鎖後重新確認：另一個 worker 可能剛 commit 了該用戶的領取
+                cursor.execute(
+                    """
+                    SELECT pg_try_advisory_xact_lock(hashtext(%s))
+                       AND NOT EXISTS (
+                           SELECT 1 FROM memory_jobs
+                           WHERE user_id = %s AND status = 'running'
+                       )
+                    """,
+                    (head[0], head[0]),
+                )
+                if cursor.fetchone()[0]:
+                    user_id = head[0]
+                    break
+                skipped.append(head[0])
+            if user_id is None:
+                return []
+            cursor.execute(
+                """
+                UPDATE memory_jobs
+                SET status = 'running', locked_at = NOW(), attempts = attempts + 1
+                WHERE id IN (
+                    SELECT id FROM memory_jobs
+                    WHERE user_id = %s AND status = 'pending'
+                      AND available_at <= NOW()
+                    ORDER BY id
+                    LIMIT %s
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id, user_id, session_id, kind, payload, provider, model,
+                          attempts, created_at
+                """,
+                (user_id, limit),
+            )
+            columns = [col[0] for col in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+    for row in rows:
+        if isinstance(row["payload"], str):
+            row["payload"] = json.loads(row["payload"])
+    return sorted(rows, key=lambda r: r["id"])
+
+
+def complete_memory_jobs(job_ids: List[int]) -> int:
+    """標記工作完成"""
+    if not job_ids:
+        return 0
+    return DatabaseBase.execute(
+        "UPDATE memory_jobs SET status = 'done', finished_at = NOW(), "
+        "last_error = NULL WHERE id = ANY(%s)",
+        (list(job_ids),),
+    )
+
+
+def fail_memory_jobs(
+    job_ids: List[int], error: str, retry_delay: float, max_attempts: int
+) -> int:
+    """
+    工作失敗：未達重試上限者延後 retry_delay 秒重新排入，否則標記 failed
+    """
+    if not job_ids:
+        return 0
+    return DatabaseBase.execute(
+        """
+        UPDATE memory_jobs SET
+            status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+            available_at = NOW() + make_interval(secs => %s),
+            finished_at = CASE WHEN attempts >= %s THEN NOW() ELSE NULL END,
+            last_error = %s
+        WHERE id = ANY(%s)
+        """,
+        (max_attempts, retry_delay, max_attempts, error[:500], list(job_ids)),
+    )
+
+
+def requeue_stale_memory_jobs(timeout_seconds: float) -> int:
+    """將 worker 中斷後卡在 running 的工作放回佇列"""
+    return DatabaseBase.execute(
+        """
+        UPDATE memory_jobs SET status = 'pending', locked_at = NULL
+        WHERE status = 'running'
+          AND locked_at < NOW() - make_interval(secs => %s)
+        """,
+        (timeout_seconds,),
+    )
+
+
+def purge_finished_memory_jobs(retention_seconds: float) -> int:
+    """刪除超過保留時間的已完成 / 失敗工作"""
+    return DatabaseBase.execute(
+        """
+        DELETE FROM memory_jobs
+        WHERE status IN ('done', 'failed')
+          AND finished_at < NOW() - make_interval(secs => %s)
+        """,
+        (retention_seconds,),
+    )
+
+
+def get_memory_job_stats() -> Dict[str, Any]:
+    """佇列深度（依狀態與種類）與最舊待處理工作的等待秒數"""
+    rows = DatabaseBase.query_all(
+        """
+        SELECT status, kind, COUNT(*) AS total,
+               EXTRACT(EPOCH FROM NOW() - MIN(created_at)) AS oldest_age
+        FROM memory_jobs
+        WHERE status IN ('pending', 'running', 'failed')
+        GROUP BY status, kind
+        """
+    )
+    depth: Dict[str, Dict[str, int]] = {}
+    lag = 0.0
+    for row in rows:
+        depth.setdefault(row["status"], {})[row["kind"]] = row["total"]
+        if row["status"] == "pending":
+            lag = max(lag, float(row["oldest_age"] or 0))
+    return {"depth": depth, "oldest_pending_seconds": round(lag, 1)}
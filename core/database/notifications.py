@@ -2,13 +2,30 @@
 通知資料庫操作模組
 """
 
+import os
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
-from psycopg2.extras import Json
+from psycopg2.extras import Json, execute_values
 
 from .connection import get_connection
 
+# 批量建立通知時每條 multi-row INSERT 的最大列數
+BULK_CHUNK_SIZE = int(os.getenv("NOTIFICATION_BULK_CHUNK_SIZE", "1000"))
+
+
+def _row_to_dict(row) -> Dict[str, Any]:
+    return {
+        "id": row[0],
+        "user_id": row[1],
+        "type": row[2],
+        "title": row[3],
+        "body": row[4],
+        "data": row[5],
+        "is_read": row[6],
+        "created_at": row[7].isoformat() if row[7] else None,
+    }
+
 
 def create_notifications_table():
     """創建通知表（如果不存在）"""
@@ -88,16 +105,7 @@ def create_notification(
             conn.commit()
 
             if row:
-                return {
-                    "id": row[0],
-                    "user_id": row[1],
-                    "type": row[2],
-                    "title": row[3],
-                    "body": row[4],
-                    "data": row[5],
-                    "is_read": row[6],
-                    "created_at": row[7].isoformat() if row[7] else None,
-                }
+                return _row_to_dict(row)
             return None
     except Exception as e:
         conn.rollback()
@@ -106,6 +114,69 @@ def create_notification(
         conn.close()
 
 
+def create_notifications_bulk(
+    items: List[Dict[str, Any]],
+    chunk_size: Optional[int] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    批量創建通知（每個 chunk 一條 multi-row INSERT ... RETURNING，單一交易）
+
+    Args:
+        items: 通知列表，每項包含 user_id, type, title, body, data(可選)
+        chunk_size: 每條語句的列數，預設 BULK_CHUNK_SIZE
+        on_progress: 每個 chunk 完成後呼叫 on_progress(done, total)
+
+    Returns:
+        創建的通知對象列表（與輸入順序一致；RETURNING 不保證順序，依 id 對回）
+    """
+    if not items:
+        return []
+
+    size = max(1, chunk_size or BULK_CHUNK_SIZE)
+    total = len(items)
+    created: List[Dict[str, Any]] = []
+
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            for start in range(0, total, size):
+                values = [
+                    (
+                        f"notif_{uuid.uuid4().hex[:12]}",
+                        item["user_id"],
+                        item["type"],
+                        item.get("title"),
+                        item.get("body"),
+                        Json(item["data"]) if item.get("data") else None,
+                    )
+                    for item in items[start : start + size]
+                ]
+                rows = execute_values(
+                    cur,
+                    """
+                    INSERT INTO notifications (id, user_id, type, title, body, data, is_read, created_at)
+                    VALUES %s
+                    RETURNING id, user_id, type, title, body, data, is_read, created_at
+                """,
+                    values,
+                    template="(%s, %s, %s, %s, %s, %s, FALSE, NOW())",
+                    page_size=len(values),
+                    fetch=True,
+                )
+                by_id = {row[0]: row for row in rows}
+                created.extend(_row_to_dict(by_id[value[0]]) for value in values)
+                if on_progress is not None:
+                    on_progress(min(start + size, total), total)
+            conn.commit()
+        return created
+    except Exception as e:
+        conn.rollback()
+        raise e
+    finally:
+        conn.close()
+
+
 def get_notifications(
     user_id: str, limit: int = 50, offset: int = 0, unread_only: bool = False
 ) -> List[Dict[str, Any]]:
@@ -148,19 +219,7 @@ def get_notifications(
                 )
 
             rows = cur.fetchall()
-            return [
-                {
-                    "id": row[0],
-                    "user_id": row[1],
-                    "type": row[2],
-                    "title": row[3],
-                    "body": row[4],
-                    "data": row[5],
-                    "is_read": row[6],
-                    "created_at": row[7].isoformat() if row[7] else None,
-                }
-                for row in rows
-            ]
+            return [_row_to_dict(row) for row in rows]
     finally:
         conn.close()
 
@@ -384,41 +443,10 @@ def notify_system_update(
 def notify_announcement(
     user_ids: List[str], title: str, body: str
 ) -> List[Dict[str, Any]]:
-    """創建系統公告（批量，單次 DB 連接）"""
-    if not user_ids:
-        return []
-    conn = get_connection()
-    try:
-        rows = []
-        with conn.cursor() as cur:
-            for uid in user_ids:
-                notif_id = f"notif_{uuid.uuid4().hex[:12]}"
-                cur.execute(
-                    """
-                    INSERT INTO notifications (id, user_id, type, title, body, data, is_read, created_at)
-                    VALUES (%s, %s, 'announcement', %s, %s, NULL, FALSE, NOW())
-                    RETURNING id, user_id, type, title, body, data, is_read, created_at
-                """,
-                    (notif_id, uid, title, body),
-                )
-                row = cur.fetchone()
-                if row:
-                    rows.append(
-                        {
-                            "id": row[0],
-                            "user_id": row[1],
-                            "type": row[2],
-                            "title": row[3],
-                            "body": row[4],
-                            "data": row[5],
-                            "is_read": row[6],
-                            "created_at": row[7].isoformat() if row[7] else None,
-                        }
-                    )
-            conn.commit()
-        return rows
-    except Exception as e:
-        conn.rollback()
-        raise e
-    finally:
-        conn.close()
+    """創建系統公告（批量 multi-row INSERT）"""
+    return create_notifications_bulk(
+        [
+            {"user_id": uid, "type": "announcement", "title": title, "body": body}
+            for uid in user_ids
+        ]
+    )
@@ -0,0 +1,450 @@
+"""
+Query instrumentation shared by the psycopg2 pool and the async ORM engine.
+
+Every statement is reduced to a fingerprint (literals and bind markers
+replaced by ``?``, whitespace collapsed) and aggregated per fingerprint:
+call count, errors, rows returned, latency percentiles from a bounded
+sample window, and the time spent waiting for a pooled connection.
+
+Hooks:
+    • psycopg2 — ``TimedConnection`` and ``TimedCursor`` are installed as the
+      pool's ``connection_factory`` / default ``cursor_factory``; an explicit
+      ``cursor_factory=RealDictCursor`` (or ``DictCursor``) is swapped for its
+      timed variant. ``note_pool_wait()`` is called by ``get_connection``.
+    • SQLAlchemy — ``instrument_engine()`` attaches cursor-execute events and
+      ``TimedAsyncAdaptedQueuePool`` measures checkout wait.
+
+Slow-query logging is opt-in: ``SLOW_QUERY_MS`` (> 0) logs statements above
+the threshold, and ``SLOW_QUERY_EXPLAIN_SAMPLE_RATE`` (0–1) additionally runs
+``EXPLAIN (ANALYZE, BUFFERS)`` for a sample of slow read-only statements
+inside a savepoint.
+
+Usage::
+
+    from core.database.query_stats import query_stats
+
+    query_stats.snapshot(limit=20, order_by="total_ms")
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import random
+import re
+import threading
+import time
+import weakref
+from collections import deque
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import psycopg2.extensions
+import psycopg2.extras
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+QUERY_STATS_ENABLED = os.getenv("QUERY_STATS_ENABLED", "true").lower() == "true"
+# Latency samples kept per fingerprint for percentile estimates
+SAMPLE_WINDOW = int(os.getenv("QUERY_STATS_SAMPLE_WINDOW", "1000"))
+# Distinct fingerprints tracked before new ones fold into OTHER_FINGERPRINT
+MAX_STATEMENTS = int(os.getenv("QUERY_STATS_MAX_STATEMENTS", "2000"))
+# Most-called fingerprints flagged as "hot" in snapshots
+HOT_TOP_N = int(os.getenv("QUERY_STATS_HOT_TOP_N", "256"))
+
+OTHER_FINGERPRINT = "<other>"
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER_RE = re.compile(r"%\(\w+\)s|%s|\$\d+|(?<![:\w]):\w+")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_REPEATED_LIST_RE = re.compile(r"\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+")
+_WHITESPACE_RE = re.compile(r"\s+")
+_READ_ONLY_RE = re.compile(r"^\s*(select|with)\b", re.IGNORECASE)
+_WRITE_RE = re.compile(r"\b(insert|update|delete|merge)\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql: str) -> str:
+    """Normalise a statement so calls differing only in values share a key."""
+    text = _COMMENT_RE.sub(" ", sql)
+    text = _STRING_RE.sub("?", text)
+    text = _PLACEHOLDER_RE.sub("?", text)
+    text = _NUMBER_RE.sub("?", text)
+    text = _LIST_RE.sub("(...)", text)
+    text = _REPEATED_LIST_RE.sub("(...)", text)
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+def fingerprint_id(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:12]
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class _StatementStats:
+    __slots__ = (
+        "calls",
+        "errors",
+        "rows",
+        "total_ms",
+        "max_ms",
+        "pool_wait_ms",
+        "samples",
+        "last_seen",
+    )
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.pool_wait_ms = 0.0
+        self.samples: deque = deque(maxlen=SAMPLE_WINDOW)
+        self.last_seen = 0.0
+
+
+class QueryStats:
+    """Thread-safe per-fingerprint statement statistics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _StatementStats] = {}
+        self._since = time.time()
+
+    def record(
+        self,
+        sql: str,
+        duration_ms: float,
+        rows: int = 0,
+        pool_wait_ms: float = 0.0,
+        error: bool = False,
+    ) -> None:
+        if not QUERY_STATS_ENABLED:
+            return
+        key = fingerprint(sql)
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                if len(self._stats) >= MAX_STATEMENTS:
+                    key = OTHER_FINGERPRINT
+                    entry = self._stats.get(key)
+                if entry is None:
+                    entry = self._stats[key] = _StatementStats()
+            entry.calls += 1
+            entry.errors += int(error)
+            entry.rows += max(rows, 0)
+            entry.total_ms += duration_ms
+            entry.max_ms = max(entry.max_ms, duration_ms)
+            entry.pool_wait_ms += pool_wait_ms
+            entry.samples.append(duration_ms)
+            entry.last_seen = time.time()
+
+    def snapshot(
+        self, limit: int = 50, order_by: str = "total_ms"
+    ) -> List[Dict[str, Any]]:
+        """
+        Return per-fingerprint statistics, heaviest first.
+
+        Args:
+            limit: Maximum number of statements to return.
+            order_by: ``total_ms``, ``calls``, ``p95_ms``, ``p99_ms``,
+                ``rows`` or ``pool_wait_ms``.
+        """
+        with self._lock:
+            items = [
+                (key, entry, sorted(entry.samples))
+                for key, entry in self._stats.items()
+            ]
+            by_calls = sorted(items, key=lambda item: item[1].calls, reverse=True)
+            hot = {key for key, _, _ in by_calls[:HOT_TOP_N]}
+
+            rows = []
+            for key, entry, ordered in items:
+                rows.append(
+                    {
+                        "fingerprint_id": fingerprint_id(key),
+                        "statement": key,
+                        "calls": entry.calls,
+                        "errors": entry.errors,
+                        "rows": entry.rows,
+                        "total_ms": round(entry.total_ms, 3),
+                        "mean_ms": round(entry.total_ms / entry.calls, 3),
+                        "p50_ms": round(_percentile(ordered, 50), 3),
+                        "p95_ms": round(_percentile(ordered, 95), 3),
+                        "p99_ms": round(_percentile(ordered, 99), 3),
+                        "max_ms": round(entry.max_ms, 3),
+                        "pool_wait_ms": round(entry.pool_wait_ms, 3),
+                        "hot": key in hot,
+                        "last_seen": entry.last_seen,
+                    }
+                )
+
+        rows.sort(key=lambda row: row.get(order_by, 0), reverse=True)
+        return rows[:limit]
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = sum(entry.calls for entry in self._stats.values())
+            total_ms = sum(entry.total_ms for entry in self._stats.values())
+            pool_wait_ms = sum(entry.pool_wait_ms for entry in self._stats.values())
+            statements = len(self._stats)
+        return {
+            "enabled": QUERY_STATS_ENABLED,
+            "since": self._since,
+            "statements": statements,
+            "calls": calls,
+            "total_ms": round(total_ms, 3),
+            "pool_wait_ms": round(pool_wait_ms, 3),
+            "slow_query_ms": _slow_query_ms(),
+            "explain_sample_rate": _explain_sample_rate(),
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._since = time.time()
+
+
+query_stats = QueryStats()
+
+
+# ---------------------------------------------------------------------------
+# Slow-query logging with EXPLAIN sampling
+# ---------------------------------------------------------------------------
+
+
+def _slow_query_ms() -> float:
+    return float(os.getenv("SLOW_QUERY_MS", "0"))
+
+
+def _explain_sample_rate() -> float:
+    return float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", "0"))
+
+
+def _should_explain(sql: str) -> bool:
+    rate = _explain_sample_rate()
+    if rate <= 0 or random.random() >= rate:
+        return False
+    return bool(_READ_ONLY_RE.match(sql)) and not _WRITE_RE.search(sql)
+
+
+def _log_slow(sql: str, duration_ms: float, plan: Optional[str]) -> None:
+    if plan:
+        logger.warning(
+            "Slow query %.1fms [%s]: %s\n%s",
+            duration_ms,
+            fingerprint_id(fingerprint(sql)),
+            fingerprint(sql)[:500],
+            plan,
+        )
+    else:
+        logger.warning(
+            "Slow query %.1fms [%s]: %s",
+            duration_ms,
+            fingerprint_id(fingerprint(sql)),
+            fingerprint(sql)[:500],
+        )
+
+
+def _is_slow(duration_ms: float) -> bool:
+    threshold = _slow_query_ms()
+    return threshold > 0 and duration_ms >= threshold
+
+
+# ---------------------------------------------------------------------------
+# psycopg2 hooks
+# ---------------------------------------------------------------------------
+
+_pending_pool_wait: "weakref.WeakKeyDictionary[Any, float]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def note_pool_wait(raw_conn, wait_ms: float) -> None:
+    """Attribute pool checkout wait to the next statement on *raw_conn*."""
+    try:
+        _pending_pool_wait[raw_conn] = wait_ms
+    except TypeError:
+        pass
+
+
+class _TimedCursorMixin:
+    """Records every execute() of the cursor class it is mixed into."""
+
+    def execute(self, query, vars=None):
+        return self._timed(super().execute, query, vars)
+
+    def executemany(self, query, vars_list):
+        return self._timed(super().executemany, query, vars_list)
+
+    def _timed(self, method, query, params):
+        sql = query.decode("utf-8") if isinstance(query, bytes) else str(query)
+        start = time.perf_counter()
+        error = False
+        try:
+            return method(query, params)
+        except Exception:
+            error = True
+            raise
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            wait_ms = _pending_pool_wait.pop(self.connection, 0.0)
+            query_stats.record(
+                sql,
+                duration_ms,
+                rows=self.rowcount if not error else 0,
+                pool_wait_ms=wait_ms,
+                error=error,
+            )
+            if not error and _is_slow(duration_ms):
+                plan = None
+                if _should_explain(sql):
+                    plan = self._explain(sql, params)
+                _log_slow(sql, duration_ms, plan)
+
+    def _explain(self, sql: str, params) -> Optional[str]:
+        cur = psycopg2.extensions.cursor(self.connection)
+        try:
+            cur.execute("SAVEPOINT query_stats_explain")
+            try:
+                cur.execute("EXPLAIN (ANALYZE, BUFFERS) " + sql, params)
+                plan = "\n".join(row[0] for row in cur.fetchall())
+            finally:
+                cur.execute("ROLLBACK TO SAVEPOINT query_stats_explain")
+                cur.execute("RELEASE SAVEPOINT query_stats_explain")
+            return plan
+        except Exception as e:
+            logger.debug("EXPLAIN sampling failed: %s", e)
+            return None
+        finally:
+            cur.close()
+
+
+class TimedCursor(_TimedCursorMixin, psycopg2.extensions.cursor):
+    """psycopg2 cursor that records every execute() in ``query_stats``."""
+
+
+class TimedDictCursor(_TimedCursorMixin, psycopg2.extras.DictCursor):
+    """``DictCursor`` that records every execute() in ``query_stats``."""
+
+
+class TimedRealDictCursor(_TimedCursorMixin, psycopg2.extras.RealDictCursor):
+    """``RealDictCursor`` that records every execute() in ``query_stats``."""
+
+
+_TIMED_CURSORS = {
+    psycopg2.extensions.cursor: TimedCursor,
+    psycopg2.extras.DictCursor: TimedDictCursor,
+    psycopg2.extras.RealDictCursor: TimedRealDictCursor,
+}
+
+
+def timed_cursor_factory(cursor_factory):
+    """Return the timed variant of *cursor_factory*, or it unchanged."""
+    return _TIMED_CURSORS.get(cursor_factory, cursor_factory)
+
+
+class TimedConnection(psycopg2.extensions.connection):
+    """Connection that keeps explicitly requested cursor factories timed."""
+
+    def cursor(self, *args, **kwargs):
+        if len(args) > 1:
+            args = (args[0], timed_cursor_factory(args[1])) + args[2:]
+        elif "cursor_factory" in kwargs:
+            kwargs["cursor_factory"] = timed_cursor_factory(kwargs["cursor_factory"])
+        return super().cursor(*args, **kwargs)
+
+
+# ---------------------------------------------------------------------------
+# SQLAlchemy hooks
+# ---------------------------------------------------------------------------
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that stores checkout wait on the connection record."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        record = super()._do_get()
+        record.info["query_stats_pool_wait_ms"] = (time.perf_counter() - start) * 1000
+        return record
+
+
+def instrument_engine(sync_engine) -> None:
+    """Attach statement timing (and slow-query sampling) to an Engine."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_stats_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get("query_stats_start")
+        if not starts:
+            return
+        duration_ms = (time.perf_counter() - starts.pop()) * 1000
+        if conn.info.get("query_stats_explaining"):
+            return
+        wait_ms = conn.info.pop("query_stats_pool_wait_ms", 0.0)
+        query_stats.record(
+            statement, duration_ms, rows=_result_rows(cursor), pool_wait_ms=wait_ms
+        )
+        if _is_slow(duration_ms):
+            plan = None
+            if _should_explain(statement):
+                plan = _explain_sqlalchemy(conn, statement, parameters)
+            _log_slow(statement, duration_ms, plan)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is None or conn.info.get("query_stats_explaining"):
+            return
+        starts = conn.info.get("query_stats_start")
+        if not starts:
+            return
+        duration_ms = (time.perf_counter() - starts.pop()) * 1000
+        query_stats.record(
+            exception_context.statement or "",
+            duration_ms,
+            pool_wait_ms=conn.info.pop("query_stats_pool_wait_ms", 0.0),
+            error=True,
+        )
+
+
+def _result_rows(cursor) -> int:
+    rowcount = getattr(cursor, "rowcount", -1)
+    if rowcount is not None and rowcount >= 0:
+        return rowcount
+    buffered = getattr(cursor, "_rows", None)
+    return len(buffered) if buffered is not None else 0
+
+
+def _explain_sqlalchemy(conn, statement: str, parameters) -> Optional[str]:
+    conn.info["query_stats_explaining"] = True
+    try:
+        conn.exec_driver_sql("SAVEPOINT query_stats_explain")
+        try:
+            result = conn.exec_driver_sql(
+                "EXPLAIN (ANALYZE, BUFFERS) " + statement, parameters
+            )
+            return "\n".join(row[0] for row in result)
+        finally:
+            conn.exec_driver_sql("ROLLBACK TO SAVEPOINT query_stats_explain")
+            conn.exec_driver_sql("RELEASE SAVEPOINT query_stats_explain")
+    except Exception as e:
+        logger.debug("EXPLAIN sampling failed: %s", e)
+        return None
+    finally:
+        conn.info.pop("query_stats_explaining", None)
@@ -0,0 +1,82 @@
+"""
+已撤銷 Token 黑名單資料庫操作
+
+revoked_tokens 表是撤銷紀錄的持久層（Redis 僅作為共享快取），
+各 worker 透過 revoked_at 增量同步，把新撤銷的 token 加入本地 Bloom filter。
+"""
+
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from psycopg2.extras import execute_values
+
+from .base import DatabaseBase
+from .connection import get_connection
+
+
+def insert_revoked_tokens(entries: Iterable[Tuple[str, datetime]]) -> int:
+    """寫入撤銷紀錄 (token_hash, expires_at)；重複撤銷時延長到期時間"""
+    rows = list(entries)
+    if not rows:
+        return 0
+    conn = get_connection()
+    try:
+        with conn.cursor() as c:
+            execute_values(
+                c,
+                """
+                INSERT INTO revoked_tokens (token_hash, expires_at)
+                VALUES %s
+                ON CONFLICT (token_hash) DO UPDATE SET
+                    expires_at = GREATEST(revoked_tokens.expires_at, EXCLUDED.expires_at)
+                """,
+                rows,
+            )
+        conn.commit()
+        return len(rows)
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def is_revoked_in_db(token_hash: str) -> bool:
+    """查詢單一 token 是否仍在黑名單中（主鍵查詢）"""
+    row = DatabaseBase.query_one(
+        "SELECT 1 AS hit FROM revoked_tokens WHERE token_hash = %s AND expires_at > NOW()",
+        (token_hash,),
+    )
+    return row is not None
+
+
+def get_db_now() -> datetime:
+    """資料庫時鐘；增量同步的水位線以此為準，不受各 worker 本機時鐘偏差影響"""
+    return DatabaseBase.query_one("SELECT NOW() AS now")["now"]
+
+
+def get_revoked_since(
+    since: Optional[datetime] = None,
+) -> List[Tuple[str, datetime, datetime]]:
+    """
+    取得未過期的撤銷紀錄 (token_hash, expires_at, revoked_at)
+
+    since 為 None 時回傳全部，用於 worker 啟動時建立 Bloom filter。
+    """
+    if since is None:
+        rows = DatabaseBase.query_all(
+            "SELECT token_hash, expires_at, revoked_at FROM revoked_tokens "
+            "WHERE expires_at > NOW()"
+        )
+    else:
+        rows = DatabaseBase.query_all(
+            "SELECT token_hash, expires_at, revoked_at FROM revoked_tokens "
+            "WHERE revoked_at >= %s AND expires_at > NOW()",
+            (since,),
+        )
+    return [(r["token_hash"], r["expires_at"], r["revoked_at"]) for r in rows]
+
+
+def delete_expired_revoked_tokens() -> int:
+    """刪除已過期的撤銷紀錄，回傳刪除筆數"""
+    return DatabaseBase.execute("DELETE FROM revoked_tokens WHERE expires_at <= NOW()")
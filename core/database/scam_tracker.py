@@ -174,6 +174,14 @@ def create_scam_report(
 
         conn.commit()
         logger.info(f"Scam report created: {report_id} by {reporter_user_id}")
+
+        # 10. 更新錢包查詢索引（失敗時由背景同步補上）
+        try:
+            from core.scam_wallet_index import wallet_index
+
+            wallet_index.add(scam_wallet_upper, report_id, "pending")
+        except Exception as e:
+            logger.warning(f"Wallet index update failed: {e}")
         return {"success": True, "report_id": report_id}
 
     except Exception as e:
@@ -46,6 +46,10 @@ def create_basic_tables(c):
         CREATE INDEX IF NOT EXISTS idx_revoked_tokens_expires
         ON revoked_tokens (expires_at)
     """)
+    c.execute("""
+        CREATE INDEX IF NOT EXISTS idx_revoked_tokens_revoked_at
+        ON revoked_tokens (revoked_at)
+    """)
 
     # 建立系統快取表 (System Cache)
     c.execute("""
@@ -558,6 +562,7 @@ def create_governance_tables(c):
             points INTEGER DEFAULT 0,
             total_violations INTEGER DEFAULT 0,
             last_violation_at TIMESTAMP,
+            last_decrement_at TIMESTAMP,
             suspension_count INTEGER DEFAULT 0,
             updated_at TIMESTAMP DEFAULT NOW()
         )
@@ -575,10 +580,10 @@ def create_governance_tables(c):
         )
     """)
 
-    # 用戶活動日誌表
+    # 用戶活動日誌表（依 created_at 按月分區，過期資料以整個分區刪除）
     c.execute("""
         CREATE TABLE IF NOT EXISTS user_activity_logs (
-            id SERIAL PRIMARY KEY,
+            id BIGSERIAL,
             user_id VARCHAR(255) NOT NULL,
             activity_type VARCHAR(100) NOT NULL,
             resource_type VARCHAR(50),
@@ -588,9 +593,34 @@ def create_governance_tables(c):
             error_message TEXT,
             ip_address VARCHAR(45),
             user_agent TEXT,
-            created_at TIMESTAMP DEFAULT NOW()
-        )
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
     """)
+    # 月分區由 ensure_activity_log_partitions 建立；DEFAULT 分區兜底避免寫入失敗
+    # 尚未執行 c006 遷移的舊資料庫仍是一般表，此時跳過（由遷移建立）
+    from .governance.activity import is_activity_log_partitioned
+
+    if is_activity_log_partitioned(c):
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS user_activity_logs_default
+            PARTITION OF user_activity_logs DEFAULT
+        """)
+    else:
+        logger.warning(
+            "user_activity_logs is not partitioned yet; "
+            "run the c006_partition_user_activity_logs migration"
+        )
+
+
+def create_activity_log_partitions(c):
+    """Create the current and upcoming monthly user_activity_logs partitions."""
+    from .governance.activity import ensure_activity_log_partitions
+
+    created = ensure_activity_log_partitions(c)
+    if created:
+        logger.info("Activity log partitions created: %s", ", ".join(created))
+    return created
 
 
 def create_analysis_tables(c):
@@ -818,6 +848,9 @@ def create_indexes(c):
     c.execute(
         "CREATE INDEX IF NOT EXISTS idx_user_activity_logs_type ON user_activity_logs(activity_type)"
     )
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_activity_logs_created ON user_activity_logs(created_at)"
+    )
 
     # 好友功能索引
     c.execute(
@@ -1118,6 +1151,48 @@ def create_memory_tables(c):
         )
     """)
 
+    # 記憶背景工作佇列（事實萃取 / 整合由 core/memory_worker 執行）
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS memory_jobs (
+            id BIGSERIAL PRIMARY KEY,
+            user_id VARCHAR(255) NOT NULL,
+            session_id VARCHAR(255),
+            kind VARCHAR(20) NOT NULL,
+            payload JSONB NOT NULL,
+            dedupe_key VARCHAR(255) NOT NULL,
+            provider VARCHAR(50),
+            model VARCHAR(100),
+            status VARCHAR(10) NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            available_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+            locked_at TIMESTAMP WITH TIME ZONE,
+            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+            finished_at TIMESTAMP WITH TIME ZONE
+        )
+    """)
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_memory_jobs_pending "
+        "ON memory_jobs(available_at, id) WHERE status = 'pending'"
+    )
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_memory_jobs_user_pending "
+        "ON memory_jobs(user_id, id) WHERE status = 'pending'"
+    )
+    # 去重只看未失敗的工作，failed 的同一輪對話可以重新排入
+    c.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_memory_jobs_dedupe_active "
+        "ON memory_jobs(dedupe_key) WHERE status <> 'failed'"
+    )
+    # 舊版建立的整欄 UNIQUE 會連 failed 的工作一起擋下
+    c.execute(
+        "ALTER TABLE memory_jobs DROP CONSTRAINT IF EXISTS memory_jobs_dedupe_key_key"
+    )
+    c.execute(
+        "CREATE INDEX IF NOT EXISTS idx_memory_jobs_user_running "
+        "ON memory_jobs(user_id) WHERE status = 'running'"
+    )
+
 
 def create_user_facts_table(c):
     """Create user_facts table for nanoclaw-style structured fact extraction"""
@@ -1137,6 +1212,60 @@ def create_user_facts_table(c):
     c.execute("CREATE INDEX IF NOT EXISTS idx_user_facts_user ON user_facts(user_id)")
 
 
+def create_checkpoint_tables(c):
+    """Create LangGraph checkpoint tables (core/agents/checkpointer.py)"""
+    # 每個 checkpoint 一列，不含 channel 值
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS checkpoints (
+            thread_id TEXT NOT NULL,
+            checkpoint_ns TEXT NOT NULL DEFAULT '',
+            checkpoint_id TEXT NOT NULL,
+            parent_checkpoint_id TEXT,
+            type TEXT NOT NULL,
+            checkpoint BYTEA NOT NULL,
+            metadata_type TEXT NOT NULL,
+            metadata BYTEA NOT NULL,
+            size_bytes INTEGER NOT NULL DEFAULT 0,
+            ts DOUBLE PRECISION NOT NULL DEFAULT EXTRACT(EPOCH FROM NOW()),
+            PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+        )
+    """)
+    # 寫入時間（epoch 秒），閒置 thread 清理用；舊表補欄位時以當下時間起算
+    c.execute(
+        "ALTER TABLE checkpoints ADD COLUMN IF NOT EXISTS "
+        "ts DOUBLE PRECISION NOT NULL DEFAULT EXTRACT(EPOCH FROM NOW())"
+    )
+
+    # channel 值，只在版本變動時寫入（增量）
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS checkpoint_blobs (
+            thread_id TEXT NOT NULL,
+            checkpoint_ns TEXT NOT NULL DEFAULT '',
+            channel TEXT NOT NULL,
+            version TEXT NOT NULL,
+            type TEXT NOT NULL,
+            blob BYTEA,
+            PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+        )
+    """)
+
+    # 進行中步驟的 pending writes
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS checkpoint_writes (
+            thread_id TEXT NOT NULL,
+            checkpoint_ns TEXT NOT NULL DEFAULT '',
+            checkpoint_id TEXT NOT NULL,
+            task_id TEXT NOT NULL,
+            idx INTEGER NOT NULL,
+            channel TEXT NOT NULL,
+            type TEXT NOT NULL,
+            blob BYTEA,
+            task_path TEXT NOT NULL DEFAULT '',
+            PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+        )
+    """)
+
+
 def create_notifications_table(c):
     """Create notifications table"""
     c.execute("""
@@ -1209,6 +1338,27 @@ def reconcile_user_tables(c):
     )
 
 
+def reconcile_governance_tables(c):
+    """Add the violation-point decay column and its partial index."""
+    return _run_reconcile_steps(
+        c,
+        "user_violation_points",
+        [
+            (
+                "last_decrement_at",
+                "ALTER TABLE user_violation_points ADD COLUMN IF NOT EXISTS last_decrement_at TIMESTAMPTZ",
+            ),
+            (
+                # 遞減任務與統計只看 points > 0 的少數用戶
+                "idx_user_violation_points_positive",
+                "CREATE INDEX IF NOT EXISTS idx_user_violation_points_positive "
+                "ON user_violation_points (last_decrement_at, last_violation_at) "
+                "INCLUDE (points) WHERE points > 0",
+            ),
+        ],
+    )
+
+
 def reconcile_audit_log_tables(c):
     """Safely reconcile audit_logs columns and indexes for upgraded databases."""
     checked_items = _run_reconcile_steps(
@@ -1565,6 +1715,7 @@ def reconcile_timestamptz(c):
         ("user_violations", "suspended_until"),
         ("user_violations", "created_at"),
         ("user_violation_points", "last_violation_at"),
+        ("user_violation_points", "last_decrement_at"),
         ("user_violation_points", "updated_at"),
         ("audit_reputation", "updated_at"),
         ("user_activity_logs", "created_at"),
@@ -1654,6 +1805,7 @@ def reconcile_existing_tables(c):
     payment_result = reconcile_payment_tables(c)
     return {
         "users": reconcile_user_tables(c),
+        "user_violation_points": reconcile_governance_tables(c),
         "audit_logs": reconcile_audit_log_tables(c),
         "scam_report_comments": reconcile_scam_tracker_tables(c),
         "tools_catalog": reconcile_tool_tables(c),
@@ -1694,5 +1846,7 @@ def create_all_tables(c):
     create_tool_tables(c)
     create_memory_tables(c)
     create_user_facts_table(c)
+    create_checkpoint_tables(c)
     create_indexes(c)
+    create_activity_log_partitions(c)
     init_default_data(c)
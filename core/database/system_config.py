@@ -2,35 +2,42 @@
 系統配置管理模組 V2
 
 提供從數據庫讀取和更新系統配置的功能。
-包含多層快取機制（進程內 + Redis）以提高性能。
+每個 worker 持有一份不可變的配置快照，讀取只是一次 dict 查詢。
 
 商用化設計：
-- 多層快取：進程內快取(10秒) -> Redis快取(5分鐘) -> PostgreSQL
+- 版本化快照：整份配置一個版本號（內容 md5），變更時原子替換
+- 推送失效：PostgreSQL LISTEN/NOTIFY + Redis Pub/Sub 公告新版本
+- 定期版本探測：補上漏接的通知（預設 30 秒）
 - 配置變更審計日誌
-- Redis Pub/Sub 跨進程快取失效
 - 支持即時更新配置，無需重啟服務
 - 分類管理（pricing, limits, general）
 - 權限控制（is_public 標記）
 
 架構圖：
-┌─────────────┐     ┌─────────────┐     ┌─────────────┐     ┌─────────────┐
-│   API 請求   │ --> │ 進程內快取   │ --> │ Redis 快取  │ --> │ PostgreSQL  │
-└─────────────┘     │   (10秒)    │     │  (5分鐘)    │     └─────────────┘
-                    └─────────────┘     └──────┬──────┘
-                                               │
-                                        Pub/Sub 失效通知
+┌─────────────┐     ┌─────────────┐  重新載入   ┌─────────────┐     ┌─────────────┐
+│   API 請求   │ --> │ 進程內快照   │ <--------- │ Redis 快照  │ <-- │ PostgreSQL  │
+└─────────────┘     │  (無 TTL)   │            │ (同版本共用) │     └──────┬──────┘
+                    └──────▲──────┘            └─────────────┘            │
+                           │        NOTIFY config_updates / Pub/Sub       │
+                           └──────────────────────────────────────────────┘
+
+未啟動監聽線程的進程（腳本、測試）沿用 10 秒過期的舊行為。
 """
 
+import hashlib
 import json
 import logging
+import os
+import select
 import threading
 import time
-from typing import Any, Dict, List, Optional
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
 
 logger = logging.getLogger(__name__)
 from core.redis_url import resolve_redis_url
 
-from .connection import get_connection
+from .connection import get_connection, get_database_url
 
 # ============================================================================
 # Redis 支持（可選依賴）
@@ -48,23 +55,48 @@ except ImportError:
 # 配置常量
 # ============================================================================
 
-MEMORY_CACHE_TTL = 10  # 進程內快取 10 秒
-REDIS_CACHE_TTL = 300  # Redis 快取 5 分鐘
+MEMORY_CACHE_TTL = 10  # 未啟動監聽線程時，進程內快照 10 秒過期
+REDIS_CACHE_TTL = 300  # Redis 快照 5 分鐘
+VERSION_PROBE_INTERVAL = float(os.getenv("CONFIG_VERSION_PROBE_INTERVAL", "30"))
 CONFIG_CHANNEL = "config:updates"  # Redis Pub/Sub 頻道
+PG_NOTIFY_CHANNEL = "config_updates"  # PostgreSQL LISTEN/NOTIFY 頻道
 REDIS_KEY_PREFIX = "config:"
+REDIS_SNAPSHOT_KEY = f"{REDIS_KEY_PREFIX}snapshot"
+
+# 整張表的內容摘要即為版本號；任何寫入（包括直接 SQL）都會改變它
+_VERSION_EXPR = (
+    "md5(COALESCE(string_agg(key || '=' || value || ':' || COALESCE(value_type, ''),"
+    " E'\\n' ORDER BY key), ''))"
+)
+_VERSION_SQL = f"SELECT {_VERSION_EXPR} FROM system_config"
+# 同一條語句讀取內容與版本，兩者來自同一個 MVCC 快照
+_SNAPSHOT_SQL = (
+    f"SELECT key, value, value_type, ({_VERSION_SQL}) AS version FROM system_config"
+)
+_EMPTY_VERSION = hashlib.md5(b"").hexdigest()
+
+
+class ConfigSnapshot(NamedTuple):
+    """某一版本的完整配置（唯讀）"""
+
+    version: str
+    values: Mapping[str, Any]
+    loaded_at: float
+
 
 # ============================================================================
-# 多層快取管理器
+# 快照管理器
 # ============================================================================
 
 
 class ConfigCacheManager:
     """
-    多層快取管理器
+    版本化配置快照管理器
 
-    Layer 1: 進程內記憶體快取（10秒）- 最快，避免頻繁網絡請求
-    Layer 2: Redis 快取（5分鐘）- 跨進程同步
-    Layer 3: PostgreSQL 數據庫 - 持久化存儲
+    - 讀取：直接返回當前快照，不做 TTL 檢查、不做任何 I/O
+    - 失效：NOTIFY / Pub/Sub 公告新版本 -> 監聽線程重新載入 -> 原子替換快照
+    - 兜底：監聽線程每 VERSION_PROBE_INTERVAL 秒探測一次數據庫版本
+    - Redis 快照讓同一版本只由一個 worker 查詢數據庫
     """
 
     _instance = None
@@ -82,10 +114,21 @@ class ConfigCacheManager:
         if self._initialized:
             return
 
-        self._memory_cache: Dict[str, Any] = {}
-        self._memory_timestamp: float = 0
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._reload_lock = threading.Lock()
         self._redis_client: Optional[Any] = None
         self._pubsub_thread: Optional[threading.Thread] = None
+        self._watcher_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # 監聽線程運行時快照不會過期
+        self._watching = False
+        self._stats = {
+            "reloads": 0,
+            "redis_snapshot_hits": 0,
+            "notifications": 0,
+            "probes": 0,
+            "stale_probes": 0,
+        }
         self._initialized = True
 
         # 初始化 Redis 連接
@@ -128,12 +171,12 @@ class ConfigCacheManager:
 
                 for message in pubsub.listen():
                     if message["type"] == "message":
-                        # 收到失效通知，清除本地快取
-                        self._memory_cache = {}
-                        self._memory_timestamp = 0
-                        logger.info(
-                            "Cache invalidation notification received, local cache cleared"
-                        )
+                        # 舊版 worker 發布的訊息沒有 version，一律重新載入
+                        try:
+                            version = json.loads(message["data"]).get("version")
+                        except (TypeError, ValueError, AttributeError):
+                            version = None
+                        self._on_announce(version)
             except Exception as e:
                 logger.error("Pub/Sub listener error: %s", e)
 
@@ -142,113 +185,261 @@ class ConfigCacheManager:
         logger.info("Pub/Sub listener started")
 
     # ========================================================================
-    # 快取讀取
+    # 快照讀取
     # ========================================================================
 
+    def snapshot(self) -> ConfigSnapshot:
+        """返回當前快照；僅在尚未載入（或未監聽且已過期）時讀取後端"""
+        snap = self._snapshot
+        if snap is not None and (
+            self._watching or time.monotonic() - snap.loaded_at < MEMORY_CACHE_TTL
+        ):
+            return snap
+        return self.reload()
+
     def get_all(self) -> Dict[str, Any]:
         """
-        獲取所有配置（多層快取）
+        獲取所有配置（可修改的副本）
         """
-        # Layer 1: 進程內快取
-        if self._is_memory_cache_valid():
-            return self._memory_cache.copy()
-
-        # Layer 2: Redis 快取
-        redis_data = self._get_from_redis()
-        if redis_data is not None:
-            self._set_memory_cache(redis_data)
-            return redis_data.copy()
-
-        # Layer 3: 數據庫
-        db_data = self._load_from_db()
-        self._set_memory_cache(db_data)
-        self._set_to_redis(db_data)
-        return db_data.copy()
+        return dict(self.snapshot().values)
 
     def _is_memory_cache_valid(self) -> bool:
-        """檢查進程內快取是否有效"""
-        return (time.time() - self._memory_timestamp) < MEMORY_CACHE_TTL and bool(
-            self._memory_cache
+        """檢查進程內快照是否有效"""
+        snap = self._snapshot
+        return snap is not None and (
+            self._watching or time.monotonic() - snap.loaded_at < MEMORY_CACHE_TTL
         )
 
-    def _set_memory_cache(self, data: Dict[str, Any]):
-        """設置進程內快取"""
-        self._memory_cache = data.copy()
-        self._memory_timestamp = time.time()
+    def reload(self, version: Optional[str] = None) -> ConfigSnapshot:
+        """
+        載入並替換快照
 
-    def _get_from_redis(self) -> Optional[Dict[str, Any]]:
-        """從 Redis 獲取快取"""
+        Args:
+            version: 公告的新版本；已持有該版本時不做任何 I/O，
+                     Redis 快照版本相同時不查詢數據庫
+        """
+        with self._reload_lock:
+            current = self._snapshot
+            if version and current is not None and current.version == version:
+                return current
+
+            snap = self._get_from_redis()
+            if snap is None or (version and snap.version != version):
+                snap = self._load_from_db()
+                self._set_to_redis(snap)
+            else:
+                self._stats["redis_snapshot_hits"] += 1
+
+            self._snapshot = snap
+            self._stats["reloads"] += 1
+            return snap
+
+    def _get_from_redis(self) -> Optional[ConfigSnapshot]:
+        """從 Redis 獲取共用快照"""
         if not self._redis_client:
             return None
 
         try:
-            data = self._redis_client.get(f"{REDIS_KEY_PREFIX}all")
+            data = self._redis_client.get(REDIS_SNAPSHOT_KEY)
             if data:
-                return json.loads(data)
+                payload = json.loads(data)
+                return ConfigSnapshot(
+                    payload["version"],
+                    MappingProxyType(payload["values"]),
+                    time.monotonic(),
+                )
         except Exception as e:
             logger.warning("Redis read failed: %s", e)
             if "connecting to" in str(e) or "Name or service not known" in str(e):
                 self._redis_client = None
         return None
 
-    def _set_to_redis(self, data: Dict[str, Any]):
-        """設置 Redis 快取"""
+    def _set_to_redis(self, snap: ConfigSnapshot):
+        """設置 Redis 共用快照"""
         if not self._redis_client:
             return
 
         try:
             self._redis_client.setex(
-                f"{REDIS_KEY_PREFIX}all", REDIS_CACHE_TTL, json.dumps(data)
+                REDIS_SNAPSHOT_KEY,
+                REDIS_CACHE_TTL,
+                json.dumps({"version": snap.version, "values": dict(snap.values)}),
             )
         except Exception as e:
             logger.warning("Redis write failed: %s", e)
             if "connecting to" in str(e) or "Name or service not known" in str(e):
                 self._redis_client = None
 
-    def _load_from_db(self) -> Dict[str, Any]:
-        """從數據庫載入所有配置"""
+    def _load_from_db(self) -> ConfigSnapshot:
+        """從數據庫載入所有配置及其版本"""
         conn = get_connection()
         c = conn.cursor()
         try:
-            c.execute("SELECT key, value, value_type FROM system_config")
+            c.execute(_SNAPSHOT_SQL)
             rows = c.fetchall()
 
             result = {}
-            for key, value, value_type in rows:
+            version = _EMPTY_VERSION
+            for key, value, value_type, version in rows:
                 result[key] = _parse_value(value, value_type)
-            return result
+            return ConfigSnapshot(version, MappingProxyType(result), time.monotonic())
         finally:
             conn.close()
 
     # ========================================================================
-    # 快取失效
+    # 版本公告與探測
     # ========================================================================
 
+    def _on_announce(self, version: Optional[str]):
+        """收到新版本公告（NOTIFY 或 Pub/Sub）"""
+        self._stats["notifications"] += 1
+        current = self._snapshot
+        if version and current is not None and current.version == version:
+            return
+        try:
+            self.reload(version)
+            logger.info("Config snapshot reloaded (version %s)", version or "?")
+        except Exception as e:
+            # 載入失敗時丟棄快照，下一次讀取會重試
+            self._snapshot = None
+            logger.warning("Config snapshot reload failed: %s", e)
+
+    def _probe(self, conn=None):
+        """比對數據庫版本與本地快照版本，補上漏接的通知"""
+        self._stats["probes"] += 1
+        own = conn is None
+        if own:
+            conn = get_connection()
+        try:
+            c = conn.cursor()
+            c.execute(_VERSION_SQL)
+            row = c.fetchone()
+            version = row[0] if row and row[0] else _EMPTY_VERSION
+        finally:
+            if own:
+                conn.close()
+
+        current = self._snapshot
+        if current is None or current.version != version:
+            self._stats["stale_probes"] += 1
+            self._on_announce(version)
+
+    def _watch(self):
+        """LISTEN config_updates；逾時即做一次版本探測"""
+        import psycopg2
+        from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+
+        while not self._stop.is_set():
+            conn = None
+            try:
+                # 專用連線：LISTEN 需要長期持有，不能佔用連接池
+                conn = psycopg2.connect(get_database_url())
+                conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                conn.cursor().execute(f"LISTEN {PG_NOTIFY_CHANNEL}")
+                # 監聽建立前的變更
+                self._probe(conn)
+
+                while not self._stop.is_set():
+                    ready, _, _ = select.select([conn], [], [], VERSION_PROBE_INTERVAL)
+                    if not ready:
+                        self._probe(conn)
+                        continue
+                    conn.poll()
+                    if conn.notifies:
+                        version = conn.notifies[-1].payload or None
+                        conn.notifies.clear()
+                        self._on_announce(version)
+            except Exception as e:
+                # LISTEN 不可用（例如 transaction pooling）時退化為定期探測
+                logger.warning("Config LISTEN unavailable, probing only: %s", e)
+                if self._stop.wait(VERSION_PROBE_INTERVAL):
+                    break
+                try:
+                    self._probe()
+                except Exception as probe_error:
+                    logger.warning("Config version probe failed: %s", probe_error)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+    def start_watcher(self):
+        """啟動 LISTEN/探測線程；啟動後讀取不再有 TTL"""
+        if self._watching:
+            return
+        if not get_database_url():
+            logger.warning("DATABASE_URL not set, config watcher not started")
+            return
+        self._stop.clear()
+        self._watching = True
+        self._watcher_thread = threading.Thread(
+            target=self._watch, name="config-watcher", daemon=True
+        )
+        self._watcher_thread.start()
+        logger.info("Config watcher started (probe every %ss)", VERSION_PROBE_INTERVAL)
+
+    def stop_watcher(self):
+        """停止 LISTEN/探測線程"""
+        self._stop.set()
+        self._watching = False
+        self._watcher_thread = None
+
+    # ========================================================================
+    # 快照失效
+    # ========================================================================
+
+    def announce(self, version: Optional[str] = None, key: Optional[str] = None):
+        """
+        公告已提交的新版本：本進程立即載入，並通知其他進程
+
+        Args:
+            version: 新版本（由寫入事務中的 pg_notify 取得）
+            key: 變更的 key（僅供日誌）
+        """
+        try:
+            self.reload(version)
+        except Exception as e:
+            self._snapshot = None
+            logger.warning("Config snapshot reload failed: %s", e)
+        self._publish(key, self._snapshot.version if self._snapshot else None)
+
     def invalidate(self, key: Optional[str] = None):
         """
-        使快取失效
+        使快照失效（下次讀取時重新載入）
 
         Args:
             key: 指定 key 或 None 清除全部
         """
-        # 清除進程內快取
-        self._memory_cache = {}
-        self._memory_timestamp = 0
+        self._snapshot = None
+        if self._redis_client:
+            try:
+                self._redis_client.delete(REDIS_SNAPSHOT_KEY)
+            except Exception as e:
+                logger.warning("Redis invalidation failed: %s", e)
+        self._publish(key, None)
 
+    def _publish(self, key: Optional[str], version: Optional[str]):
+        """發布失效通知（讓其他進程載入新版本）"""
         if not self._redis_client:
             return
 
         try:
-            # 清除 Redis 快取
+            # 舊版 worker 讀取的 key
             if key:
                 self._redis_client.delete(f"{REDIS_KEY_PREFIX}{key}")
             self._redis_client.delete(f"{REDIS_KEY_PREFIX}all")
 
-            # 發布失效通知（讓其他進程也失效）
             self._redis_client.publish(
                 CONFIG_CHANNEL,
                 json.dumps(
-                    {"action": "invalidate", "key": key, "timestamp": time.time()}
+                    {
+                        "action": "invalidate",
+                        "key": key,
+                        "version": version,
+                        "timestamp": time.time(),
+                    }
                 ),
             )
             logger.debug("Cache invalidation notification published")
@@ -258,6 +449,20 @@ class ConfigCacheManager:
             if "connecting to" in str(e) or "Name or service not known" in str(e):
                 self._redis_client = None
 
+    def stats(self) -> Dict[str, Any]:
+        """快照版本、監聽狀態與載入計數"""
+        snap = self._snapshot
+        return {
+            **self._stats,
+            "version": snap.version if snap else None,
+            "keys": len(snap.values) if snap else 0,
+            "age_seconds": round(time.monotonic() - snap.loaded_at, 1)
+            if snap
+            else None,
+            "watching": self._watching,
+            "redis": self._redis_client is not None,
+        }
+
 
 # 全局快取管理器實例
 _cache_manager: Optional[ConfigCacheManager] = None
@@ -341,6 +546,21 @@ def _is_cache_valid() -> bool:
     return _get_cache_manager()._is_memory_cache_valid()
 
 
+def start_config_watcher():
+    """啟動配置版本監聽（API startup 呼叫）"""
+    _get_cache_manager().start_watcher()
+
+
+def stop_config_watcher():
+    """停止配置版本監聽"""
+    _get_cache_manager().stop_watcher()
+
+
+def get_config_cache_stats() -> Dict[str, Any]:
+    """配置快照狀態（管理後台用）"""
+    return _get_cache_manager().stats()
+
+
 # ============================================================================
 # 配置讀取
 # ============================================================================
@@ -357,8 +577,7 @@ def get_config(key: str, default: Any = None) -> Any:
     Returns:
         配置值
     """
-    all_configs = _get_cache_manager().get_all()
-    return all_configs.get(key, default)
+    return _get_cache_manager().snapshot().values.get(key, default)
 
 
 def get_all_configs(
@@ -403,7 +622,7 @@ def get_prices() -> Dict[str, float]:
     Returns:
         價格配置字典，格式與原 PI_PAYMENT_PRICES 相容
     """
-    all_configs = _get_cache_manager().get_all()
+    all_configs = _get_cache_manager().snapshot().values
 
     return {
         "create_post": all_configs.get("price_create_post", 1.0),
@@ -419,7 +638,7 @@ def get_limits() -> Dict[str, Optional[int]]:
     Returns:
         限制配置字典，格式與原 FORUM_LIMITS 相容
     """
-    all_configs = _get_cache_manager().get_all()
+    all_configs = _get_cache_manager().snapshot().values
 
     return {
         "daily_post_free": all_configs.get("limit_daily_post_free", 3),
@@ -495,10 +714,11 @@ def set_config(
         # 寫入審計日誌
         _write_audit_log(c, key, old_value, serialized_value, changed_by)
 
+        version = _notify_new_version(c)
         conn.commit()
 
-        # 清除快取
-        _get_cache_manager().invalidate()
+        # 本進程立即換上新快照，並公告給其他進程
+        _get_cache_manager().announce(version, key)
 
         logger.info("Config updated: %s = %s (by %s)", key, value, changed_by)
         return True
@@ -526,6 +746,20 @@ def _write_audit_log(cursor, key: str, old_value: Any, new_value: Any, changed_b
         logger.warning("Audit log write failed (table may not exist): %s", e)
 
 
+def _notify_new_version(cursor) -> str:
+    """
+    在寫入事務內計算新版本並發出 NOTIFY（提交後才送達）
+
+    Returns:
+        新版本號
+    """
+    cursor.execute(_VERSION_SQL)
+    row = cursor.fetchone()
+    version = row[0] if row and row[0] else _EMPTY_VERSION
+    cursor.execute("SELECT pg_notify(%s, %s)", (PG_NOTIFY_CHANNEL, version))
+    return version
+
+
 def update_price(key: str, value: float, changed_by: str = "admin") -> bool:
     """
     更新價格配置的便捷方法
@@ -644,8 +878,9 @@ def bulk_update_configs(configs: Dict[str, Any], changed_by: str = "admin") -> b
             # 寫入審計日誌
             _write_audit_log(c, key, old_value, serialized_value, changed_by)
 
+        version = _notify_new_version(c)
         conn.commit()
-        _get_cache_manager().invalidate()
+        _get_cache_manager().announce(version)
         return True
     except Exception as e:
         logger.error("Batch update failed: %s", e)
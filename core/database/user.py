@@ -8,6 +8,8 @@ import uuid
 from datetime import datetime
 from typing import Dict, Optional
 
+from core.principal_cache import invalidate_principal_sync
+
 from .connection import get_connection
 
 logger = logging.getLogger(__name__)
@@ -295,7 +297,10 @@ def expire_user_membership(user_id: str) -> bool:
             (user_id,),
         )
         conn.commit()
-        return c.rowcount > 0
+        expired = c.rowcount > 0
+        if expired:
+            invalidate_principal_sync(user_id)
+        return expired
     except Exception as e:
         logger.error(f"Expire membership error: {e}")
         conn.rollback()
@@ -382,6 +387,8 @@ def upgrade_to_pro(
             )
 
         conn.commit()
+        # 會員等級已變更，讓各 worker 的身分快取失效
+        invalidate_principal_sync(user_id)
         return c.rowcount > 0
     except ValueError:
         # 重複交易或用戶不存在等業務錯誤，不回滾（因為沒有執行任何寫入）
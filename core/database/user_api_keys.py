@@ -5,6 +5,7 @@
 
 from typing import Dict, Optional
 
+from core.llm_client_pool import invalidate_user_keys_sync
 from utils.encryption import decrypt_api_key, encrypt_api_key, mask_api_key
 
 from .connection import get_connection
@@ -98,6 +99,8 @@ def save_user_api_key(
         )
 
         conn.commit()
+        # 讓各 worker 的金鑰快取與 LLM client 池失效
+        invalidate_user_keys_sync(user_id)
         return {"success": True}
     except Exception as e:
         conn.rollback()
@@ -258,6 +261,7 @@ def delete_user_api_key(user_id: str, provider: str) -> Dict:
         )
 
         conn.commit()
+        invalidate_user_keys_sync(user_id)
         return {"success": True}
     except Exception as e:
         conn.rollback()
@@ -277,6 +281,7 @@ def delete_all_user_api_keys(user_id: str) -> Dict:
     try:
         c.execute("DELETE FROM user_api_keys WHERE user_id = %s", (user_id,))
         conn.commit()
+        invalidate_user_keys_sync(user_id)
         return {"success": True}
     except Exception as e:
         conn.rollback()
@@ -0,0 +1,358 @@
+"""
+Pooled per-user LLM clients and cached API key resolution.
+
+Every analysis request used to fetch and Fernet-decrypt the user's key
+(one query per provider tried) and build a fresh chat model via
+``init_chat_model``.  This module keeps both per worker:
+
+Key cache:
+  ``get_user_api_keys`` loads all of a user's keys in one query and keeps
+  the decrypted map in a short-TTL in-process cache (never in Redis).
+  ``invalidate_user_keys`` / ``invalidate_user_keys_sync`` are called when a
+  key is saved or deleted; they evict the entry here and publish the user_id
+  on ``llm_keys:invalidate`` so every worker running
+  ``start_invalidation_listener`` (see api/lifespan.py) does the same.
+  Without Redis the TTL bounds how long another worker keeps a stale key.
+  The sync variant runs in worker threads, so the cache and its generation
+  counter are only touched under ``_keys_lock``.
+
+Client pool:
+  ``llm_client_pool.get`` returns a chat model keyed by (user, provider,
+  model, key fingerprint), bounded by LLM_CLIENT_POOL_MAX (least recently
+  used first out) with idle entries dropped after LLM_CLIENT_IDLE_TTL.  A
+  rotated key has a new fingerprint, so it never reuses the old client.
+  Chat models are not mutated per request (``bind_tools`` etc. return new
+  runnables), so one instance can serve concurrent requests.
+
+Transports:
+  OpenAI-compatible models (openai, openrouter) already share langchain's
+  cached keep-alive httpx client per base URL; the API key travels per
+  request.  Gemini models own their transport, so pooling the model is what
+  keeps its connections alive between a user's requests.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from cachetools import TTLCache
+
+from core.redis_url import resolve_redis_url
+
+logger = logging.getLogger(__name__)
+
+# ── Configuration ────────────────────────────────────────────────────────────
+KEY_CACHE_MAX = int(os.getenv("LLM_KEY_CACHE_MAX", "10000"))
+KEY_CACHE_TTL = float(os.getenv("LLM_KEY_CACHE_TTL", "30"))
+CLIENT_POOL_MAX = int(os.getenv("LLM_CLIENT_POOL_MAX", "512"))
+CLIENT_IDLE_TTL = float(os.getenv("LLM_CLIENT_IDLE_TTL", "600"))
+INVALIDATE_CHANNEL = "llm_keys:invalidate"
+
+# ── Key cache state ──────────────────────────────────────────────────────────
+_keys: TTLCache = TTLCache(maxsize=KEY_CACHE_MAX, ttl=KEY_CACHE_TTL)
+_redis: Optional[Any] = None  # redis.asyncio.Redis or None
+_redis_checked: bool = False
+_sync_redis: Optional[Any] = None  # redis.Redis, for sync invalidation
+_sync_redis_checked: bool = False
+_listener_task: Optional[asyncio.Task] = None
+# Bumped on every invalidation; loads that straddle a bump are not cached
+_generation: int = 0
+_keys_lock = threading.Lock()
+_key_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+async def _get_redis() -> Optional[Any]:
+    """Return a live async Redis client, or None if unavailable."""
+    global _redis, _redis_checked
+    if _redis_checked:
+        return _redis
+
+    _redis_checked = True
+    redis_url, source = resolve_redis_url()
+    if not redis_url:
+        return None
+
+    try:
+        import redis.asyncio as aioredis  # noqa: PLC0415
+
+        client = aioredis.from_url(
+            redis_url, socket_connect_timeout=2, socket_timeout=2
+        )
+        await client.ping()
+        _redis = client
+        logger.info("[LLMKeys] Redis async connected via %s", source)
+    except Exception as exc:
+        logger.warning("[LLMKeys] Redis unavailable — TTL-only mode: %s", exc)
+        _redis = None
+
+    return _redis
+
+
+def _get_sync_redis() -> Optional[Any]:
+    """Sync Redis client for invalidations issued from worker threads."""
+    global _sync_redis, _sync_redis_checked
+    if _sync_redis_checked:
+        return _sync_redis
+
+    _sync_redis_checked = True
+    redis_url, _ = resolve_redis_url()
+    if not redis_url:
+        return None
+
+    try:
+        import redis as redis_lib  # noqa: PLC0415
+
+        client = redis_lib.from_url(
+            redis_url, socket_connect_timeout=2, socket_timeout=2
+        )
+        client.ping()
+        _sync_redis = client
+    except Exception as exc:
+        logger.warning("[LLMKeys] Sync Redis unavailable: %s", exc)
+        _sync_redis = None
+
+    return _sync_redis
+
+
+def _evict_local(user_ids: Iterable[str]) -> None:
+    global _generation
+    user_ids = list(user_ids)
+    with _keys_lock:
+        _generation += 1
+        for user_id in user_ids:
+            _keys.pop(user_id, None)
+            _key_stats["invalidations"] += 1
+    for user_id in user_ids:
+        llm_client_pool.drop_user(user_id)
+
+
+async def get_user_api_keys(user_id: str) -> Dict[str, str]:
+    """Decrypted {provider: api_key} for user_id, cached for KEY_CACHE_TTL."""
+    with _keys_lock:
+        hit = _keys.get(user_id)
+        generation = _generation
+    if hit is not None:
+        _key_stats["hits"] += 1
+        return hit
+
+    from core.orm.user_api_keys_repo import user_api_keys_repo  # noqa: PLC0415
+
+    _key_stats["misses"] += 1
+    keys = await user_api_keys_repo.get_user_api_keys(user_id)
+    with _keys_lock:
+        if generation == _generation:
+            _keys[user_id] = keys
+    return keys
+
+
+async def invalidate_user_keys(*user_ids: str) -> None:
+    """Drop cached keys and pooled clients here and on every other worker."""
+    if not user_ids:
+        return
+    _evict_local(user_ids)
+
+    r = await _get_redis()
+    if r:
+        try:
+            for user_id in user_ids:
+                await r.publish(INVALIDATE_CHANNEL, user_id)
+        except Exception as exc:
+            logger.warning("[LLMKeys] Redis invalidation failed: %s", exc)
+
+
+def invalidate_user_keys_sync(*user_ids: str) -> None:
+    """Sync variant for the psycopg2 layer (runs in threads)."""
+    if not user_ids:
+        return
+    _evict_local(user_ids)
+
+    r = _get_sync_redis()
+    if r:
+        try:
+            pipe = r.pipeline(transaction=False)
+            for user_id in user_ids:
+                pipe.publish(INVALIDATE_CHANNEL, user_id)
+            pipe.execute()
+        except Exception as exc:
+            logger.warning("[LLMKeys] Redis invalidation failed: %s", exc)
+
+
+async def _listen() -> None:
+    r = await _get_redis()
+    if not r:
+        return
+    pubsub = r.pubsub()
+    await pubsub.subscribe(INVALIDATE_CHANNEL)
+    try:
+        while True:
+            try:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("[LLMKeys] Pub/Sub error: %s", exc)
+                await asyncio.sleep(1.0)
+                continue
+            if message and message.get("type") == "message":
+                data = message["data"]
+                user_id = data.decode() if isinstance(data, bytes) else str(data)
+                _evict_local([user_id])
+    finally:
+        try:
+            await pubsub.aclose()
+        except Exception:
+            pass
+
+
+async def start_invalidation_listener() -> None:
+    """Subscribe this worker to cross-process key invalidations."""
+    global _listener_task
+    if _listener_task is not None and not _listener_task.done():
+        return
+    if await _get_redis() is None:
+        return
+    _listener_task = asyncio.create_task(_listen(), name="llm-key-invalidation")
+
+
+async def stop_invalidation_listener() -> None:
+    global _listener_task
+    if _listener_task is None:
+        return
+    _listener_task.cancel()
+    try:
+        await _listener_task
+    except asyncio.CancelledError:
+        pass
+    _listener_task = None
+
+
+# ── Client pool ──────────────────────────────────────────────────────────────
+
+
+def key_fingerprint(api_key: str) -> str:
+    """Short digest identifying a key without keeping it in the pool key."""
+    return hashlib.sha256(api_key.strip().encode()).hexdigest()[:16]
+
+
+_PoolKey = Tuple[str, str, str, str]
+
+
+class LLMClientPool:
+    """Bounded LRU of chat models with idle eviction."""
+
+    def __init__(
+        self, max_size: int = CLIENT_POOL_MAX, idle_ttl: float = CLIENT_IDLE_TTL
+    ):
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self._clients: "OrderedDict[_PoolKey, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evicted_lru": 0, "evicted_idle": 0}
+
+    def get(
+        self,
+        user_id: str,
+        provider: str,
+        api_key: str,
+        model: Optional[str] = None,
+    ) -> Any:
+        """Return the pooled chat model for this user/provider/model/key."""
+        from utils.user_client_factory import create_user_llm_client  # noqa: PLC0415
+
+        key = (user_id, provider, model or "", key_fingerprint(api_key or ""))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None:
+                entry[1] = now
+                self._clients.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry[0]
+            self._stats["misses"] += 1
+
+        client = create_user_llm_client(provider, api_key, model)
+
+        with self._lock:
+            # Another request may have built the same client meanwhile
+            entry = self._clients.setdefault(key, [client, now])
+            self._clients.move_to_end(key)
+            self._evict(now)
+            return entry[0]
+
+    def _evict(self, now: float) -> None:
+        while self._clients:
+            oldest_key, (_, last_used) = next(iter(self._clients.items()))
+            if now - last_used > self.idle_ttl:
+                self._stats["evicted_idle"] += 1
+            elif len(self._clients) > self.max_size:
+                self._stats["evicted_lru"] += 1
+            else:
+                break
+            del self._clients[oldest_key]
+
+    def drop_user(self, user_id: str) -> int:
+        """Forget every client built from user_id's keys."""
+        with self._lock:
+            stale = [k for k in self._clients if k[0] == user_id]
+            for k in stale:
+                del self._clients[k]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clients.clear()
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._evict(time.monotonic())
+            return {
+                **self._stats,
+                "size": len(self._clients),
+                "max_size": self.max_size,
+                "idle_ttl": self.idle_ttl,
+            }
+
+
+llm_client_pool = LLMClientPool()
+
+
+def get_user_llm_client(
+    user_id: str, provider: str, api_key: str, model: Optional[str] = None
+) -> Any:
+    """Pooled replacement for ``create_user_llm_client`` on request paths."""
+    return llm_client_pool.get(user_id, provider, api_key, model)
+
+
+def clear() -> None:
+    """Drop cached keys and pooled clients (tests / admin tooling)."""
+    _evict_local([])
+    with _keys_lock:
+        _keys.clear()
+    llm_client_pool.clear()
+
+
+def stats() -> dict:
+    """Key cache and client pool counters for this worker."""
+    with _keys_lock:
+        size = len(_keys)
+    return {
+        "keys": {
+            **_key_stats,
+            "size": size,
+            "max": KEY_CACHE_MAX,
+            "ttl": KEY_CACHE_TTL,
+        },
+        "clients": llm_client_pool.stats(),
+    }
@@ -0,0 +1,342 @@
+"""
+Background worker for long-term memory jobs.
+
+Fact extraction and memory consolidation used to run as LLM calls inside the
+request's event loop, where they competed with user-facing calls and were
+repeated whenever a turn was retried.  Turns are now enqueued in the
+``memory_jobs`` table (see ``core/database/memory_jobs.py``) and processed
+here:
+
+  - each claim takes all ready jobs of one user, so several pending turns
+    become one extraction prompt, and repeated messages collapse to the
+    latest turn
+  - ``dedupe_key`` makes a retried turn a no-op at enqueue time
+  - LLM calls are spaced per provider (``MEMORY_WORKER_PROVIDER_RPM``)
+  - ``FOR UPDATE SKIP LOCKED`` lets several workers and processes share the
+    queue; jobs stuck in ``running`` after a crash are put back by the
+    maintenance loop
+
+``MEMORY_QUEUE_ENABLED=false`` restores the old inline behaviour.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# ── Configuration ────────────────────────────────────────────────────────────
+QUEUE_ENABLED = os.getenv("MEMORY_QUEUE_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+WORKER_CONCURRENCY = int(os.getenv("MEMORY_WORKER_CONCURRENCY", "2"))
+WORKER_BATCH = int(os.getenv("MEMORY_WORKER_BATCH", "20"))
+POLL_INTERVAL = float(os.getenv("MEMORY_WORKER_POLL_INTERVAL", "2"))
+PROVIDER_RPM = float(os.getenv("MEMORY_WORKER_PROVIDER_RPM", "30"))
+MAX_ATTEMPTS = int(os.getenv("MEMORY_WORKER_MAX_ATTEMPTS", "3"))
+RETRY_DELAY = float(os.getenv("MEMORY_WORKER_RETRY_DELAY", "30"))
+STALE_SECONDS = float(os.getenv("MEMORY_WORKER_STALE_SECONDS", "600"))
+RETENTION_SECONDS = float(os.getenv("MEMORY_WORKER_RETENTION_SECONDS", "86400"))
+MAINTENANCE_INTERVAL = 60.0
+
+KIND_EXTRACT = "extract"
+KIND_CONSOLIDATE = "consolidate"
+
+
+class ProviderRateLimiter:
+    """Spaces calls to each provider at least ``60 / rpm`` seconds apart.
+
+    Slots are reserved before sleeping, so concurrent workers queue behind
+    each other instead of all waking at the same instant.
+    """
+
+    def __init__(self, rpm: float = PROVIDER_RPM):
+        self.interval = 60.0 / rpm if rpm > 0 else 0.0
+        self._next_slot: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, provider: str) -> float:
+        """Wait for the provider's next slot; returns the seconds waited."""
+        if self.interval <= 0:
+            return 0.0
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(provider, 0.0))
+            self._next_slot[provider] = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def enqueue_turn(
+    user_id: str,
+    session_id: str,
+    user_message: str,
+    assistant_message: str,
+    turn_index: int,
+    tools_used: Optional[List[str]] = None,
+    provider: Optional[str] = None,
+    model: Optional[str] = None,
+) -> bool:
+    """Queue fact extraction for one turn; returns False for a duplicate."""
+    from core.database.memory_jobs import enqueue_memory_job
+
+    return enqueue_memory_job(
+        user_id,
+        session_id,
+        KIND_EXTRACT,
+        {
+            "user_message": user_message,
+            "assistant_message": assistant_message,
+            "turn_index": turn_index,
+            "tools_used": tools_used or [],
+        },
+        dedupe_key=f"{KIND_EXTRACT}:"
+        + _digest(user_id, session_id, user_message, assistant_message),
+        provider=provider,
+        model=model,
+    )
+
+
+def enqueue_consolidation(
+    user_id: str,
+    session_id: str,
+    messages: List[Dict[str, Any]],
+    start_index: int,
+    end_index: int,
+    archive_all: bool = False,
+    provider: Optional[str] = None,
+    model: Optional[str] = None,
+) -> bool:
+    """Queue consolidation of ``messages``; ``end_index`` becomes the new
+    consolidated index once the job succeeds."""
+    from core.database.memory_jobs import enqueue_memory_job
+
+    # Until the index advances, every turn past the threshold re-enqueues
+    # the same window; keying on its start keeps that to a single job
+    scope = f"archive:{end_index}" if archive_all else str(start_index)
+    return enqueue_memory_job(
+        user_id,
+        session_id,
+        KIND_CONSOLIDATE,
+        {"messages": messages, "start_index": start_index, "end_index": end_index},
+        dedupe_key=f"{KIND_CONSOLIDATE}:{user_id}:{session_id}:{scope}",
+        provider=provider,
+        model=model,
+    )
+
+
+async def _build_llm(user_id: str, provider: Optional[str], model: Optional[str]):
+    from api.user_llm import resolve_user_llm_credentials
+    from core.llm_client_pool import get_user_llm_client
+
+    credentials = await resolve_user_llm_credentials({"user_id": user_id}, provider)
+    if not credentials:
+        return None, provider
+    llm = get_user_llm_client(
+        user_id=user_id,
+        provider=credentials["provider"],
+        api_key=credentials["api_key"],
+        model=model,
+    )
+    return llm, credentials["provider"]
+
+
+def _coalesce_turns(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Ordered turns with repeated user messages reduced to the latest one."""
+    latest: Dict[str, Dict[str, Any]] = {}
+    for job in jobs:
+        turn = job["payload"]
+        key = turn["user_message"].strip()
+        latest.pop(key, None)
+        latest[key] = turn
+    return list(latest.values())
+
+
+class MemoryWorker:
+    """Claims and runs memory jobs; one instance per process."""
+
+    def __init__(
+        self,
+        batch_size: int = WORKER_BATCH,
+        rate_limiter: Optional[ProviderRateLimiter] = None,
+    ):
+        self.batch_size = batch_size
+        self.rate_limiter = rate_limiter or ProviderRateLimiter()
+        self.stats = {
+            "jobs_processed": 0,
+            "jobs_failed": 0,
+            "turns_coalesced": 0,
+            "llm_calls": 0,
+            "rate_limited_seconds": 0.0,
+        }
+
+    async def run_once(self) -> int:
+        """Claim one user's ready jobs and run them; returns the job count."""
+        from api.utils import run_sync
+        from core.database.memory_jobs import claim_memory_jobs
+
+        jobs = await run_sync(claim_memory_jobs, self.batch_size)
+        if not jobs:
+            return 0
+
+        head = jobs[-1]
+        try:
+            llm, provider = await _build_llm(
+                head["user_id"], head["provider"], head["model"]
+            )
+        except Exception as exc:
+            await self._fail(jobs, f"llm client: {exc}")
+            return len(jobs)
+        if llm is None:
+            # No key to retry with: fail outright instead of burning attempts
+            await self._fail(jobs, "no LLM credentials", give_up=True)
+            return len(jobs)
+
+        extract = [j for j in jobs if j["kind"] == KIND_EXTRACT]
+        consolidate = [j for j in jobs if j["kind"] == KIND_CONSOLIDATE]
+        if extract:
+            await self._run_extract(extract, llm, provider)
+        by_session: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for job in consolidate:
+            by_session[job["session_id"]].append(job)
+        for session_jobs in by_session.values():
+            await self._run_consolidate(session_jobs, llm, provider)
+        return len(jobs)
+
+    async def _call(self, provider: Optional[str], coro_fn, *args) -> bool:
+        self.stats["rate_limited_seconds"] += await self.rate_limiter.acquire(
+            provider or "default"
+        )
+        self.stats["llm_calls"] += 1
+        return await coro_fn(*args)
+
+    async def _run_extract(self, jobs, llm, provider) -> None:
+        from core.database.memory import get_memory_store
+
+        head = jobs[-1]
+        turns = _coalesce_turns(jobs)
+        store = get_memory_store(head["user_id"], head["session_id"])
+        try:
+            ok = await self._call(provider, store.extract_facts_from_turns, turns, llm)
+        except Exception as exc:
+            ok, error = False, str(exc)
+        else:
+            error = "extraction failed"
+        if ok:
+            self.stats["turns_coalesced"] += len(jobs)
+            await self._complete(jobs)
+        else:
+            await self._fail(jobs, error)
+
+    async def _run_consolidate(self, jobs, llm, provider) -> None:
+        from api.utils import run_sync
+        from core.database.memory import get_memory_store
+
+        head = jobs[-1]
+        messages: List[Dict[str, Any]] = []
+        for job in jobs:
+            messages.extend(job["payload"]["messages"])
+        end_index = max(job["payload"]["end_index"] for job in jobs)
+        store = get_memory_store(head["user_id"], head["session_id"])
+        try:
+            ok = await self._call(provider, store.consolidate, messages, llm)
+            if ok:
+                await run_sync(store.advance_consolidated_index, end_index)
+        except Exception as exc:
+            ok, error = False, str(exc)
+        else:
+            error = "consolidation failed"
+        if ok:
+            await self._complete(jobs)
+        else:
+            await self._fail(jobs, error)
+
+    async def _complete(self, jobs) -> None:
+        from api.utils import run_sync
+        from core.database.memory_jobs import complete_memory_jobs
+
+        await run_sync(complete_memory_jobs, [j["id"] for j in jobs])
+        self.stats["jobs_processed"] += len(jobs)
+
+    async def _fail(self, jobs, error: str, give_up: bool = False) -> None:
+        from api.utils import run_sync
+        from core.database.memory_jobs import fail_memory_jobs
+
+        logger.warning(
+            "[MemoryWorker] %d job(s) for %s failed: %s",
+            len(jobs),
+            jobs[0]["user_id"],
+            error,
+        )
+        await run_sync(
+            fail_memory_jobs,
+            [j["id"] for j in jobs],
+            error,
+            RETRY_DELAY,
+            1 if give_up else MAX_ATTEMPTS,
+        )
+        self.stats["jobs_failed"] += len(jobs)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth / lag from the database plus this process's counters."""
+        from core.database.memory_jobs import get_memory_job_stats
+
+        return {**get_memory_job_stats(), "worker": dict(self.stats)}
+
+
+memory_worker = MemoryWorker()
+
+
+async def _worker_loop(worker: MemoryWorker) -> None:
+    while True:
+        try:
+            processed = await worker.run_once()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("[MemoryWorker] Poll failed: %s", exc)
+            processed = 0
+        if not processed:
+            await asyncio.sleep(POLL_INTERVAL)
+
+
+async def _maintenance_loop() -> None:
+    from api.utils import run_sync
+    from core.database.memory_jobs import (
+        purge_finished_memory_jobs,
+        requeue_stale_memory_jobs,
+    )
+
+    while True:
+        try:
+            requeued = await run_sync(requeue_stale_memory_jobs, STALE_SECONDS)
+            if requeued:
+                logger.info("[MemoryWorker] Requeued %d stale job(s)", requeued)
+            await run_sync(purge_finished_memory_jobs, RETENTION_SECONDS)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("[MemoryWorker] Maintenance failed: %s", exc)
+        await asyncio.sleep(MAINTENANCE_INTERVAL)
+
+
+async def memory_worker_task(concurrency: int = WORKER_CONCURRENCY) -> None:
+    """Run ``concurrency`` claim loops plus queue maintenance until cancelled."""
+    await asyncio.gather(
+        _maintenance_loop(),
+        *(_worker_loop(memory_worker) for _ in range(max(1, concurrency))),
+    )
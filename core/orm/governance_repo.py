@@ -35,11 +35,14 @@ from sqlalchemy import (
     case,
     func,
     select,
+    text,
     update,
 )
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.principal_cache import invalidate_principal
+
 from .models import (
     AuditReputation,
     ContentReport,
@@ -51,7 +54,7 @@ from .models import (
     UserViolation,
     UserViolationPoints,
 )
-from .session import using_session
+from .session import run_after_commit, using_session
 
 logger = logging.getLogger(__name__)
 
@@ -95,6 +98,12 @@ MIN_VOTES_REQUIRED: int = 3
 CONSENSUS_APPROVE_THRESHOLD: float = 0.70
 CONSENSUS_REJECT_THRESHOLD: float = 0.30
 
+# (min reputation_score, min total_reviews, weight), highest tier first
+VOTE_WEIGHT_TIERS: List[tuple] = [
+    (80, 20, 2.0),
+    (50, 10, 1.5),
+]
+
 DEFAULT_DAILY_REPORT_LIMIT: int = 5
 PRO_DAILY_REPORT_LIMIT: int = 10
 
@@ -115,6 +124,104 @@ def _utcnow() -> datetime:
     return datetime.now(timezone.utc)
 
 
+def _consensus_from_counts(approve_count: int, reject_count: int) -> dict:
+    """Evaluate voting consensus from a report's vote counters."""
+    total_votes = approve_count + reject_count
+    if total_votes < MIN_VOTES_REQUIRED:
+        return {
+            "has_consensus": False,
+            "total_votes": total_votes,
+            "minimum_votes": MIN_VOTES_REQUIRED,
+            "reason": "insufficient_votes",
+        }
+
+    approve_rate = approve_count / total_votes if total_votes > 0 else 0
+    counts = {
+        "total_votes": total_votes,
+        "approve_count": approve_count,
+        "reject_count": reject_count,
+        "approve_rate": approve_rate,
+    }
+    if approve_rate >= CONSENSUS_APPROVE_THRESHOLD:
+        return {"has_consensus": True, "decision": "approved", **counts}
+    elif approve_rate <= CONSENSUS_REJECT_THRESHOLD:
+        return {"has_consensus": True, "decision": "rejected", **counts}
+    else:
+        return {"has_consensus": False, **counts, "reason": "no_clear_consensus"}
+
+
+_WEIGHT_CASE = "\n".join(
+    f"            WHEN r.reputation_score >= {score} "
+    f"AND r.total_reviews >= {reviews} THEN {weight}"
+    for score, reviews, weight in VOTE_WEIGHT_TIERS
+)
+
+# One round-trip per vote.  The report row is locked first so concurrent
+# voters on the same report serialise on it; the unique constraint
+# uq_report_review_vote makes a duplicate vote a no-op, in which case the
+# counter UPDATE and activity log (both driven by ``ins``) do nothing.
+# Data-modifying CTEs share the statement snapshot, so ``existing`` only
+# sees a vote committed before this statement, i.e. the duplicate case.
+_VOTE_SQL = f"""
+WITH report AS (
+    SELECT review_status, reporter_user_id
+    FROM content_reports
+    WHERE id = :report_id
+    FOR UPDATE
+),
+weight AS (
+    SELECT CASE
+{_WEIGHT_CASE}
+            ELSE 1.0
+        END AS vote_weight
+    FROM (SELECT 1) AS one
+    LEFT JOIN audit_reputation r ON r.user_id = :reviewer
+),
+ins AS (
+    INSERT INTO report_review_votes
+        (report_id, reviewer_user_id, vote_type, vote_weight)
+    SELECT CAST(:report_id AS INTEGER), CAST(:reviewer AS TEXT),
+           CAST(:vote_type AS TEXT), weight.vote_weight
+    FROM report, weight
+    WHERE report.review_status = 'pending'
+      AND report.reporter_user_id <> :reviewer
+    ON CONFLICT (report_id, reviewer_user_id) DO NOTHING
+    RETURNING id, vote_weight
+),
+counted AS (
+    UPDATE content_reports
+    SET approve_count = approve_count + :approve_inc,
+        reject_count = reject_count + :reject_inc,
+        updated_at = NOW()
+    FROM ins
+    WHERE content_reports.id = :report_id
+    RETURNING approve_count, reject_count
+),
+logged AS (
+    INSERT INTO user_activity_logs
+        (user_id, activity_type, resource_type, resource_id, metadata)
+    SELECT CAST(:reviewer AS TEXT), 'review_vote', 'report',
+           CAST(:report_id AS INTEGER),
+           jsonb_build_object(
+               'vote_type', CAST(:vote_type AS TEXT),
+               'vote_weight', ins.vote_weight
+           )
+    FROM ins
+)
+SELECT report.review_status, report.reporter_user_id,
+       ins.id, ins.vote_weight,
+       counted.approve_count, counted.reject_count,
+       existing.vote_type
+FROM (SELECT 1) AS one
+LEFT JOIN report ON TRUE
+LEFT JOIN ins ON TRUE
+LEFT JOIN counted ON TRUE
+LEFT JOIN report_review_votes existing
+    ON existing.report_id = :report_id
+   AND existing.reviewer_user_id = :reviewer
+"""
+
+
 # ---------------------------------------------------------------------------
 # GovernanceRepository
 # ---------------------------------------------------------------------------
@@ -614,7 +721,12 @@ class GovernanceRepository:
         """
         Cast a vote on a report (premium members only).
 
-        Returns ``{"success": True, "vote_id": <int>}`` on success.
+        The duplicate check, weighted vote insert, counter update, activity
+        log and the post-vote counts all come from a single statement
+        (``_VOTE_SQL``).
+
+        Returns ``{"success": True, "vote_id": <int>, "vote_weight": <float>,
+        "consensus": <check_report_consensus-style dict>}`` on success.
         """
         if vote_type not in ("approve", "reject"):
             return {"success": False, "error": "invalid_vote_type"}
@@ -622,86 +734,48 @@ class GovernanceRepository:
         if not is_premium:
             return {"success": False, "error": "premium_membership_required"}
 
+        approve = 1 if vote_type == "approve" else 0
+        stmt = text(_VOTE_SQL).bindparams(
+            report_id=report_id,
+            reviewer=reviewer_user_id,
+            vote_type=vote_type,
+            approve_inc=approve,
+            reject_inc=1 - approve,
+        )
+
         async with using_session(session) as s:
-            # Check report status
-            report_stmt = select(
-                ContentReport.review_status,
-                ContentReport.reporter_user_id,
-            ).where(ContentReport.id == report_id)
-            result = await s.execute(report_stmt)
+            result = await s.execute(stmt)
             row = result.fetchone()
-            if not row:
-                return {"success": False, "error": "report_not_found"}
-
-            review_status, reporter_user_id = row
 
+        (
+            review_status,
+            reporter_user_id,
+            vote_id,
+            vote_weight,
+            approve_count,
+            reject_count,
+            existing_vote,
+        ) = row
+
+        if review_status is None:
+            return {"success": False, "error": "report_not_found"}
+        if vote_id is None:
             if review_status != "pending":
                 return {"success": False, "error": "report_not_pending"}
-
             if reviewer_user_id == reporter_user_id:
                 return {"success": False, "error": "cannot_vote_on_own_report"}
+            return {
+                "success": False,
+                "error": "already_voted",
+                "existing_vote": existing_vote,
+            }
 
-            # Check for existing vote
-            dup_stmt = select(ReportReviewVote.id, ReportReviewVote.vote_type).where(
-                and_(
-                    ReportReviewVote.report_id == report_id,
-                    ReportReviewVote.reviewer_user_id == reviewer_user_id,
-                )
-            )
-            dup_result = await s.execute(dup_stmt)
-            existing = dup_result.fetchone()
-            if existing:
-                return {
-                    "success": False,
-                    "error": "already_voted",
-                    "existing_vote": existing[1],
-                }
-
-            # Get reputation for vote weight
-            reputation = await self._get_audit_reputation_tx(s, reviewer_user_id)
-            vote_weight = self.calculate_vote_weight(reputation)
-
-            # Record the vote
-            vote = ReportReviewVote(
-                report_id=report_id,
-                reviewer_user_id=reviewer_user_id,
-                vote_type=vote_type,
-                vote_weight=vote_weight,
-            )
-            s.add(vote)
-            await s.flush()
-
-            # Update report vote counts
-            if vote_type == "approve":
-                await s.execute(
-                    update(ContentReport)
-                    .where(ContentReport.id == report_id)
-                    .values(
-                        approve_count=ContentReport.approve_count + 1,
-                        updated_at=_utcnow(),
-                    )
-                )
-            else:
-                await s.execute(
-                    update(ContentReport)
-                    .where(ContentReport.id == report_id)
-                    .values(
-                        reject_count=ContentReport.reject_count + 1,
-                        updated_at=_utcnow(),
-                    )
-                )
-
-            # Log activity
-            log_entry = UserActivityLog(
-                user_id=reviewer_user_id,
-                activity_type="review_vote",
-                resource_type="report",
-                resource_id=report_id,
-                metadata_={"vote_type": vote_type, "vote_weight": vote_weight},
-            )
-            s.add(log_entry)
-
-            return {"success": True, "vote_id": vote.id}
+        return {
+            "success": True,
+            "vote_id": vote_id,
+            "vote_weight": vote_weight,
+            "consensus": _consensus_from_counts(approve_count, reject_count),
+        }
 
     async def get_report_votes(
         self,
@@ -749,9 +823,6 @@ class GovernanceRepository:
         Returns a dict with ``has_consensus``, ``decision``, vote counts, etc.
         """
         stmt = select(
-            (ContentReport.approve_count + ContentReport.reject_count).label(
-                "total_votes"
-            ),
             ContentReport.approve_count,
             ContentReport.reject_count,
         ).where(ContentReport.id == report_id)
@@ -761,50 +832,7 @@ class GovernanceRepository:
             row = result.fetchone()
             if not row:
                 return {"has_consensus": False, "error": "report_not_found"}
-
-            total_votes, approve_count, reject_count = (
-                row[0],
-                row[1],
-                row[2],
-            )
-
-            if total_votes < MIN_VOTES_REQUIRED:
-                return {
-                    "has_consensus": False,
-                    "total_votes": total_votes,
-                    "minimum_votes": MIN_VOTES_REQUIRED,
-                    "reason": "insufficient_votes",
-                }
-
-            approve_rate = approve_count / total_votes if total_votes > 0 else 0
-
-            if approve_rate >= CONSENSUS_APPROVE_THRESHOLD:
-                return {
-                    "has_consensus": True,
-                    "decision": "approved",
-                    "total_votes": total_votes,
-                    "approve_count": approve_count,
-                    "reject_count": reject_count,
-                    "approve_rate": approve_rate,
-                }
-            elif approve_rate <= CONSENSUS_REJECT_THRESHOLD:
-                return {
-                    "has_consensus": True,
-                    "decision": "rejected",
-                    "total_votes": total_votes,
-                    "approve_count": approve_count,
-                    "reject_count": reject_count,
-                    "approve_rate": approve_rate,
-                }
-            else:
-                return {
-                    "has_consensus": False,
-                    "total_votes": total_votes,
-                    "approve_count": approve_count,
-                    "reject_count": reject_count,
-                    "approve_rate": approve_rate,
-                    "reason": "no_clear_consensus",
-                }
+            return _consensus_from_counts(row[0] or 0, row[1] or 0)
 
     async def finalize_report(
         self,
@@ -842,6 +870,7 @@ class GovernanceRepository:
 
             points = 0
             action_taken = None
+            suspended = False
 
             if decision == "approved" and violation_level:
                 points = VIOLATION_LEVELS.get(violation_level, 0)
@@ -865,7 +894,9 @@ class GovernanceRepository:
 
                 # Apply suspension if needed
                 if action_taken and action_taken != "warning":
-                    await self._apply_suspension_tx(s, author_id, action_taken)
+                    suspended = await self._apply_suspension_tx(
+                        s, author_id, action_taken
+                    )
 
             # Update report status
             await s.execute(
@@ -893,13 +924,16 @@ class GovernanceRepository:
                     s, vote["reviewer_user_id"], was_correct
                 )
 
-            return {
-                "success": True,
-                "decision": decision,
-                "violation_level": violation_level,
-                "points_assigned": points,
-                "action_taken": action_taken,
-            }
+        if suspended:
+            await self._invalidate_when_committed(author_id, session)
+
+        return {
+            "success": True,
+            "decision": decision,
+            "violation_level": violation_level,
+            "points_assigned": points,
+            "action_taken": action_taken,
+        }
 
     # ===================================================================
     # Violations  (core.database.governance.violations)
@@ -1071,7 +1105,25 @@ class GovernanceRepository:
             return False
 
         async with using_session(session) as s:
-            return await self._apply_suspension_tx(s, user_id, action)
+            applied = await self._apply_suspension_tx(s, user_id, action)
+
+        if applied:
+            await self._invalidate_when_committed(user_id, session)
+        return applied
+
+    @staticmethod
+    async def _invalidate_when_committed(
+        user_id: str, session: AsyncSession | None
+    ) -> None:
+        """Evict the cached principal once the suspension is visible.
+
+        Our own session is committed by now; a caller's session commits
+        later, and evicting before that lets a reload re-cache the old row.
+        """
+        if session is None:
+            await invalidate_principal(user_id)
+        else:
+            run_after_commit(session, lambda: invalidate_principal(user_id))
 
     async def check_user_suspension(
         self,
@@ -1130,12 +1182,10 @@ class GovernanceRepository:
         score = reputation.get("reputation_score", 0)
         total_reviews = reputation.get("total_reviews", 0)
 
-        weight = 1.0
-        if score >= 80 and total_reviews >= 20:
-            weight = 2.0
-        elif score >= 50 and total_reviews >= 10:
-            weight = 1.5
-        return weight
+        for min_score, min_reviews, weight in VOTE_WEIGHT_TIERS:
+            if score >= min_score and total_reviews >= min_reviews:
+                return weight
+        return 1.0
 
     async def update_audit_reputation(
         self,
@@ -793,6 +793,9 @@ class UserViolationPoints(Base):
     last_violation_at: Mapped[Optional[datetime]] = mapped_column(
         TIMESTAMP(timezone=True)
     )
+    last_decrement_at: Mapped[Optional[datetime]] = mapped_column(
+        TIMESTAMP(timezone=True)
+    )
     suspension_count: Mapped[int] = mapped_column(Integer, default=0)
     updated_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), server_default=func.now(), onupdate=func.now()
@@ -813,9 +816,12 @@ class AuditReputation(Base):
 
 
 class UserActivityLog(Base):
+    # Range-partitioned by month on created_at in PostgreSQL (primary key
+    # (id, created_at)); partitions are managed in core/database/schema.py and
+    # core/database/governance/activity.py.  ids stay unique via the sequence.
     __tablename__ = "user_activity_logs"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     user_id: Mapped[str] = mapped_column(Text, nullable=False)
     activity_type: Mapped[str] = mapped_column(Text, nullable=False)
     resource_type: Mapped[Optional[str]] = mapped_column(Text)
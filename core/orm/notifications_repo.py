@@ -14,10 +14,11 @@ Usage::
 from __future__ import annotations
 
 import logging
+import os
 import uuid
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
-from sqlalchemy import delete, func, select, update
+from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .models import Notification
@@ -25,6 +26,11 @@ from .session import using_session
 
 logger = logging.getLogger(__name__)
 
+# Rows per multi-row INSERT in create_notifications_bulk
+BULK_CHUNK_SIZE = int(os.getenv("NOTIFICATION_BULK_CHUNK_SIZE", "1000"))
+
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
 
 def _row_to_dict(row: Any) -> Dict[str, Any]:
     return {
@@ -68,6 +74,70 @@ class NotificationsRepository:
             await s.refresh(notification)
             return _row_to_dict(notification)
 
+    async def create_notifications_bulk(
+        self,
+        items: List[Dict[str, Any]],
+        chunk_size: int | None = None,
+        on_progress: ProgressCallback | None = None,
+        session: AsyncSession | None = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Insert many notifications with one multi-row INSERT ... RETURNING per chunk.
+
+        Args:
+            items: Dicts with ``user_id``, ``type``, ``title``, ``body`` and
+                optional ``data``.
+            chunk_size: Rows per statement (defaults to BULK_CHUNK_SIZE).
+            on_progress: Optional ``await on_progress(done, total)`` after each chunk.
+            session: Optional existing session.
+
+        Returns:
+            List of created notification dicts, in input order. RETURNING
+            makes no ordering promise, so rows are matched back by id.
+        """
+        if not items:
+            return []
+
+        size = max(1, chunk_size or BULK_CHUNK_SIZE)
+        total = len(items)
+        created: List[Dict[str, Any]] = []
+
+        async with using_session(session) as s:
+            for start in range(0, total, size):
+                rows = [
+                    {
+                        "id": f"notif_{uuid.uuid4().hex[:12]}",
+                        "user_id": item["user_id"],
+                        "type": item["type"],
+                        "title": item.get("title"),
+                        "body": item.get("body"),
+                        "data": item.get("data"),
+                        "is_read": False,
+                    }
+                    for item in items[start : start + size]
+                ]
+                stmt = (
+                    insert(Notification)
+                    .values(rows)
+                    .returning(
+                        Notification.id,
+                        Notification.user_id,
+                        Notification.type,
+                        Notification.title,
+                        Notification.body,
+                        Notification.data,
+                        Notification.is_read,
+                        Notification.created_at,
+                    )
+                )
+                result = await s.execute(stmt)
+                by_id = {r.id: r for r in result.fetchall()}
+                created.extend(_row_to_dict(by_id[row["id"]]) for row in rows)
+                if on_progress is not None:
+                    await on_progress(min(start + size, total), total)
+
+        return created
+
     async def get_notifications(
         self,
         user_id: str,
@@ -278,54 +348,30 @@ class NotificationsRepository:
         user_ids: List[str],
         title: str,
         body: str,
+        on_progress: ProgressCallback | None = None,
         session: AsyncSession | None = None,
     ) -> List[Dict[str, Any]]:
         """
-        Create announcement notifications for multiple users in one session.
+        Create announcement notifications for multiple users via bulk insert.
 
         Args:
             user_ids: List of target user IDs.
             title: Announcement title.
             body: Announcement body.
+            on_progress: Optional progress callback, see create_notifications_bulk.
             session: Optional existing session.
 
         Returns:
             List of created notification dicts.
         """
-        if not user_ids:
-            return []
-
-        notifications = []
-        for uid in user_ids:
-            notif_id = f"notif_{uuid.uuid4().hex[:12]}"
-            notifications.append(
-                Notification(
-                    id=notif_id,
-                    user_id=uid,
-                    type="announcement",
-                    title=title,
-                    body=body,
-                    is_read=False,
-                )
-            )
-
-        async with using_session(session) as s:
-            s.add_all(notifications)
-            await s.flush()
-            results = []
-            for n in notifications:
-                results.append(
-                    {
-                        "id": n.id,
-                        "user_id": n.user_id,
-                        "type": n.type,
-                        "title": n.title,
-                        "body": n.body,
-                        "data": n.data,
-                        "is_read": False,
-                    }
-                )
-            return results
+        return await self.create_notifications_bulk(
+            [
+                {"user_id": uid, "type": "announcement", "title": title, "body": body}
+                for uid in user_ids
+            ],
+            on_progress=on_progress,
+            session=session,
+        )
 
 
 notifications_repo = NotificationsRepository()
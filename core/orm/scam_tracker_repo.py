@@ -19,10 +19,12 @@ import logging
 from datetime import UTC, datetime
 from typing import Dict, List, Optional
 
-from sqlalchemy import delete, func, select, update
+from sqlalchemy import case, delete, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import joinedload
 
+from core.scam_wallet_index import STATUS_RANK, parse_wallet_pattern, wallet_index
+
 from .models import ScamReport, ScamReportComment, ScamReportVote
 from .session import using_session
 
@@ -151,7 +153,9 @@ class ScamTrackerRepository:
             await s.flush()
             await s.refresh(report)
             logger.info("Scam report created: %s by %s", report.id, reporter_user_id)
-            return {"success": True, "report_id": report.id}
+
+        wallet_index.add(scam_wallet_upper, report.id, verification_status)
+        return {"success": True, "report_id": report.id}
 
     async def get_reports(
         self,
@@ -266,33 +270,80 @@ class ScamTrackerRepository:
         """
         Search for a wallet address that has been reported.
 
+        Addresses the wallet index has never seen are answered without a
+        query; otherwise the report and its vote tallies come back in one.
+
         Args:
             wallet_address: Wallet address to search (will be uppercased).
 
         Returns:
             Report detail dict or None.
         """
-        stmt = select(ScamReport.id).where(
-            ScamReport.scam_wallet_address == wallet_address.upper()
-        )
+        if not wallet_index.might_contain(wallet_address):
+            return None
 
+        stmt = (
+            select(ScamReport)
+            .options(joinedload(ScamReport.reporter))
+            .where(ScamReport.scam_wallet_address == wallet_address.strip().upper())
+        )
         async with using_session(session) as s:
             result = await s.execute(stmt)
-            row = result.scalar_one_or_none()
-            if row is None:
-                return None
-            # Use get_report_by_id without incrementing view count
-            report_stmt = (
-                select(ScamReport)
-                .options(joinedload(ScamReport.reporter))
-                .where(ScamReport.id == row)
-            )
-            report_result = await s.execute(report_stmt)
-            report = report_result.scalars().unique().first()
+            report = result.scalars().unique().first()
             if report is None:
                 return None
             return _report_detail_to_dict(report)
 
+    async def search_wallets(
+        self,
+        pattern: str,
+        limit: int = 10,
+        session: AsyncSession | None = None,
+    ) -> List[Dict]:
+        """
+        Search reported wallets by a truncated address such as ``GABC…WXYZ``.
+
+        Args:
+            pattern: Prefix, ``…suffix`` or ``prefix…suffix``.
+            limit: Maximum number of matches.
+
+        Returns:
+            List of report dicts, verified reports first; empty if the
+            pattern is too short to search.
+        """
+        parsed = parse_wallet_pattern(pattern)
+        if parsed is None:
+            return []
+        prefix, suffix = parsed
+
+        stmt = (
+            select(ScamReport)
+            .options(joinedload(ScamReport.reporter))
+            .where(ScamReport.scam_wallet_address.like(f"{prefix}%{suffix}"))
+        )
+        if wallet_index.ready:
+            # Over-fetch: candidates are confirmed against the full pattern.
+            # None means both sides are too wide to narrow; LIKE alone then.
+            ids = wallet_index.candidates(prefix, suffix, limit=limit * 4)
+            if ids is not None:
+                if not ids:
+                    return []
+                stmt = stmt.where(ScamReport.id.in_(ids))
+
+        status_rank = case(
+            STATUS_RANK,
+            value=ScamReport.verification_status,
+            else_=STATUS_RANK["pending"],
+        )
+        stmt = stmt.order_by(
+            status_rank, ScamReport.approve_count.desc(), ScamReport.id.desc()
+        ).limit(limit)
+
+        async with using_session(session) as s:
+            result = await s.execute(stmt)
+            rows = result.scalars().unique().all()
+            return [_report_row_to_dict(r) for r in rows]
+
     # ── Voting ────────────────────────────────────────────────────────────────
 
     async def vote_report(
@@ -501,14 +552,18 @@ class ScamTrackerRepository:
             else:
                 new_status = "pending"
 
-            await s.execute(
+            result = await s.execute(
                 update(ScamReport)
                 .where(ScamReport.id == report_id)
                 .values(
                     verification_status=new_status,
                     updated_at=datetime.now(UTC),
                 )
+                .returning(ScamReport.scam_wallet_address)
             )
+            address = result.scalar_one_or_none()
+            if address:
+                wallet_index.update_status(address, report_id, new_status)
 
     # ── Comments ──────────────────────────────────────────────────────────────
 
@@ -20,16 +20,18 @@ import logging
 import os
 import threading
 from contextlib import asynccontextmanager
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Awaitable, Callable, Set
 from urllib.parse import quote
 
 from fastapi import HTTPException, status
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
 
+from core.database.query_stats import TimedAsyncAdaptedQueuePool, instrument_engine
 from core.db_ready import wait_for_db_ready
 
 logger = logging.getLogger(__name__)
@@ -37,6 +39,7 @@ logger = logging.getLogger(__name__)
 _async_engine = None
 _async_session_factory = None
 _engine_lock = threading.Lock()
+_after_commit_tasks: Set[asyncio.Task] = set()
 _factory_lock = threading.Lock()
 
 
@@ -104,14 +107,30 @@ def get_engine():
                         "POSTGRESQL_* variables set"
                     )
                 pool_size = int(os.getenv("DB_MAX_POOL_SIZE", "10"))
+                # asyncpg prepares every statement and keeps an LRU of them per
+                # connection; size it to cover the hot fingerprints reported by
+                # core.database.query_stats so they stay in it.
+                statement_cache_size = int(
+                    os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "256")
+                )
                 _async_engine = create_async_engine(
                     url,
+                    poolclass=TimedAsyncAdaptedQueuePool,
                     pool_size=pool_size,
                     max_overflow=pool_size,
                     pool_pre_ping=True,
                     pool_recycle=300,
+                    connect_args={
+                        "prepared_statement_cache_size": statement_cache_size
+                    },
+                )
+                instrument_engine(_async_engine.sync_engine)
+                logger.info(
+                    "Async SQLAlchemy engine created (pool_size=%d, "
+                    "prepared_statement_cache_size=%d)",
+                    pool_size,
+                    statement_cache_size,
                 )
-                logger.info("Async SQLAlchemy engine created (pool_size=%d)", pool_size)
     return _async_engine
 
 
@@ -190,3 +209,34 @@ async def using_session(
             except Exception:
                 await s.rollback()
                 raise
+
+
+def run_after_commit(
+    session: AsyncSession, callback: Callable[[], Awaitable[None]]
+) -> None:
+    """
+    Schedule *callback* once *session*'s current transaction commits.
+
+    For side effects that must not be seen before the data is (cache
+    invalidation): on a caller-managed session the commit happens after
+    the repo method returns.  Nothing runs if the transaction rolls back.
+    """
+    loop = asyncio.get_running_loop()
+
+    def _done(task: asyncio.Task) -> None:
+        _after_commit_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("After-commit callback failed: %s", task.exception())
+
+    def _committed(_sync_session) -> None:
+        task = loop.create_task(callback())
+        _after_commit_tasks.add(task)
+        task.add_done_callback(_done)
+
+    def _rolled_back(_sync_session) -> None:
+        if event.contains(sync_session, "after_commit", _committed):
+            event.remove(sync_session, "after_commit", _committed)
+
+    sync_session = session.sync_session
+    event.listen(sync_session, "after_commit", _committed, once=True)
+    event.listen(sync_session, "after_rollback", _rolled_back, once=True)
@@ -21,6 +21,7 @@ from sqlalchemy import delete, select, update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.llm_client_pool import invalidate_user_keys
 from utils.encryption import decrypt_api_key, encrypt_api_key, mask_api_key
 
 from .models import UserApiKey
@@ -80,6 +81,7 @@ class UserApiKeysRepository:
         async with using_session(session) as s:
             await s.execute(stmt)
 
+        await invalidate_user_keys(user_id)
         return {"success": True}
 
     async def get_user_api_key(
@@ -102,6 +104,25 @@ class UserApiKeysRepository:
             decrypted = decrypt_api_key(row)
             return decrypted or None
 
+    async def get_user_api_keys(
+        self,
+        user_id: str,
+        session: AsyncSession | None = None,
+    ) -> Dict[str, str]:
+        """Get all decrypted API keys for a user in one query: {provider: key}."""
+        stmt = select(UserApiKey.provider, UserApiKey.encrypted_key).where(
+            UserApiKey.user_id == user_id
+        )
+
+        async with using_session(session) as s:
+            result = await s.execute(stmt)
+            keys: Dict[str, str] = {}
+            for provider, encrypted_key in result.fetchall():
+                decrypted = decrypt_api_key(encrypted_key)
+                if decrypted:
+                    keys[provider] = decrypted
+            return keys
+
     async def get_user_api_key_masked(
         self,
         user_id: str,
@@ -198,6 +219,7 @@ class UserApiKeysRepository:
         async with using_session(session) as s:
             await s.execute(stmt)
 
+        await invalidate_user_keys(user_id)
         return {"success": True}
 
     async def delete_all_user_api_keys(
@@ -211,6 +233,7 @@ class UserApiKeysRepository:
         async with using_session(session) as s:
             await s.execute(stmt)
 
+        await invalidate_user_keys(user_id)
         return {"success": True}
 
     async def save_user_model_selection(
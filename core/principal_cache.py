@@ -0,0 +1,318 @@
+"""
+Authenticated-principal cache for ``api.deps.get_current_user``.
+
+Architecture (hot → cold):
+  L1  TTLCache (in-process, ~5 s, bounded)  — absorbs polling endpoints
+  L2  Redis async (shared across workers, ~60 s)
+  L3  user_repo.get_by_id (PostgreSQL)
+
+Invalidation:
+  ``invalidate_principal`` / ``invalidate_principal_sync`` drop the L1 entry,
+  delete the Redis key and publish the user_id on ``principal:invalidate``.
+  Every worker runs ``start_invalidation_listener`` (see api/lifespan.py) and
+  evicts its own L1 entry on receipt, so a role/membership/suspension change
+  is visible everywhere without waiting for the TTL.  Without Redis the L1
+  TTL bounds staleness.
+
+A load that started before an invalidation is not written back, so a slow
+DB read cannot re-cache a principal that was invalidated mid-flight.  Locally
+the generation counter guards L1; across workers every invalidation bumps a
+per-user version key in Redis, and the L2 write-back is a compare-and-set
+(Lua) against the version read before the load.
+
+``invalidate_principal_sync`` runs in worker threads, so L1 and the
+generation counter are only touched under ``_lock`` (never held across an
+await).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+import orjson
+from cachetools import TTLCache
+
+from core.redis_url import resolve_redis_url
+
+logger = logging.getLogger(__name__)
+
+# ── Configuration ────────────────────────────────────────────────────────────
+L1_MAX = int(os.getenv("PRINCIPAL_CACHE_MAX", "10000"))
+L1_TTL = float(os.getenv("PRINCIPAL_CACHE_TTL", "5"))
+REDIS_TTL = int(os.getenv("PRINCIPAL_CACHE_REDIS_TTL", "60"))
+INVALIDATE_CHANNEL = "principal:invalidate"
+# Version keys only need to outlive any load in flight
+VERSION_TTL = 86400
+
+_KEY_PREFIX = "principal:"
+_VERSION_PREFIX = "principal:ver:"
+
+# SETEX KEYS[1] only if KEYS[2] (the version) still equals ARGV[1]
+_CAS_SETEX = """
+if (redis.call('GET', KEYS[2]) or '0') == ARGV[1] then
+    redis.call('SETEX', KEYS[1], ARGV[2], ARGV[3])
+    return 1
+end
+return 0
+"""
+
+# ── Module-level state ───────────────────────────────────────────────────────
+_l1: TTLCache = TTLCache(maxsize=L1_MAX, ttl=L1_TTL)
+_redis: Optional[Any] = None  # redis.asyncio.Redis or None
+_redis_checked: bool = False
+_sync_redis: Optional[Any] = None  # redis.Redis, for sync invalidation
+_sync_redis_checked: bool = False
+_listener_task: Optional[asyncio.Task] = None
+# Bumped on every invalidation; loads that straddle a bump are not cached
+_generation: int = 0
+_lock = threading.Lock()
+_stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "invalidations": 0}
+
+
+def _full(user_id: str) -> str:
+    return _KEY_PREFIX + user_id
+
+
+def _version_key(user_id: str) -> str:
+    return _VERSION_PREFIX + user_id
+
+
+async def _get_redis() -> Optional[Any]:
+    """Return a live async Redis client, or None if unavailable."""
+    global _redis, _redis_checked
+    if _redis_checked:
+        return _redis
+
+    _redis_checked = True
+    redis_url, source = resolve_redis_url()
+    if not redis_url:
+        logger.info("[PrincipalCache] No Redis configured — L1-only mode")
+        return None
+
+    try:
+        import redis.asyncio as aioredis  # noqa: PLC0415
+
+        client = aioredis.from_url(
+            redis_url,
+            decode_responses=False,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+        )
+        await client.ping()
+        _redis = client
+        logger.info("[PrincipalCache] Redis async connected via %s", source)
+    except Exception as exc:
+        logger.warning("[PrincipalCache] Redis unavailable — L1-only mode: %s", exc)
+        _redis = None
+
+    return _redis
+
+
+def _get_sync_redis() -> Optional[Any]:
+    """Sync Redis client for invalidations issued from worker threads."""
+    global _sync_redis, _sync_redis_checked
+    if _sync_redis_checked:
+        return _sync_redis
+
+    _sync_redis_checked = True
+    redis_url, _ = resolve_redis_url()
+    if not redis_url:
+        return None
+
+    try:
+        import redis as redis_lib  # noqa: PLC0415
+
+        client = redis_lib.from_url(
+            redis_url, socket_connect_timeout=2, socket_timeout=2
+        )
+        client.ping()
+        _sync_redis = client
+    except Exception as exc:
+        logger.warning("[PrincipalCache] Sync Redis unavailable: %s", exc)
+        _sync_redis = None
+
+    return _sync_redis
+
+
+def _evict_local(user_ids: Iterable[str]) -> None:
+    global _generation
+    with _lock:
+        _generation += 1
+        for user_id in user_ids:
+            _l1.pop(_full(user_id), None)
+            _stats["invalidations"] += 1
+
+
+def _store_local(key: str, value: dict, generation: int) -> bool:
+    """Cache value in L1 unless an invalidation happened since generation."""
+    with _lock:
+        if generation != _generation:
+            return False
+        _l1[key] = value
+        return True
+
+
+# ── Public API ───────────────────────────────────────────────────────────────
+
+
+async def get_principal(
+    user_id: str, loader: Callable[[str], Awaitable[Optional[dict]]]
+) -> Optional[dict]:
+    """Return the cached principal for user_id, loading it on a miss.
+
+    Missing users (loader returns None) are not cached.
+    """
+    key = _full(user_id)
+
+    with _lock:
+        hit = _l1.get(key)
+        generation = _generation
+    if hit is not None:
+        _stats["l1_hits"] += 1
+        return dict(hit)
+
+    r = await _get_redis()
+    version = None
+    if r:
+        try:
+            raw, version = await r.mget(key, _version_key(user_id))
+            version = version or b"0"
+            if raw is not None:
+                value = orjson.loads(raw)
+                _store_local(key, value, generation)
+                _stats["l2_hits"] += 1
+                return dict(value)
+        except Exception as exc:
+            logger.debug("[PrincipalCache] Redis get(%s) error: %s", user_id, exc)
+
+    _stats["misses"] += 1
+    value = await loader(user_id)
+    if value is None or not _store_local(key, dict(value), generation):
+        return value
+
+    if r and version is not None:
+        try:
+            # Skipped if another worker invalidated this user during the load
+            await r.eval(
+                _CAS_SETEX,
+                2,
+                key,
+                _version_key(user_id),
+                version,
+                REDIS_TTL,
+                orjson.dumps(value),
+            )
+        except Exception as exc:
+            logger.debug("[PrincipalCache] Redis set(%s) error: %s", user_id, exc)
+    return value
+
+
+async def invalidate_principal(*user_ids: str) -> None:
+    """Evict principals here and on every other worker."""
+    if not user_ids:
+        return
+    _evict_local(user_ids)
+
+    r = await _get_redis()
+    if r:
+        try:
+            pipe = r.pipeline(transaction=False)
+            for user_id in user_ids:
+                pipe.incr(_version_key(user_id))
+                pipe.expire(_version_key(user_id), VERSION_TTL)
+            pipe.delete(*[_full(u) for u in user_ids])
+            for user_id in user_ids:
+                pipe.publish(INVALIDATE_CHANNEL, user_id)
+            await pipe.execute()
+        except Exception as exc:
+            logger.warning("[PrincipalCache] Redis invalidation failed: %s", exc)
+
+
+def invalidate_principal_sync(*user_ids: str) -> None:
+    """Sync variant for the psycopg2 layer and scripts (runs in threads)."""
+    if not user_ids:
+        return
+    _evict_local(user_ids)
+
+    r = _get_sync_redis()
+    if r:
+        try:
+            pipe = r.pipeline(transaction=False)
+            for user_id in user_ids:
+                pipe.incr(_version_key(user_id))
+                pipe.expire(_version_key(user_id), VERSION_TTL)
+            pipe.delete(*[_full(u) for u in user_ids])
+            for user_id in user_ids:
+                pipe.publish(INVALIDATE_CHANNEL, user_id)
+            pipe.execute()
+        except Exception as exc:
+            logger.warning("[PrincipalCache] Redis invalidation failed: %s", exc)
+
+
+async def _listen() -> None:
+    r = await _get_redis()
+    if not r:
+        return
+    pubsub = r.pubsub()
+    await pubsub.subscribe(INVALIDATE_CHANNEL)
+    try:
+        while True:
+            try:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("[PrincipalCache] Pub/Sub error: %s", exc)
+                await asyncio.sleep(1.0)
+                continue
+            if message and message.get("type") == "message":
+                data = message["data"]
+                user_id = data.decode() if isinstance(data, bytes) else str(data)
+                _evict_local([user_id])
+    finally:
+        try:
+            await pubsub.aclose()
+        except Exception:
+            pass
+
+
+async def start_invalidation_listener() -> None:
+    """Subscribe this worker to cross-process invalidations."""
+    global _listener_task
+    if _listener_task is not None and not _listener_task.done():
+        return
+    if await _get_redis() is None:
+        return
+    _listener_task = asyncio.create_task(_listen(), name="principal-invalidation")
+
+
+async def stop_invalidation_listener() -> None:
+    global _listener_task
+    if _listener_task is None:
+        return
+    _listener_task.cancel()
+    try:
+        await _listener_task
+    except asyncio.CancelledError:
+        pass
+    _listener_task = None
+
+
+def clear() -> None:
+    """Drop all local entries (tests / admin tooling)."""
+    _evict_local([])
+    with _lock:
+        _l1.clear()
+
+
+def stats() -> dict:
+    """Hit/miss counters and current L1 size for this worker."""
+    with _lock:
+        size = len(_l1)
+    return {**_stats, "l1_size": size, "l1_max": L1_MAX, "l1_ttl": L1_TTL}
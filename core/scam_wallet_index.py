@@ -0,0 +1,343 @@
+"""
+In-process lookup index over reported scam wallet addresses.
+
+Layers:
+  Bloom filter           — every reported address; a negative answer means
+                           "never reported" without touching Postgres
+  Sorted prefix keys     — the first KEY_WIDTH characters of each address,
+                           packed into one bytearray and binary-searched
+  Sorted suffix keys     — the last KEY_WIDTH characters, reversed, likewise
+
+Users paste truncated forms such as ``GABC…WXYZ``; ``parse_wallet_pattern``
+splits those into a prefix and a suffix, and ``candidates`` intersects the
+matching key ranges.  The index only proposes report ids — the repository
+confirms them in the one query that also returns the report summary and vote
+tallies — so stale or false-positive entries cost a query, never a wrong
+answer.  Each entry carries the report's verification status so fuzzy
+matches are ranked (verified first, then newest) before they are cut to the
+requested count and that query is issued.
+
+``create_report`` and status changes update the index directly;
+``wallet_index_sync_task`` loads it on startup and then pulls rows by
+``updated_at`` every WALLET_INDEX_SYNC_INTERVAL seconds.  Negatives are
+therefore only as fresh as the last sync: a report filed on another worker
+is missed here (the exact lookup answers "never reported", fuzzy searches
+leave it out) for up to that interval.  Until the first load completes every
+lookup goes to the database.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import heapq
+import logging
+import os
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from core.token_revocation import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+# ── Configuration ────────────────────────────────────────────────────────────
+# 2^24 bits (2 MB) keeps the false-positive rate near 0.05% at 1M addresses
+BLOOM_BITS = int(os.getenv("WALLET_INDEX_BLOOM_BITS", str(1 << 24)))
+BLOOM_HASHES = int(os.getenv("WALLET_INDEX_BLOOM_HASHES", "7"))
+SYNC_INTERVAL = float(os.getenv("WALLET_INDEX_SYNC_INTERVAL", "10"))
+# Characters kept per side; truncated forms rarely show more than 8
+KEY_WIDTH = 16
+# Widest key range intersected with the other side of a fuzzy query
+MAX_SCAN = 5000
+# Shortest prefix + suffix (excluding the leading "G") accepted for search
+MIN_PATTERN_CHARS = 4
+FULL_ADDRESS_LENGTH = 56
+_SYNC_OVERLAP = timedelta(seconds=5)
+
+STATUS_RANK = {
+    "verified": 0,
+    "investigating": 1,
+    "pending": 2,
+    "disputed": 3,
+    "rejected": 4,
+}
+_DEFAULT_RANK = STATUS_RANK["pending"]
+_ELLIPSIS = re.compile(r"…|\.{2,}|\*{2,}")
+_NON_ADDRESS = re.compile(r"[^A-Z0-9]")
+
+
+def normalize_address(address: str) -> str:
+    return address.strip().upper()
+
+
+def _digest(address: str) -> str:
+    return hashlib.sha256(address.encode("utf-8")).hexdigest()
+
+
+def _key(text: str) -> bytes:
+    return _key_prefix(text).ljust(KEY_WIDTH, b"\x00")
+
+
+def _key_prefix(text: str) -> bytes:
+    return text.encode("ascii", "ignore")[:KEY_WIDTH]
+
+
+def parse_wallet_pattern(text: str) -> Optional[Tuple[str, str]]:
+    """Split ``GABC…WXYZ`` / ``GABC...`` / ``…WXYZ`` into (prefix, suffix).
+
+    A string without an ellipsis is a prefix.  Returns None when the pattern
+    is too short to narrow the search.
+    """
+    text = normalize_address(text)
+    parts = _ELLIPSIS.split(text, maxsplit=1)
+    prefix = _NON_ADDRESS.sub("", parts[0])
+    suffix = _NON_ADDRESS.sub("", parts[1]) if len(parts) > 1 else ""
+    significant = len(prefix.removeprefix("G")) + len(suffix)
+    if significant < MIN_PATTERN_CHARS:
+        return None
+    return prefix, suffix
+
+
+class _SortedKeys:
+    """Sorted fixed-width keys with parallel report ids and status ranks.
+
+    Keys live in one bytearray (KEY_WIDTH bytes each) rather than a list of
+    str, which keeps a million entries at ~25 MB instead of several hundred.
+    """
+
+    def __init__(self):
+        self._keys = bytearray()
+        self._ids = array("q")
+        self._ranks = bytearray()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, i: int) -> bytes:
+        start = i * KEY_WIDTH
+        return bytes(self._keys[start : start + KEY_WIDTH])
+
+    @classmethod
+    def build(cls, entries: Iterable[Tuple[bytes, int, int]]) -> "_SortedKeys":
+        keys = cls()
+        for key, report_id, rank in sorted(entries):
+            keys._keys += key
+            keys._ids.append(report_id)
+            keys._ranks.append(rank)
+        return keys
+
+    def _find(self, key: bytes, report_id: int) -> Optional[int]:
+        i = bisect_left(self, key)
+        while i < len(self) and self[i] == key:
+            if self._ids[i] == report_id:
+                return i
+            i += 1
+        return None
+
+    def upsert(self, key: bytes, report_id: int, rank: int) -> bool:
+        """Insert or re-rank an entry; returns True if it was new."""
+        found = self._find(key, report_id)
+        if found is not None:
+            self._ranks[found] = rank
+            return False
+        i = bisect_right(self, key)
+        start = i * KEY_WIDTH
+        self._keys[start:start] = key
+        self._ids.insert(i, report_id)
+        self._ranks.insert(i, rank)
+        return True
+
+    def span(self, prefix: bytes) -> Tuple[int, int]:
+        """Index range of keys starting with *prefix*."""
+        prefix = prefix[:KEY_WIDTH]
+        pad = KEY_WIDTH - len(prefix)
+        return (
+            bisect_left(self, prefix + b"\x00" * pad),
+            bisect_right(self, prefix + b"\xff" * pad),
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._keys) + self._ids.itemsize * len(self._ids) + len(self._ranks)
+
+    def entries(self, lo: int, hi: int) -> Iterable[Tuple[int, int]]:
+        """(report_id, rank) pairs for positions lo..hi."""
+        return zip(self._ids[lo:hi], self._ranks[lo:hi])
+
+
+class WalletIndex:
+    """Reported-wallet lookup index; see module docstring."""
+
+    def __init__(self, bloom_bits: int = BLOOM_BITS, bloom_hashes: int = BLOOM_HASHES):
+        self._bloom_bits = bloom_bits
+        self._bloom_hashes = bloom_hashes
+        self._bloom = BloomFilter(bloom_bits, bloom_hashes)
+        self._prefixes = _SortedKeys()
+        self._suffixes = _SortedKeys()
+        self._lock = threading.Lock()
+        self._watermark: Optional[datetime] = None
+        self._stats = {
+            "lookups": 0,
+            "bloom_negative": 0,
+            "fuzzy_lookups": 0,
+            "fuzzy_wide": 0,
+        }
+
+    @property
+    def ready(self) -> bool:
+        """True once a full load has completed, i.e. negatives can be trusted."""
+        return self._watermark is not None
+
+    def __len__(self) -> int:
+        return len(self._prefixes)
+
+    # ── Updates ─────────────────────────────────────────────────────────────
+
+    def add(self, address: str, report_id: int, status: str = "pending") -> None:
+        """Record (or re-rank) a reported address."""
+        address = normalize_address(address)
+        rank = STATUS_RANK.get(status, _DEFAULT_RANK)
+        with self._lock:
+            if self._prefixes.upsert(_key(address), report_id, rank):
+                self._bloom.add(_digest(address))
+            self._suffixes.upsert(_key(address[::-1]), report_id, rank)
+
+    update_status = add
+
+    def load(self, rows: Iterable[Tuple[int, str, str]]) -> int:
+        """Replace the index with (report_id, address, status) rows."""
+        bloom = BloomFilter(self._bloom_bits, self._bloom_hashes)
+        entries = []
+        for report_id, address, status in rows:
+            address = normalize_address(address)
+            bloom.add(_digest(address))
+            entries.append((address, report_id, STATUS_RANK.get(status, _DEFAULT_RANK)))
+        # One side at a time keeps the peak to a single list of sort keys
+        prefixes = _SortedKeys.build((_key(a), rid, rank) for a, rid, rank in entries)
+        suffixes = _SortedKeys.build(
+            (_key(a[::-1]), rid, rank) for a, rid, rank in entries
+        )
+        with self._lock:
+            self._bloom = bloom
+            self._prefixes, self._suffixes = prefixes, suffixes
+        return len(entries)
+
+    # ── Lookups ─────────────────────────────────────────────────────────────
+
+    def might_contain(self, address: str) -> bool:
+        """False if *address* was not reported as of the last sync.
+
+        Reports made on this worker are added immediately; those made on
+        other workers only after the next sync.
+        """
+        self._stats["lookups"] += 1
+        if not self.ready:
+            return True
+        if _digest(normalize_address(address)) in self._bloom:
+            return True
+        self._stats["bloom_negative"] += 1
+        return False
+
+    def candidates(
+        self, prefix: str, suffix: str = "", limit: int = 20
+    ) -> Optional[List[int]]:
+        """Report ids whose address may match ``prefix…suffix``, best first.
+
+        The whole matching range is ranked before it is cut to *limit*.  Keys
+        hold KEY_WIDTH characters per side, so callers must confirm the full
+        pattern against the stored address.  When one side's range is wider
+        than MAX_SCAN it is not intersected and the other side is returned
+        uncut; when both are, None is returned and the caller should fall
+        back to a plain LIKE query.
+        """
+        self._stats["fuzzy_lookups"] += 1
+        with self._lock:
+            spans = []
+            if prefix:
+                spans.append((self._prefixes, self._prefixes.span(_key_prefix(prefix))))
+            if suffix:
+                spans.append(
+                    (self._suffixes, self._suffixes.span(_key_prefix(suffix[::-1])))
+                )
+            if not spans:
+                return []
+            spans.sort(key=lambda s: s[1][1] - s[1][0])
+            (keys, (lo, hi)), others = spans[0], spans[1:]
+            if hi - lo > MAX_SCAN:
+                self._stats["fuzzy_wide"] += 1
+                if others:
+                    return None
+            matches = keys.entries(lo, hi)
+            for other, (olo, ohi) in others:
+                if ohi - olo > MAX_SCAN:
+                    # Unconfirmed by the other side: a cut here could drop
+                    # every real match, so hand the whole range over
+                    self._stats["fuzzy_wide"] += 1
+                    limit = max(limit, hi - lo)
+                    continue
+                allowed = {rid for rid, _ in other.entries(olo, ohi)}
+                matches = [(rid, rank) for rid, rank in matches if rid in allowed]
+            ranked = heapq.nsmallest(
+                limit, matches, key=lambda item: (item[1], -item[0])
+            )
+        return [report_id for report_id, _ in ranked]
+
+    # ── Sync ────────────────────────────────────────────────────────────────
+
+    async def sync(self) -> int:
+        """Full load on first call, then rows changed since the last sync."""
+        from sqlalchemy import func, select
+
+        from core.orm.models import ScamReport
+        from core.orm.session import using_session
+
+        stmt = select(
+            ScamReport.id,
+            ScamReport.scam_wallet_address,
+            ScamReport.verification_status,
+        )
+        if self._watermark is not None:
+            stmt = stmt.where(ScamReport.updated_at > self._watermark - _SYNC_OVERLAP)
+        async with using_session() as s:
+            # updated_at is stamped by the DB, so the watermark must be too
+            started = (await s.execute(select(func.now()))).scalar_one()
+            rows = (await s.execute(stmt)).all()
+
+        if self._watermark is None:
+            # Sorting a large table would stall the event loop
+            count = await asyncio.to_thread(self.load, rows)
+            logger.info("[WalletIndex] Loaded %d reported wallets", count)
+        else:
+            for report_id, address, status in rows:
+                self.add(address, report_id, status)
+            count = len(rows)
+        self._watermark = started
+        return count
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "entries": len(self._prefixes),
+            "index_bytes": self._prefixes.nbytes + self._suffixes.nbytes,
+            "bloom_bits": self._bloom.bits,
+            "synced_at": self._watermark.isoformat() if self._watermark else None,
+        }
+
+
+wallet_index = WalletIndex()
+
+
+async def wallet_index_sync_task() -> None:
+    """Load the index, then keep it in step with reports made elsewhere."""
+    while True:
+        try:
+            await wallet_index.sync()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("[WalletIndex] Sync failed: %s", exc)
+        await asyncio.sleep(SYNC_INTERVAL)
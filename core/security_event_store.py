@@ -0,0 +1,413 @@
+"""
+Security Event Store
+
+SQLite (WAL) backed storage for security events, replacing the flat JSONL
+file that had to be re-read and re-parsed on every dashboard query.
+
+Layout:
+- events:        one row per event, indexed on the epoch timestamp so
+                 time-range reads and retention deletes are index scans.
+- hourly_counts: pre-aggregated counters per (hour, event_type, severity),
+                 maintained in the same transaction as the event insert.
+                 Statistics read these instead of scanning events.
+- imported_files: JSONL files (and rotated backups) already migrated, so
+                 the import runs once per file, even with several workers
+                 starting at the same time.
+
+Writes are handed to a single background writer thread through a bounded
+queue and committed in batches; callers never wait on disk I/O unless the
+queue is full, in which case the event is written synchronously rather than
+dropped.
+"""
+
+import json
+import os
+import queue
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from api.utils import logger
+
+QUEUE_MAXSIZE = int(os.getenv("SECURITY_EVENTS_QUEUE_MAXSIZE", "10000"))
+BATCH_SIZE = int(os.getenv("SECURITY_EVENTS_BATCH_SIZE", "200"))
+
+_HOUR = 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id          INTEGER PRIMARY KEY,
+    ts          REAL    NOT NULL,
+    event_type  TEXT    NOT NULL,
+    severity    TEXT    NOT NULL,
+    title       TEXT,
+    description TEXT,
+    user_id     TEXT,
+    ip_address  TEXT,
+    metadata    TEXT,
+    resolved    INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts);
+
+CREATE TABLE IF NOT EXISTS hourly_counts (
+    hour        INTEGER NOT NULL,
+    event_type  TEXT    NOT NULL,
+    severity    TEXT    NOT NULL,
+    total       INTEGER NOT NULL DEFAULT 0,
+    unresolved  INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (hour, event_type, severity)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS imported_files (
+    path        TEXT    NOT NULL,
+    size        INTEGER NOT NULL,
+    mtime       REAL    NOT NULL,
+    imported    INTEGER NOT NULL,
+    PRIMARY KEY (path, size, mtime)
+);
+"""
+
+_INSERT_EVENT = (
+    "INSERT INTO events (ts, event_type, severity, title, description, "
+    "user_id, ip_address, metadata, resolved) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+_BUMP_COUNTER = (
+    "INSERT INTO hourly_counts (hour, event_type, severity, total, unresolved) "
+    "VALUES (?, ?, ?, 1, ?) "
+    "ON CONFLICT (hour, event_type, severity) DO UPDATE SET "
+    "total = total + 1, unresolved = unresolved + excluded.unresolved"
+)
+
+_STOP = object()
+
+
+def _to_epoch(timestamp: Any) -> float:
+    """Accept datetime or ISO string (naive values are treated as UTC)."""
+    if isinstance(timestamp, str):
+        timestamp = datetime.fromisoformat(timestamp)
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+def _hour_of(ts: float) -> int:
+    return int(ts // _HOUR) * _HOUR
+
+
+def _event_to_row(event: Dict[str, Any]) -> tuple:
+    metadata = event.get("metadata")
+    return (
+        _to_epoch(event["timestamp"]),
+        event.get("event_type") or "unknown",
+        event.get("severity") or "unknown",
+        event.get("title"),
+        event.get("description"),
+        event.get("user_id"),
+        event.get("ip_address"),
+        json.dumps(metadata) if metadata is not None else None,
+        # Legacy lines without the field counted as resolved in the old stats
+        1 if event.get("resolved", True) else 0,
+    )
+
+
+def _row_to_event(row: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        "event_type": row["event_type"],
+        "severity": row["severity"],
+        "title": row["title"],
+        "description": row["description"],
+        "user_id": row["user_id"],
+        "ip_address": row["ip_address"],
+        "metadata": json.loads(row["metadata"]) if row["metadata"] else None,
+        "timestamp": datetime.fromtimestamp(row["ts"], timezone.utc).isoformat(),
+        "resolved": bool(row["resolved"]),
+    }
+
+
+class SecurityEventStore:
+    """
+    Indexed security event storage with per-hour aggregates.
+
+    Thread-safe: the writer thread owns one connection, readers get a
+    per-thread connection (WAL lets them run alongside the writer).
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=QUEUE_MAXSIZE)
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._written = 0
+        self._sync_writes = 0
+
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _insert_rows(conn: sqlite3.Connection, rows: List[tuple]) -> None:
+        conn.executemany(_INSERT_EVENT, rows)
+        conn.executemany(
+            _BUMP_COUNTER,
+            [(_hour_of(r[0]), r[1], r[2], 1 - r[8]) for r in rows],
+        )
+
+    @classmethod
+    def _write_rows(cls, conn: sqlite3.Connection, rows: List[tuple]) -> None:
+        with conn:
+            cls._insert_rows(conn, rows)
+
+    def append(self, event: Dict[str, Any]) -> None:
+        """Queue an event for the background writer (non-blocking)."""
+        row = _event_to_row(event)
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            # Never drop security events: fall back to a synchronous write
+            self._sync_writes += 1
+            self._write_rows(self._reader(), [row])
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self._run, name="security-event-writer", daemon=True
+                )
+                self._writer.start()
+
+    def _run(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                item = self._queue.get()
+                batch, stop = [], item is _STOP
+                if not stop:
+                    batch.append(item)
+                while not stop and len(batch) < BATCH_SIZE:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stop = True
+                    else:
+                        batch.append(item)
+                if batch:
+                    try:
+                        self._write_rows(conn, batch)
+                        self._written += len(batch)
+                    except sqlite3.Error as e:
+                        logger.error(
+                            f"Failed to write {len(batch)} security events: {e}"
+                        )
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self._queue.task_done()
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def flush(self) -> None:
+        """Block until every queued event has been committed."""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.join()
+
+    def close(self) -> None:
+        """Drain the queue and stop the writer thread."""
+        if self._writer is not None and self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        self._writer = None
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def recent_events(
+        self, since: datetime, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """Events with timestamp >= since, newest first."""
+        sql = "SELECT * FROM events WHERE ts >= ? ORDER BY ts DESC"
+        params: tuple = (since.timestamp(),)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        return [_row_to_event(r) for r in self._reader().execute(sql, params)]
+
+    def statistics(self, since: datetime) -> Dict[str, Any]:
+        """
+        Counts by type/severity since a point in time.
+
+        Whole hours come from hourly_counts; only the partial hour at the
+        start of the window touches the events table (via the ts index).
+        """
+        cutoff = since.timestamp()
+        first_full_hour = _hour_of(cutoff) + (0 if cutoff % _HOUR == 0 else _HOUR)
+        conn = self._reader()
+        rows = conn.execute(
+            "SELECT event_type, severity, SUM(total) AS total, "
+            "SUM(unresolved) AS unresolved FROM hourly_counts "
+            "WHERE hour >= ? GROUP BY event_type, severity "
+            "UNION ALL "
+            "SELECT event_type, severity, COUNT(*), SUM(1 - resolved) FROM events "
+            "WHERE ts >= ? AND ts < ? GROUP BY event_type, severity",
+            (first_full_hour, cutoff, first_full_hour),
+        ).fetchall()
+
+        by_type: Dict[str, int] = {}
+        by_severity: Dict[str, int] = {}
+        total = unresolved = 0
+        for row in rows:
+            count = row["total"] or 0
+            total += count
+            unresolved += row["unresolved"] or 0
+            by_type[row["event_type"]] = by_type.get(row["event_type"], 0) + count
+            by_severity[row["severity"]] = by_severity.get(row["severity"], 0) + count
+        return {
+            "total_events": total,
+            "unresolved_events": unresolved,
+            "by_type": by_type,
+            "by_severity": by_severity,
+        }
+
+    def hourly_counts(self, since: datetime) -> List[Dict[str, Any]]:
+        """Per-hour counters (oldest first) for dashboard time series."""
+        rows = self._reader().execute(
+            "SELECT hour, event_type, severity, total, unresolved "
+            "FROM hourly_counts WHERE hour >= ? ORDER BY hour",
+            (_hour_of(since.timestamp()),),
+        )
+        return [
+            {
+                "hour": datetime.fromtimestamp(r["hour"], timezone.utc).isoformat(),
+                "event_type": r["event_type"],
+                "severity": r["severity"],
+                "total": r["total"],
+                "unresolved": r["unresolved"],
+            }
+            for r in rows
+        ]
+
+    # ------------------------------------------------------------------
+    # Retention / migration
+    # ------------------------------------------------------------------
+
+    def delete_before(self, cutoff: datetime) -> int:
+        """Delete events older than cutoff; returns the number removed."""
+        self.flush()
+        ts = cutoff.timestamp()
+        boundary = _hour_of(ts)
+        conn = self._reader()
+        with conn:
+            removed = conn.execute("DELETE FROM events WHERE ts < ?", (ts,)).rowcount
+            conn.execute("DELETE FROM hourly_counts WHERE hour <= ?", (boundary,))
+            # The cutoff hour keeps only part of its events; rebuild its counters
+            conn.execute(
+                "INSERT INTO hourly_counts (hour, event_type, severity, total, unresolved) "
+                "SELECT ?, event_type, severity, COUNT(*), SUM(1 - resolved) "
+                "FROM events WHERE ts >= ? AND ts < ? GROUP BY event_type, severity",
+                (boundary, boundary, boundary + _HOUR),
+            )
+        return removed
+
+    def import_jsonl(self, paths: Iterable[Path]) -> int:
+        """
+        Import legacy JSONL files (skips files already imported unchanged).
+
+        Each file's rows and its imported_files marker are written in one
+        BEGIN IMMEDIATE transaction that re-checks the marker first, so
+        workers importing at the same time cannot both import a file and a
+        crash never leaves a half-imported file behind.
+
+        Malformed lines are skipped. Returns the number of events imported.
+        """
+        self.flush()
+        conn = self._reader()
+        imported = 0
+        for path in paths:
+            if not path.exists():
+                continue
+            stat = path.stat()
+            key = (str(path.resolve()), stat.st_size, stat.st_mtime)
+            if self._is_imported(conn, key):
+                continue
+
+            # Parse before taking the write lock; it is the slow part
+            rows = []
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        rows.append(_event_to_row(json.loads(line)))
+                    except (json.JSONDecodeError, ValueError, KeyError, TypeError):
+                        continue
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._is_imported(conn, key):
+                    conn.rollback()
+                    continue
+                self._insert_rows(conn, rows)
+                conn.execute(
+                    "INSERT INTO imported_files (path, size, mtime, imported) "
+                    "VALUES (?, ?, ?, ?)",
+                    key + (len(rows),),
+                )
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            imported += len(rows)
+            logger.info(f"Imported {len(rows)} security events from {path}")
+        return imported
+
+    @staticmethod
+    def _is_imported(conn: sqlite3.Connection, key: tuple) -> bool:
+        return (
+            conn.execute(
+                "SELECT 1 FROM imported_files WHERE path = ? AND size = ? AND mtime = ?",
+                key,
+            ).fetchone()
+            is not None
+        )
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self._written,
+            "sync_writes": self._sync_writes,
+        }
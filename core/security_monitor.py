@@ -2,7 +2,8 @@
 Security Monitoring System (Stage 4 Security)
 
 Logs and tracks security events for monitoring and alerting.
-Events are stored in a JSONL file for easy parsing and rotation.
+Events are stored in an indexed SQLite store (see core/security_event_store.py)
+with per-hour counters; legacy JSONL files are imported on first start.
 
 Security Event Types:
 - BRUTE_FORCE_ATTEMPT: Multiple failed login attempts
@@ -16,7 +17,6 @@ Security Event Types:
 - TEST_MODE_ENABLED: Development mode enabled
 """
 
-import json
 import os
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, timezone
@@ -25,14 +25,7 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 from api.utils import logger
-
-
-def _parse_iso_utc(timestamp_str: str) -> datetime:
-    """Parse ISO timestamp and normalize to UTC (supports legacy naive values)."""
-    dt = datetime.fromisoformat(timestamp_str)
-    if dt.tzinfo is None:
-        return dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(timezone.utc)
+from core.security_event_store import SecurityEventStore
 
 
 class SecurityEventType(Enum):
@@ -97,7 +90,7 @@ class SecurityMonitor:
     """
     Security event monitoring and logging system.
 
-    Stores events in JSONL format for easy parsing and rotation.
+    Appends events to an indexed store without blocking the caller.
     Provides querying and statistics functionality.
     """
 
@@ -106,24 +99,40 @@ class SecurityMonitor:
         Initialize the security monitor.
 
         Args:
-            storage_path: Path to the event log file (JSONL format)
+            storage_path: Path to the legacy event log file (JSONL format).
+                The store lives next to it as ``<name>.db`` (override with
+                SECURITY_EVENTS_DB_PATH); the JSONL file and its rotated
+                backups are imported once on startup.
         """
         self.storage_path = Path(storage_path)
         self.storage_path.parent.mkdir(parents=True, exist_ok=True)
-        self.max_bytes = int(
-            os.getenv("SECURITY_EVENTS_MAX_BYTES", str(10 * 1024 * 1024))
-        )
         self.backup_count = int(os.getenv("SECURITY_EVENTS_BACKUP_COUNT", "3"))
+        self.db_path = Path(
+            os.getenv("SECURITY_EVENTS_DB_PATH") or self.storage_path.with_suffix(".db")
+        )
+        self.store = SecurityEventStore(str(self.db_path))
+        self._import_legacy_files()
 
-        # Load alert dispatcher
+        # Load alert dispatcher (shared, so the one started in lifespan is used)
         try:
-            from core.alert_dispatcher import AlertDispatcher
+            from core.alert_dispatcher import get_alert_dispatcher
 
-            self.alert_dispatcher = AlertDispatcher()
+            self.alert_dispatcher = get_alert_dispatcher()
         except ImportError:
             logger.warning("⚠️ Alert dispatcher not available")
             self.alert_dispatcher = None
 
+    def _import_legacy_files(self):
+        """Import the JSONL log and its rotated backups (oldest first)."""
+        paths = [
+            self.storage_path.with_name(f"{self.storage_path.name}.{idx}")
+            for idx in range(self.backup_count, 0, -1)
+        ] + [self.storage_path]
+        try:
+            self.store.import_jsonl(paths)
+        except Exception as e:
+            logger.error(f"Failed to import legacy security events: {e}")
+
     def log_event(self, event: SecurityEvent) -> Dict[str, Any]:
         """
         Log a security event to storage and trigger alerts if needed.
@@ -136,12 +145,10 @@ class SecurityMonitor:
         """
         event_data = event.to_dict()
 
-        # Append to JSONL file
+        # Hand off to the store's background writer
         try:
-            self._rotate_if_needed()
-            with open(self.storage_path, "a") as f:
-                f.write(json.dumps(event_data) + "\n")
-        except IOError as e:
+            self.store.append(event_data)
+        except Exception as e:
             logger.error(f"Failed to write security event: {e}")
 
         # Check if alert is needed
@@ -163,31 +170,6 @@ class SecurityMonitor:
 
         return event_data
 
-    def _rotate_if_needed(self):
-        """Rotate JSONL security log files to cap disk usage."""
-        try:
-            if not self.storage_path.exists():
-                return
-            if self.storage_path.stat().st_size < self.max_bytes:
-                return
-
-            # Rotate backups: .2 -> .3, .1 -> .2, current -> .1
-            for idx in range(self.backup_count, 0, -1):
-                src = self.storage_path.with_name(f"{self.storage_path.name}.{idx}")
-                dst = self.storage_path.with_name(f"{self.storage_path.name}.{idx + 1}")
-                if src.exists():
-                    if idx == self.backup_count:
-                        src.unlink(missing_ok=True)
-                    else:
-                        src.replace(dst)
-
-            first_backup = self.storage_path.with_name(f"{self.storage_path.name}.1")
-            self.storage_path.replace(first_backup)
-        except OSError as e:
-            logger.warning(
-                f"Security log rotation skipped due to filesystem error: {e}"
-            )
-
     def _check_alerts(self, event: SecurityEvent):
         """
         Check if event requires alert dispatch.
@@ -211,37 +193,26 @@ class SecurityMonitor:
             except Exception as e:
                 logger.error(f"Failed to send alert: {e}")
 
-    def get_recent_events(self, hours: int = 24) -> List[Dict[str, Any]]:
+    def get_recent_events(
+        self, hours: int = 24, limit: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
         """
         Get security events from the last N hours.
 
         Args:
             hours: Number of hours to look back (default: 24)
+            limit: Maximum number of events to return (default: all)
 
         Returns:
             List of event dictionaries, sorted by timestamp (newest first)
         """
         cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
-        events = []
-
-        if not self.storage_path.exists():
-            return events
-
         try:
-            with open(self.storage_path, "r") as f:
-                for line in f:
-                    try:
-                        event = json.loads(line.strip())
-                        event_time = _parse_iso_utc(event["timestamp"])
-                        if event_time >= cutoff:
-                            events.append(event)
-                    except (json.JSONDecodeError, ValueError, KeyError):
-                        continue
-        except IOError:
+            return self.store.recent_events(cutoff, limit=limit)
+        except Exception as e:
+            logger.error(f"Failed to read security events: {e}")
             return []
 
-        return sorted(events, key=lambda e: e["timestamp"], reverse=True)
-
     def get_statistics(self, days: int = 7) -> Dict[str, Any]:
         """
         Get security statistics for the last N days.
@@ -253,60 +224,31 @@ class SecurityMonitor:
             Dictionary with statistics
         """
         cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-        events_by_type = {}
-        events_by_severity = {}
-        total_events = 0
-        unresolved_events = 0
-
-        if not self.storage_path.exists():
-            return {
+        try:
+            stats = self.store.statistics(cutoff)
+        except Exception as e:
+            logger.error(f"Failed to read security statistics: {e}")
+            stats = {
                 "total_events": 0,
                 "unresolved_events": 0,
                 "by_type": {},
                 "by_severity": {},
-                "period_days": days,
             }
+        stats["period_days"] = days
+        return stats
 
-        try:
-            with open(self.storage_path, "r") as f:
-                for line in f:
-                    try:
-                        event = json.loads(line.strip())
-                        event_time = _parse_iso_utc(event["timestamp"])
-
-                        if event_time < cutoff:
-                            continue
-
-                        total_events += 1
-
-                        # Count by type
-                        event_type = event.get("event_type", "unknown")
-                        events_by_type[event_type] = (
-                            events_by_type.get(event_type, 0) + 1
-                        )
-
-                        # Count by severity
-                        severity = event.get("severity", "unknown")
-                        events_by_severity[severity] = (
-                            events_by_severity.get(severity, 0) + 1
-                        )
-
-                        # Count unresolved
-                        if not event.get("resolved", True):
-                            unresolved_events += 1
-
-                    except (json.JSONDecodeError, ValueError, KeyError):
-                        continue
-        except IOError:
-            pass
-
-        return {
-            "total_events": total_events,
-            "unresolved_events": unresolved_events,
-            "by_type": events_by_type,
-            "by_severity": events_by_severity,
-            "period_days": days,
-        }
+    def get_hourly_counts(self, hours: int = 24) -> List[Dict[str, Any]]:
+        """
+        Get pre-aggregated per-hour counts by type and severity.
+
+        Args:
+            hours: Number of hours to look back (default: 24)
+
+        Returns:
+            List of {hour, event_type, severity, total, unresolved}, oldest first
+        """
+        cutoff = datetime.now(timezone.utc) - timedelta(hours=hours)
+        return self.store.hourly_counts(cutoff)
 
     def cleanup_old_events(self, days_to_keep: int = 90):
         """
@@ -318,42 +260,17 @@ class SecurityMonitor:
         Returns:
             Number of events removed
         """
-        if not self.storage_path.exists():
-            return 0
-
         cutoff = datetime.now(timezone.utc) - timedelta(days=days_to_keep)
-        remaining_events = []
-        removed_count = 0
-
         try:
-            with open(self.storage_path, "r") as f:
-                for line in f:
-                    try:
-                        event = json.loads(line.strip())
-                        event_time = _parse_iso_utc(event["timestamp"])
-
-                        if event_time >= cutoff:
-                            remaining_events.append(line.strip())
-                        else:
-                            removed_count += 1
-                    except (json.JSONDecodeError, ValueError, KeyError):
-                        # Keep malformed lines
-                        remaining_events.append(line.strip())
-
-            # Write back filtered events
-            with open(self.storage_path, "w") as f:
-                for event_line in remaining_events:
-                    f.write(event_line + "\n")
-
-            if removed_count > 0:
-                logger.info(
-                    f"🧹 Cleaned up {removed_count} old security events (older than {days_to_keep} days)"
-                )
-
-        except IOError as e:
+            removed_count = self.store.delete_before(cutoff)
+        except Exception as e:
             logger.error(f"Failed to cleanup security events: {e}")
             return 0
 
+        if removed_count > 0:
+            logger.info(
+                f"🧹 Cleaned up {removed_count} old security events (older than {days_to_keep} days)"
+            )
         return removed_count
 
 
@@ -0,0 +1,304 @@
+"""
+Shared revoked-token store for refresh-token blacklisting.
+
+Layers:
+  Bloom filter (in-process)  — every revoked hash this worker knows about;
+                               a negative answer needs no I/O at all
+  Redis ``SET ... EX``       — shared, self-expiring confirmation for
+                               Bloom "maybe" hits
+  PostgreSQL revoked_tokens  — durable record; workers pull new rows by
+                               revoked_at every REVOKED_TOKENS_SYNC_INTERVAL
+                               seconds, which bounds cross-worker propagation
+
+Lookups on the request path are O(1): a Bloom probe, and only on a "maybe"
+a Redis EXISTS and, if that misses, a primary-key query.  When a "maybe"
+cannot be confirmed because both backends are down the token is treated as
+revoked (fail closed).
+
+A Bloom negative is only as fresh as the last sync: a token revoked on
+another worker is still accepted here until this worker's next sync, i.e.
+for up to REVOKED_TOKENS_SYNC_INTERVAL seconds.  Revocations made on this
+worker take effect immediately.
+
+Until ``revocation_sync_task`` has completed its first full load, Bloom
+misses are confirmed against the backends so a freshly started worker never
+accepts a token revoked elsewhere.  Processes that never start the task
+(scripts, tests) rely on the local filter alone.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from core.redis_url import resolve_redis_url
+
+logger = logging.getLogger(__name__)
+
+# ── Configuration ────────────────────────────────────────────────────────────
+BLOOM_BITS = int(os.getenv("REVOKED_TOKENS_BLOOM_BITS", str(1 << 20)))
+BLOOM_HASHES = int(os.getenv("REVOKED_TOKENS_BLOOM_HASHES", "7"))
+SYNC_INTERVAL = float(os.getenv("REVOKED_TOKENS_SYNC_INTERVAL", "5"))
+REBUILD_INTERVAL = float(os.getenv("REVOKED_TOKENS_REBUILD_INTERVAL", "3600"))
+# Rows committed slightly before the previous sync's watermark are re-read
+_SYNC_OVERLAP = timedelta(seconds=5)
+
+_KEY_PREFIX = "revoked:"
+LEGACY_FILE = Path("data/revoked_tokens.json")
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter keyed by SHA-256 hex digests.
+
+    The digest is already uniformly distributed, so the k bit positions are
+    taken from consecutive 32-bit slices of it instead of re-hashing.
+    """
+
+    def __init__(self, bits: int = BLOOM_BITS, hashes: int = BLOOM_HASHES):
+        self.bits = bits
+        self.hashes = min(hashes, 8)
+        self._array = bytearray((bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, digest: str):
+        for i in range(self.hashes):
+            yield int(digest[i * 8 : i * 8 + 8], 16) % self.bits
+
+    def add(self, digest: str) -> None:
+        for pos in self._positions(digest):
+            self._array[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, digest: str) -> bool:
+        return all(
+            self._array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(digest)
+        )
+
+
+class RevokedTokenStore:
+    """Revocation set shared across workers; see module docstring."""
+
+    def __init__(self):
+        self._bloom = BloomFilter()
+        self._lock = threading.Lock()
+        # This worker's own revocations: confirms Bloom hits without a backend
+        self._local: Dict[str, float] = {}
+        self._watermark: Optional[datetime] = None
+        self._sync_expected = False
+        self._redis: Optional[Any] = None
+        self._redis_checked = False
+        self._stats = {
+            "lookups": 0,
+            "bloom_negative": 0,
+            "backend_checks": 0,
+            "false_positives": 0,
+            "backend_errors": 0,
+        }
+
+    # ── Backends ────────────────────────────────────────────────────────────
+
+    def _get_redis(self) -> Optional[Any]:
+        if self._redis_checked:
+            return self._redis
+        self._redis_checked = True
+        redis_url, source = resolve_redis_url()
+        if not redis_url:
+            return None
+        try:
+            import redis as redis_lib  # noqa: PLC0415
+
+            client = redis_lib.from_url(
+                redis_url, socket_connect_timeout=2, socket_timeout=2
+            )
+            client.ping()
+            self._redis = client
+            logger.info("[RevokedTokens] Redis connected via %s", source)
+        except Exception as exc:
+            logger.warning("[RevokedTokens] Redis unavailable — DB only: %s", exc)
+            self._redis = None
+        return self._redis
+
+    def _check_backends(self, token_hash: str, on_error: bool = True) -> bool:
+        self._stats["backend_checks"] += 1
+        r = self._get_redis()
+        if r:
+            try:
+                if r.exists(_KEY_PREFIX + token_hash):
+                    return True
+            except Exception as exc:
+                logger.warning("[RevokedTokens] Redis lookup failed: %s", exc)
+        try:
+            from core.database.revoked_tokens import is_revoked_in_db
+
+            return is_revoked_in_db(token_hash)
+        except Exception as exc:
+            logger.warning("[RevokedTokens] DB lookup failed: %s", exc)
+        self._stats["backend_errors"] += 1
+        return on_error
+
+    # ── Public API ──────────────────────────────────────────────────────────
+
+    def revoke(self, token_hash: str, expires_at: datetime) -> None:
+        """Add a token hash to the blacklist until expires_at."""
+        with self._lock:
+            self._bloom.add(token_hash)
+            self._local[token_hash] = expires_at.timestamp()
+
+        ttl = int((expires_at - datetime.now(timezone.utc)).total_seconds())
+        if ttl <= 0:
+            return
+        r = self._get_redis()
+        if r:
+            try:
+                r.set(_KEY_PREFIX + token_hash, "1", ex=ttl)
+            except Exception as exc:
+                logger.warning("[RevokedTokens] Redis SET failed: %s", exc)
+        try:
+            from core.database.revoked_tokens import insert_revoked_tokens
+
+            insert_revoked_tokens([(token_hash, expires_at)])
+        except Exception as exc:
+            logger.warning("[RevokedTokens] Failed to persist revocation: %s", exc)
+
+    def is_revoked(self, token_hash: str) -> bool:
+        """O(1) membership check; see module docstring for the fallbacks."""
+        self._stats["lookups"] += 1
+        if token_hash not in self._bloom:
+            if self._sync_expected and self._watermark is None:
+                # Filter not loaded yet; a miss here is the normal answer,
+                # so a backend outage must not lock everyone out
+                return self._check_backends(token_hash, on_error=False)
+            self._stats["bloom_negative"] += 1
+            return False
+
+        expiry = self._local.get(token_hash)
+        if expiry is not None:
+            if expiry > datetime.now(timezone.utc).timestamp():
+                return True
+            with self._lock:
+                self._local.pop(token_hash, None)
+            return False
+
+        revoked = self._check_backends(token_hash)
+        if not revoked:
+            self._stats["false_positives"] += 1
+        return revoked
+
+    def sync(self) -> int:
+        """Pull revocations made by other workers since the last sync."""
+        from core.database.revoked_tokens import get_db_now, get_revoked_since
+
+        # revoked_at is stamped by the DB, so the watermark must be too
+        started = get_db_now()
+        since = None if self._watermark is None else self._watermark - _SYNC_OVERLAP
+        rows = get_revoked_since(since)
+        with self._lock:
+            for token_hash, _expires_at, _revoked_at in rows:
+                self._bloom.add(token_hash)
+            self._watermark = started
+        return len(rows)
+
+    def rebuild(self) -> int:
+        """Drop expired entries: delete them from the DB and rebuild the filter."""
+        from core.database.revoked_tokens import (
+            delete_expired_revoked_tokens,
+            get_db_now,
+            get_revoked_since,
+        )
+
+        pruned = self.prune_local()
+        try:
+            removed = delete_expired_revoked_tokens()
+        except Exception as exc:
+            logger.warning("[RevokedTokens] Failed to delete expired rows: %s", exc)
+            return pruned
+
+        started = get_db_now()
+        rows = get_revoked_since(None)
+        bloom = BloomFilter()
+        with self._lock:
+            for token_hash in self._local:
+                bloom.add(token_hash)
+            for token_hash, _expires_at, _revoked_at in rows:
+                bloom.add(token_hash)
+            self._bloom = bloom
+            self._watermark = started
+        return removed
+
+    def prune_local(self) -> int:
+        """Forget this worker's expired revocations; returns the count."""
+        now = datetime.now(timezone.utc).timestamp()
+        with self._lock:
+            expired = [h for h, exp in self._local.items() if exp <= now]
+            for token_hash in expired:
+                del self._local[token_hash]
+        return len(expired)
+
+    def import_legacy_file(self, path: Path = LEGACY_FILE) -> int:
+        """Move entries from the old data/revoked_tokens.json into the DB."""
+        if not path.exists():
+            return 0
+        from core.database.revoked_tokens import insert_revoked_tokens
+
+        with open(path, "r", encoding="utf-8") as f:
+            raw: dict = json.load(f)
+        now = datetime.now(timezone.utc)
+        entries = []
+        for token_hash, expiry in raw.items():
+            expires_at = datetime.fromisoformat(expiry)
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            if expires_at > now:
+                entries.append((token_hash, expires_at))
+        insert_revoked_tokens(entries)
+        path.replace(path.with_name(path.name + ".imported"))
+        logger.info("[RevokedTokens] Imported %d entries from %s", len(entries), path)
+        return len(entries)
+
+    def expect_sync(self) -> None:
+        """Mark that a sync task will run; confirm misses until it has loaded."""
+        self._sync_expected = True
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "bloom_entries": self._bloom.count,
+            "bloom_bits": self._bloom.bits,
+            "local_entries": len(self._local),
+            "synced_at": self._watermark.isoformat() if self._watermark else None,
+        }
+
+
+revoked_token_store = RevokedTokenStore()
+
+
+async def revocation_sync_task() -> None:
+    """Keep this worker's filter in step with the shared store."""
+    from api.utils import run_sync
+
+    revoked_token_store.expect_sync()
+    try:
+        await run_sync(revoked_token_store.import_legacy_file)
+    except Exception as exc:
+        logger.warning("[RevokedTokens] Legacy file import failed: %s", exc)
+
+    loop = asyncio.get_running_loop()
+    last_rebuild = loop.time()
+    while True:
+        try:
+            if loop.time() - last_rebuild >= REBUILD_INTERVAL:
+                await run_sync(revoked_token_store.rebuild)
+                last_rebuild = loop.time()
+            else:
+                await run_sync(revoked_token_store.sync)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.warning("[RevokedTokens] Sync failed: %s", exc)
+        await asyncio.sleep(SYNC_INTERVAL)
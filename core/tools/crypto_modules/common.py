@@ -1,28 +1,283 @@
 """
 加密貨幣工具共用模組
 Shared imports, constants, and cache functions
+
+All crypto tool modules share one bounded cache (``tool_cache``):
+  - LRU bound (CRYPTO_TOOL_CACHE_MAX entries) with a TTL per endpoint
+  - stale-while-revalidate: an expired entry is still served for its stale
+    window while a background thread refreshes it
+  - concurrent misses for the same key wait for a single upstream call
+
+The coin id → chain/platform map changes rarely, so it is also persisted
+to CRYPTO_COIN_MAP_PATH and survives restarts.
 """
 
+import json
+import logging
+import os
+import threading
 import time
-from typing import Dict, Optional
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import httpx
+
+from core.coin_registry import coin_registry
+
+logger = logging.getLogger(__name__)
 
 # API Base URLs
 ETHERSCAN_BASE = "https://api.etherscan.io/api"
 DEXSCREENER_BASE = "https://api.dexscreener.com/latest"
+COINGECKO_BASE = "https://api.coingecko.com/api/v3"
+DEFILLAMA_BASE = "https://api.llama.fi"
+FEAR_GREED_URL = "https://api.alternative.me/fng/?limit=1"
+
+CACHE_MAX = int(os.getenv("CRYPTO_TOOL_CACHE_MAX", "2048"))
+COIN_MAP_PATH = Path(os.getenv("CRYPTO_COIN_MAP_PATH", "data/coin_platforms.json"))
+COIN_MAP_TTL = 7 * 24 * 3600
+
+# endpoint -> (fresh seconds, extra seconds an expired entry may still be served)
+ENDPOINT_TTLS: Dict[str, Tuple[float, float]] = {
+    "coingecko_search": (3600, 86400),
+    "coingecko_coin": (120, 600),
+    "coingecko_price": (30, 120),
+    "dexscreener_tokens": (30, 120),
+    "defillama_protocol": (300, 1800),
+    "defillama_chains": (300, 1800),
+    "fear_greed": (600, 3600),
+}
+DEFAULT_TTL: Tuple[float, float] = (300, 0)
+
+
+class ToolCache:
+    """Thread-safe LRU cache with per-entry TTL, stale serving and single-flight."""
+
+    def __init__(self, max_size: int = CACHE_MAX):
+        self.max_size = max_size
+        # key -> (value, fresh_until, stale_until, stored_at)
+        self._entries: "OrderedDict[str, Tuple[Any, float, float, float]]" = (
+            OrderedDict()
+        )
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix="crypto-cache-refresh"
+        )
+        self.stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "evictions": 0,
+        }
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """Return a fresh value or None.
+
+        ``max_age`` additionally rejects values stored more than that many
+        seconds ago, even if the TTL given to ``set`` has not run out.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= now:
+                return None
+            if max_age is not None and now - entry[3] > max_age:
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return entry[0]
+
+    def set(self, key: str, value: Any, ttl: float, stale_ttl: float = 0) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (value, now + ttl, now + ttl + stale_ttl, now)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def fetch(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: float,
+        stale_ttl: float = 0,
+    ) -> Any:
+        """Return the cached value for key, calling loader at most once at a time.
+
+        A loader result of None means "nothing usable" and is not cached.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry[2]:
+                self._entries.move_to_end(key)
+                if now < entry[1]:
+                    self.stats["hits"] += 1
+                    return entry[0]
+                self.stats["stale_hits"] += 1
+                if key not in self._inflight:
+                    self._inflight[key] = future = Future()
+                    self.stats["refreshes"] += 1
+                    self._refresher.submit(
+                        self._load, key, loader, ttl, stale_ttl, future
+                    )
+                return entry[0]
+
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                owner = False
+            else:
+                self._inflight[key] = future = Future()
+                self.stats["misses"] += 1
+                owner = True
+
+        if owner:
+            self._load(key, loader, ttl, stale_ttl, future)
+        return future.result()
+
+    def _load(self, key, loader, ttl, stale_ttl, future: Future) -> None:
+        try:
+            value = loader()
+        except Exception as exc:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(exc)
+            return
+        if value is not None:
+            self.set(key, value, ttl, stale_ttl)
+        with self._lock:
+            self._inflight.pop(key, None)
+        future.set_result(value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
-# In-Memory TTL Cache
-_COINGECKO_CACHE: Dict = {}
+
+tool_cache = ToolCache()
 
 
 def get_cached_data(key: str, ttl_seconds: int = 300) -> Optional[str]:
-    """Get cached data if still valid"""
-    if key in _COINGECKO_CACHE:
-        timestamp, data = _COINGECKO_CACHE[key]
-        if time.time() - timestamp < ttl_seconds:
-            return data
-    return None
+    """Get cached data stored at most ttl_seconds ago and still within its TTL."""
+    return tool_cache.get(key, max_age=ttl_seconds)
 
 
-def set_cached_data(key: str, data: str):
+def set_cached_data(key: str, data: str, ttl_seconds: int = 300):
     """Store data in cache"""
-    _COINGECKO_CACHE[key] = (time.time(), data)
+    tool_cache.set(key, data, ttl_seconds)
+
+
+def cached_get_json(
+    endpoint: str,
+    url: str,
+    params: Optional[Dict[str, Any]] = None,
+    timeout: float = 10,
+) -> Optional[Any]:
+    """GET url and return its JSON body, cached with the endpoint's TTLs.
+
+    Non-200 responses return None and are not cached; network errors are
+    raised to the caller unless a stale copy can be served.
+    """
+    ttl, stale_ttl = ENDPOINT_TTLS.get(endpoint, DEFAULT_TTL)
+    key = f"{endpoint}:{url}"
+    if params:
+        key += "?" + "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+
+    def load():
+        resp = httpx.get(url, params=params, timeout=timeout)
+        if resp.status_code != 200:
+            return None
+        return resp.json()
+
+    return tool_cache.fetch(key, load, ttl, stale_ttl)
+
+
+class CoinPlatformMap:
+    """Symbol → {id, name, platforms} map persisted as JSON."""
+
+    def __init__(self, path: Path = COIN_MAP_PATH, ttl: float = COIN_MAP_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self._entries: Optional[Dict[str, dict]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, dict]:
+        if self._entries is None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self._entries = {}
+        return self._entries
+
+    def get(self, symbol: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._load().get(symbol.upper())
+        if entry and time.time() - entry.get("resolved_at", 0) < self.ttl:
+            return entry
+        return None
+
+    def put(self, symbol: str, coin_id: str, name: str, platforms: dict) -> None:
+        with self._lock:
+            entries = self._load()
+            entries[symbol.upper()] = {
+                "id": coin_id,
+                "name": name,
+                "platforms": platforms or {},
+                "resolved_at": time.time(),
+            }
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(".tmp")
+                with open(tmp, "w", encoding="utf-8") as f:
+                    json.dump(entries, f)
+                os.replace(tmp, self.path)
+            except OSError:
+                logger.debug("Failed to persist coin map to %s", self.path)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+
+
+coin_platform_map = CoinPlatformMap()
+
+
+def find_coingecko_id(symbol: str) -> Optional[str]:
+    """CoinGecko coin id for a ticker symbol (exact symbol match preferred)."""
+    registered = coin_registry.resolve(symbol)
+    if registered:
+        return registered.id
+    known = coin_platform_map.get(symbol)
+    if known:
+        return known["id"]
+
+    data = cached_get_json(
+        "coingecko_search", f"{COINGECKO_BASE}/search", {"query": symbol}
+    )
+    coins = (data or {}).get("coins", [])
+    if not coins:
+        return None
+    for c in coins:
+        if c.get("symbol", "").upper() == symbol.upper():
+            return c["id"]
+    return coins[0]["id"]
+
+
+def get_coingecko_coin(coin_id: str) -> Optional[dict]:
+    """Cached /coins/{id} detail with market data."""
+    return cached_get_json(
+        "coingecko_coin",
+        f"{COINGECKO_BASE}/coins/{coin_id}",
+        {"localization": "false", "tickers": "false", "market_data": "true"},
+    )
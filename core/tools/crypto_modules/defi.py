@@ -10,7 +10,14 @@ from langchain_core.tools import tool
 
 from ..helpers import extract_crypto_symbols
 from ..schemas import ExtractCryptoSymbolsInput
-from .common import get_cached_data, set_cached_data
+from .common import (
+    DEFILLAMA_BASE,
+    cached_get_json,
+    find_coingecko_id,
+    get_cached_data,
+    get_coingecko_coin,
+    set_cached_data,
+)
 
 
 @tool
@@ -18,10 +25,11 @@ def get_defillama_tvl(protocol_name: str) -> str:
     """從 DefiLlama 獲取特定協議或公鏈的 TVL"""
     try:
         slug = protocol_name.strip().lower().replace(" ", "-")
-        resp = httpx.get(f"https://api.llama.fi/protocol/{slug}", timeout=10)
+        data = cached_get_json(
+            "defillama_protocol", f"{DEFILLAMA_BASE}/protocol/{slug}"
+        )
 
-        if resp.status_code == 200:
-            data = resp.json()
+        if data:
             name = data.get("name", protocol_name)
             current_chain_tvls = data.get("currentChainTvls", {})
             tvl = sum(current_chain_tvls.values()) if current_chain_tvls else 0
@@ -38,9 +46,9 @@ def get_defillama_tvl(protocol_name: str) -> str:
                 return f"## 🏦 DefiLlama TVL\n\n- **協議**: {name}\n- **TVL**: {tvl_str}\n\n*(來源: DefiLlama)*"
 
         # Try as chain
-        chains_resp = httpx.get("https://api.llama.fi/v2/chains", timeout=10)
-        if chains_resp.status_code == 200:
-            for chain in chains_resp.json():
+        chains = cached_get_json("defillama_chains", f"{DEFILLAMA_BASE}/v2/chains")
+        if chains:
+            for chain in chains:
                 if (
                     chain.get("name", "").lower() == slug
                     or chain.get("tokenSymbol", "").lower() == slug
@@ -81,7 +89,7 @@ def get_crypto_categories_and_gainers() -> str:
             for i, cat in enumerate(sorted_cats[:5], 1):
                 output += f"{i}. **{cat.get('name')}**: {cat.get('market_cap_change_24h', 0):+.2f}%\n"
             final = output + "\n*(來源: CoinGecko)*"
-            set_cached_data(cache_key, final)
+            set_cached_data(cache_key, final, 300)
             return final
         return "無法取得板塊數據。"
     except Exception as e:
@@ -115,24 +123,11 @@ def get_token_supply(symbol: str) -> str:
         return cached
 
     try:
-        search_resp = httpx.get(
-            f"https://api.coingecko.com/api/v3/search?query={symbol}", timeout=10
-        )
-        coins = search_resp.json().get("coins", [])
-        if not coins:
+        coin_id = find_coingecko_id(symbol)
+        if not coin_id:
             return f"找不到 {symbol}。"
 
-        coin_id = coins[0]["id"]
-        for c in coins:
-            if c.get("symbol", "").upper() == symbol:
-                coin_id = c["id"]
-                break
-
-        detail_resp = httpx.get(
-            f"https://api.coingecko.com/api/v3/coins/{coin_id}?localization=false&tickers=false&market_data=true",
-            timeout=10,
-        )
-        md = detail_resp.json().get("market_data", {})
+        md = (get_coingecko_coin(coin_id) or {}).get("market_data", {})
 
         def fmt(v):
             if v is None:
@@ -144,7 +139,7 @@ def get_token_supply(symbol: str) -> str:
             )
 
         result = f"## 🪙 {symbol} 供應量\n\n- 流通: {fmt(md.get('circulating_supply'))}\n- 總量: {fmt(md.get('total_supply'))}\n- 上限: {fmt(md.get('max_supply'))}\n\n*(來源: CoinGecko)*"
-        set_cached_data(cache_key, result)
+        set_cached_data(cache_key, result, 600)
         return result
     except Exception as e:
         return f"錯誤: {str(e)}"
@@ -249,7 +244,7 @@ def get_staking_yield(symbol: str) -> str:
         result += "\n> ⚠️ 收益率會隨市場變化，過去收益不代表未來。\n"
         result += "> 📊 數據來源: DefiLlama Yields\n"
 
-        set_cached_data(cache_key, result)
+        set_cached_data(cache_key, result, 600)
         return result
 
     except Exception as e:
@@ -260,31 +255,15 @@ def _get_staking_info_from_coingecko(symbol: str) -> str:
     """從 CoinGecko 獲取代幣質押信息（備用方案）"""
     try:
         # 搜索代幣
-        search_resp = httpx.get(
-            f"https://api.coingecko.com/api/v3/search?query={symbol}", timeout=10
-        )
-        coins = search_resp.json().get("coins", [])
-
-        if not coins:
+        coin_id = find_coingecko_id(symbol)
+        if not coin_id:
             return f"找不到 {symbol} 的質押數據。請確認代幣符號是否正確。"
 
-        coin_id = coins[0]["id"]
-        for c in coins:
-            if c.get("symbol", "").upper() == symbol:
-                coin_id = c["id"]
-                break
-
         # 獲取代幣詳細信息
-        detail_resp = httpx.get(
-            f"https://api.coingecko.com/api/v3/coins/{coin_id}?localization=false&tickers=false&market_data=true",
-            timeout=10,
-        )
-
-        if detail_resp.status_code != 200:
+        data = get_coingecko_coin(coin_id)
+        if not data:
             return f"無法獲取 {symbol} 的詳細信息。"
 
-        data = detail_resp.json()
-
         # 檢查是否有質押信息
         # CoinGecko 不直接提供質押 APY，返回基本信息
         result = f"## {symbol} 質押資訊\n\n"
@@ -6,7 +6,7 @@ DEX Pair Info, Trending Pairs, Search Pairs
 import httpx
 from langchain_core.tools import tool
 
-from .common import DEXSCREENER_BASE
+from .common import DEXSCREENER_BASE, cached_get_json
 
 
 @tool
@@ -14,10 +14,9 @@ def get_dex_pair_info(token_address: str) -> dict:
     """獲取 DEX 代幣對的詳細資訊"""
     try:
         url = f"{DEXSCREENER_BASE}/dex/tokens/{token_address}"
-        resp = httpx.get(url, timeout=10)
+        data = cached_get_json("dexscreener_tokens", url)
 
-        if resp.status_code == 200:
-            data = resp.json()
+        if data is not None:
             pairs = data.get("pairs", [])
 
             if not pairs:
@@ -45,7 +44,7 @@ def get_dex_pair_info(token_address: str) -> dict:
                 "source": "DexScreener",
             }
 
-        return {"error": f"API 錯誤: {resp.status_code}"}
+        return {"error": "API 錯誤"}
     except Exception as e:
         return {"error": f"查詢失敗: {str(e)}"}
 
@@ -16,7 +16,18 @@
 import httpx
 from langchain_core.tools import tool
 
-from .common import get_cached_data, set_cached_data
+from core import whale_scanner
+from core.coin_registry import coin_registry
+
+from .common import (
+    COINGECKO_BASE,
+    cached_get_json,
+    coin_platform_map,
+    find_coingecko_id,
+    get_cached_data,
+    get_coingecko_coin,
+    set_cached_data,
+)
 
 
 @tool
@@ -66,6 +77,11 @@ def get_whale_transactions(symbol: str = "BTC", min_value_usd: int = 500000) ->
     支援任何有公開區塊瀏覽器的代幣。
     """
     symbol = symbol.upper()
+    # 背景掃描器已在追蹤此鏈：直接查本地索引，不再逐次抓取
+    scanner = whale_scanner.scanner_for(symbol)
+    if scanner is not None:
+        return _format_indexed_whale_tx(scanner, min_value_usd)
+
     cache_key = f"whale_tx_{symbol}_{min_value_usd}"
     cached = get_cached_data(cache_key, 120)
     if cached:
@@ -94,7 +110,7 @@ def get_whale_transactions(symbol: str = "BTC", min_value_usd: int = 500000) ->
             result = _fetch_generic_whale_tx(symbol, chain, min_value_usd, token_info)
 
         if result:
-            set_cached_data(cache_key, result)
+            set_cached_data(cache_key, result, 120)
             return result
 
         return f"無法獲取 {symbol} 的鯨魚交易數據。"
@@ -104,39 +120,28 @@ def get_whale_transactions(symbol: str = "BTC", min_value_usd: int = 500000) ->
 
 
 def _get_token_chain_info(symbol: str) -> dict:
-    """從 CoinGecko 獲取代幣所在鏈資訊"""
+    """獲取代幣所在鏈資訊（優先查本地幣種註冊表，價格另行快取）"""
     try:
-        # 搜索代幣
-        search_resp = httpx.get(
-            f"https://api.coingecko.com/api/v3/search?query={symbol}", timeout=10
-        )
-        if search_resp.status_code != 200:
-            return None
-
-        coins = search_resp.json().get("coins", [])
-        if not coins:
-            return None
+        registered = coin_registry.resolve(symbol)
+        known = registered._asdict() if registered else coin_platform_map.get(symbol)
+        if known:
+            coin_id, name, platforms = known["id"], known["name"], known["platforms"]
+            price = _get_coingecko_price(coin_id)
+        else:
+            coin_id = find_coingecko_id(symbol)
+            if not coin_id:
+                return None
 
-        # 找到匹配的代幣
-        coin_id = None
-        for c in coins:
-            if c.get("symbol", "").upper() == symbol:
-                coin_id = c["id"]
-                break
-        if not coin_id:
-            coin_id = coins[0]["id"]
-
-        # 獲取詳細資訊
-        detail_resp = httpx.get(
-            f"https://api.coingecko.com/api/v3/coins/{coin_id}?localization=false&tickers=false&market_data=true",
-            timeout=10,
-        )
-        if detail_resp.status_code != 200:
-            return None
+            # 獲取詳細資訊
+            detail = get_coingecko_coin(coin_id)
+            if not detail:
+                return None
 
-        detail = detail_resp.json()
-        platforms = detail.get("platforms", {})
-        market_data = detail.get("market_data", {})
+            name = detail.get("name", symbol)
+            platforms = detail.get("platforms", {})
+            coin_platform_map.put(symbol, coin_id, name, platforms)
+            market_data = detail.get("market_data", {})
+            price = market_data.get("current_price", {}).get("usd", 0)
 
         # 確定主要鏈
         chain = "unknown"
@@ -151,10 +156,10 @@ def _get_token_chain_info(symbol: str) -> dict:
 
         return {
             "id": coin_id,
-            "name": detail.get("name", symbol),
+            "name": name,
             "symbol": symbol,
             "chain": chain,
-            "price": market_data.get("current_price", {}).get("usd", 0),
+            "price": price,
             "platforms": platforms,
         }
 
@@ -162,17 +167,23 @@ def _get_token_chain_info(symbol: str) -> dict:
         return {"chain": "unknown", "price": 0}
 
 
+def _get_coingecko_price(coin_id: str) -> float:
+    """以 CoinGecko id 查詢 USD 價格（快取 30 秒）"""
+    data = cached_get_json(
+        "coingecko_price",
+        f"{COINGECKO_BASE}/simple/price",
+        {"ids": coin_id, "vs_currencies": "usd"},
+        timeout=5,
+    )
+    return (data or {}).get(coin_id, {}).get("usd", 0)
+
+
 def _get_current_price(symbol: str) -> float:
     """獲取代幣當前價格"""
     try:
-        resp = httpx.get(
-            f"https://api.coingecko.com/api/v3/simple/price?ids={symbol.lower()}&vs_currencies=usd",
-            timeout=5,
-        )
-        if resp.status_code == 200:
-            data = resp.json()
-            if symbol.lower() in data:
-                return data[symbol.lower()].get("usd", 0)
+        price = _get_coingecko_price(symbol.lower())
+        if price:
+            return price
     except Exception:
         pass
 
@@ -181,6 +192,25 @@ def _get_current_price(symbol: str) -> float:
     return info.get("price", 0) if info else 0
 
 
+def _format_indexed_whale_tx(scanner, min_value_usd: int) -> str:
+    """以背景掃描器的索引回答鯨魚交易查詢"""
+    symbol = scanner.symbol
+    floor = max(min_value_usd, scanner.min_usd)
+    whale_txs = whale_scanner.whale_index.top(symbol, floor, limit=5)
+    if not whale_txs:
+        return f"## 🐋 {symbol} 鯨魚交易\n\n近期未發現 >{floor / 1_000_000:.1f}M USD 的轉帳。"
+
+    result = f"## 🐋 {symbol} 鯨魚交易 (>{floor / 1_000_000:.1f}M USD)\n\n"
+    for i, tx in enumerate(whale_txs, 1):
+        result += (
+            f"{i}. **{tx.amount:,.4f} {symbol}** (~${tx.value_usd / 1_000_000:.1f}M)\n"
+        )
+    if floor > min_value_usd:
+        result += f"\n索引僅收錄 >{scanner.min_usd / 1_000_000:.1f}M USD 的轉帳。\n"
+    result += f"\n*(來源: {scanner.source} | {symbol}: ${scanner.price:,.0f})*"
+    return result
+
+
 def _fetch_btc_whale_tx(min_value_usd: int) -> str:
     """獲取 BTC 鯨魚交易"""
     try:
@@ -377,7 +407,7 @@ def get_exchange_flow(symbol: str = "BTC") -> str:
 
 *(價格來源: CoinGecko)*"""
 
-        set_cached_data(cache_key, result)
+        set_cached_data(cache_key, result, 300)
         return result
 
     except Exception as e:
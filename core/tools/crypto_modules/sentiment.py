@@ -3,35 +3,19 @@
 Fear & Greed Index, Trending Tokens, Futures Data, Current Time
 """
 
-import time
-from typing import Dict
-
 import httpx
 from langchain_core.tools import tool
 
-_COINGECKO_CACHE: Dict = {}
-
-
-def _get_cached_coingecko_data(key: str, ttl_seconds: int = 300):
-    if key in _COINGECKO_CACHE:
-        timestamp, data = _COINGECKO_CACHE[key]
-        if time.time() - timestamp < ttl_seconds:
-            return data
-    return None
-
-
-def _set_cached_coingecko_data(key: str, data):
-    _COINGECKO_CACHE[key] = (time.time(), data)
+from .common import FEAR_GREED_URL, cached_get_json, get_cached_data, set_cached_data
 
 
 @tool
 def get_fear_and_greed_index() -> str:
     """獲取加密貨幣市場全域的恐慌與貪婪指數 (Fear and Greed Index)"""
     try:
-        resp = httpx.get("https://api.alternative.me/fng/?limit=1", timeout=10)
-        if resp.status_code == 200:
-            data = resp.json()
-            if data and "data" in data and len(data["data"]) > 0:
+        data = cached_get_json("fear_greed", FEAR_GREED_URL)
+        if data:
+            if "data" in data and len(data["data"]) > 0:
                 current = data["data"][0]
                 val = str(current.get("value")).strip()
                 classification = str(current.get("value_classification")).strip()
@@ -45,7 +29,7 @@ def get_fear_and_greed_index() -> str:
 def get_trending_tokens() -> str:
     """獲取目前全網最熱門搜尋的加密貨幣 (Trending Tokens)"""
     cache_key = "trending_tokens"
-    cached_data = _get_cached_coingecko_data(cache_key, 300)
+    cached_data = get_cached_data(cache_key, 300)
     if cached_data:
         return cached_data
 
@@ -66,7 +50,7 @@ def get_trending_tokens() -> str:
                 result += f"{i}. **{symbol}** ({name}) - 市值排名: {market_cap_rank}\n"
 
             final_output = result + "\n*(資料來源: CoinGecko)*"
-            _set_cached_coingecko_data(cache_key, final_output)
+            set_cached_data(cache_key, final_output, 300)
             return final_output
         return "目前無法連線到 CoinGecko API。"
     except Exception as e:
@@ -12,6 +12,8 @@ from __future__ import annotations
 import re
 from typing import Dict, Optional
 
+from core.coin_registry import coin_registry
+
 from .tw_symbol_resolver import TWSymbolResolver
 
 _KNOWN_CRYPTO = {
@@ -92,7 +94,13 @@ class UniversalSymbolResolver:
         candidates: Dict[str, dict] = {}
         boosts = self._collect_market_hint_boosts(context_text)
 
-        if upper in _KNOWN_CRYPTO:
+        # Top-ranked registry symbols include plain tickers ("S", "A"), so
+        # they only displace a US ticker reading when the context says crypto
+        known_crypto = upper in _KNOWN_CRYPTO or (
+            coin_registry.is_major(upper)
+            and (boosts["crypto"] > 0 or not _US_PATTERN.match(upper))
+        )
+        if known_crypto:
             candidates["crypto"] = {
                 "symbol": upper,
                 "score": min(1.0, _BASE_SCORES["crypto"] + boosts["crypto"]),
@@ -134,7 +142,7 @@ class UniversalSymbolResolver:
             and not candidates.get("crypto")
             and s == upper
             and _US_PATTERN.match(upper)
-            and upper not in _KNOWN_CRYPTO
+            and not known_crypto
         ):
             us_score = _BASE_SCORES["us_ticker"] + boosts["us"]
             if _TW_CODE_PATTERN.match(s):
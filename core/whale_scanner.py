@@ -0,0 +1,385 @@
+"""
+Background whale-transfer scanners with per-chain cursors.
+
+``get_whale_transactions`` used to download the latest unconfirmed BTC
+transactions on every tool call and filter them in Python.  Instead, one
+scanner per chain polls its source every WHALE_SCAN_INTERVAL seconds,
+ingests only what is new since its cursor, and files transfers worth at
+least WHALE_SCAN_MIN_USD into ``whale_index``; tool calls read the index.
+
+Scanners:
+  BitcoinMempoolScanner  blockchain.info unconfirmed-transactions feed; the
+                         cursor is the newest tx hash already ingested, and
+                         a page is read only up to it
+  EvmBlockScanner        public JSON-RPC (no API key): the cursor is the last
+                         block number processed; each poll walks to the head
+                         in batched requests of RPC_BATCH_BLOCKS blocks, up
+                         to MAX_BLOCKS_PER_POLL; native ETH / BNB transfers
+                         only (token transfers would need logs)
+
+Index:
+  ``WhaleIndex`` keeps, per token, a ring buffer of the last
+  WHALE_INDEX_CAPACITY transfers plus a list of the same entries sorted by
+  USD value, so "largest transfers above X" is a bisect and a short slice.
+
+Every worker runs its own scanners (``whale_scanner_task``, started from
+api/lifespan.py).  A scanner is ``ready`` after its first successful poll;
+until then the tool falls back to the direct fetch.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left, insort
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# ── Configuration ────────────────────────────────────────────────────────────
+SCAN_INTERVAL = float(os.getenv("WHALE_SCAN_INTERVAL", "20"))
+SCAN_MIN_USD = float(os.getenv("WHALE_SCAN_MIN_USD", "100000"))
+INDEX_CAPACITY = int(os.getenv("WHALE_INDEX_CAPACITY", "500"))
+SCAN_CHAINS = os.getenv("WHALE_SCAN_CHAINS", "bitcoin,ethereum,bsc")
+BTC_API_BASE = os.getenv("WHALE_BTC_API_BASE", "https://blockchain.info")
+ETH_RPC_URL = os.getenv("WHALE_ETH_RPC_URL", "https://ethereum-rpc.publicnode.com")
+BSC_RPC_URL = os.getenv("WHALE_BSC_RPC_URL", "https://bsc-rpc.publicnode.com")
+# Blocks fetched per batched JSON-RPC request and walked per poll at most;
+# a scanner further behind than MAX_LAG skips ahead and counts what it skipped
+RPC_BATCH_BLOCKS = int(os.getenv("WHALE_RPC_BATCH_BLOCKS", "10"))
+MAX_BLOCKS_PER_POLL = int(os.getenv("WHALE_MAX_BLOCKS_PER_POLL", "200"))
+MAX_LAG = int(os.getenv("WHALE_MAX_LAG", "1000"))
+# Hashes remembered to drop repeats when the feed reorders
+SEEN_HASHES = 5000
+
+
+class WhaleTransfer(NamedTuple):
+    chain: str
+    symbol: str
+    tx_hash: str
+    amount: float
+    value_usd: float
+    seen_at: float
+    block: Optional[int] = None
+
+
+class _TokenRing:
+    __slots__ = ("ring", "by_value", "seq")
+
+    def __init__(self):
+        self.ring: deque = deque()
+        # (value_usd, seq, transfer), ascending
+        self.by_value: list = []
+        self.seq = 0
+
+
+class WhaleIndex:
+    """Bounded per-token ring buffer of transfers, also ordered by USD value."""
+
+    def __init__(self, capacity: int = INDEX_CAPACITY):
+        self.capacity = capacity
+        self._tokens: Dict[str, _TokenRing] = {}
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, transfer: WhaleTransfer) -> bool:
+        """File a transfer; False if this hash was already seen."""
+        key = f"{transfer.chain}:{transfer.tx_hash}"
+        with self._lock:
+            if key in self._seen:
+                return False
+            self._seen[key] = None
+            if len(self._seen) > SEEN_HASHES:
+                self._seen.popitem(last=False)
+
+            token = self._tokens.setdefault(transfer.symbol, _TokenRing())
+            token.seq += 1
+            entry = (transfer.value_usd, token.seq, transfer)
+            token.ring.append(entry)
+            insort(token.by_value, entry)
+            if len(token.ring) > self.capacity:
+                old = token.ring.popleft()
+                del token.by_value[bisect_left(token.by_value, old[:2])]
+            return True
+
+    def top(
+        self, symbol: str, min_value_usd: float = 0, limit: int = 5
+    ) -> List[WhaleTransfer]:
+        """Largest transfers of symbol worth at least min_value_usd."""
+        with self._lock:
+            token = self._tokens.get(symbol.upper())
+            if token is None:
+                return []
+            start = bisect_left(token.by_value, (min_value_usd,))
+            hits = token.by_value[start:][-limit:]
+        return [entry[2] for entry in reversed(hits)]
+
+    def recent(self, symbol: str, limit: int = 5) -> List[WhaleTransfer]:
+        with self._lock:
+            token = self._tokens.get(symbol.upper())
+            if token is None:
+                return []
+            return [entry[2] for entry in list(token.ring)[-limit:]][::-1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tokens.clear()
+            self._seen.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "tokens": {s: len(t.ring) for s, t in self._tokens.items()},
+            }
+
+
+def _coingecko_price(price_id: str) -> float:
+    from core.tools.crypto_modules.common import COINGECKO_BASE, cached_get_json
+
+    data = cached_get_json(
+        "coingecko_price",
+        f"{COINGECKO_BASE}/simple/price",
+        {"ids": price_id, "vs_currencies": "usd"},
+        timeout=5,
+    )
+    return float((data or {}).get(price_id, {}).get("usd", 0) or 0)
+
+
+class _Scanner(ABC):
+    chain: str
+    symbol: str
+    price_id: str
+    source: str
+
+    def __init__(
+        self,
+        index: "WhaleIndex",
+        client: Optional[httpx.Client] = None,
+        price_fn: Callable[[str], float] = _coingecko_price,
+        min_usd: float = SCAN_MIN_USD,
+    ):
+        self.index = index
+        self.client = client or httpx.Client(timeout=15)
+        self.price_fn = price_fn
+        self.min_usd = min_usd
+        self.ready = False
+        self.last_poll: Optional[float] = None
+        self.price = 0.0
+        self.ingested = 0
+
+    def poll(self) -> int:
+        """Ingest everything new since the cursor; returns transfers filed."""
+        self.price = self.price_fn(self.price_id) or self.price
+        if not self.price:
+            raise RuntimeError(f"no {self.symbol} price")
+        added = self._poll()
+        self.ingested += added
+        self.ready = True
+        self.last_poll = time.time()
+        return added
+
+    @abstractmethod
+    def _poll(self) -> int:
+        """Ingest from the source past the cursor; returns transfers filed."""
+
+    def _file(self, tx_hash: str, amount: float, block: Optional[int] = None) -> bool:
+        value_usd = amount * self.price
+        if value_usd < self.min_usd:
+            return False
+        return self.index.add(
+            WhaleTransfer(
+                self.chain, self.symbol, tx_hash, amount, value_usd, time.time(), block
+            )
+        )
+
+    def stats(self) -> dict:
+        return {
+            "ready": self.ready,
+            "last_poll": self.last_poll,
+            "ingested": self.ingested,
+            "price": self.price,
+        }
+
+
+class BitcoinMempoolScanner(_Scanner):
+    chain = "bitcoin"
+    symbol = "BTC"
+    price_id = "bitcoin"
+    source = "Blockchain.com"
+
+    def __init__(self, index, base_url: str = BTC_API_BASE, **kwargs):
+        super().__init__(index, **kwargs)
+        self.base_url = base_url.rstrip("/")
+        self.cursor: Optional[str] = None
+
+    def _poll(self) -> int:
+        resp = self.client.get(
+            f"{self.base_url}/unconfirmed-transactions", params={"format": "json"}
+        )
+        resp.raise_for_status()
+        txs = resp.json().get("txs", [])
+        added = 0
+        # Newest first: stop at the last hash ingested by the previous poll
+        for tx in txs:
+            tx_hash = tx.get("hash", "")
+            if tx_hash == self.cursor:
+                break
+            # The largest output is the transfer; the rest is usually change
+            largest = max((out.get("value", 0) for out in tx.get("out", [])), default=0)
+            added += self._file(tx_hash, largest / 100_000_000)
+        if txs:
+            self.cursor = txs[0].get("hash") or self.cursor
+        return added
+
+    def stats(self) -> dict:
+        return {**super().stats(), "cursor": self.cursor}
+
+
+class EvmBlockScanner(_Scanner):
+    def __init__(
+        self, index, chain: str, symbol: str, price_id: str, rpc_url: str, **kwargs
+    ):
+        super().__init__(index, **kwargs)
+        self.chain = chain
+        self.symbol = symbol
+        self.price_id = price_id
+        self.source = "JSON-RPC"
+        self.rpc_url = rpc_url
+        self.cursor: Optional[int] = None
+        self.skipped_blocks = 0
+        self._rpc_id = 0
+
+    def _call(self, method: str, params: list) -> dict:
+        self._rpc_id += 1
+        return {
+            "jsonrpc": "2.0",
+            "id": self._rpc_id,
+            "method": method,
+            "params": params,
+        }
+
+    def _rpc(self, method: str, params: list):
+        return self._rpc_batch([(method, params)])[0]
+
+    def _rpc_batch(self, calls: List[tuple]) -> list:
+        """Send several calls in one JSON-RPC batch; results in call order."""
+        payload = [self._call(method, params) for method, params in calls]
+        resp = self.client.post(
+            self.rpc_url, json=payload if len(payload) > 1 else payload[0]
+        )
+        resp.raise_for_status()
+        body = resp.json()
+        # Batch replies may come back in any order
+        replies = {r.get("id"): r for r in (body if isinstance(body, list) else [body])}
+        results = []
+        for call in payload:
+            reply = replies.get(call["id"])
+            if reply is None or reply.get("error"):
+                error = reply.get("error") if reply else "missing reply"
+                raise RuntimeError(f"{call['method']}: {error}")
+            results.append(reply.get("result"))
+        return results
+
+    def _poll(self) -> int:
+        head = int(self._rpc("eth_blockNumber", []), 16)
+        if self.cursor is None:
+            self.cursor = head - 1
+        elif head - self.cursor > MAX_LAG:
+            # Too far behind to catch up: skip ahead, but say what was missed
+            skipped = head - MAX_LAG - self.cursor
+            self.skipped_blocks += skipped
+            logger.warning(
+                "[WhaleScanner] %s: %d blocks behind, skipping blocks %d-%d",
+                self.chain,
+                head - self.cursor,
+                self.cursor + 1,
+                head - MAX_LAG,
+            )
+            self.cursor = head - MAX_LAG
+        added = 0
+        end = min(head, self.cursor + MAX_BLOCKS_PER_POLL)
+        while self.cursor < end:
+            numbers = range(
+                self.cursor + 1, min(end, self.cursor + RPC_BATCH_BLOCKS) + 1
+            )
+            blocks = self._rpc_batch(
+                [("eth_getBlockByNumber", [hex(n), True]) for n in numbers]
+            )
+            for number, block in zip(numbers, blocks):
+                if block is None:
+                    # Not visible on this node yet; retry from here next poll
+                    return added
+                for tx in block.get("transactions", []):
+                    amount = int(tx.get("value", "0x0"), 16) / 1e18
+                    added += self._file(tx["hash"], amount, number)
+                self.cursor = number
+        return added
+
+    def stats(self) -> dict:
+        return {
+            **super().stats(),
+            "cursor": self.cursor,
+            "skipped_blocks": self.skipped_blocks,
+        }
+
+
+whale_index = WhaleIndex()
+_scanners: Dict[str, _Scanner] = {}
+
+
+def build_scanners(
+    chains: str = SCAN_CHAINS, index: WhaleIndex = whale_index, **kwargs
+) -> Dict[str, _Scanner]:
+    """Scanners keyed by the token symbol they cover."""
+    scanners: Dict[str, _Scanner] = {}
+    for chain in (c.strip() for c in chains.split(",") if c.strip()):
+        if chain == "bitcoin":
+            scanners["BTC"] = BitcoinMempoolScanner(index, **kwargs)
+        elif chain == "ethereum":
+            scanners["ETH"] = EvmBlockScanner(
+                index, "ethereum", "ETH", "ethereum", ETH_RPC_URL, **kwargs
+            )
+        elif chain == "bsc":
+            scanners["BNB"] = EvmBlockScanner(
+                index, "bsc", "BNB", "binancecoin", BSC_RPC_URL, **kwargs
+            )
+        else:
+            logger.warning("[WhaleScanner] Unknown chain %r ignored", chain)
+    return scanners
+
+
+def scanner_for(symbol: str) -> Optional[_Scanner]:
+    """The running scanner covering symbol, once it has polled successfully."""
+    scanner = _scanners.get(symbol.upper())
+    return scanner if scanner is not None and scanner.ready else None
+
+
+def stats() -> dict:
+    return {
+        "index": whale_index.stats(),
+        "scanners": {s: scanner.stats() for s, scanner in _scanners.items()},
+    }
+
+
+async def whale_scanner_task() -> None:
+    """Poll every configured chain forever."""
+    _scanners.update(build_scanners())
+    while True:
+        for symbol, scanner in list(_scanners.items()):
+            try:
+                added = await asyncio.to_thread(scanner.poll)
+                if added:
+                    logger.debug("[WhaleScanner] %s: %d new transfers", symbol, added)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("[WhaleScanner] %s poll failed: %s", symbol, exc)
+        await asyncio.sleep(SCAN_INTERVAL)
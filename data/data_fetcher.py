@@ -7,6 +7,7 @@ from cachetools import TTLCache
 from dotenv import load_dotenv
 
 from api.utils import logger
+from core.coin_registry import coin_registry
 
 # Load environment variables from .env file
 load_dotenv()
@@ -132,6 +133,11 @@ class BinanceDataFetcher:
         Checks if a given symbol is available on Binance for the specified market type.
         Raises SymbolNotFoundError if the symbol is not found.
         """
+        # Listed in the local coin registry: skip the weight-40 /exchangeInfo call.
+        # Unknown symbols still go to the API so new listings are not rejected.
+        if market_type == "spot" and coin_registry.is_listed("binance", symbol):
+            return True
+
         base_url = (
             self.spot_base_url if market_type == "spot" else self.futures_base_url
         )
@@ -522,6 +528,10 @@ class OkxDataFetcher:
         Checks if a given symbol is available on OKX.
         Raises SymbolNotFoundError if the symbol is not found.
         """
+        # Listed in the local coin registry: no instruments round-trip needed
+        if inst_type == "SPOT" and coin_registry.is_listed("okx", symbol):
+            return True
+
         endpoint = "/public/instruments"
         params = {"instType": inst_type, "instId": symbol}
 
@@ -0,0 +1,139 @@
+"""
+Benchmark: process memory and resume latency of the manager checkpointer at
+thousands of concurrent sessions
+
+Runs a small StateGraph (messages accumulate, a few scalar channels change per
+turn, like ManagerState) for N sessions x T turns and then resumes every
+session once.
+
+    baseline   — one MemorySaver per session (old _per_user_checkpointer)
+    persistent — shared PersistentCheckpointSaver through ScopedCheckpointer,
+                 SQLite file backend, hot LRU at its configured size
+
+Memory is the tracemalloc peak/retained size of Python objects; the SQLite
+file size is reported separately since it lives on disk.
+
+Usage:
+    python scripts/bench_checkpointer.py [--sessions 5000] [--turns 4]
+                                         [--hot-entries 512]
+"""
+
+import argparse
+import asyncio
+import operator
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Annotated, TypedDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class State(TypedDict):
+    messages: Annotated[list, operator.add]
+    phase: str
+    turn: int
+
+
+def _build():
+    from langgraph.graph import END, StateGraph
+
+    def respond(state):
+        turn = state.get("turn", 0) + 1
+        reply = f"assistant reply {turn}: " + "lorem ipsum " * 40
+        return {"messages": [reply], "phase": f"done-{turn}", "turn": turn}
+
+    builder = StateGraph(State)
+    builder.add_node("respond", respond)
+    builder.set_entry_point("respond")
+    builder.add_edge("respond", END)
+    return builder
+
+
+async def _run_phase(name, sessions, turns, make_checkpointer, after=None):
+    builder = _build()
+    tracemalloc.start()
+    checkpointers = {}
+
+    for turn in range(turns):
+        for s in range(sessions):
+            cp = checkpointers.get(s) or make_checkpointer(s)
+            checkpointers[s] = cp
+            graph = builder.compile(checkpointer=cp)
+            await graph.ainvoke(
+                {"messages": [f"user message {turn}"]},
+                {"configurable": {"thread_id": f"s{s}"}},
+            )
+
+    retained, peak = tracemalloc.get_traced_memory()
+    latencies = []
+    for s in range(sessions):
+        graph = builder.compile(checkpointer=checkpointers[s])
+        start = time.perf_counter()
+        state = await graph.aget_state({"configurable": {"thread_id": f"s{s}"}})
+        latencies.append((time.perf_counter() - start) * 1000)
+        assert len(state.values["messages"]) == 2 * turns
+    tracemalloc.stop()
+
+    latencies.sort()
+    print(f"\n== {name} ==")
+    print(f"sessions x turns  : {sessions} x {turns}")
+    print(f"retained memory   : {retained / 1024 / 1024:.1f} MiB")
+    print(f"peak memory       : {peak / 1024 / 1024:.1f} MiB")
+    print(
+        f"resume p50/p99    : {statistics.median(latencies):.3f} / "
+        f"{latencies[int(0.99 * (len(latencies) - 1))]:.3f} ms"
+    )
+    if after:
+        after()
+
+
+async def main(sessions, turns, hot_entries):
+    from langgraph.checkpoint.memory import MemorySaver
+
+    from core.agents.checkpointer import (
+        PersistentCheckpointSaver,
+        ScopedCheckpointer,
+        _SQLiteBackend,
+    )
+
+    await _run_phase(
+        "baseline (MemorySaver per session)",
+        sessions,
+        turns,
+        lambda s: MemorySaver(),
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "checkpoints.db")
+        saver = PersistentCheckpointSaver(
+            _SQLiteBackend(path), hot_max_entries=hot_entries
+        )
+
+        def report():
+            stats = saver.stats()
+            print(
+                f"hot entries/bytes : {stats['hot_entries']} / {stats['hot_bytes']:,}"
+            )
+            print(f"hot hits/misses   : {stats['hot_hits']} / {stats['hot_misses']}")
+            print(f"sqlite file       : {os.path.getsize(path) / 1024 / 1024:.1f} MiB")
+
+        await _run_phase(
+            f"persistent (SQLite, hot LRU {hot_entries})",
+            sessions,
+            turns,
+            lambda s: ScopedCheckpointer(saver, f"bench-user:{s}"),
+            after=report,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--hot-entries", type=int, default=512)
+    args = parser.parse_args()
+    asyncio.run(main(args.sessions, args.turns, args.hot_entries))
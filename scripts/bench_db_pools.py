@@ -0,0 +1,127 @@
+"""
+Benchmark: legacy psycopg2 pool vs. unified async engine for DatabaseBase
+
+Runs the same concurrent workload twice against a live PostgreSQL
+(DATABASE_URL / POSTGRESQL_*):
+
+    legacy  — DatabaseBase.query_one via run_sync (thread executor + psycopg2),
+              with an ORM query alongside, as request handlers do today
+    unified — DatabaseBase.aquery_one on the shared async engine
+
+and reports p50/p95 latency plus the pooled connections held by this process
+(i.e. one worker) at the end of each phase, both from the pools' own counters
+and from pg_stat_activity.  Run against an otherwise idle database so the
+server-side count reflects this process only.
+
+Usage:
+    python scripts/bench_db_pools.py [--requests 2000] [--concurrency 50]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+QUERY = "SELECT COUNT(*) AS n FROM users WHERE user_id = %s"
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _count_backend_connections() -> int:
+    """Client connections to the current database, excluding this probe."""
+    import psycopg2
+
+    from core.database.connection import get_database_url
+
+    conn = psycopg2.connect(get_database_url())
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT COUNT(*) FROM pg_stat_activity "
+                "WHERE datname = current_database() AND pid <> pg_backend_pid()"
+            )
+            return cur.fetchone()[0]
+    finally:
+        conn.close()
+
+
+async def _run_phase(name, handler, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def _one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await handler(f"bench-user-{i % 100}")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[_one(i) for i in range(requests)])
+    elapsed = time.perf_counter() - started
+
+    from core.database.bridge import get_pool_stats
+
+    stats = get_pool_stats()
+    print(f"\n== {name} ==")
+    print(f"requests        : {requests} (concurrency {concurrency})")
+    print(f"throughput      : {requests / elapsed:,.0f} req/s")
+    print(
+        f"latency p50/p95 : {statistics.median(latencies):.2f} / "
+        f"{_percentile(latencies, 95):.2f} ms"
+    )
+    print(
+        f"pool connections: {stats['total_connections']}  "
+        f"(async={stats['async_engine']}, psycopg2={stats['psycopg2']})"
+    )
+    print(f"pg_stat_activity: {_count_backend_connections()}")
+
+
+async def main(requests: int, concurrency: int):
+    from sqlalchemy import text
+
+    from api.utils import run_sync
+    from core.database import close_all_connections
+    from core.database.base import DatabaseBase
+    from core.database.bridge import bind_event_loop
+    from core.orm.session import close_async_engine, get_session_factory
+
+    bind_event_loop()
+
+    async def legacy_handler(user_id):
+        await run_sync(DatabaseBase.query_one, QUERY, (user_id,))
+        async with get_session_factory()() as session:
+            await session.execute(text("SELECT 1"))
+
+    async def unified_handler(user_id):
+        await DatabaseBase.aquery_one(QUERY, (user_id,))
+        async with get_session_factory()() as session:
+            await session.execute(text("SELECT 1"))
+
+    os.environ["DB_UNIFIED_ENGINE"] = "false"
+    await _run_phase(
+        "legacy (psycopg2 + async engine)", legacy_handler, requests, concurrency
+    )
+    close_all_connections()
+    await close_async_engine()
+
+    os.environ["DB_UNIFIED_ENGINE"] = "true"
+    await _run_phase(
+        "unified (async engine only)", unified_handler, requests, concurrency
+    )
+    await close_async_engine()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
@@ -0,0 +1,201 @@
+"""
+Benchmark: futunn crawler throughput, sequential vs pooled pipeline
+
+Generates a static fixture site (an index page linking N article pages, each
+with images and a web font) and serves it locally with --latency-ms per
+response, then crawls it two ways:
+
+    sequential — the previous loop: one fresh page per article, full
+                 resource loading, fixed 1200 ms wait, summaries in-line
+    pooled     — web_crawler2.crawl: --pages reusable pages, images/fonts/
+                 media aborted, network-idle wait, batch summaries running
+                 concurrently with fetching
+
+Summaries come from a fake chain that sleeps --llm-ms per article, so no API
+key is needed.  Reports articles/minute for each path, then asks the pooled
+run's state file which links a resumed crawl would still fetch (none).
+
+Requires playwright (with chromium installed) and trafilatura.
+
+Usage:
+    python scripts/bench_futunn_crawler.py [--articles 40] [--pages 4]
+                                           [--latency-ms 150] [--llm-ms 800]
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "web_crawler"
+    ),
+)
+
+PARAGRAPH = (
+    "市場今日震盪整理，成交量較前一交易日放大，資金明顯流向半導體與人工智慧相關個股。"
+    "分析師認為，在利率路徑明朗之前，指數仍將維持區間走勢，短線宜留意財報公布後的波動。"
+)
+
+
+def build_site(root: Path, articles: int) -> None:
+    """Index page plus article pages that pull in images and a font."""
+    post = root / "post"
+    post.mkdir(parents=True)
+    (root / "img").mkdir()
+    (root / "font.woff2").write_bytes(os.urandom(64 * 1024))
+    links = []
+    for i in range(1, articles + 1):
+        (root / "img" / f"{i}.jpg").write_bytes(os.urandom(200 * 1024))
+        # Each article body is distinct so content hashes do not collide
+        body = "".join(f"<p>{PARAGRAPH}（第 {i} 篇，第 {n} 段）</p>" for n in range(8))
+        (post / f"{i}.html").write_text(
+            "<html><head><meta charset='utf-8'>"
+            f"<title>測試文章 {i}</title>"
+            "<style>@font-face{font-family:f;src:url(/font.woff2)}"
+            "body{font-family:f}</style></head><body><article>"
+            f"<h1>測試文章 {i}</h1><img src='/img/{i}.jpg'>{body}"
+            "</article></body></html>",
+            encoding="utf-8",
+        )
+        links.append(f"<a href='/post/{i}.html'>測試文章 {i}</a>")
+    (root / "index.html").write_text(
+        "<html><head><meta charset='utf-8'></head><body>"
+        + "".join(links)
+        + "</body></html>",
+        encoding="utf-8",
+    )
+
+
+class SlowHandler(SimpleHTTPRequestHandler):
+    latency = 0.0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(root: Path, latency_ms: int) -> ThreadingHTTPServer:
+    SlowHandler.latency = latency_ms / 1000
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0), partial(SlowHandler, directory=str(root))
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fake_chain(llm_ms: int):
+    from langchain_core.runnables import RunnableLambda
+
+    def summarize(payload):
+        time.sleep(llm_ms / 1000)
+        return f"摘要：{payload['title']}"
+
+    async def asummarize(payload):
+        await asyncio.sleep(llm_ms / 1000)
+        return f"摘要：{payload['title']}"
+
+    return RunnableLambda(summarize, afunc=asummarize)
+
+
+async def run_sequential(context, links, chain, batch_size):
+    from summarize_futunn_posts import summarize_articles
+    from web_crawler2 import fetch_article_via_playwright
+
+    pending = []
+    done = 0
+    for it in links:
+        pending.append(await fetch_article_via_playwright(context, it["url"]))
+        if len(pending) >= batch_size:
+            summarize_articles(chain, pending)
+            done += len(pending)
+            pending = []
+    if pending:
+        summarize_articles(chain, pending)
+        done += len(pending)
+    return done
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--articles", type=int, default=40)
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--latency-ms", type=int, default=150)
+    parser.add_argument("--llm-ms", type=int, default=800)
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--summary-concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    from crawl_store import CrawlStore
+    from playwright.async_api import async_playwright
+    from web_crawler2 import block_heavy_resources, crawl
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        build_site(tmp / "site", args.articles)
+        server = serve(tmp / "site", args.latency_ms)
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        links = [
+            {"url": f"{base}/post/{i}.html", "title": f"測試文章 {i}"}
+            for i in range(1, args.articles + 1)
+        ]
+        chain = fake_chain(args.llm_ms)
+        crawl_args = SimpleNamespace(
+            pages=args.pages,
+            settle_ms=1200,
+            summary_batch_size=args.batch_size,
+            summary_concurrency=args.summary_concurrency,
+            summary_max_content_chars=6000,
+        )
+
+        print(
+            f"{args.articles} articles, {args.latency_ms} ms/response, "
+            f"{args.llm_ms} ms/summary, batch {args.batch_size}\n"
+        )
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+
+            context = await browser.new_context()
+            started = time.perf_counter()
+            done = await run_sequential(context, links, chain, args.batch_size)
+            seq = time.perf_counter() - started
+            await context.close()
+            print(f"  sequential  {seq:7.1f}s  {done * 60 / seq:7.1f} articles/min")
+
+            store = CrawlStore(tmp / "state.sqlite3")
+            context = await browser.new_context()
+            await context.route("**/*", block_heavy_resources)
+            started = time.perf_counter()
+            stats = await crawl(
+                context, links, crawl_args, store, io.StringIO(), None, chain
+            )
+            pooled = time.perf_counter() - started
+            print(
+                f"  pooled      {pooled:7.1f}s  "
+                f"{stats['fetched'] * 60 / pooled:7.1f} articles/min  "
+                f"({seq / pooled:.1f}x, {args.pages} pages)"
+            )
+
+            remaining = store.unseen(it["url"] for it in links)
+            print(f"  resume      {len(remaining)} of {len(links)} links left to fetch")
+            await context.close()
+            store.close()
+            await browser.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,266 @@
+"""
+Benchmark: governance cron jobs, per-row loops vs set-based statements
+
+Builds a scratch schema (bench_governance) in a live PostgreSQL
+(DATABASE_URL / POSTGRESQL_*) holding --users violation-point rows and
+--logs activity-log rows spread over the last --months months, once as a
+plain table and once partitioned by month, then times:
+
+    decrement — the previous job (SELECT the eligible users, then one
+                UPDATE + one log INSERT per user) vs the batched
+                UPDATE ... FROM ... RETURNING feeding INSERT ... SELECT
+    cleanup   — one DELETE of everything past retention vs dropping whole
+                expired partitions plus id-range chunked deletes
+    stats     — the three separate statistics queries vs the single query
+                on the partial index
+
+The scratch schema is dropped at the end unless --keep is given.
+
+Usage:
+    python scripts/bench_governance_cron.py [--users 200000] [--logs 1000000]
+                                            [--months 6] [--keep-days 90]
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database.governance.activity import (  # noqa: E402
+    delete_activity_logs_before,
+    drop_expired_activity_log_partitions,
+    ensure_activity_log_partitions,
+)
+from scripts.cron_governance import _DECREMENT_BATCH_SQL  # noqa: E402
+
+SCHEMA = "bench_governance"
+
+_POINTS_DDL = """
+    CREATE TABLE user_violation_points (
+        user_id TEXT PRIMARY KEY,
+        points INTEGER DEFAULT 0,
+        total_violations INTEGER DEFAULT 0,
+        last_violation_at TIMESTAMPTZ,
+        last_decrement_at TIMESTAMPTZ,
+        suspension_count INTEGER DEFAULT 0,
+        action_level TEXT DEFAULT 'none',
+        created_at TIMESTAMPTZ DEFAULT NOW(),
+        updated_at TIMESTAMPTZ DEFAULT NOW()
+    );
+    CREATE INDEX idx_user_violation_points_positive
+        ON user_violation_points (last_decrement_at, last_violation_at)
+        INCLUDE (points) WHERE points > 0;
+"""
+
+_LOG_COLUMNS = """
+    id BIGSERIAL,
+    user_id TEXT NOT NULL,
+    activity_type TEXT NOT NULL,
+    resource_type TEXT,
+    resource_id TEXT,
+    metadata JSONB,
+    ip_address TEXT,
+    user_agent TEXT,
+    success BOOLEAN DEFAULT TRUE,
+    error_message TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+"""
+
+
+def _connect():
+    import psycopg2
+
+    from core.database.connection import get_database_url
+
+    conn = psycopg2.connect(get_database_url())
+    with conn.cursor() as c:
+        c.execute(f"CREATE SCHEMA IF NOT EXISTS {SCHEMA}")
+        c.execute(f"SET search_path TO {SCHEMA}")
+    conn.commit()
+    return conn
+
+
+def _timed(label, fn):
+    started = time.perf_counter()
+    result = fn()
+    print(f"  {label:<34} {time.perf_counter() - started:8.2f}s  {result}")
+    return result
+
+
+def seed(conn, args, partitioned: bool):
+    c = conn.cursor()
+    c.execute("DROP TABLE IF EXISTS user_violation_points, user_activity_logs CASCADE")
+    c.execute(_POINTS_DDL)
+    # One user in four is eligible for a decrement
+    c.execute(
+        """
+        INSERT INTO user_violation_points
+            (user_id, points, total_violations, last_violation_at)
+        SELECT 'u' || g, 1 + g % 5, 1 + g % 5,
+               NOW() - (CASE WHEN g % 4 = 0 THEN 45 ELSE 5 END) * INTERVAL '1 day'
+        FROM generate_series(1, %s) g
+        """,
+        (args.users,),
+    )
+
+    if partitioned:
+        c.execute(
+            f"CREATE TABLE user_activity_logs ({_LOG_COLUMNS}, "
+            "PRIMARY KEY (id, created_at)) PARTITION BY RANGE (created_at)"
+        )
+        c.execute(
+            "CREATE TABLE user_activity_logs_default "
+            "PARTITION OF user_activity_logs DEFAULT"
+        )
+        # Monthly partitions reaching back over the whole seeded range
+        today = datetime.now(timezone.utc).date()
+        first = today.replace(day=1) - timedelta(days=31 * args.months)
+        ensure_activity_log_partitions(
+            c, months_ahead=args.months + 2, today=first.replace(day=1)
+        )
+    else:
+        c.execute(f"CREATE TABLE user_activity_logs ({_LOG_COLUMNS}, PRIMARY KEY (id))")
+    c.execute(
+        """
+        INSERT INTO user_activity_logs
+            (user_id, activity_type, resource_type, metadata, created_at)
+        SELECT 'u' || (g % %s), 'report_submitted', 'report',
+               jsonb_build_object('n', g),
+               NOW() - (g::FLOAT8 / %s) * %s * INTERVAL '1 day'
+        FROM generate_series(1, %s) g
+        ORDER BY 5
+        """,
+        (args.users, args.logs, args.months * 30, args.logs),
+    )
+    c.execute("CREATE INDEX ON user_activity_logs (user_id)")
+    c.execute("CREATE INDEX ON user_activity_logs (activity_type)")
+    c.execute("CREATE INDEX ON user_activity_logs (created_at)")
+    c.execute("ANALYZE user_violation_points")
+    c.execute("ANALYZE user_activity_logs")
+    conn.commit()
+
+
+def decrement_per_row(conn):
+    c = conn.cursor()
+    c.execute("""
+        SELECT user_id, points FROM user_violation_points
+        WHERE points > 0
+          AND (last_decrement_at IS NULL OR last_decrement_at < NOW() - INTERVAL '30 days')
+          AND (last_violation_at IS NULL OR last_violation_at < NOW() - INTERVAL '30 days')
+    """)
+    users = c.fetchall()
+    for user_id, points in users:
+        c.execute(
+            "UPDATE user_violation_points SET points = %s, last_decrement_at = NOW(), "
+            "updated_at = NOW() WHERE user_id = %s",
+            (points - 1, user_id),
+        )
+        c.execute(
+            "INSERT INTO user_activity_logs "
+            "(user_id, activity_type, resource_type, metadata, success, created_at) "
+            "VALUES (%s, 'points_decremented', 'violation_points', %s, TRUE, NOW())",
+            (user_id, f'{{"previous_points": {points}, "new_points": {points - 1}}}'),
+        )
+    conn.commit()
+    return f"{len(users)} users"
+
+
+def decrement_set_based(conn, batch_size):
+    c = conn.cursor()
+    total = 0
+    while True:
+        c.execute(_DECREMENT_BATCH_SQL, (batch_size,))
+        batch = c.rowcount
+        conn.commit()
+        total += batch
+        if batch < batch_size:
+            return f"{total} users"
+
+
+def cleanup_single_delete(conn, cutoff):
+    c = conn.cursor()
+    c.execute("DELETE FROM user_activity_logs WHERE created_at < %s", (cutoff,))
+    conn.commit()
+    return f"{c.rowcount} rows"
+
+
+def cleanup_partitioned(conn, cutoff):
+    c = conn.cursor()
+    dropped = drop_expired_activity_log_partitions(c, cutoff)
+    conn.commit()
+    deleted = delete_activity_logs_before(conn, cutoff)
+    return f"{len(dropped)} partitions (~{sum(r for _, r in dropped)} rows) + {deleted} rows"
+
+
+def stats_separate(conn):
+    c = conn.cursor()
+    c.execute("SELECT COUNT(*) FROM user_violation_points WHERE points > 0")
+    c.execute(
+        "SELECT SUM(points), AVG(points), MAX(points) FROM user_violation_points "
+        "WHERE points > 0"
+    )
+    c.execute(
+        "SELECT COUNT(*) FROM user_activity_logs "
+        "WHERE created_at > NOW() - INTERVAL '7 days'"
+    )
+    conn.commit()
+    return "3 queries"
+
+
+def stats_single(conn):
+    c = conn.cursor()
+    c.execute("""
+        SELECT COUNT(*), SUM(points), AVG(points), MAX(points),
+               (SELECT COUNT(*) FROM user_activity_logs
+                WHERE created_at > NOW() - INTERVAL '7 days')
+        FROM user_violation_points WHERE points > 0
+    """)
+    conn.commit()
+    return "1 query"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--logs", type=int, default=1_000_000)
+    parser.add_argument("--months", type=int, default=6)
+    parser.add_argument("--keep-days", type=int, default=90)
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema")
+    args = parser.parse_args()
+
+    conn = _connect()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=args.keep_days)
+    print(
+        f"{args.users:,} users, {args.logs:,} log rows over {args.months} months, "
+        f"retention {args.keep_days} days\n"
+    )
+    try:
+        print("== before (plain table, per-row loop, single DELETE) ==")
+        _timed("seed", lambda: seed(conn, args, partitioned=False))
+        _timed("decrement (per row)", lambda: decrement_per_row(conn))
+        _timed("stats (3 queries)", lambda: stats_separate(conn))
+        _timed("cleanup (single DELETE)", lambda: cleanup_single_delete(conn, cutoff))
+
+        print("\n== after (partitioned, set-based, partition drop) ==")
+        _timed("seed", lambda: seed(conn, args, partitioned=True))
+        _timed(
+            "decrement (UPDATE ... RETURNING)",
+            lambda: decrement_set_based(conn, args.batch_size),
+        )
+        _timed("stats (1 query)", lambda: stats_single(conn))
+        _timed("cleanup (drop + chunked)", lambda: cleanup_partitioned(conn, cutoff))
+    finally:
+        if not args.keep:
+            conn.rollback()
+            with conn.cursor() as c:
+                c.execute(f"DROP SCHEMA {SCHEMA} CASCADE")
+            conn.commit()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
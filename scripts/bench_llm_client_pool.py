@@ -0,0 +1,210 @@
+"""
+Benchmark: per-request LLM client overhead, fresh vs pooled
+
+Runs U concurrent users (default 500) against a local fake
+OpenAI-compatible server and compares, per chat request:
+
+    fresh   — the previous path: key query + Fernet decrypt for each
+              provider tried, then create_user_llm_client (init_chat_model)
+    pooled  — core.llm_client_pool: cached key map + pooled chat model
+
+The key store is simulated (--db-ms of latency per query, real Fernet
+decryption); the server answers every request after --server-ms.  Reported:
+overhead = time from request start until the client is ready (key lookup +
+client build), total latency, connections the server accepted, and peak
+sockets open at the same time.  Each path runs in its own process so neither
+inherits the other's keep-alive connections.
+
+Usage:
+    python scripts/bench_llm_client_pool.py [--users 500] [--requests 4]
+                                            [--db-ms 2] [--server-ms 20]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeOpenAIServer:
+    """Minimal HTTP/1.1 keep-alive server answering /v1/chat/completions."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.accepted = 0
+        self.open = 0
+        self.peak_open = 0
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._handle, "127.0.0.1", 0, backlog=4096
+        )
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+
+    async def _handle(self, reader, writer):
+        self.accepted += 1
+        self.open += 1
+        self.peak_open = max(self.peak_open, self.open)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                await reader.readexactly(length)
+                await asyncio.sleep(self.delay)
+                body = json.dumps(
+                    {
+                        "id": "chatcmpl-bench",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": "bench",
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {"role": "assistant", "content": "ok"},
+                                "finish_reason": "stop",
+                            }
+                        ],
+                        "usage": {
+                            "prompt_tokens": 1,
+                            "completion_tokens": 1,
+                            "total_tokens": 2,
+                        },
+                    }
+                ).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.open -= 1
+            writer.close()
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def _run(mode, users, requests, db_delay, encrypted):
+    from langchain_core.messages import HumanMessage
+
+    from api.user_llm import resolve_user_llm_credentials
+    from core import llm_client_pool
+    from utils.encryption import decrypt_api_key
+    from utils.user_client_factory import create_user_llm_client
+
+    async def get_user_api_key(user_id, provider):
+        await asyncio.sleep(db_delay)
+        return decrypt_api_key(encrypted) if provider == "openai" else None
+
+    async def get_user_api_keys(user_id):
+        await asyncio.sleep(db_delay)
+        return {"openai": decrypt_api_key(encrypted)}
+
+    async def fresh(user_id):
+        # The previous resolve_user_llm_credentials loop
+        for provider in ("openai",):
+            api_key = await get_user_api_key(user_id, provider)
+            if api_key:
+                return create_user_llm_client(provider, api_key)
+
+    async def pooled(user_id):
+        credentials = await resolve_user_llm_credentials({"user_id": user_id})
+        return llm_client_pool.get_user_llm_client(
+            user_id, credentials["provider"], credentials["api_key"]
+        )
+
+    overhead, latency = [], []
+
+    async def user(i):
+        for _ in range(requests):
+            start = time.perf_counter()
+            llm = await (pooled if mode == "pooled" else fresh)(f"user-{i}")
+            ready = time.perf_counter()
+            await llm.ainvoke([HumanMessage(content="hi")])
+            overhead.append((ready - start) * 1000)
+            latency.append((time.perf_counter() - start) * 1000)
+
+    llm_client_pool.clear()
+    with patch(
+        "core.orm.user_api_keys_repo.user_api_keys_repo.get_user_api_keys",
+        get_user_api_keys,
+    ):
+        start = time.perf_counter()
+        await asyncio.gather(*(user(i) for i in range(users)))
+        elapsed = time.perf_counter() - start
+    return overhead, latency, elapsed
+
+
+async def main_async(args):
+    from cryptography.fernet import Fernet
+
+    from utils import encryption
+
+    # In-memory encryption key: do not touch config/api_key_encryption.json
+    encryption._encryption_key_cache = Fernet.generate_key()
+    encrypted = encryption.encrypt_api_key("sk-bench-" + "x" * 40)
+
+    server = FakeOpenAIServer(args.server_ms / 1000)
+    port = await server.start()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+    overhead, latency, elapsed = await _run(
+        args.mode, args.users, args.requests, args.db_ms / 1000, encrypted
+    )
+    await server.stop()
+    total = args.users * args.requests
+    print(
+        f"{args.mode:<8}{statistics.median(overhead):>11.2f} ms"
+        f"{_percentile(overhead, 0.99):>8.2f} ms"
+        f"{statistics.median(latency):>10.1f} ms"
+        f"{_percentile(latency, 0.99):>8.1f} ms"
+        f"{total / elapsed:>9,.0f}{server.accepted:>10,}{server.peak_open:>11,}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=4)
+    parser.add_argument("--db-ms", type=float, default=2.0)
+    parser.add_argument("--server-ms", type=float, default=20.0)
+    parser.add_argument("--mode", choices=("fresh", "pooled"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.mode:
+        asyncio.run(main_async(args))
+        return
+
+    print(
+        f"{args.users} users x {args.requests} requests, key query "
+        f"{args.db_ms:g} ms, server {args.server_ms:g} ms\n"
+    )
+    print(
+        f"{'path':<8}{'overhead p50':>14}{'p99':>11}{'latency p50':>13}{'p99':>11}"
+        f"{'req/s':>9}{'accepted':>10}{'peak open':>11}"
+    )
+    for mode in ("fresh", "pooled"):
+        subprocess.run(
+            [sys.executable, os.path.abspath(__file__), *sys.argv[1:], "--mode", mode],
+            check=True,
+            stderr=subprocess.DEVNULL,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Benchmark: Market Pulse persistence, whole-dict blob vs per-symbol entries
+
+Simulates one refresh window over --symbols tracked symbols (~3 KB of
+synthetic pulse data each) and a reader in another worker, then reports:
+
+    write amplification — bytes sent to the cache per byte of changed pulse
+                          data: the previous refresh re-serialized the whole
+                          MARKET_PULSE dict every 10 symbols plus a final
+                          save (and the on-demand path once per symbol);
+                          entries are written once per updated symbol
+    read latency        — a reader catching up after --changed symbols were
+                          updated: GET + decode of the whole blob vs index
+                          read + MGET of the changed entries only
+
+Both run against an in-process Redis stand-in that counts bytes and charges
+--rtt ms per round trip (a pipeline or MGET is one).  The DB side is
+stubbed out: the upsert carries the same entry payloads as the Redis write,
+and the reader's DB index row (merged with the Redis hash) costs one more
+round trip of ~20 bytes per symbol, not timed here.
+
+Usage:
+    python scripts/bench_market_pulse_store.py [--symbols 300] [--changed 10]
+                                               [--rtt 0.2]
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.database import cache  # noqa: E402
+from core.database import market_pulse_store as store  # noqa: E402
+
+
+class MemoryRedis:
+    """decode_responses=True Redis subset; counts bytes written."""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.strings = {}
+        self.hashes = {}
+        self.bytes_written = 0
+        self._queued = False
+
+    def _trip(self):
+        if not self._queued and self.rtt:
+            time.sleep(self.rtt)
+
+    def get(self, key):
+        self._trip()
+        return self.strings.get(key)
+
+    def set(self, key, value):
+        self._trip()
+        self.bytes_written += len(key) + len(value.encode())
+        self.strings[key] = value
+
+    def setex(self, key, ttl, value):
+        self.set(key, value)
+
+    def expire(self, key, ttl):
+        self._trip()
+
+    def mget(self, keys):
+        self._trip()
+        return [self.strings.get(k) for k in keys]
+
+    def hset(self, key, mapping):
+        self._trip()
+        for field, value in mapping.items():
+            self.bytes_written += len(field) + len(str(value))
+            self.hashes.setdefault(key, {})[field] = str(value)
+
+    def hgetall(self, key):
+        self._trip()
+        return dict(self.hashes.get(key, {}))
+
+    def publish(self, channel, message):
+        self._trip()
+        self.bytes_written += len(message)
+
+    def pipeline(self, transaction=False):
+        self._queued = True
+        return self
+
+    def execute(self):
+        self._queued = False
+        self._trip()
+        return []
+
+    def ping(self):
+        return True
+
+
+def make_pulse(symbol: str, rng: random.Random) -> dict:
+    return {
+        "symbol": symbol,
+        "current_price": rng.uniform(0.01, 60_000),
+        "change_24h": rng.uniform(-20, 20),
+        "explanation": " ".join(
+            rng.choice(["price", "volume", "breakout", "funding", "ETF", "whale"])
+            for _ in range(250)
+        ),
+        "news_sources": [
+            {
+                "title": f"{symbol} headline {i} " + "x" * 60,
+                "url": f"https://news.example.com/{symbol.lower()}/{i}",
+                "source": "google",
+            }
+            for i in range(8)
+        ],
+        "indicators": {"rsi": rng.uniform(10, 90), "macd": rng.uniform(-5, 5)},
+        "signals": ["breakout"] if rng.random() < 0.3 else [],
+        "timestamp": "2026-01-01T00:00:00+00:00",
+    }
+
+
+def legacy_window(redis, pulse: dict, symbols: list) -> None:
+    """The previous refresh: blob save every 10 symbols plus a final save."""
+    current = {}
+    for i, symbol in enumerate(symbols, 1):
+        current[symbol] = pulse[symbol]
+        if i % 10 == 0:
+            redis.set(cache._redis_key("MARKET_PULSE"), json.dumps(current))
+    redis.set(cache._redis_key("MARKET_PULSE"), json.dumps(current))
+
+
+def legacy_read(redis) -> dict:
+    return json.loads(redis.get(cache._redis_key("MARKET_PULSE")))
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=300)
+    parser.add_argument("--changed", type=int, default=10)
+    parser.add_argument("--rtt", type=float, default=0.2, help="ms per round trip")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    symbols = [f"C{i:03d}" for i in range(args.symbols)]
+    pulse = {s: make_pulse(s, rng) for s in symbols}
+    payload = sum(len(json.dumps(p).encode()) for p in pulse.values())
+
+    legacy = MemoryRedis(args.rtt / 1000)
+    new = MemoryRedis(args.rtt / 1000)
+    print(
+        f"{args.symbols} symbols, {payload / args.symbols / 1024:.1f} KB each, "
+        f"{args.changed} changed before each read\n"
+    )
+
+    # Write amplification over one refresh window, and for one on-demand update
+    legacy_window(legacy, pulse, symbols)
+    legacy_full = legacy.bytes_written
+    legacy.bytes_written = 0
+    legacy.set(cache._redis_key("MARKET_PULSE"), json.dumps(pulse))
+    legacy_one = legacy.bytes_written
+
+    with (
+        patch.object(cache, "_init_redis"),
+        patch.object(cache, "_redis_client", new),
+        patch.object(cache, "_redis_available", True),
+        patch.object(store.DatabaseBase, "execute"),
+        patch.object(cache, "_db_get", return_value=None),
+    ):
+        for symbol in symbols:
+            store.save_market_pulse_entries({symbol: pulse[symbol]})
+        new_full = new.bytes_written
+        new.bytes_written = 0
+        store.save_market_pulse_entries({symbols[0]: pulse[symbols[0]]})
+        new_one = new.bytes_written
+        one_size = len(json.dumps(pulse[symbols[0]]).encode())
+
+        print(
+            f"write  window    blob {legacy_full / 1e6:8.2f} MB "
+            f"({legacy_full / payload:5.1f}x)   "
+            f"entries {new_full / 1e6:6.2f} MB ({new_full / payload:4.2f}x)"
+        )
+        print(
+            f"write  1 symbol  blob {legacy_one / 1e3:8.1f} KB "
+            f"({legacy_one / one_size:5.1f}x)   "
+            f"entries {new_one / 1e3:6.1f} KB ({new_one / one_size:4.2f}x)"
+        )
+
+        # Reader catching up after a few symbols changed
+        known = store.load_market_pulse_index()
+
+        def new_read():
+            changed = rng.sample(symbols, args.changed)
+            stale = dict(known)
+            for s in changed:
+                stale[s] = 0
+            store.load_market_pulse_entries(stale)
+
+        old_read_t = timed(lambda: legacy_read(legacy), args.repeat)
+        new_read_t = timed(new_read, args.repeat)
+        print(
+            f"read   catch-up  blob {old_read_t * 1e3:8.2f} ms          "
+            f"entries {new_read_t * 1e3:6.2f} ms         "
+            f"x{old_read_t / new_read_t:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
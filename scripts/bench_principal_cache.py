@@ -0,0 +1,110 @@
+"""
+Benchmark: user lookups per 1k authenticated requests, with and without the
+principal cache in front of get_current_user
+
+Drives api.deps.get_current_user with valid JWTs for a pool of users (as
+polling endpoints such as /notifications/unread-count do) and counts calls
+into user_repo.get_by_id, i.e. Postgres round-trips.
+
+    baseline — principal cache cleared before every request (old behaviour)
+    cached   — principal cache enabled (PRINCIPAL_CACHE_TTL, default 5 s)
+
+By default the repository call is stubbed with a fixed latency so the script
+runs without a database; pass --live to hit the real user_repo (DATABASE_URL
+must point at a database containing the bench-user-* rows).
+
+Usage:
+    python scripts/bench_principal_cache.py [--requests 5000] [--users 50]
+                                            [--concurrency 50] [--live]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret-key-for-principal-cache-0000")
+os.environ.setdefault("TEST_MODE", "false")
+
+
+class _Request:
+    def __init__(self, token):
+        self.cookies = {}
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+
+async def _run_phase(name, requests, users, concurrency, clear_each):
+    from api.deps import create_access_token, get_current_user
+    from core import principal_cache
+
+    tokens = [create_access_token({"sub": f"bench-user-{i}"}) for i in range(users)]
+    principal_cache.clear()
+    _calls["n"] = 0
+    before = principal_cache.stats()
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def _one(i):
+        async with semaphore:
+            if clear_each:
+                principal_cache.clear()
+            token = tokens[i % users]
+            start = time.perf_counter()
+            await get_current_user(_Request(token), token)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[_one(i) for i in range(requests)])
+    elapsed = time.perf_counter() - started
+
+    print(f"\n== {name} ==")
+    print(f"requests          : {requests} ({users} users, concurrency {concurrency})")
+    print(f"throughput        : {requests / elapsed:,.0f} req/s")
+    print(
+        f"latency p50/p95   : {statistics.median(latencies):.3f} / "
+        f"{sorted(latencies)[int(0.95 * (len(latencies) - 1))]:.3f} ms"
+    )
+    print(f"DB lookups        : {_calls['n']}")
+    print(f"DB lookups per 1k : {_calls['n'] * 1000 / requests:.1f}")
+    after = principal_cache.stats()
+    print(f"L1 hits           : {after['l1_hits'] - before['l1_hits']}")
+
+
+_calls = {"n": 0}
+
+
+async def main(requests, users, concurrency, live, latency_ms):
+    from api import deps
+
+    real_get_by_id = deps.user_repo.get_by_id
+
+    async def counting_get_by_id(user_id, session=None):
+        _calls["n"] += 1
+        if live:
+            return await real_get_by_id(user_id, session)
+        await asyncio.sleep(latency_ms / 1000)
+        return {"user_id": user_id, "username": user_id, "is_active": True}
+
+    deps.user_repo.get_by_id = counting_get_by_id
+    try:
+        await _run_phase("baseline (no cache)", requests, users, concurrency, True)
+        await _run_phase("principal cache", requests, users, concurrency, False)
+    finally:
+        deps.user_repo.get_by_id = real_get_by_id
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=1.0)
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(
+        main(args.requests, args.users, args.concurrency, args.live, args.latency_ms)
+    )
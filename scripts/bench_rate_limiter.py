@@ -0,0 +1,208 @@
+"""
+Benchmark: rate limiter accuracy and throughput, current vs leased backend
+
+Simulates W workers (separate storage instances, as in separate processes)
+enforcing one limit for one key, and compares:
+
+    fixed/memory   — the current fallback: fixed window, memory:// per worker
+    fixed/shared   — the current Redis setup: fixed window, one shared counter
+    moving/shared  — sliding-window log, one shared round-trip per hit
+    leased/shared  — LeasedStorage: local buckets leasing from the shared
+                     sliding-window log (the new default)
+
+"shared" is a SQLite file unless --redis-url is given.  Accuracy is the
+largest number of hits admitted in any window-length interval (the limit is
+the correct answer; fixed windows admit up to 2x across a window edge) and
+the share of the run's capacity that was admitted.  Throughput is hits/s on
+one thread plus backend round-trips per 1k hits.
+
+Usage:
+    python scripts/bench_rate_limiter.py [--workers 4] [--limit 200]
+                                         [--window 2] [--duration 8]
+                                         [--redis-url redis://localhost:6379/0]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from bisect import bisect_left
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+_BACKEND_METHODS = (
+    "incr",
+    "get",
+    "get_expiry",
+    "acquire_entry",
+    "get_moving_window",
+)
+
+
+def _counting(storage, counter):
+    """Count calls that reach *storage* (the shared backend)."""
+    for name in _BACKEND_METHODS:
+        method = getattr(storage, name)
+
+        def call(*args, _method=method, **kwargs):
+            counter[0] += 1
+            return _method(*args, **kwargs)
+
+        setattr(storage, name, call)
+    return storage
+
+
+def _backends(shared_uri, workers):
+    from limits.storage import MemoryStorage, storage_from_string
+    from limits.strategies import (
+        FixedWindowRateLimiter,
+        MovingWindowRateLimiter,
+    )
+
+    from api.middleware.rate_limit_storage import LeasedStorage
+
+    def fixed_memory(counter):
+        return [
+            FixedWindowRateLimiter(_counting(MemoryStorage(), counter))
+            for _ in range(workers)
+        ]
+
+    def fixed_shared(counter):
+        shared = storage_from_string(shared_uri)
+        shared.reset()
+        return [
+            FixedWindowRateLimiter(_counting(storage_from_string(shared_uri), counter))
+            for _ in range(workers)
+        ]
+
+    def moving_shared(counter):
+        storage_from_string(shared_uri).reset()
+        return [
+            MovingWindowRateLimiter(_counting(storage_from_string(shared_uri), counter))
+            for _ in range(workers)
+        ]
+
+    def leased_shared(counter):
+        storage_from_string(shared_uri).reset()
+        limiters = []
+        for _ in range(workers):
+            storage = LeasedStorage(f"leased+{shared_uri}")
+            storage.shared = _counting(storage.shared, counter)
+            limiters.append(MovingWindowRateLimiter(storage))
+        return limiters
+
+    return {
+        "fixed/memory": fixed_memory,
+        "fixed/shared": fixed_shared,
+        "moving/shared": moving_shared,
+        "leased/shared": leased_shared,
+    }
+
+
+def _max_in_window(times, window):
+    best = 0
+    for i, t in enumerate(times):
+        best = max(best, i - bisect_left(times, t - window) + 1)
+    return best
+
+
+def _accuracy(make, item, workers, duration, rate, edges):
+    counter = [0]
+    limiters = make(counter)
+    admitted = []
+    interval = 1.0 / rate
+    window = item.get_expiry()
+    start = time.time()
+    next_send = start
+    n = 0
+    while True:
+        now = time.time()
+        if now - start >= duration:
+            break
+        cycle, phase = divmod((now - start) / window, 2)
+        if edges and not (phase < 0.02 or 0.9 <= phase < 1.1):
+            # A short opening burst starts each fixed window; the main burst
+            # then straddles its reset (0.9W - 1.1W).  Idle in between.
+            # Bursts are sent unpaced.
+            wake = cycle * 2 + (0.9 if phase < 0.9 else 2)
+            time.sleep(max(0.0, start + wake * window - time.time()))
+            next_send = time.time()
+            continue
+        if limiters[n % workers].hit(item, "bench"):
+            admitted.append(now - start)
+        n += 1
+        # Pace the uniform load (bursts go as fast as the limiter allows)
+        next_send += 0 if edges else interval
+        ahead = next_send - time.time()
+        if ahead > 0:
+            time.sleep(ahead)
+    return admitted, n, counter[0]
+
+
+def _throughput(make, item, hits):
+    counter = [0]
+    limiter = make(counter)[0]
+    start = time.perf_counter()
+    for i in range(hits):
+        limiter.hit(item, f"user-{i % 100}")
+    elapsed = time.perf_counter() - start
+    return hits / elapsed, counter[0] * 1000 / hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--window", type=int, default=2, help="seconds")
+    parser.add_argument("--duration", type=float, default=8.0, help="seconds")
+    parser.add_argument(
+        "--load", type=float, default=5.0, help="offered load as a multiple of limit"
+    )
+    parser.add_argument("--hits", type=int, default=20000, help="throughput hits")
+    parser.add_argument("--redis-url", default=None)
+    args = parser.parse_args()
+
+    from limits import parse
+
+    if args.redis_url:
+        shared_uri = args.redis_url
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "bench_rate_limits.sqlite3")
+        shared_uri = f"sqlite:///{path}"
+    backends = _backends(shared_uri, args.workers)
+
+    item = parse(f"{args.limit} per {args.window} seconds")
+    rate = args.limit / args.window * args.load
+    capacity = args.limit * args.duration / args.window
+    print(
+        f"{args.workers} workers, limit {args.limit}/{args.window}s, offered "
+        f"{rate:,.0f} req/s for {args.duration:g}s, shared = {shared_uri}\n"
+    )
+    for edges in (False, True):
+        print("Bursts straddling each fixed-window reset" if edges else "Uniform load")
+        print(
+            f"{'backend':<16}{'admitted':>10}{'of cap.':>9}{'max/window':>12}"
+            f"{'vs limit':>10}{'backend calls/1k':>18}"
+        )
+        for name, make in backends.items():
+            admitted, offered, calls = _accuracy(
+                make, item, args.workers, args.duration, rate, edges
+            )
+            peak = _max_in_window(admitted, args.window)
+            print(
+                f"{name:<16}{len(admitted):>10,}{len(admitted) / capacity:>9.0%}"
+                f"{peak:>12,}{peak / args.limit:>10.2f}x"
+                f"{calls * 1000 / max(offered, 1):>18,.0f}"
+            )
+        print()
+
+    print(f"Throughput, one worker, 100 keys, limit {args.limit}/{args.window}s")
+    for name, make in backends.items():
+        per_s, calls = _throughput(make, item, args.hits)
+        print(f"{name:<16}{per_s:>12,.0f} hits/s{calls:>12,.0f} backend calls/1k")
+
+
+if __name__ == "__main__":
+    main()
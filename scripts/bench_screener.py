@@ -0,0 +1,194 @@
+"""
+Benchmark: crypto screener, per-refresh DataFrame rebuild vs NumPy state
+
+Generates --symbols synthetic OKX USDT tickers and a stream of --ticks
+random ticker pushes, then times:
+
+    refresh   — the previous screen_top_cryptos_light body (a Python loop
+                building one dict per ticker, a DataFrame, three full sorts)
+                vs ScreenerState.load_tickers + snapshot
+    stream    — per tick, the previous WebSocket callback (scan every cached
+                list for the symbol and patch it) vs ScreenerState.update,
+                plus a re-rank every --snapshot-every ticks
+    snapshot  — volume leaders / gainers / losers as cache records after
+                every --snapshot-every ticks: full DataFrame sorts vs
+                argpartition on the arrays
+
+Usage:
+    python scripts/bench_screener.py [--symbols 1000] [--ticks 100000]
+                                     [--snapshot-every 100]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis.screener_state import ScreenerState  # noqa: E402
+
+
+def make_tickers(n: int, rng: random.Random) -> list:
+    tickers = []
+    for i in range(n):
+        open24h = rng.uniform(0.01, 50_000)
+        tickers.append(
+            {
+                "instId": f"C{i:04d}-USDT",
+                "last": str(open24h * rng.uniform(0.7, 1.3)),
+                "open24h": str(open24h),
+                "volCcy24h": str(rng.lognormvariate(14, 2)),
+            }
+        )
+    return tickers
+
+
+def legacy_frame(tickers: list) -> pd.DataFrame:
+    rows = []
+    for t in tickers:
+        last = float(t["last"])
+        open_24h = float(t.get("open24h", last))
+        rows.append(
+            {
+                "Symbol": t["instId"],
+                "Close": last,
+                "price_change_24h": (last - open_24h) / open_24h * 100
+                if open_24h
+                else 0.0,
+                "Volume": float(t["volCcy24h"]),
+                "RSI_14": 50.0,
+                "signals": [],
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def legacy_rank(df_all: pd.DataFrame, limit: int = 10):
+    df_volume = df_all.sort_values(by="Volume", ascending=False).head(limit)
+    df_liquid = df_all[df_all["Volume"] > 100_000]
+    if df_liquid.empty:
+        df_liquid = df_all
+    gainers = df_liquid.sort_values(by="price_change_24h", ascending=False).head(5)
+    losers = df_liquid.sort_values(by="price_change_24h", ascending=True).head(5)
+    return df_volume, gainers, losers
+
+
+def legacy_tick(data: dict, symbol: str, last: float, change: float) -> None:
+    symbol_key = symbol.upper().replace("/", "").replace("-", "")
+    for list_name in (
+        "top_volume",
+        "top_gainers",
+        "top_losers",
+        "top_performers",
+        "oversold",
+        "overbought",
+    ):
+        for item in data.get(list_name) or []:
+            item_key = item.get("Symbol", "").upper().replace("/", "").replace("-", "")
+            if item_key == symbol_key:
+                item["Close"] = last
+                item["price_change_24h"] = change
+
+
+def timed(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--ticks", type=int, default=100_000)
+    parser.add_argument("--snapshot-every", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    tickers = make_tickers(args.symbols, rng)
+    stream = [
+        (
+            tickers[rng.randrange(args.symbols)]["instId"].replace("-", ""),
+            rng.uniform(0.01, 60_000),
+        )
+        for _ in range(args.ticks)
+    ]
+    print(
+        f"{args.symbols} symbols, {args.ticks:,} ticks, "
+        f"snapshot every {args.snapshot_every} ticks\n"
+    )
+
+    # Full refresh
+    old_refresh = timed(lambda: legacy_rank(legacy_frame(tickers)), args.repeat)
+    state = ScreenerState("okx")
+
+    def new_refresh():
+        state.load_tickers(tickers)
+        state.snapshot()
+
+    new_refresh_t = timed(new_refresh, args.repeat)
+    print(
+        f"refresh   legacy {old_refresh * 1e3:8.2f} ms   "
+        f"state {new_refresh_t * 1e3:8.2f} ms   x{old_refresh / new_refresh_t:.1f}"
+    )
+
+    # Tick stream with periodic snapshots
+    volume, gainers, losers = legacy_rank(legacy_frame(tickers))
+    data = {
+        "top_volume": volume.to_dict(orient="records"),
+        "top_gainers": gainers.to_dict(orient="records"),
+        "top_losers": losers.to_dict(orient="records"),
+    }
+    df_all = legacy_frame(tickers)
+    prices = dict(zip(df_all["Symbol"].str.replace("-", ""), df_all.index))
+    started = time.perf_counter()
+    for i, (symbol, last) in enumerate(stream, 1):
+        legacy_tick(data, symbol, last, 0.0)
+        # Re-ranking needs the full table: patch it, then sort it again
+        df_all.at[prices[symbol], "Close"] = last
+        if i % args.snapshot_every == 0:
+            for frame in legacy_rank(df_all):
+                frame.to_dict(orient="records")
+    old_stream = time.perf_counter() - started
+
+    state.load_tickers(tickers)
+    started = time.perf_counter()
+    for i, (symbol, last) in enumerate(stream, 1):
+        state.update(symbol, last)
+        if i % args.snapshot_every == 0:
+            state.snapshot_records()
+    new_stream = time.perf_counter() - started
+
+    print(
+        f"stream    legacy {old_stream / args.ticks * 1e6:8.2f} us/tick   "
+        f"state {new_stream / args.ticks * 1e6:8.2f} us/tick   "
+        f"x{old_stream / new_stream:.1f}"
+    )
+
+    # Snapshot alone, after a write so the ranking cache is cold
+    def new_snapshot():
+        state.update(stream[0][0], stream[0][1])
+        state.snapshot_records()
+
+    def old_snapshot():
+        for frame in legacy_rank(df_all):
+            frame.to_dict(orient="records")
+
+    old_snap = timed(old_snapshot, args.repeat)
+    new_snap = timed(new_snapshot, args.repeat)
+    print(
+        f"snapshot  legacy {old_snap * 1e3:8.2f} ms   "
+        f"state {new_snap * 1e3:8.2f} ms   x{old_snap / new_snap:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
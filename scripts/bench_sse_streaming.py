@@ -0,0 +1,138 @@
+"""
+Benchmark: time-to-first-content and total latency of /api/analyze with a
+local fake streaming chat model
+
+The fake model emits --tokens tokens with --token-ms delay each, like a
+remote LLM generating the synthesis answer.
+
+    baseline — old behaviour: wait for the full answer, then re-chunk it into
+               50-character SSE events with a 5 ms sleep between them
+    streamed — the real /api/analyze endpoint; the manager's _llm_stream
+               forwards model deltas through the bounded token queue
+
+Usage:
+    python scripts/bench_sse_streaming.py [--tokens 400] [--token-ms 5]
+                                          [--runs 5]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret-key-for-sse-streaming-00000")
+os.environ.setdefault("REDIS_URL", "memory://")
+
+
+def _fake_model(tokens, token_ms):
+    from langchain_core.language_models import BaseChatModel
+    from langchain_core.messages import AIMessage, AIMessageChunk
+    from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+    words = [f"詞{i} " for i in range(tokens)]
+
+    class SlowStreamingModel(BaseChatModel):
+        @property
+        def _llm_type(self):
+            return "slow-fake"
+
+        def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+            raise NotImplementedError
+
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            await asyncio.sleep(tokens * token_ms / 1000)
+            message = AIMessage(content="".join(words))
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+        async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+            for word in words:
+                await asyncio.sleep(token_ms / 1000)
+                yield ChatGenerationChunk(message=AIMessageChunk(content=word))
+
+    return SlowStreamingModel()
+
+
+async def _baseline(model):
+    """The removed event_generator_v4 tail: full answer, then re-chunk."""
+    from langchain_core.messages import HumanMessage
+
+    started = time.perf_counter()
+    first = None
+    response = (await model.ainvoke([HumanMessage(content="q")])).content
+    for i in range(0, len(response), 50):
+        _ = f"data: {json.dumps({'content': response[i : i + 50]})}\n\n"
+        if first is None:
+            first = time.perf_counter() - started
+        await asyncio.sleep(0.005)
+    return first, time.perf_counter() - started
+
+
+async def _streamed(model):
+    from api.routers import analysis
+    from core.agents.manager.llm import LLMInvokeMixin
+    from core.agents.token_tracker import TokenTracker
+
+    class Manager(LLMInvokeMixin):
+        def __init__(self):
+            self.llm = model
+            self._token_tracker = TokenTracker()
+            self.progress_callback = None
+            self.stream_callback = None
+            self.graph = MagicMock()
+            self.graph.ainvoke = self._ainvoke
+
+        async def _ainvoke(self, graph_input, config):
+            return {"final_response": await self._llm_stream("q"), "task_results": {}}
+
+    # httpx's ASGITransport buffers the whole body, so read the endpoint's
+    # StreamingResponse iterator directly, as the ASGI server would
+    body = analysis.QueryRequest(message="q", session_id="bench")
+    with (
+        patch.object(
+            analysis,
+            "resolve_user_llm_credentials",
+            AsyncMock(return_value={"provider": "openai", "api_key": "k"}),
+        ),
+        patch.object(analysis, "get_user_llm_client", return_value=MagicMock()),
+        patch.object(analysis, "save_chat_message"),
+        patch.object(analysis, "get_chat_history", return_value=[]),
+        patch("core.agents.bootstrap.bootstrap", return_value=Manager()),
+    ):
+        started = time.perf_counter()
+        first = None
+        response = await analysis.analyze_crypto.__wrapped__(
+            MagicMock(), body, {"user_id": "bench-user", "membership_tier": "free"}
+        )
+        async for chunk in response.body_iterator:
+            if first is None and chunk.startswith('data: {"content"'):
+                first = time.perf_counter() - started
+        return first, time.perf_counter() - started
+
+
+async def main(tokens, token_ms, runs):
+    model = _fake_model(tokens, token_ms)
+    for name, fn in (("baseline (re-chunked)", _baseline), ("streamed", _streamed)):
+        ttfb, total = [], []
+        for _ in range(runs):
+            first, elapsed = await fn(model)
+            ttfb.append(first * 1000)
+            total.append(elapsed * 1000)
+        print(f"\n== {name} ==")
+        print(f"tokens x delay    : {tokens} x {token_ms} ms")
+        print(f"first content p50 : {statistics.median(ttfb):.1f} ms")
+        print(f"total p50         : {statistics.median(total):.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tokens", type=int, default=400)
+    parser.add_argument("--token-ms", type=float, default=5)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.tokens, args.token_ms, args.runs))
@@ -0,0 +1,281 @@
+"""
+Benchmark: Telegram bot under load, direct vs queued agent calls
+
+Runs C chats (default 200) each sending M questions (default 3) against a
+local fake Telegram Bot API server.  A share of the questions (--dup-ratio)
+are the same popular question ("BTC price"), the rest are unique.  The
+agent is faked: it streams --deltas chunks over --agent-ms, and at most
+--llm-slots runs make progress at once (the LLM provider's concurrency).
+
+    direct  — the previous shape: every message calls the agent as soon as
+              it arrives and the reply is edited on every streamed chunk
+    queued  — telegram_bot.work_queue + telegram_bot.streaming: per-chat
+              serialization, bounded backlog, repeats within a chat coalesced,
+              edits throttled to one per --edit-interval per message
+
+The fake server answers after --api-ms and, like Telegram, returns 429 when
+a chat edits faster than once per second (token bucket, burst of 3).  Reported: answers/s, latency to
+the final answer (p50/p95), agent runs, Bot API calls and 429 responses.
+
+Usage:
+    python scripts/bench_telegram_bot.py [--chats 200] [--messages 3]
+                                         [--dup-ratio 0.5] [--agent-ms 800]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram_bot.streaming import StreamingReply  # noqa: E402
+from telegram_bot.work_queue import AgentWorkQueue, QueueFullError  # noqa: E402
+
+TOKEN = "123:bench"
+EDITS_PER_SECOND = 1.0
+EDIT_BURST = 3
+
+
+class FakeBotAPI(BaseHTTPRequestHandler):
+    """sendMessage / editMessageText with Telegram's per-chat edit limit."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        try:
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        except ValueError:
+            return self._reply(400, {"ok": False, "error_code": 400})
+        method = self.path.rsplit("/", 1)[-1]
+        server = self.server
+        time.sleep(server.latency)
+        chat_id = body.get("chat_id")
+        now = time.monotonic()
+        with server.lock:
+            server.calls[method] = server.calls.get(method, 0) + 1
+            if method == "editMessageText":
+                tokens, last = server.edit_buckets.get(chat_id, (EDIT_BURST, now))
+                tokens = min(EDIT_BURST, tokens + (now - last) * EDITS_PER_SECOND)
+                if tokens < 1:
+                    server.edit_buckets[chat_id] = (tokens, now)
+                    server.calls["429"] = server.calls.get("429", 0) + 1
+                    return self._reply(
+                        429,
+                        {
+                            "ok": False,
+                            "error_code": 429,
+                            "parameters": {"retry_after": 1},
+                        },
+                    )
+                server.edit_buckets[chat_id] = (tokens - 1, now)
+            server.message_id += 1
+            message_id = server.message_id
+        self._reply(200, {"ok": True, "result": {"message_id": message_id}})
+
+    def _reply(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # Clients closing keep-alive connections between runs
+        pass
+
+
+def start_server(latency_ms: float) -> ThreadingHTTPServer:
+    server = _Server(("127.0.0.1", 0), FakeBotAPI)
+    server.latency = latency_ms / 1000
+    server.lock = threading.Lock()
+    server.calls = {}
+    server.edit_buckets = {}
+    server.message_id = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class BotAPI:
+    def __init__(self, client: httpx.AsyncClient, base: str):
+        self.client = client
+        self.base = f"{base}/bot{TOKEN}"
+
+    async def call(self, method: str, **params):
+        resp = await self.client.post(f"{self.base}/{method}", json=params)
+        if resp.status_code != 200:
+            raise RuntimeError(f"{method}: HTTP {resp.status_code}")
+        return resp.json()["result"]
+
+    def reply_for(self, chat_id: int, interval: float) -> StreamingReply:
+        async def send(text):
+            return (await self.call("sendMessage", chat_id=chat_id, text=text))[
+                "message_id"
+            ]
+
+        async def edit(message_id, text):
+            await self.call(
+                "editMessageText", chat_id=chat_id, message_id=message_id, text=text
+            )
+
+        return StreamingReply(send, edit, interval=interval)
+
+
+def fake_agent(args, slots: asyncio.Semaphore, runs: list):
+    async def run(chat_id, text, on_delta):
+        runs.append(text)
+        async with slots:
+            for i in range(args.deltas):
+                await asyncio.sleep(args.agent_ms / 1000 / args.deltas)
+                await on_delta(f"{text} 第 {i} 段分析。")
+        return f"{text} 的分析完成。"
+
+    return run
+
+
+def questions(args) -> dict[int, list[str]]:
+    rng = random.Random(7)
+    return {
+        chat_id: [
+            "BTC price" if rng.random() < args.dup_ratio else f"chat {chat_id} q{i}"
+            for i in range(args.messages)
+        ]
+        for chat_id in range(1, args.chats + 1)
+    }
+
+
+async def run_direct(args, api: BotAPI, plan, latencies, runs):
+    agent = fake_agent(args, asyncio.Semaphore(args.llm_slots), runs)
+
+    async def one(chat_id, text):
+        started = time.perf_counter()
+        message_id = None
+        acc: list[str] = []
+
+        async def on_delta(delta):
+            nonlocal message_id
+            acc.append(delta)
+            try:
+                if message_id is None:
+                    message_id = (
+                        await api.call("sendMessage", chat_id=chat_id, text=delta)
+                    )["message_id"]
+                else:
+                    await api.call(
+                        "editMessageText",
+                        chat_id=chat_id,
+                        message_id=message_id,
+                        text="".join(acc),
+                    )
+            except RuntimeError:
+                pass
+
+        answer = await agent(chat_id, text, on_delta)
+        try:
+            await api.call(
+                "editMessageText", chat_id=chat_id, message_id=message_id, text=answer
+            )
+        except RuntimeError:
+            pass
+        latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(
+        *(one(chat_id, text) for chat_id, texts in plan.items() for text in texts)
+    )
+
+
+async def run_queued(args, api: BotAPI, plan, latencies, runs):
+    queue = AgentWorkQueue(
+        fake_agent(args, asyncio.Semaphore(args.llm_slots), runs),
+        workers=args.workers,
+        max_pending=args.max_pending,
+    )
+    queue.start()
+    rejected = 0
+
+    async def one(chat_id, text):
+        nonlocal rejected
+        started = time.perf_counter()
+        reply = api.reply_for(chat_id, args.edit_interval)
+        try:
+            answer = await queue.submit(chat_id, text, reply.update)
+        except QueueFullError:
+            rejected += 1
+            answer = "busy"
+        await reply.finish(answer)
+        latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(
+        *(one(chat_id, text) for chat_id, texts in plan.items() for text in texts)
+    )
+    await queue.stop()
+    return rejected
+
+
+async def measure(name, runner, args, base, server):
+    plan = questions(args)
+    latencies: list[float] = []
+    runs: list[str] = []
+    server.calls.clear()
+    server.edit_buckets.clear()
+    limits = httpx.Limits(max_connections=200, max_keepalive_connections=200)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        extra = await runner(args, BotAPI(client, base), plan, latencies, runs)
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    api_calls = sum(v for k, v in server.calls.items() if k != "429")
+    print(
+        f"  {name:<7} {len(latencies) / elapsed:7.1f} answers/s  "
+        f"p50 {statistics.median(latencies):6.2f}s  "
+        f"p95 {latencies[int(len(latencies) * 0.95) - 1]:6.2f}s  "
+        f"agent runs {len(runs):5d}  api calls {api_calls:6d}  "
+        f"429s {server.calls.get('429', 0):5d}" + (f"  busy {extra}" if extra else "")
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--chats", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=3)
+    parser.add_argument("--dup-ratio", type=float, default=0.5)
+    parser.add_argument("--agent-ms", type=float, default=800)
+    parser.add_argument("--deltas", type=int, default=20)
+    parser.add_argument("--llm-slots", type=int, default=32)
+    parser.add_argument("--api-ms", type=float, default=20)
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--max-pending", type=int, default=1000)
+    parser.add_argument("--edit-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = start_server(args.api_ms)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    print(
+        f"{args.chats} chats x {args.messages} messages, "
+        f"{args.dup_ratio:.0%} identical, agent {args.agent_ms:.0f} ms, "
+        f"{args.llm_slots} LLM slots, Bot API {args.api_ms:.0f} ms\n"
+    )
+    await measure("direct", run_direct, args, base, server)
+    await measure("queued", run_queued, args, base, server)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
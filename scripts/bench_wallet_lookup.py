@@ -0,0 +1,124 @@
+"""
+Benchmark: scam wallet lookups against the in-process wallet index
+
+Builds a WalletIndex over N synthetic Pi addresses (default 1,000,000) and
+measures, without a database:
+
+    load     — full rebuild time and resident memory of the index
+    exact    — might_contain() for reported and never-reported addresses,
+               i.e. the Bloom check that lets search_wallet skip Postgres
+    fuzzy    — candidates() for truncated GABCD…WXYZ / prefix / …suffix forms
+    insert   — incremental add() as done by create_report
+
+The false-positive rate printed for never-reported addresses is the share of
+lookups that would still reach Postgres.
+
+Usage:
+    python scripts/bench_wallet_lookup.py [--addresses 1000000]
+                                          [--lookups 100000] [--seed 38]
+"""
+
+import argparse
+import os
+import random
+import resource
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ234567"
+
+
+def _addresses(rng, n):
+    return ["G" + "".join(rng.choices(_ALPHABET, k=55)) for _ in range(n)]
+
+
+def _rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _timed(fn, items):
+    latencies = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        latencies.append((time.perf_counter() - start) * 1e6)
+    latencies.sort()
+    return {
+        "mean_us": statistics.fmean(latencies),
+        "p50_us": latencies[len(latencies) // 2],
+        "p99_us": latencies[int(len(latencies) * 0.99)],
+        "ops_per_s": len(latencies) / (sum(latencies) / 1e6),
+    }
+
+
+def _print(name, stats):
+    print(
+        f"{name:<22} mean {stats['mean_us']:8.2f} us   p50 {stats['p50_us']:8.2f} us"
+        f"   p99 {stats['p99_us']:8.2f} us   {stats['ops_per_s']:>12,.0f} ops/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--addresses", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=38)
+    args = parser.parse_args()
+
+    from datetime import datetime, timezone
+
+    from core.scam_wallet_index import WalletIndex
+
+    rng = random.Random(args.seed)
+    print(f"Generating {args.addresses:,} addresses...")
+    reported = _addresses(rng, args.addresses)
+    unreported = _addresses(rng, args.lookups)
+    rss_before = _rss_mb()
+
+    index = WalletIndex()
+    start = time.perf_counter()
+    index.load((i, addr, "pending") for i, addr in enumerate(reported, start=1))
+    index._watermark = datetime.now(timezone.utc)
+    stats = index.stats()
+    print(
+        f"load                   {time.perf_counter() - start:8.2f} s    "
+        f"{len(index):,} entries, index {stats['index_bytes'] / 2**20:,.0f} MB + "
+        f"Bloom {stats['bloom_bits'] / 2**23:,.0f} MB "
+        f"(peak RSS +{_rss_mb() - rss_before:,.0f} MB while sorting)"
+    )
+
+    hits = rng.sample(reported, min(args.lookups, len(reported)))
+    _print("exact (reported)", _timed(index.might_contain, hits))
+    _print("exact (never reported)", _timed(index.might_contain, unreported))
+    false_positives = sum(index.might_contain(a) for a in unreported)
+    print(
+        f"{'':<22} false positives {false_positives:,}/{len(unreported):,} "
+        f"({false_positives / len(unreported):.4%}) would still query Postgres"
+    )
+
+    fuzzy = args.lookups // 10
+    targets = rng.sample(reported, fuzzy)
+    _print(
+        "fuzzy GABCD…WXYZ",
+        _timed(lambda a: index.candidates(a[:5], a[-4:]), targets),
+    )
+    _print("fuzzy prefix (8)", _timed(lambda a: index.candidates(a[:8]), targets))
+    _print("fuzzy …suffix (6)", _timed(lambda a: index.candidates("", a[-6:]), targets))
+    found = sum(
+        (i + 1) in index.candidates(a[:5], a[-4:])
+        for i, a in enumerate(reported[:fuzzy])
+    )
+    print(f"{'':<22} recall {found:,}/{fuzzy:,}")
+
+    inserts = _addresses(rng, min(1000, args.lookups))
+    next_id = iter(range(len(reported) + 1, len(reported) + len(inserts) + 1))
+    _print(
+        "insert (create_report)", _timed(lambda a: index.add(a, next(next_id)), inserts)
+    )
+
+
+if __name__ == "__main__":
+    main()
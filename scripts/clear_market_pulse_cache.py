@@ -13,13 +13,19 @@ def clear_market_pulse_cache():
         conn = get_connection()
         c = conn.cursor()
 
-        # Check if key exists first
-        c.execute("SELECT count(*) FROM system_cache WHERE key = 'MARKET_PULSE'")
+        # Legacy whole-dict key plus per-symbol entries and their index
+        c.execute(
+            "SELECT count(*) FROM system_cache "
+            "WHERE key = 'MARKET_PULSE' OR key LIKE 'MARKET_PULSE:%'"
+        )
         count = c.fetchone()[0]
 
         if count > 0:
-            print("Found 'MARKET_PULSE' cache. Deleting...")
-            c.execute("DELETE FROM system_cache WHERE key = 'MARKET_PULSE'")
+            print(f"Found {count} Market Pulse cache rows. Deleting...")
+            c.execute(
+                "DELETE FROM system_cache "
+                "WHERE key = 'MARKET_PULSE' OR key LIKE 'MARKET_PULSE:%'"
+            )
             conn.commit()
             print("✅ Market Pulse cache cleared successfully.")
         else:
@@ -6,6 +6,7 @@
 from datetime import datetime
 
 from core.database.connection import get_connection
+from core.principal_cache import invalidate_principal_sync
 
 
 def batch_expire_memberships():
@@ -16,31 +17,28 @@ def batch_expire_memberships():
     conn = get_connection()
     c = conn.cursor()
     try:
-        # 查詢過期會員數量
-        c.execute("""
-            SELECT COUNT(*) FROM users
-            WHERE membership_tier = 'pro'
-              AND membership_expires_at < NOW()
-        """)
-        count_before = c.fetchone()[0]
-
-        if count_before == 0:
-            print("[Cron] 沒有過期會員需要處理")
-            return
-
-        # 批量更新過期會員
+        # 批量更新過期會員（單一語句；RETURNING 取代事前的 COUNT 查詢）
         c.execute("""
             UPDATE users
             SET membership_tier = 'free',
                 membership_expires_at = NULL
             WHERE membership_tier = 'pro'
               AND membership_expires_at < NOW()
+            RETURNING user_id
         """)
 
-        affected = c.rowcount
+        expired_ids = [row[0] for row in c.fetchall()]
+        affected = len(expired_ids)
         conn.commit()
 
-        print(f"[Cron] 成功處理 {affected} 個過期會員 (預期: {count_before})")
+        if affected == 0:
+            print("[Cron] 沒有過期會員需要處理")
+            return 0
+
+        # 通知各 worker 丟棄這些用戶的身分快取
+        invalidate_principal_sync(*expired_ids)
+
+        print(f"[Cron] 成功處理 {affected} 個過期會員")
 
         # 記錄日誌（可選：存入數據庫）
         current_time = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
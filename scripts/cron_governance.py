@@ -5,12 +5,57 @@
 功能：對30天內無新違規且上次遞減超過30天的用戶，每日自動遞減1點
 """
 
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
 from core.database.connection import get_connection
+from core.database.governance.activity import (
+    delete_activity_logs_before,
+    drop_expired_activity_log_partitions,
+    ensure_activity_log_partitions,
+)
+
+# 每批遞減的用戶數；每批一個短交易，避免長時間鎖住大量資料列
+DECREMENT_BATCH_SIZE = 10_000
+
+# 一條語句完成：鎖定一批符合條件的用戶、遞減、並把每位用戶的前後點數寫入活動日誌。
+# SKIP LOCKED 讓同時執行的另一個任務（或正在加點的請求）不會互相等待。
+_DECREMENT_BATCH_SQL = """
+    WITH eligible AS (
+        SELECT user_id
+        FROM user_violation_points
+        WHERE points > 0
+          AND (last_decrement_at IS NULL OR last_decrement_at < NOW() - INTERVAL '30 days')
+          AND (last_violation_at IS NULL OR last_violation_at < NOW() - INTERVAL '30 days')
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    ),
+    decremented AS (
+        UPDATE user_violation_points v
+        SET points = v.points - 1,
+            last_decrement_at = NOW(),
+            updated_at = NOW()
+        FROM eligible e
+        WHERE v.user_id = e.user_id
+        RETURNING v.user_id, v.points AS new_points
+    )
+    INSERT INTO user_activity_logs
+        (user_id, activity_type, resource_type, metadata, success, created_at)
+    SELECT
+        user_id,
+        'points_decremented',
+        'violation_points',
+        jsonb_build_object(
+            'previous_points', new_points + 1,
+            'new_points', new_points,
+            'decremented_by', 1
+        ),
+        TRUE,
+        NOW()
+    FROM decremented
+"""
 
 
-def decrement_violation_points_job():
+def decrement_violation_points_job(batch_size: int = DECREMENT_BATCH_SIZE):
     """
     執行違規點數遞減任務
 
@@ -21,6 +66,10 @@ def decrement_violation_points_job():
     - 最後違規時間超過 30 天
     - 上次遞減時間超過 30 天（或從未遞減）
 
+    以集合運算分批處理（每批 batch_size 位用戶一條 UPDATE ... RETURNING
+    接 INSERT ... SELECT），不再逐一用戶往返資料庫。已遞減的用戶
+    last_decrement_at 已更新，不會在下一批再次被選中。
+
     返回：
         dict: 處理結果統計
     """
@@ -28,75 +77,29 @@ def decrement_violation_points_job():
     c = conn.cursor()
 
     try:
-        # 查詢符合條件的用戶
-        c.execute("""
-            SELECT user_id, points, last_violation_at, last_decrement_at
-            FROM user_violation_points
-            WHERE points > 0
-              AND (last_decrement_at IS NULL OR last_decrement_at < NOW() - INTERVAL '30 days')
-              AND (last_violation_at IS NULL OR last_violation_at < NOW() - INTERVAL '30 days')
-            ORDER BY points DESC
-        """)
-
-        users_to_decrement = c.fetchall()
-
-        if not users_to_decrement:
+        processed_count = 0
+        while True:
+            c.execute(_DECREMENT_BATCH_SQL, (batch_size,))
+            batch = c.rowcount
+            conn.commit()
+            processed_count += batch
+            if batch < batch_size:
+                break
+
+        if not processed_count:
             print("[Governance Cron] 沒有用戶需要遞減點數")
             return {"success": True, "processed_count": 0, "total_points_deducted": 0}
 
-        # 執行遞減
-        processed_count = 0
-        total_points_deducted = 0
-
-        for user_id, points, last_violation_at, last_decrement_at in users_to_decrement:
-            # 確保點數不會變成負數
-            new_points = max(0, points - 1)
-
-            c.execute(
-                """
-                UPDATE user_violation_points
-                SET points = %s,
-                    last_decrement_at = NOW(),
-                    updated_at = NOW()
-                WHERE user_id = %s
-            """,
-                (new_points, user_id),
-            )
-
-            # 記錄活動日誌
-            c.execute(
-                """
-                INSERT INTO user_activity_logs
-                (user_id, activity_type, resource_type, metadata, success, created_at)
-                VALUES (%s, %s, %s, %s, %s, NOW())
-            """,
-                (
-                    user_id,
-                    "points_decremented",
-                    "violation_points",
-                    '{"previous_points": %s, "new_points": %s, "decremented_by": 1}'
-                    % (points, new_points),
-                    True,
-                ),
-            )
-
-            processed_count += 1
-            total_points_deducted += 1
-
-            print(f"[Governance Cron] 用戶 {user_id}: {points} -> {new_points} 點")
-
-        conn.commit()
-
         current_time = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
         print(f"[Governance Cron] 執行時間: {current_time}")
         print(
-            f"[Governance Cron] 處理 {processed_count} 個用戶，共遞減 {total_points_deducted} 點"
+            f"[Governance Cron] 處理 {processed_count} 個用戶，共遞減 {processed_count} 點"
         )
 
         return {
             "success": True,
             "processed_count": processed_count,
-            "total_points_deducted": total_points_deducted,
+            "total_points_deducted": processed_count,
         }
 
     except Exception as e:
@@ -116,28 +119,34 @@ def cleanup_old_activity_logs(days_to_keep: int = 90):
     """
     清理舊的活動日誌
 
+    整個月份都已超過保留期的分區直接 DETACH 後 DROP（不產生大量刪除與
+    VACUUM 負擔）；跨越保留期邊界的分區（或尚未分區的舊表）以 id 區間
+    分批刪除，每批獨立提交，避免長時間持有鎖。同時預先建立接下來幾個月的分區。
+
     Args:
         days_to_keep: 保留天數（默認 90 天）
 
     返回：
-        int: 刪除的記錄數
+        int: 刪除的記錄數（整個分區刪除的資料列以刪除前的估計值計）
     """
     conn = get_connection()
     c = conn.cursor()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days_to_keep)
 
     try:
-        # 刪除超過保留期的日誌
-        # SQL injection fix: Use parameterized query for INTERVAL
-        c.execute(
-            """
-            DELETE FROM user_activity_logs
-            WHERE created_at < NOW() - INTERVAL %s
-        """,
-            (f"{days_to_keep} days",),
-        )
+        created = ensure_activity_log_partitions(c)
+        conn.commit()
+        if created:
+            print(f"[Governance Cron] 建立活動日誌分區: {', '.join(created)}")
 
-        deleted_count = c.rowcount
+        dropped = drop_expired_activity_log_partitions(c, cutoff)
         conn.commit()
+        dropped_rows = sum(rows for _, rows in dropped)
+        if dropped:
+            names = ", ".join(name for name, _ in dropped)
+            print(f"[Governance Cron] 移除過期分區: {names}（約 {dropped_rows} 條）")
+
+        deleted_count = dropped_rows + delete_activity_logs_before(conn, cutoff)
 
         print(
             f"[Governance Cron] 清理了 {deleted_count} 條舊的活動日誌（超過 {days_to_keep} 天）"
@@ -157,6 +166,9 @@ def get_governance_statistics():
     """
     獲取治理系統統計數據
 
+    一次查詢取得全部數字：違規點數彙總走 points > 0 的部分索引
+    （index-only scan），近 7 天日誌數只掃描最近的分區與 created_at 索引。
+
     返回：
         dict: 統計數據
     """
@@ -164,33 +176,29 @@ def get_governance_statistics():
     c = conn.cursor()
 
     try:
-        stats = {}
-
-        # 違規點數統計
         c.execute("""
             SELECT
-                COUNT(*) as total_users_with_points,
-                SUM(points) as total_points,
-                AVG(points) as avg_points,
-                MAX(points) as max_points
+                COUNT(*) AS total_users_with_points,
+                SUM(points) AS total_points,
+                AVG(points) AS avg_points,
+                MAX(points) AS max_points,
+                (
+                    SELECT COUNT(*) FROM user_activity_logs
+                    WHERE created_at > NOW() - INTERVAL '7 days'
+                ) AS recent_activity_logs
             FROM user_violation_points
             WHERE points > 0
         """)
         result = c.fetchone()
-        if result:
-            stats["users_with_points"] = result[0] or 0
-            stats["total_points"] = result[1] or 0
-            stats["avg_points"] = float(result[2]) if result[2] else 0
-            stats["max_points"] = result[3] or 0
-
-        # 活動日誌統計
-        c.execute("""
-            SELECT COUNT(*) FROM user_activity_logs
-            WHERE created_at > NOW() - INTERVAL '7 days'
-        """)
-        stats["recent_activity_logs"] = c.fetchone()[0] or 0
-
-        return stats
+        if not result:
+            return {}
+        return {
+            "users_with_points": result[0] or 0,
+            "total_points": result[1] or 0,
+            "avg_points": float(result[2]) if result[2] else 0,
+            "max_points": result[3] or 0,
+            "recent_activity_logs": result[4] or 0,
+        }
 
     except Exception as e:
         print(f"[Governance Cron] 獲取統計數據失敗: {e}")
@@ -0,0 +1,176 @@
+"""
+ManagerAgent sessions for Telegram chats.
+
+Each chat gets one ManagerAgent, built on its first message and reused for
+every later one (graph thread ``telegram-<chat_id>``, recent turns kept as
+history).  Sessions are kept in a bounded LRU and dropped after
+SESSION_IDLE_TTL seconds without a message.  Runs for one chat must not
+overlap; ``telegram_bot.work_queue`` guarantees that.
+
+The bot answers with the operator's LLM key (TELEGRAM_LLM_PROVIDER /
+TELEGRAM_LLM_MODEL, system keys as in utils/llm_client.py).
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+SESSION_MAX = int(os.getenv("TELEGRAM_SESSION_MAX", "500"))
+SESSION_IDLE_TTL = float(os.getenv("TELEGRAM_SESSION_IDLE_TTL", "3600"))
+AGENT_TIMEOUT = float(os.getenv("TELEGRAM_AGENT_TIMEOUT", "180"))
+HISTORY_LINES = 18
+LANGUAGE = os.getenv("TELEGRAM_LANGUAGE", "zh-TW")
+
+_llm_client: Any = None
+
+
+def bot_llm_client() -> Any:
+    """The bot's chat model, built once per process."""
+    global _llm_client
+    if _llm_client is None:
+        from utils.llm_client import LLMClientFactory
+
+        _llm_client = LLMClientFactory.create_client(
+            os.getenv("TELEGRAM_LLM_PROVIDER", "openai_server"),
+            os.getenv("TELEGRAM_LLM_MODEL") or None,
+        )
+    return _llm_client
+
+
+def build_manager(chat_id: int) -> Any:
+    from core.agents.bootstrap import bootstrap
+
+    return bootstrap(
+        bot_llm_client(),
+        web_mode=False,
+        language=LANGUAGE,
+        user_tier="free",
+        user_id=f"telegram:{chat_id}",
+        session_id=f"telegram-{chat_id}",
+    )
+
+
+@dataclass
+class ChatSession:
+    chat_id: int
+    manager: Any
+    history: deque = field(default_factory=lambda: deque(maxlen=HISTORY_LINES))
+    # The agent asked a question; the next message resumes the graph
+    waiting: bool = False
+    last_used: float = field(default_factory=time.monotonic)
+
+    @property
+    def thread_id(self) -> str:
+        return f"telegram-{self.chat_id}"
+
+
+class AgentSessions:
+    """Bounded LRU of per-chat ManagerAgent sessions."""
+
+    def __init__(
+        self,
+        build: Callable[[int], Any] = build_manager,
+        max_size: int = SESSION_MAX,
+        idle_ttl: float = SESSION_IDLE_TTL,
+    ) -> None:
+        self.build = build
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self._sessions: "OrderedDict[int, ChatSession]" = OrderedDict()
+        self._stats = {"hits": 0, "builds": 0, "evicted": 0}
+
+    def get(self, chat_id: int) -> ChatSession:
+        now = time.monotonic()
+        session = self._sessions.get(chat_id)
+        if session is not None and now - session.last_used <= self.idle_ttl:
+            self._stats["hits"] += 1
+            self._sessions.move_to_end(chat_id)
+        else:
+            self._stats["builds"] += 1
+            session = self._sessions[chat_id] = ChatSession(
+                chat_id, self.build(chat_id)
+            )
+            self._sessions.move_to_end(chat_id)
+            self._evict(now)
+        session.last_used = now
+        return session
+
+    def _evict(self, now: float) -> None:
+        while self._sessions:
+            chat_id, oldest = next(iter(self._sessions.items()))
+            if now - oldest.last_used <= self.idle_ttl and (
+                len(self._sessions) <= self.max_size
+            ):
+                break
+            del self._sessions[chat_id]
+            self._stats["evicted"] += 1
+
+    def is_waiting(self, chat_id: int) -> bool:
+        session = self._sessions.get(chat_id)
+        return session is not None and session.waiting
+
+    def drop(self, chat_id: int) -> None:
+        self._sessions.pop(chat_id, None)
+
+    def stats(self) -> dict:
+        return {**self._stats, "size": len(self._sessions), "max": self.max_size}
+
+    async def ask(
+        self,
+        chat_id: int,
+        text: str,
+        on_delta: Optional[Callable[[str], Awaitable[None]]] = None,
+    ) -> str:
+        """Run one question through the chat's ManagerAgent; returns the answer."""
+        from langgraph.types import Command
+
+        from core.agents.manager import MANAGER_GRAPH_RECURSION_LIMIT
+
+        session = self.get(chat_id)
+        manager = session.manager
+        if session.waiting:
+            graph_input = Command(resume=text)
+        else:
+            graph_input = Command(
+                goto="understand_intent",
+                update={
+                    "session_id": session.thread_id,
+                    "query": text,
+                    "history": "\n".join(session.history),
+                    "analysis_mode": "quick",
+                    "task_results": {},
+                    "language": LANGUAGE,
+                    "execution_mode": "vending",
+                },
+            )
+        config = {
+            "configurable": {"thread_id": session.thread_id},
+            "recursion_limit": MANAGER_GRAPH_RECURSION_LIMIT,
+        }
+
+        manager.stream_callback = on_delta
+        try:
+            result = await asyncio.wait_for(
+                manager.graph.ainvoke(graph_input, config), timeout=AGENT_TIMEOUT
+            )
+        finally:
+            manager.stream_callback = None
+
+        interrupts = result.get("__interrupt__", [])
+        session.waiting = bool(interrupts)
+        if interrupts:
+            question = interrupts[0].value
+            if isinstance(question, dict):
+                question = question.get("question") or str(question)
+            return str(question)
+
+        answer = result.get("final_response") or "（無回應）"
+        session.history.append(f"用戶: {text}")
+        session.history.append(f"助手: {answer}")
+        return answer
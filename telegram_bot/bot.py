@@ -1,27 +1,59 @@
 """
 Telegram Bot for Pi Crypto Insight.
 
-Wraps every incoming message with per-user rate limiting before
-delegating to the agent pipeline.
+Wraps every incoming message with per-user rate limiting before handing it
+to the agent work queue (telegram_bot/work_queue.py), which serializes each
+chat, bounds the backlog and coalesces a chat's repeated questions.  Each
+chat reuses one ManagerAgent session (telegram_bot/agent.py) and the answer
+is edited into the reply as it streams (telegram_bot/streaming.py).
 """
 
+import asyncio
 import logging
 import os
 from typing import Optional
 
-from telegram_bot.rate_limiter import TelegramRateLimiter
+from telegram_bot.agent import AgentSessions
+from telegram_bot.rate_limiter import create_rate_limiter
+from telegram_bot.streaming import StreamingReply
+from telegram_bot.work_queue import AgentWorkQueue, QueueFullError
 
 logger = logging.getLogger(__name__)
 
 # ---------------------------------------------------------------------------
-# Rate limiter (module-level singleton)
+# Rate limiter (module-level singleton, shared across bot replicas)
 # ---------------------------------------------------------------------------
-rate_limiter = TelegramRateLimiter()
+rate_limiter = create_rate_limiter()
 
 # ---------------------------------------------------------------------------
 # Telegram Bot token — must be set via TELEGRAM_BOT_TOKEN env var
 # ---------------------------------------------------------------------------
 TELEGRAM_BOT_TOKEN: Optional[str] = os.getenv("TELEGRAM_BOT_TOKEN")
+# Bot API server, e.g. a local fake for load tests
+TELEGRAM_API_BASE_URL: Optional[str] = os.getenv("TELEGRAM_API_BASE_URL")
+
+BUSY_MESSAGE = "目前詢問人數較多，請稍後再試。"
+TIMEOUT_MESSAGE = "分析超時，請縮小問題範圍後重試。"
+ERROR_MESSAGE = "處理訊息時發生錯誤，請稍後再試。"
+
+
+# ---------------------------------------------------------------------------
+# Agent sessions and work queue (module-level singletons)
+# ---------------------------------------------------------------------------
+
+
+async def _process_with_agent(chat_id: int, text: str, on_delta=None) -> str:
+    """Send a message through the chat's ManagerAgent session."""
+    logger.info("Processing message from chat %s: %.80s", chat_id, text)
+    return await sessions.ask(chat_id, text, on_delta)
+
+
+sessions = AgentSessions()
+work_queue = AgentWorkQueue(
+    _process_with_agent,
+    workers=int(os.getenv("TELEGRAM_AGENT_WORKERS", "4")),
+    max_pending=int(os.getenv("TELEGRAM_MAX_PENDING", "200")),
+)
 
 
 # ---------------------------------------------------------------------------
@@ -29,7 +61,12 @@ TELEGRAM_BOT_TOKEN: Optional[str] = os.getenv("TELEGRAM_BOT_TOKEN")
 # ---------------------------------------------------------------------------
 
 
-async def handle_message(user_id: int, text: str) -> str:
+async def handle_message(
+    user_id: int,
+    text: str,
+    chat_id: Optional[int] = None,
+    reply: Optional[StreamingReply] = None,
+) -> str:
     """
     Process an incoming Telegram message.
 
@@ -40,6 +77,9 @@ async def handle_message(user_id: int, text: str) -> str:
     Args:
         user_id: Telegram user ID.
         text: Message text from the user.
+        chat_id: Chat the message came from (defaults to user_id, i.e. a
+            private chat); one agent session per chat.
+        reply: Receives the answer progressively while it streams.
 
     Returns:
         Reply text to send back to the user.
@@ -50,25 +90,26 @@ async def handle_message(user_id: int, text: str) -> str:
         logger.warning("Rate limited user %s: %s", user_id, reason)
         return reason
 
-    # 2. Delegate to agent pipeline (existing logic)
-    #    Replace the placeholder below with your actual agent call.
-    return await _process_with_agent(user_id, text)
-
-
-# ---------------------------------------------------------------------------
-# Internal: agent processing (placeholder — integrate with LangGraph)
-# ---------------------------------------------------------------------------
-
-
-async def _process_with_agent(user_id: int, text: str) -> str:
-    """
-    Send user message through the LangGraph agent pipeline.
-
-    TODO: Wire this up to the actual ManagerAgent / core.agents flow.
-    """
-    logger.info("Processing message from user %s: %.80s", user_id, text)
-    # Placeholder response — replace with real agent invocation
-    return f"[Agent response placeholder] You said: {text}"
+    # 2. Queue for the chat's agent session
+    chat_id = user_id if chat_id is None else chat_id
+    work_queue.start()
+    try:
+        return await work_queue.submit(
+            chat_id,
+            text,
+            listener=reply.update if reply is not None else None,
+            # A reply to the agent's own question only makes sense in this chat
+            coalesce=not sessions.is_waiting(chat_id),
+        )
+    except QueueFullError:
+        logger.warning("Agent queue full, turning away chat %s", chat_id)
+        return BUSY_MESSAGE
+    except asyncio.TimeoutError:
+        logger.error("Agent timed out for chat %s", chat_id)
+        return TIMEOUT_MESSAGE
+    except Exception as e:
+        logger.error("Agent failed for chat %s: %s", chat_id, e, exc_info=True)
+        return ERROR_MESSAGE
 
 
 # ---------------------------------------------------------------------------
@@ -97,7 +138,11 @@ async def run_polling() -> None:
             "python-telegram-bot is not installed. Run: pip install python-telegram-bot"
         )
 
-    app = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+    builder = Application.builder().token(TELEGRAM_BOT_TOKEN)
+    if TELEGRAM_API_BASE_URL:
+        builder = builder.base_url(TELEGRAM_API_BASE_URL)
+    # Updates are handled concurrently; the work queue does the ordering
+    app = builder.concurrent_updates(True).build()
 
     # --- Command handlers ---
     async def start_command(update: Update, context: object) -> None:
@@ -147,12 +192,23 @@ async def run_polling() -> None:
         user = update.effective_user
         if user is None:
             return
-        text = update.message.text or ""  # type: ignore[union-attr]
+        message = update.message
+        text = message.text or ""  # type: ignore[union-attr]
         if not text.strip():
             return
 
-        reply = await handle_message(user.id, text)
-        await update.message.reply_text(reply)  # type: ignore[union-attr]
+        await message.chat.send_action("typing")  # type: ignore[union-attr]
+        reply = StreamingReply(
+            send=message.reply_text,  # type: ignore[union-attr]
+            edit=lambda sent, new_text: sent.edit_text(new_text),
+        )
+        answer = await handle_message(
+            user.id,
+            text,
+            chat_id=message.chat_id,  # type: ignore[union-attr]
+            reply=reply,
+        )
+        await reply.finish(answer)
 
     # Register handlers
     app.add_handler(CommandHandler("start", start_command))
@@ -164,14 +220,14 @@ async def run_polling() -> None:
     await app.initialize()
     await app.start()
     await app.updater.start_polling()  # type: ignore[union-attr]
+    work_queue.start()
     try:
         # Block until interrupted
-        import asyncio
-
         await asyncio.Event().wait()
     except (KeyboardInterrupt, SystemExit):
         logger.info("Telegram bot shutting down...")
     finally:
+        await work_queue.stop()
         await app.updater.stop()  # type: ignore[union-attr]
         await app.stop()
         await app.shutdown()
@@ -1,12 +1,19 @@
 """
 Per-user rate limiter for Telegram Bot.
 
-Uses in-memory dict with automatic cleanup of expired timestamps.
-No external dependencies — standard library only.
+``TelegramRateLimiter`` keeps state in an in-memory dict with automatic
+cleanup of expired timestamps (one bot process).
+
+``SharedTelegramRateLimiter`` keeps the same two windows in a ``limits``
+storage (Redis, or the SQLite file from api/middleware/rate_limit_storage.py)
+so several bot replicas agree on each user's quota.  ``create_rate_limiter``
+picks the backend from the environment.
 """
 
 import logging
+import os
 import time
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +28,21 @@ MAX_PER_DAY = 100
 _CLEANUP_THRESHOLD = 500
 
 
+def _daily_denied(wait: float) -> str:
+    minutes, seconds = divmod(int(wait), 60)
+    return (
+        f"您今天的訊息次數已達上限（{MAX_PER_DAY} 則）。"
+        f"請在 {minutes} 分 {seconds} 秒後再試。"
+    )
+
+
+def _minute_denied(wait: float) -> str:
+    return (
+        f"您發送訊息太頻繁了（每分鐘上限 {MAX_PER_MINUTE} 則）。"
+        f"請在 {int(wait) + 1} 秒後再試。"
+    )
+
+
 class TelegramRateLimiter:
     """In-memory per-user rate limiter with minute and daily windows."""
 
@@ -51,13 +73,7 @@ class TelegramRateLimiter:
         daily_count: int = bucket["daily_count"]  # type: ignore[assignment]
         if daily_count >= MAX_PER_DAY:
             daily_reset: float = bucket["daily_reset"]  # type: ignore[assignment]
-            remaining = int(daily_reset - now)
-            minutes, seconds = divmod(remaining, 60)
-            return (
-                False,
-                f"您今天的訊息次數已達上限（{MAX_PER_DAY} 則）。"
-                f"請在 {minutes} 分 {seconds} 秒後再試。",
-            )
+            return (False, _daily_denied(daily_reset - now))
 
         # --- Per-minute limit ---
         timestamps: list[float] = bucket["timestamps"]  # type: ignore[assignment]
@@ -68,12 +84,7 @@ class TelegramRateLimiter:
 
         if len(timestamps) >= MAX_PER_MINUTE:
             oldest = timestamps[0]
-            wait = int(oldest - cutoff) + 1
-            return (
-                False,
-                f"您發送訊息太頻繁了（每分鐘上限 {MAX_PER_MINUTE} 則）。"
-                f"請在 {wait} 秒後再試。",
-            )
+            return (False, _minute_denied(oldest - cutoff))
 
         # --- Allowed — record the hit ---
         timestamps.append(now)
@@ -137,3 +148,102 @@ class TelegramRateLimiter:
             logger.debug(
                 "Rate limiter cleanup: removed %d expired buckets", len(expired)
             )
+
+
+class SharedTelegramRateLimiter:
+    """Per-user limits kept in a shared ``limits`` storage.
+
+    The minute window is a sliding log (``acquire_entry`` checks and records
+    atomically), the daily window a fixed counter started by the user's
+    first message, as in the in-memory limiter.  If the store is unreachable
+    messages are let through rather than silencing the bot.
+    """
+
+    def __init__(self, storage_uri: str) -> None:
+        from limits.storage import storage_from_string
+
+        # Registers the sqlite:// and leased+* schemes
+        import api.middleware.rate_limit_storage  # noqa: F401
+
+        self.storage = storage_from_string(storage_uri)
+        self.storage_uri = storage_uri
+
+    @staticmethod
+    def _keys(user_id: int) -> tuple[str, str]:
+        return f"telegram:minute:{user_id}", f"telegram:day:{user_id}"
+
+    def is_allowed(self, user_id: int) -> tuple[bool, str]:
+        minute_key, day_key = self._keys(user_id)
+        try:
+            if self.storage.get(day_key) >= MAX_PER_DAY:
+                return (
+                    False,
+                    _daily_denied(self.storage.get_expiry(day_key) - time.time()),
+                )
+            if not self.storage.acquire_entry(
+                minute_key, MAX_PER_MINUTE, MINUTE_WINDOW
+            ):
+                oldest, _ = self.storage.get_moving_window(
+                    minute_key, MAX_PER_MINUTE, MINUTE_WINDOW
+                )
+                return (False, _minute_denied(oldest + MINUTE_WINDOW - time.time()))
+            # Another replica may have spent the last daily message meanwhile
+            if self.storage.incr(day_key, DAILY_WINDOW) > MAX_PER_DAY:
+                return (
+                    False,
+                    _daily_denied(self.storage.get_expiry(day_key) - time.time()),
+                )
+        except Exception as e:
+            logger.warning("Shared rate limit store unavailable, allowing: %s", e)
+        return (True, "")
+
+    def get_remaining(self, user_id: int) -> dict[str, int]:
+        minute_key, day_key = self._keys(user_id)
+        try:
+            _, minute_count = self.storage.get_moving_window(
+                minute_key, MAX_PER_MINUTE, MINUTE_WINDOW
+            )
+            daily_count = self.storage.get(day_key)
+        except Exception as e:
+            logger.warning("Shared rate limit store unavailable: %s", e)
+            minute_count = daily_count = 0
+        return {
+            "minute_remaining": max(0, MAX_PER_MINUTE - minute_count),
+            "day_remaining": max(0, MAX_PER_DAY - daily_count),
+        }
+
+    def reset_user(self, user_id: int) -> None:
+        """Remove all rate-limit data for a user (admin use)."""
+        for key in self._keys(user_id):
+            self.storage.clear(key)
+        logger.info("Rate limit reset for user %s", user_id)
+
+
+def create_rate_limiter(
+    storage_uri: Optional[str] = None,
+) -> "TelegramRateLimiter | SharedTelegramRateLimiter":
+    """
+    Build the limiter for this bot process.
+
+    TELEGRAM_RATE_LIMIT_STORAGE_URI wins ("memory" keeps the per-process
+    limiter); otherwise Redis from REDIS_URL/REDIS_HOST, otherwise the SQLite
+    file shared with the API rate limiter (replicas on this host only).
+    """
+    from core.redis_url import resolve_redis_url
+
+    uri = storage_uri or os.getenv("TELEGRAM_RATE_LIMIT_STORAGE_URI", "")
+    if uri == "memory":
+        return TelegramRateLimiter()
+    if not uri:
+        uri = resolve_redis_url()[0] or "sqlite:///" + os.getenv(
+            "RATE_LIMIT_SQLITE_PATH", "data/rate_limits.sqlite3"
+        )
+    try:
+        return SharedTelegramRateLimiter(uri)
+    except Exception as e:
+        logger.warning(
+            "Shared rate limit store %s unusable, falling back to in-memory: %s",
+            uri.split("@")[-1],
+            e,
+        )
+        return TelegramRateLimiter()
@@ -0,0 +1,101 @@
+"""
+Progressive Telegram replies.
+
+The answer is sent as soon as the agent starts streaming and then edited in
+place as more of it arrives.  Telegram throttles edits (roughly one per second per chat), so ``StreamingReply``
+keeps only the latest text and edits at most every EDIT_INTERVAL seconds
+from a background task; the agent never waits on Telegram.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+EDIT_INTERVAL = 1.0  # seconds between edits of one message
+MESSAGE_LIMIT = 4096  # Telegram's maximum message length
+CURSOR = " ▌"
+
+# send(text) -> message handle; edit(message, text)
+Send = Callable[[str], Awaitable[Any]]
+Edit = Callable[[Any, str], Awaitable[Any]]
+
+
+def split_message(text: str, limit: int = MESSAGE_LIMIT) -> list[str]:
+    """Split text into Telegram-sized parts, preferring line breaks."""
+    parts = []
+    while len(text) > limit:
+        cut = text.rfind("\n", 0, limit)
+        if cut <= 0:
+            cut = limit
+        parts.append(text[:cut])
+        text = text[cut:].lstrip("\n")
+    parts.append(text)
+    return parts
+
+
+class StreamingReply:
+    """One Telegram message the answer is progressively edited into.
+
+    Args:
+        send: Sends a new message and returns its handle; used for the first
+            text shown and for the rest of answers longer than one message.
+        edit: Replaces the text of a message returned by send.
+    """
+
+    def __init__(self, send: Send, edit: Edit, interval: float = EDIT_INTERVAL) -> None:
+        self.send = send
+        self.edit = edit
+        self.interval = interval
+        self.message: Any = None
+        self.edits = 0
+        self._latest = ""
+        self._shown = ""
+        self._last_edit = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def update(self, text: str) -> None:
+        """Show text (the answer so far) at the next allowed edit."""
+        self._latest = text
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        while self._shown != self._latest:
+            wait = self._last_edit + self.interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            text = self._latest
+            # While streaming, show at most one message's worth
+            await self._edit(text[: MESSAGE_LIMIT - len(CURSOR)] + CURSOR)
+            self._shown = text
+
+    async def _edit(self, text: str) -> None:
+        self._last_edit = time.monotonic()
+        try:
+            if self.message is None:
+                self.message = await self.send(text)
+            else:
+                self.edits += 1
+                await self.edit(self.message, text)
+        except Exception as e:
+            # "message is not modified" and transient errors: the next edit retries
+            logger.debug("Telegram edit failed: %s", e)
+
+    async def finish(self, text: str) -> None:
+        """Replace the streamed text with the final answer."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        parts = split_message(text or "（無回應）")
+        wait = self._last_edit + self.interval - time.monotonic()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        await self._edit(parts[0])
+        for part in parts[1:]:
+            await self.send(part)
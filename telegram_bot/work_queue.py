@@ -0,0 +1,169 @@
+"""
+Bounded work queue between Telegram updates and the agent.
+
+- At most ``max_pending`` questions wait at once; beyond that ``submit``
+  raises ``QueueFullError`` so the bot can answer "busy" immediately instead
+  of letting updates pile up behind a slow agent.
+- Questions from one chat run one at a time, in order: a chat's ManagerAgent
+  session holds per-run state (stream callback, graph thread) and must not
+  run twice concurrently.  Different chats run on up to ``workers`` tasks in
+  parallel.  A chat sits in the ready queue at most once, so a chatty chat
+  cannot take every worker.
+- A question repeated in the same chat while the first copy is still
+  queued or running (double taps, client resends) shares that agent run:
+  the repeat subscribes to the running answer.  Runs are never shared
+  across chats — the answer is built from the asking chat's session history.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Receives the answer text accumulated so far
+Listener = Callable[[str], Awaitable[None]]
+# (chat_id, text, on_delta) -> final answer
+Handler = Callable[[int, str, Callable[[str], Awaitable[None]]], Awaitable[str]]
+
+WORKERS = 4
+MAX_PENDING = 200
+
+
+class QueueFullError(RuntimeError):
+    """Raised by ``submit`` when ``max_pending`` questions are already waiting."""
+
+
+def coalesce_key(chat_id: int, text: str) -> Tuple[int, str]:
+    """Questions in one chat differing only in case or spacing share one run."""
+    return chat_id, " ".join(text.lower().split())
+
+
+class _Flight:
+    __slots__ = ("key", "text", "listeners", "future")
+
+    def __init__(self, key: Optional[Tuple[int, str]]) -> None:
+        self.key = key
+        self.text = ""
+        self.listeners: List[Listener] = []
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        # Every asker may have gone by the time a run fails
+        self.future.add_done_callback(lambda f: f.cancelled() or f.exception() is None)
+
+    async def publish(self, delta: str) -> None:
+        self.text += delta
+        for listener in list(self.listeners):
+            try:
+                await listener(self.text)
+            except Exception as e:
+                logger.debug("Stream listener failed: %s", e)
+
+
+class AgentWorkQueue:
+    """Per-chat serialized, bounded, coalescing queue in front of ``handler``."""
+
+    def __init__(
+        self,
+        handler: Handler,
+        workers: int = WORKERS,
+        max_pending: int = MAX_PENDING,
+    ) -> None:
+        self.handler = handler
+        self.workers = workers
+        self.max_pending = max_pending
+        # chat_id -> jobs not started yet; present while the chat is queued or running
+        self._chats: Dict[int, deque] = {}
+        self._ready: asyncio.Queue = asyncio.Queue()
+        self._inflight: Dict[Tuple[int, str], _Flight] = {}
+        self._pending = 0
+        self._tasks: List[asyncio.Task] = []
+        self._stats = {"submitted": 0, "coalesced": 0, "rejected": 0, "failed": 0}
+
+    def start(self) -> None:
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._worker()) for _ in range(self.workers)
+            ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(
+        self,
+        chat_id: int,
+        text: str,
+        listener: Optional[Listener] = None,
+        coalesce: bool = True,
+    ) -> str:
+        """Queue text for chat_id and wait for the answer.
+
+        listener, if given, is awaited with the accumulated answer each time
+        the agent streams more of it.  Pass coalesce=False for messages whose
+        meaning depends on the chat (e.g. a reply to the agent's question).
+        """
+        key = coalesce_key(chat_id, text) if coalesce else None
+        flight = self._inflight.get(key) if key else None
+        if flight is not None:
+            self._stats["coalesced"] += 1
+        else:
+            if self._pending >= self.max_pending:
+                self._stats["rejected"] += 1
+                raise QueueFullError(f"{self._pending} questions already waiting")
+            flight = _Flight(key)
+            if key:
+                self._inflight[key] = flight
+            self._enqueue(chat_id, text, flight)
+
+        if listener is not None:
+            flight.listeners.append(listener)
+            if flight.text:
+                await listener(flight.text)
+        # A cancelled asker must not cancel the run others may share
+        return await asyncio.shield(flight.future)
+
+    def _enqueue(self, chat_id: int, text: str, flight: _Flight) -> None:
+        self._stats["submitted"] += 1
+        self._pending += 1
+        jobs = self._chats.get(chat_id)
+        if jobs is None:
+            jobs = self._chats[chat_id] = deque()
+            self._ready.put_nowait(chat_id)
+        # Otherwise the chat is queued or running and is rescheduled when done
+        jobs.append((text, flight))
+
+    async def _worker(self) -> None:
+        while True:
+            chat_id = await self._ready.get()
+            jobs = self._chats[chat_id]
+            text, flight = jobs.popleft()
+            try:
+                flight.future.set_result(
+                    await self.handler(chat_id, text, flight.publish)
+                )
+            except asyncio.CancelledError:
+                flight.future.cancel()
+                raise
+            except Exception as e:
+                self._stats["failed"] += 1
+                flight.future.set_exception(e)
+            finally:
+                self._pending -= 1
+                if flight.key and self._inflight.get(flight.key) is flight:
+                    del self._inflight[flight.key]
+                if jobs:
+                    self._ready.put_nowait(chat_id)
+                else:
+                    del self._chats[chat_id]
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "pending": self._pending,
+            "chats": len(self._chats),
+            "inflight": len(self._inflight),
+            "workers": len(self._tasks),
+        }
@@ -21,12 +21,25 @@ os.environ.setdefault("TEST_MODE", "true")
 os.environ.setdefault("TEST_MODE_CONFIRMATION", "I_UNDERSTAND_THE_RISKS")
 os.environ.setdefault("ADMIN_API_KEY", "test-admin-key")
 os.environ.setdefault("ENVIRONMENT", "development")
+os.environ.setdefault("CHECKPOINT_BACKEND", "sqlite")
+os.environ.setdefault("CHECKPOINT_SQLITE_PATH", ":memory:")
+os.environ.setdefault("MEMORY_QUEUE_ENABLED", "false")
+os.environ.setdefault("CONTEXT_TOKENIZER", "estimate")
 
 
 import pytest
 from httpx import ASGITransport, AsyncClient
 
 
+@pytest.fixture(autouse=True)
+def _clear_principal_cache():
+    """Tests patch user_repo per case; never serve a principal cached by another."""
+    from core import principal_cache
+
+    principal_cache.clear()
+    yield
+
+
 @pytest.fixture
 def app():
     from api_server import app
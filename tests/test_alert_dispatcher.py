@@ -0,0 +1,297 @@
+"""
+Tests for the asynchronous security alert dispatcher, against local stub
+Telegram Bot API and SMTP servers.
+"""
+
+import asyncio
+import json
+import socketserver
+import threading
+import time
+from email import message_from_bytes, policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core.alert_dispatcher import TELEGRAM_MESSAGE_LIMIT, Alert, AlertDispatcher
+
+
+class _TelegramHandler(BaseHTTPRequestHandler):
+    """sendMessage only; answers with the queued failure statuses first."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        time.sleep(server.delay)
+        with server.lock:
+            status = server.fail_with.pop(0) if server.fail_with else 200
+            server.requests.append((self.path, body, status))
+        payload = {"ok": status == 200, "result": {"message_id": 1}}
+        if status == 429:
+            payload["parameters"] = {"retry_after": 0}
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+class StubTelegram(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _TelegramHandler)
+        self.lock = threading.Lock()
+        self.requests = []
+        self.fail_with = []
+        self.delay = 0.0
+
+    @property
+    def messages(self):
+        return [body["text"] for _, body, status in self.requests if status == 200]
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Just enough SMTP for smtplib: EHLO, MAIL, RCPT, DATA, QUIT."""
+
+    def _reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self._reply("220 stub ESMTP")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            verb = line.split(b" ", 1)[0].strip().upper()
+            if verb == b"EHLO":
+                self._reply("250-stub")
+                self._reply("250 8BITMIME")
+            elif verb in (b"HELO", b"MAIL", b"RCPT", b"RSET", b"NOOP"):
+                self._reply("250 OK")
+            elif verb == b"DATA":
+                self._reply("354 go ahead")
+                data = b""
+                while True:
+                    chunk = self.rfile.readline()
+                    if chunk in (b".\r\n", b""):
+                        break
+                    data += chunk
+                time.sleep(self.server.delay)
+                self.server.messages.append(
+                    message_from_bytes(data, policy=policy.default)
+                )
+                self._reply("250 queued")
+            elif verb == b"QUIT":
+                self._reply("221 bye")
+                return
+            else:
+                self._reply("502 not implemented")
+
+
+class StubSMTP(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SMTPHandler)
+        self.messages = []
+        self.delay = 0.0
+
+
+@pytest.fixture
+def stubs(monkeypatch):
+    telegram, smtp = StubTelegram(), StubSMTP()
+    for server in (telegram, smtp):
+        threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "123:test")
+    monkeypatch.setenv("TELEGRAM_CHAT_ID", "42")
+    monkeypatch.setenv(
+        "TELEGRAM_API_BASE_URL", f"http://127.0.0.1:{telegram.server_address[1]}/bot"
+    )
+    monkeypatch.setenv("SMTP_HOST", "127.0.0.1")
+    monkeypatch.setenv("SMTP_PORT", str(smtp.server_address[1]))
+    monkeypatch.setenv("SMTP_USERNAME", "alerts@example.com")
+    monkeypatch.delenv("SMTP_PASSWORD", raising=False)
+    monkeypatch.setenv("SMTP_STARTTLS", "false")
+    monkeypatch.setenv("ADMIN_EMAIL", "admin@example.com")
+    yield telegram, smtp
+    for server in (telegram, smtp):
+        server.shutdown()
+        server.server_close()
+
+
+def _dispatcher(**kwargs):
+    options = {"retry_base": 0.01, "coalesce_window": 0}
+    options.update(kwargs)
+    return AlertDispatcher(**options)
+
+
+class TestSynchronousFallback:
+    def test_delivers_inline_before_start(self, stubs):
+        telegram, smtp = stubs
+        dispatcher = _dispatcher()
+
+        assert dispatcher.send("telegram", "high", "Login storm", "10 failures")
+        assert dispatcher.send("email", "critical", "Key leak", "rotate now")
+
+        assert telegram.requests[0][0] == "/bot123:test/sendMessage"
+        assert "<b>Login storm</b>" in telegram.messages[0]
+        assert smtp.messages[0]["Subject"] == "[CRITICAL] Key leak"
+
+    def test_unconfigured_and_unknown_channels(self, monkeypatch):
+        monkeypatch.delenv("TELEGRAM_BOT_TOKEN", raising=False)
+        dispatcher = _dispatcher()
+        assert dispatcher.send("telegram", "high", "t", "m") is False
+        assert dispatcher.send("pager", "high", "t", "m") is False
+
+
+class TestAsyncDelivery:
+    async def test_send_does_not_wait_for_slow_smtp(self, stubs):
+        _, smtp = stubs
+        smtp.delay = 0.3
+        dispatcher = _dispatcher()
+        dispatcher.start()
+
+        started = time.perf_counter()
+        assert dispatcher.send("email", "high", "Slow", "body")
+        assert time.perf_counter() - started < 0.05
+        assert smtp.messages == []
+
+        await dispatcher.stop()
+        assert [m["Subject"] for m in smtp.messages] == ["[HIGH] Slow"]
+
+    async def test_transient_failures_are_retried(self, stubs):
+        telegram, _ = stubs
+        telegram.fail_with = [500, 429]
+        dispatcher = _dispatcher()
+        dispatcher.start()
+
+        dispatcher.send("telegram", "critical", "Breach", "details")
+        await dispatcher.stop()
+
+        assert [status for _, _, status in telegram.requests] == [500, 429, 200]
+        assert dispatcher.stats["retries"] == 2
+        assert dispatcher.stats["sent"] == 1
+
+    async def test_rejected_request_is_not_retried(self, stubs):
+        telegram, _ = stubs
+        telegram.fail_with = [400]
+        dispatcher = _dispatcher()
+        dispatcher.start()
+
+        dispatcher.send("telegram", "high", "Bad", "markup")
+        await dispatcher.stop()
+
+        assert len(telegram.requests) == 1
+        assert dispatcher.stats["failed"] == 1
+
+    async def test_backlog_is_sent_in_batches(self, stubs):
+        telegram, _ = stubs
+        telegram.delay = 0.1
+        dispatcher = _dispatcher(workers={"telegram": 1, "email": 1})
+        dispatcher.start()
+
+        dispatcher.send("telegram", "high", "Alert 0", "m")
+        await asyncio.sleep(0.02)
+        for i in range(1, 6):
+            dispatcher.send("telegram", "high", f"Alert {i}", "m")
+        await dispatcher.stop()
+
+        # The first goes out alone; the five queued behind it share a message
+        assert len(telegram.messages) == 2
+        assert all(f"Alert {i}" in "".join(telegram.messages) for i in range(6))
+
+    async def test_rejected_batch_is_resent_one_by_one(self, stubs):
+        telegram, _ = stubs
+        telegram.delay = 0.1
+        telegram.fail_with = [200, 400, 400]
+        dispatcher = _dispatcher(workers={"telegram": 1, "email": 1})
+        dispatcher.start()
+
+        dispatcher.send("telegram", "high", "Alert 0", "m")
+        await asyncio.sleep(0.02)
+        for i in range(1, 4):
+            dispatcher.send("telegram", "high", f"Alert {i}", "m")
+        await dispatcher.stop()
+
+        # The batch of three is rejected; resent alone, only "Alert 1" fails
+        assert [status for _, _, status in telegram.requests] == [
+            200,
+            400,
+            400,
+            200,
+            200,
+        ]
+        assert dispatcher.stats["sent"] == 3
+        assert dispatcher.stats["failed"] == 1
+
+    async def test_send_from_another_thread(self, stubs):
+        telegram, _ = stubs
+        dispatcher = _dispatcher()
+        dispatcher.start()
+
+        await asyncio.to_thread(dispatcher.send, "telegram", "high", "Worker", "m")
+        await dispatcher.stop()
+
+        assert "<b>Worker</b>" in telegram.messages[0]
+
+
+class TestCoalescing:
+    async def test_repeats_become_one_digest(self, stubs):
+        telegram, _ = stubs
+        dispatcher = _dispatcher(coalesce_window=0.2)
+        dispatcher.start()
+
+        for i in range(10):
+            dispatcher.send("telegram", "high", "Brute force", f"attempt {i}")
+        await asyncio.sleep(0.1)
+        assert len(telegram.messages) == 1
+        await asyncio.sleep(0.3)
+
+        assert len(telegram.messages) == 2
+        assert "Brute force (×9 more in 0s)" in telegram.messages[1]
+        assert "attempt 9" in telegram.messages[1]
+        assert dispatcher.stats["coalesced"] == 9
+        await dispatcher.stop()
+
+    async def test_stop_flushes_open_digests(self, stubs):
+        _, smtp = stubs
+        dispatcher = _dispatcher(coalesce_window=60)
+        dispatcher.start()
+
+        for _ in range(3):
+            dispatcher.send("email", "critical", "Token reuse", "m")
+        dispatcher.send("email", "critical", "Other", "m")
+        await asyncio.sleep(0.1)
+        assert len(smtp.messages) == 1
+        await dispatcher.stop()
+
+        assert smtp.messages[0]["Subject"] == "[CRITICAL] 2 security alerts"
+        assert len(smtp.messages) == 2
+        digest = smtp.messages[1]
+        assert digest["Subject"] == "[CRITICAL] Token reuse (×2 more in 60s)"
+
+
+class TestTelegramFormatting:
+    def test_title_and_body_are_escaped(self, stubs):
+        telegram, _ = stubs
+        dispatcher = _dispatcher()
+
+        dispatcher.send("telegram", "high", "Probe <script>", "GET /?a=1&b=<x>")
+
+        text = telegram.messages[0]
+        assert "<b>Probe &lt;script&gt;</b>" in text
+        assert "GET /?a=1&amp;b=&lt;x&gt;" in text
+
+    def test_long_body_is_cut_after_escaping(self):
+        alert = Alert("telegram", "high", "t", "<" * 5000)
+        text = AlertDispatcher._format_telegram_one(alert)
+
+        assert len(text) <= TELEGRAM_MESSAGE_LIMIT
+        body = text.split("\n\n")[1]
+        assert body and body.replace("&lt;", "") == ""
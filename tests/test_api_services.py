@@ -7,6 +7,7 @@ from unittest.mock import patch
 import pytest
 from cachetools import TTLCache
 
+from api import services
 from api.services import (
     _build_market_pulse_targets,
     _get_cache_timestamps,
@@ -20,36 +21,56 @@ from api.services import (
 class TestMarketPulseCache:
     """Tests for Market Pulse cache functions"""
 
+    @pytest.fixture(autouse=True)
+    def _versions(self):
+        with patch.dict("api.services._market_pulse_versions", clear=True):
+            yield
+
     def test_save_market_pulse_cache_serializes_ttlcache_snapshot(self):
-        """TTLCache should be persisted as a plain dict snapshot."""
+        """TTLCache should be persisted as one plain entry per symbol."""
         cache = TTLCache(maxsize=10, ttl=60)
         cache["BTC"] = {"price": 50000}
 
-        with patch("api.services.set_cache") as mock_set:
+        with patch("api.services.save_market_pulse_entries") as mock_save:
             with patch("api.services.MARKET_PULSE_CACHE", cache):
                 save_market_pulse_cache(silent=True)
 
-        mock_set.assert_called_once_with("MARKET_PULSE", {"BTC": {"price": 50000}})
+        mock_save.assert_called_once_with({"BTC": {"price": 50000}})
+
+    def test_save_market_pulse_cache_only_named_symbols(self):
+        """Saving one symbol must not rewrite the others."""
+        cache = {"BTC": {"price": 50000}, "ETH": {"price": 3000}}
+        with patch(
+            "api.services.save_market_pulse_entries", return_value={"ETH": 7}
+        ) as mock_save:
+            with patch("api.services.MARKET_PULSE_CACHE", cache):
+                save_market_pulse_cache(symbols=["ETH", "NOPE"])
+
+        mock_save.assert_called_once_with({"ETH": {"price": 3000}})
+        assert services._market_pulse_versions == {"ETH": 7}
 
     def test_save_market_pulse_cache_success(self):
         """Test successful cache save"""
-        with patch("api.services.set_cache") as mock_set:
+        with patch("api.services.save_market_pulse_entries") as mock_save:
             with patch("api.services.MARKET_PULSE_CACHE", {"BTC": {}}):
                 save_market_pulse_cache(silent=True)
-                mock_set.assert_called_once()
+                mock_save.assert_called_once()
 
     def test_save_market_pulse_cache_with_logging(self):
         """Test cache save with logging"""
-        with patch("api.services.set_cache") as _:
-            with patch("api.services.MARKET_PULSE_CACHE", {}):
+        with patch("api.services.save_market_pulse_entries", return_value={"BTC": 1}):
+            with patch("api.services.MARKET_PULSE_CACHE", {"BTC": {}}):
                 with patch("api.services.logger") as mock_logger:
                     save_market_pulse_cache(silent=False)
                     mock_logger.info.assert_called()
 
     def test_save_market_pulse_cache_error(self):
         """Test cache save error handling"""
-        with patch("api.services.set_cache", side_effect=Exception("DB error")):
-            with patch("api.services.MARKET_PULSE_CACHE", {}):
+        with patch(
+            "api.services.save_market_pulse_entries",
+            side_effect=Exception("DB error"),
+        ):
+            with patch("api.services.MARKET_PULSE_CACHE", {"BTC": {}}):
                 with patch("api.services.logger") as mock_logger:
                     # Should not raise
                     save_market_pulse_cache()
@@ -57,27 +78,93 @@ class TestMarketPulseCache:
 
     def test_load_market_pulse_cache_success(self):
         """Test successful cache load"""
-        with patch("api.services.get_cache") as mock_get:
-            mock_get.return_value = {"BTC": {"price": 50000}}
-            with patch("api.services.MARKET_PULSE_CACHE", {}):
-                with patch("api.services.logger"):
-                    load_market_pulse_cache()
+        entries = {"BTC": {"version": 5, "data": {"price": 50000}}}
+        cache = {}
+        with patch("api.services.load_market_pulse_entries", return_value=entries):
+            with patch("api.services.get_cache") as mock_get:
+                with patch("api.services.MARKET_PULSE_CACHE", cache):
+                    with patch("api.services.logger"):
+                        load_market_pulse_cache()
+
+        assert cache == {"BTC": {"price": 50000}}
+        assert services._market_pulse_versions == {"BTC": 5}
+        mock_get.assert_not_called()
+
+    def test_load_market_pulse_cache_migrates_legacy_blob(self):
+        """Without per-symbol entries the legacy dict is loaded and re-saved."""
+        cache = {}
+        with patch("api.services.load_market_pulse_entries", return_value={}):
+            with patch(
+                "api.services.get_cache", return_value={"BTC": {"price": 1}}
+            ) as mock_get:
+                with patch("api.services.save_market_pulse_entries") as mock_save:
+                    with patch("api.services.MARKET_PULSE_CACHE", cache):
+                        load_market_pulse_cache()
+
+        mock_get.assert_called_once_with("MARKET_PULSE")
+        assert cache == {"BTC": {"price": 1}}
+        mock_save.assert_called_once_with({"BTC": {"price": 1}})
 
     def test_load_market_pulse_cache_no_data(self):
         """Test cache load with no data"""
-        with patch("api.services.get_cache", return_value=None):
-            with patch("api.services.MARKET_PULSE_CACHE", {}):
-                load_market_pulse_cache()
+        with patch("api.services.load_market_pulse_entries", return_value={}):
+            with patch("api.services.get_cache", return_value=None):
+                with patch("api.services.MARKET_PULSE_CACHE", {}):
+                    load_market_pulse_cache()
 
     def test_load_market_pulse_cache_error(self):
         """Test cache load error handling"""
-        with patch("api.services.get_cache", side_effect=Exception("DB error")):
+        with patch(
+            "api.services.load_market_pulse_entries",
+            side_effect=Exception("DB error"),
+        ):
             with patch("api.services.logger") as mock_logger:
                 # Should not raise
                 load_market_pulse_cache()
                 mock_logger.error.assert_called()
 
 
+class TestMarketPulseSync:
+    """Tests for pulling only changed Market Pulse symbols"""
+
+    @pytest.fixture(autouse=True)
+    def _versions(self):
+        with patch.dict(
+            "api.services._market_pulse_versions",
+            {"BTC": 1, "ETH": 1, "SOL": 1},
+            clear=True,
+        ):
+            yield
+
+    def test_delta_fetches_only_stale_symbols(self):
+        cache = {"BTC": {}, "ETH": {}, "SOL": {}}
+        entries = {"ETH": {"version": 2, "data": {"price": 3000}}}
+        with patch(
+            "api.services.fetch_market_pulse_entries", return_value=entries
+        ) as mock_fetch:
+            with patch("api.services.MARKET_PULSE_CACHE", cache):
+                assert services.sync_market_pulse_cache({"BTC": 1, "ETH": 2}) == 1
+
+        mock_fetch.assert_called_once_with(["ETH"])
+        assert cache["ETH"] == {"price": 3000}
+        assert services._market_pulse_versions["ETH"] == 2
+
+    def test_own_delta_is_a_no_op(self):
+        with patch("api.services.fetch_market_pulse_entries") as mock_fetch:
+            with patch("api.services.MARKET_PULSE_CACHE", {"BTC": {}}):
+                assert services.sync_market_pulse_cache({"BTC": 1}) == 0
+        mock_fetch.assert_not_called()
+
+    def test_probe_does_not_revive_expired_symbols(self):
+        # SOL expired from the TTL cache; unchanged, it must stay expired
+        with patch(
+            "api.services.load_market_pulse_entries", return_value={}
+        ) as mock_load:
+            with patch("api.services.MARKET_PULSE_CACHE", {"BTC": {}, "ETH": {}}):
+                services.sync_market_pulse_cache()
+        mock_load.assert_called_once_with({"BTC": 1, "ETH": 1, "SOL": 1})
+
+
 class TestFundingRateCache:
     """Tests for Funding Rate cache functions"""
 
@@ -138,16 +225,19 @@ class TestCacheDataFlow:
         test_data = {"BTC": {"price": 50000, "change": 5.0}}
 
         # Simulate save
-        with patch("api.services.set_cache") as mock_set:
+        with patch(
+            "api.services.save_market_pulse_entries", return_value={"BTC": 1}
+        ) as mock_save:
             with patch("api.services.MARKET_PULSE_CACHE", test_data):
                 save_market_pulse_cache()
-                mock_set.assert_called_with("MARKET_PULSE", test_data)
+                mock_save.assert_called_with(test_data)
 
         # Simulate load
-        with patch("api.services.get_cache", return_value=test_data):
-            with patch("api.services.MARKET_PULSE_CACHE", {}) as _:
+        entries = {"BTC": {"version": 1, "data": test_data["BTC"]}}
+        with patch("api.services.load_market_pulse_entries", return_value=entries):
+            with patch("api.services.MARKET_PULSE_CACHE", {}) as cache:
                 load_market_pulse_cache()
-                # Cache should be updated
+                assert cache == test_data
 
 
 class TestMarketPulseTargetSanitization:
@@ -1,6 +1,12 @@
 """Tests for centralized audit logging."""
 
-from core.audit import AuditLogger, _sanitize_request_data
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from core.audit import AuditLogger, AuditSink, _sanitize_request_data
 
 
 class TestAuditLogger:
@@ -51,3 +57,84 @@ class TestSanitizeRequestData:
         assert sanitized["password"] == "[REDACTED]"
         assert sanitized["profile"]["access_token"] == "[REDACTED]"
         assert sanitized["profile"]["email"].startswith("use")
+
+
+class TestAuditSink:
+    """Tests for the bounded, batched audit writer."""
+
+    @pytest.fixture
+    def written(self):
+        batches = []
+
+        async def fake_insert(rows):
+            batches.append(list(rows))
+
+        with patch("core.audit._insert_rows", side_effect=fake_insert):
+            yield batches
+
+    async def test_flushes_full_batches(self, written):
+        sink = AuditSink(maxsize=100, batch_size=3, flush_interval_ms=10_000)
+        sink.start()
+        for i in range(6):
+            assert sink.submit({"action": f"a{i}"}) is True
+        await asyncio.sleep(0.05)
+        await sink.stop()
+
+        assert [len(b) for b in written] == [3, 3]
+        assert sink.metrics()["written"] == 6
+        assert sink.metrics()["batches"] == 2
+
+    async def test_flushes_partial_batch_after_interval(self, written):
+        sink = AuditSink(maxsize=100, batch_size=50, flush_interval_ms=20)
+        sink.start()
+        sink.submit({"action": "a"})
+        await asyncio.sleep(0.1)
+
+        assert written == [[{"action": "a"}]]
+        await sink.stop()
+
+    async def test_drops_when_queue_full(self, written):
+        sink = AuditSink(maxsize=2, batch_size=10, flush_interval_ms=10_000)
+        sink.start()
+        results = [sink.submit({"action": str(i)}) for i in range(5)]
+
+        assert results.count(False) >= 2
+        assert sink.metrics()["dropped"] == results.count(False)
+        await sink.stop()
+
+    async def test_stop_drains_queue(self, written):
+        sink = AuditSink(maxsize=100, batch_size=4, flush_interval_ms=10_000)
+        sink.start()
+        for i in range(10):
+            sink.submit({"action": str(i)})
+        await sink.stop()
+
+        assert sum(len(b) for b in written) == 10
+        assert not sink.running
+
+    async def test_submit_from_worker_thread(self, written):
+        sink = AuditSink(maxsize=100, batch_size=10, flush_interval_ms=10)
+        sink.start()
+        thread = threading.Thread(target=sink.submit, args=({"action": "t"},))
+        thread.start()
+        thread.join()
+        await asyncio.sleep(0.05)
+        await sink.stop()
+
+        assert written == [[{"action": "t"}]]
+
+    def test_submit_without_writer_returns_false(self):
+        assert AuditSink().submit({"action": "x"}) is False
+
+    async def test_log_enqueues_instead_of_writing(self, written):
+        sink = AuditSink(maxsize=100, batch_size=10, flush_interval_ms=10)
+        sink.start()
+        with patch("core.audit.audit_sink", sink):
+            AuditLogger.log(action="login", user_id="user-1", method="post")
+            assert sink.metrics()["enqueued"] == 1
+        await sink.stop()
+
+        [[row]] = written
+        assert row["action"] == "login"
+        assert row["method"] == "POST"
+        assert row["endpoint"] == "system://internal"
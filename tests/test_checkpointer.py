@@ -0,0 +1,284 @@
+"""Tests for core/agents/checkpointer.py (SQLite backend)."""
+
+import operator
+import sqlite3
+from typing import Annotated, TypedDict
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.graph import END, StateGraph
+
+from core.agents.checkpointer import (
+    PersistentCheckpointSaver,
+    ScopedCheckpointer,
+    _SQLiteBackend,
+)
+
+
+def _saver(**kwargs) -> PersistentCheckpointSaver:
+    return PersistentCheckpointSaver(_SQLiteBackend(":memory:"), **kwargs)
+
+
+def _cfg(thread="t1", checkpoint_id=None):
+    configurable = {"thread_id": thread, "checkpoint_ns": ""}
+    if checkpoint_id:
+        configurable["checkpoint_id"] = checkpoint_id
+    return {"configurable": configurable}
+
+
+def _step(saver, config, prev, **values):
+    """Write one checkpoint that bumps the given channels."""
+    checkpoint = empty_checkpoint() if prev is None else prev.copy()
+    checkpoint["id"] = empty_checkpoint()["id"]
+    checkpoint["channel_values"] = {**(prev or {}).get("channel_values", {}), **values}
+    versions = dict(checkpoint["channel_versions"])
+    new_versions = {}
+    for channel in values:
+        versions[channel] = saver.get_next_version(versions.get(channel), None)
+        new_versions[channel] = versions[channel]
+    checkpoint["channel_versions"] = versions
+    next_config = saver.put(config, checkpoint, {"step": 0}, new_versions)
+    return next_config, checkpoint
+
+
+def _count(saver, table):
+    with saver.backend.cursor() as cur:
+        cur.execute(f"SELECT COUNT(*) FROM {table}")
+        return cur.fetchone()[0]
+
+
+def _cold(saver):
+    """Drop the hot cache so reads go to the backend."""
+    saver._hot._entries.clear()
+    saver._hot._sizes.clear()
+    saver._hot.bytes = 0
+
+
+class TestPersistence:
+    def test_round_trip_from_backend(self):
+        saver = _saver()
+        config, _ = _step(saver, _cfg(), None, messages=["hi"], phase="a")
+        config, _ = _step(saver, config, saver.get_tuple(config).checkpoint, phase="b")
+        _cold(saver)
+
+        restored = saver.get_tuple(_cfg())
+        assert restored.checkpoint["channel_values"] == {
+            "messages": ["hi"],
+            "phase": "b",
+        }
+        assert restored.config == config
+        assert restored.parent_config is not None
+
+    def test_unchanged_channels_are_not_rewritten(self):
+        saver = _saver()
+        config, ck = _step(saver, _cfg(), None, messages=["big"], phase="a")
+        _step(saver, config, ck, phase="b")
+        with saver.backend.cursor() as cur:
+            cur.execute(
+                "SELECT channel, COUNT(*) FROM checkpoint_blobs GROUP BY channel"
+            )
+            counts = dict(cur.fetchall())
+        assert counts == {"messages": 1, "phase": 2}
+
+    def test_pending_writes_survive_restart(self):
+        saver = _saver()
+        config, _ = _step(saver, _cfg(), None, phase="a")
+        saver.put_writes(config, [("phase", "b"), ("extra", 1)], "task-1")
+        _cold(saver)
+
+        restored = saver.get_tuple(_cfg())
+        assert restored.pending_writes == [
+            ("task-1", "phase", "b"),
+            ("task-1", "extra", 1),
+        ]
+
+
+class TestRetention:
+    def test_keeps_last_n_checkpoints(self):
+        saver = _saver(keep_last=3)
+        config, ck = _cfg(), None
+        for i in range(10):
+            config, ck = _step(saver, config, ck, phase=str(i))
+            saver.put_writes(config, [("phase", "x")], f"task-{i}")
+
+        assert _count(saver, "checkpoints") == 3
+        assert _count(saver, "checkpoint_writes") == 3
+        # Only the versions still referenced by the oldest kept checkpoint onwards
+        assert _count(saver, "checkpoint_blobs") == 3
+        assert len(list(saver.list(_cfg()))) == 3
+
+    def test_unchanged_blob_kept_while_referenced(self):
+        saver = _saver(keep_last=2)
+        config, ck = _step(saver, _cfg(), None, messages=["first"], phase="0")
+        for i in range(1, 6):
+            config, ck = _step(saver, config, ck, phase=str(i))
+        _cold(saver)
+
+        restored = saver.get_tuple(_cfg())
+        assert restored.checkpoint["channel_values"]["messages"] == ["first"]
+
+    def test_byte_budget_keeps_latest(self):
+        saver = _saver(keep_last=10, thread_max_bytes=1)
+        config, ck = _cfg(), None
+        for i in range(4):
+            config, ck = _step(saver, config, ck, phase="x" * 100 + str(i))
+
+        assert _count(saver, "checkpoints") == 1
+        _cold(saver)
+        assert (
+            saver.get_tuple(_cfg()).checkpoint["channel_values"]["phase"].endswith("3")
+        )
+
+
+class TestHotCache:
+    def test_latest_served_without_backend(self):
+        saver = _saver()
+        _step(saver, _cfg(), None, phase="a")
+        saver.backend = None  # any backend access would raise
+
+        assert saver.get_tuple(_cfg()).checkpoint["channel_values"] == {"phase": "a"}
+
+    def test_lru_bounded_by_entries(self):
+        saver = _saver(hot_max_entries=2)
+        for thread in ("a", "b", "c"):
+            _step(saver, _cfg(thread), None, phase=thread)
+        stats = saver.stats()
+        assert stats["hot_entries"] == 2
+
+        # Evicted thread is still resumable from the backend
+        assert saver.get_tuple(_cfg("a")).checkpoint["channel_values"] == {"phase": "a"}
+
+    def test_lru_bounded_by_bytes(self):
+        saver = _saver(hot_max_bytes=2000)
+        for i in range(20):
+            _step(saver, _cfg(f"t{i}"), None, phase="x" * 200)
+        assert saver.stats()["hot_bytes"] <= 2000
+
+    def test_backend_failure_degrades_to_hot(self):
+        class Broken:
+            shared = False
+
+            @staticmethod
+            def sql(statement):
+                return statement
+
+            def cursor(self):
+                raise RuntimeError("db down")
+
+        saver = PersistentCheckpointSaver(Broken())
+        config, _ = _step(saver, _cfg(), None, phase="a")
+        assert saver.get_tuple(_cfg()).config == config
+        assert saver.stats()["backend_errors"] == 1
+
+    def test_shared_backend_trusts_a_fresh_entry(self, monkeypatch):
+        saver = _saver()
+        saver.backend.shared = True
+        heads = []
+        original = saver._head_id
+        monkeypatch.setattr(
+            saver, "_head_id", lambda *a: heads.append(a) or original(*a)
+        )
+        config, _ = _step(saver, _cfg(), None, phase="a")
+
+        assert saver.get_tuple(_cfg()).config == config
+        assert heads == []
+
+        saver.hot_trust_seconds = 0
+        assert saver.get_tuple(_cfg()).config == config
+        assert heads == [("t1", "")]
+
+    def test_shared_backend_sees_another_workers_step(self):
+        saver = _saver(hot_trust_seconds=0)
+        saver.backend.shared = True
+        other = PersistentCheckpointSaver(saver.backend)
+        config, ck = _step(saver, _cfg(), None, phase="a")
+        _step(other, config, ck, phase="b")
+
+        assert saver.get_tuple(_cfg()).checkpoint["channel_values"] == {"phase": "b"}
+
+
+class TestIdleThreads:
+    def test_threads_idle_past_the_cutoff_are_dropped(self):
+        saver = _saver()
+        for thread in ("old", "new"):
+            config, _ = _step(saver, _cfg(thread), None, messages=[thread])
+            saver.put_writes(config, [("phase", "x")], "task-1")
+        with saver.backend.cursor() as cur:
+            cur.execute("UPDATE checkpoints SET ts = ts - 7200 WHERE thread_id = 'old'")
+
+        assert saver.delete_idle_threads(3600) == 1
+        assert saver.get_tuple(_cfg("old")) is None
+        assert saver.get_tuple(_cfg("new")) is not None
+        for table in ("checkpoints", "checkpoint_blobs", "checkpoint_writes"):
+            assert _count(saver, table) == 1
+
+    def test_deletes_in_batches(self):
+        saver = _saver()
+        for i in range(5):
+            _step(saver, _cfg(f"t{i}"), None, phase="a")
+        with saver.backend.cursor() as cur:
+            cur.execute("UPDATE checkpoints SET ts = 0")
+
+        assert saver.delete_idle_threads(3600, batch=2) == 5
+        assert _count(saver, "checkpoints") == 0
+        assert saver.stats()["hot_entries"] == 0
+
+    def test_file_from_before_the_ts_column_is_upgraded(self, tmp_path):
+        path = str(tmp_path / "checkpoints.db")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE checkpoints (thread_id TEXT NOT NULL, "
+            "checkpoint_ns TEXT NOT NULL DEFAULT '', checkpoint_id TEXT NOT NULL, "
+            "parent_checkpoint_id TEXT, type TEXT NOT NULL, checkpoint BLOB NOT NULL, "
+            "metadata_type TEXT NOT NULL, metadata BLOB NOT NULL, "
+            "size_bytes INTEGER NOT NULL DEFAULT 0, "
+            "PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id))"
+        )
+        conn.execute(
+            "INSERT INTO checkpoints VALUES ('t', '', '1', NULL, 'x', x'', 'x', x'', 0)"
+        )
+        conn.commit()
+        conn.close()
+
+        saver = PersistentCheckpointSaver(_SQLiteBackend(path))
+        # The existing thread's clock starts at the upgrade, not at 0
+        assert saver.delete_idle_threads(3600) == 0
+        assert _count(saver, "checkpoints") == 1
+
+
+class TestScopedCheckpointer:
+    def test_threads_are_isolated(self):
+        saver = _saver()
+        alice = ScopedCheckpointer(saver, "alice:s1")
+        bob = ScopedCheckpointer(saver, "bob:s1")
+        _step(alice, _cfg("ignored"), None, phase="alice")
+
+        assert bob.get_tuple(_cfg("alice:s1")) is None
+        assert list(bob.list(None)) == []
+        assert alice.get_tuple(_cfg("anything")).checkpoint["channel_values"] == {
+            "phase": "alice"
+        }
+
+    @pytest.mark.asyncio
+    async def test_compiled_graph_resumes_state(self):
+        class State(TypedDict):
+            log: Annotated[list, operator.add]
+
+        def node(state):
+            return {"log": [len(state["log"])]}
+
+        builder = StateGraph(State)
+        builder.add_node("n", node)
+        builder.set_entry_point("n")
+        builder.add_edge("n", END)
+
+        saver = _saver()
+        config = {"configurable": {"thread_id": "session"}}
+        graph = builder.compile(checkpointer=ScopedCheckpointer(saver, "u1:s1"))
+        await graph.ainvoke({"log": []}, config)
+        _cold(saver)
+
+        # A fresh graph object (e.g. a new request) resumes from storage
+        graph = builder.compile(checkpointer=ScopedCheckpointer(saver, "u1:s1"))
+        result = await graph.ainvoke({"log": []}, config)
+        assert result["log"] == [0, 1]
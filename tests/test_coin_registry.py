@@ -0,0 +1,208 @@
+"""Tests for core/coin_registry.py and the lookups that consult it."""
+
+import os
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from core.coin_registry import CoinRegistry, fcntl
+
+COINS = [
+    {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin", "platforms": {}},
+    {
+        "id": "chainlink",
+        "symbol": "link",
+        "name": "Chainlink",
+        "platforms": {"ethereum": "0x514910771AF9Ca656af840dff83E8264EcF986CA"},
+    },
+    # Same ticker, unranked impostor
+    {"id": "link-fake", "symbol": "link", "name": "Fake Link", "platforms": {}},
+    {"id": "bonk", "symbol": "bonk", "name": "Bonk", "platforms": {"solana": "DezX"}},
+    # Top-ranked, but also a plain US ticker
+    {"id": "sonic-3", "symbol": "s", "name": "Sonic", "platforms": {}},
+]
+MARKETS = [
+    {"id": "bitcoin", "market_cap_rank": 1},
+    {"id": "chainlink", "market_cap_rank": 15},
+    {"id": "bonk", "market_cap_rank": 150},
+    {"id": "sonic-3", "market_cap_rank": 40},
+]
+
+
+def _upstream(request: httpx.Request) -> httpx.Response:
+    path = request.url.path
+    if path.endswith("/coins/list"):
+        return httpx.Response(200, json=COINS)
+    if path.endswith("/coins/markets"):
+        page = int(request.url.params["page"])
+        return httpx.Response(200, json=MARKETS if page == 1 else [])
+    if path.endswith("/exchangeInfo"):
+        return httpx.Response(
+            200,
+            json={
+                "symbols": [
+                    {
+                        "symbol": "LINKUSDT",
+                        "status": "TRADING",
+                        "baseAsset": "LINK",
+                        "quoteAsset": "USDT",
+                    },
+                    {
+                        "symbol": "BONKUSDT",
+                        "status": "BREAK",
+                        "baseAsset": "BONK",
+                        "quoteAsset": "USDT",
+                    },
+                ]
+            },
+        )
+    if path.endswith("/public/instruments"):
+        return httpx.Response(
+            200,
+            json={
+                "data": [
+                    {
+                        "instId": "BTC-USDT",
+                        "state": "live",
+                        "baseCcy": "BTC",
+                        "quoteCcy": "USDT",
+                    }
+                ]
+            },
+        )
+    return httpx.Response(404)
+
+
+@pytest.fixture
+def client():
+    with httpx.Client(transport=httpx.MockTransport(_upstream)) as c:
+        yield c
+
+
+@pytest.fixture
+def registry(tmp_path, client):
+    reg = CoinRegistry(tmp_path / "coins.sqlite3")
+    assert reg.refresh(client)
+    return reg
+
+
+class TestLookups:
+    def test_symbol_prefers_the_best_ranked_coin(self, registry):
+        assert registry.resolve("link").id == "chainlink"
+        assert [c.id for c in registry.by_symbol("LINK")] == ["chainlink", "link-fake"]
+
+    def test_name_id_and_contract_resolve(self, registry):
+        assert registry.resolve("Chainlink").id == "chainlink"
+        assert registry.resolve("bitcoin").symbol == "BTC"
+        coin, chain = registry.by_contract("0x514910771af9ca656af840dff83e8264ecf986ca")
+        assert (coin.id, chain) == ("chainlink", "ethereum")
+        assert registry.resolve("nothing") is None
+
+    def test_prefix_search(self, registry):
+        assert [c.id for c in registry.search("li")] == ["chainlink", "link-fake"]
+        assert [c.id for c in registry.search("chainl")] == ["chainlink"]
+
+    def test_listing_flags(self, registry):
+        assert registry.is_listed("binance", "LINKUSDT") is True
+        # Not trading on Binance, so not listed
+        assert registry.is_listed("binance", "BONKUSDT") is False
+        assert registry.is_listed("okx", "BTC-USDT") is True
+        assert registry.is_listed("kraken", "BTC-USD") is None
+        assert registry.listed_on("LINK") == ["binance"]
+
+    def test_major_symbols_follow_rank(self, registry):
+        assert registry.is_major("BTC")
+        assert not registry.is_major("BONK")
+        assert not registry.is_major("DOGE")
+
+
+class TestPersistence:
+    def test_restart_loads_without_network(self, registry):
+        restarted = CoinRegistry(registry.path)
+        with patch.object(httpx, "Client", side_effect=AssertionError("network")):
+            assert restarted.load()
+        assert restarted.resolve("LINK").platforms == {
+            "ethereum": "0x514910771AF9Ca656af840dff83E8264EcF986CA"
+        }
+
+    def test_missing_file_means_no_answers(self, tmp_path):
+        reg = CoinRegistry(tmp_path / "absent.sqlite3")
+        assert not reg.load()
+        assert reg.resolve("BTC") is None
+        assert reg.is_listed("okx", "BTC-USDT") is None
+        assert reg.is_stale()
+
+    @pytest.mark.skipif(fcntl is None, reason="needs fcntl")
+    def test_only_one_worker_refreshes(self, tmp_path, client):
+        reg = CoinRegistry(tmp_path / "coins.sqlite3")
+        with open(reg.path.with_suffix(".lock"), "w") as held:
+            fcntl.flock(held, fcntl.LOCK_EX)
+            assert reg.refresh(client) is False
+        assert not reg.path.exists()
+
+    def test_other_workers_pick_up_a_new_file(self, registry, client):
+        other = CoinRegistry(registry.path)
+        other.load()
+        assert not other.reload_if_changed()
+        registry.refresh(client)
+        # Force a different mtime in case the refresh landed in the same tick
+        st = registry.path.stat()
+        os.utime(registry.path, (st.st_atime, st.st_mtime + 1))
+        assert other.reload_if_changed()
+
+
+class TestCallers:
+    def test_resolver_treats_top_ranked_coins_as_crypto(self, registry):
+        from core.tools import universal_resolver
+
+        with patch.object(universal_resolver, "coin_registry", registry):
+            result = universal_resolver.UniversalSymbolResolver().resolve("LINK")
+        assert result["crypto"] == "LINK"
+        assert result["us"] is None
+
+    def test_top_ranked_coin_does_not_hide_a_us_ticker(self, registry):
+        from core.tools import universal_resolver
+
+        with patch.object(universal_resolver, "coin_registry", registry):
+            resolver = universal_resolver.UniversalSymbolResolver()
+            plain = resolver.resolve("S")
+            in_context = resolver.resolve_with_context("S", "S 幣")["resolution"]
+        assert plain["crypto"] is None
+        assert plain["us"] == "S"
+        assert in_context["crypto"] == "S"
+
+    def test_coin_id_lookup_skips_coingecko_search(self, registry):
+        from core.tools.crypto_modules import common
+
+        with (
+            patch.object(common, "coin_registry", registry),
+            patch.object(common.httpx, "get") as get,
+        ):
+            assert common.find_coingecko_id("LINK") == "chainlink"
+        get.assert_not_called()
+
+    def test_listed_pair_skips_exchange_info(self, registry):
+        from data import data_fetcher
+
+        fetcher = data_fetcher.BinanceDataFetcher()
+        with (
+            patch.object(data_fetcher, "coin_registry", registry),
+            patch.object(fetcher, "_make_request") as request,
+        ):
+            assert fetcher.check_symbol_availability("LINKUSDT")
+        request.assert_not_called()
+
+    def test_unlisted_pair_still_asks_the_exchange(self, registry):
+        from data import data_fetcher
+
+        fetcher = data_fetcher.BinanceDataFetcher()
+        with (
+            patch.object(data_fetcher, "coin_registry", registry),
+            patch.object(
+                fetcher,
+                "_make_request",
+                return_value={"symbols": [{"symbol": "NEWUSDT", "status": "TRADING"}]},
+            ),
+        ):
+            assert fetcher.check_symbol_availability("NEWUSDT")
@@ -22,12 +22,30 @@ def test_short_history_under_budget():
 
 
 def test_long_history_over_budget():
-    from core.agents.context_budget import CONTEXT_CHAR_BUDGET, history_exceeds_budget
+    from core.agents.context_budget import history_exceeds_budget, history_token_budget
 
-    long_history = "x" * (CONTEXT_CHAR_BUDGET + 1)
+    long_history = "x" * (history_token_budget() * 4 + 8)
     assert history_exceeds_budget(long_history) is True
 
 
+def test_cjk_history_over_budget_at_fewer_chars():
+    from core.agents.context_budget import history_exceeds_budget, history_token_budget
+
+    # ~1 token per CJK character: the budget is hit at a quarter of the chars
+    cjk = "比" * (history_token_budget() + 1)
+    ascii_same_chars = "x" * len(cjk)
+    assert history_exceeds_budget(cjk) is True
+    assert history_exceeds_budget(ascii_same_chars) is False
+
+
+def test_budget_scales_with_model_context_window():
+    from core.agents.context_budget import HISTORY_TOKEN_CAP, history_token_budget
+
+    assert history_token_budget("gpt-4o") < history_token_budget("gpt-5-mini")
+    assert history_token_budget("gemini-3.1-pro-preview") == HISTORY_TOKEN_CAP
+    assert history_token_budget("some-unknown-model") == history_token_budget()
+
+
 def test_empty_history_under_budget():
     from core.agents.context_budget import history_exceeds_budget
 
@@ -104,9 +122,9 @@ def test_manager_uses_raw_history_when_under_budget():
 def test_manager_falls_back_to_truncated_when_no_compact_state():
     from unittest.mock import patch
 
-    from core.agents.context_budget import CONTEXT_CHAR_BUDGET
+    from core.agents.context_budget import count_tokens, history_token_budget
 
-    long_history = "用戶: " + "x" * CONTEXT_CHAR_BUDGET
+    long_history = "\n".join(f"用戶: 第{i}則訊息 " + "x" * 200 for i in range(100))
 
     with patch("core.agents.manager.history_exceeds_budget", return_value=True):
         with patch("core.agents.manager._read_compact_for_manager", return_value=None):
@@ -116,5 +134,161 @@ def test_manager_falls_back_to_truncated_when_no_compact_state():
                 long_history, user_id="u1", session_id="s1"
             )
 
-    # fallback: returns truncated to budget
-    assert len(result) <= CONTEXT_CHAR_BUDGET
+    # fallback: most recent lines, truncated to the token budget
+    assert count_tokens(result) <= history_token_budget()
+    assert result.endswith(long_history.rsplit("\n", 1)[-1])
+
+
+# ── token-budgeted rolling window ─────────────────────────────────────────────
+
+_ZH_TURNS = [
+    ("用戶", "比特幣今天的價格走勢如何？請幫我看一下技術指標和資金費率。"),
+    (
+        "助手",
+        "比特幣目前在九萬五千美元附近震盪，RSI 約 58，資金費率略為正值，多頭情緒偏溫和。",
+    ),
+    ("用戶", "那以太幣呢？我比較關心中長期的持有策略，短線波動不太在意。"),
+    ("助手", "以太幣中長期取決於質押收益與 L2 生態發展，建議分批布局並設定停損。"),
+]
+_EN_TURNS = [
+    ("User", "What is the bitcoin price trend today? Check indicators and funding."),
+    ("Assistant", "BTC is ranging near 95k, RSI around 58, funding slightly positive."),
+    ("User", "And ETH? I care about long-term holding more than short-term swings."),
+    (
+        "Assistant",
+        "ETH long-term depends on staking yield and L2 growth; scale in slowly.",
+    ),
+]
+_MIXED_TURNS = [
+    ("用戶", "幫我比較 BTC 和 ETH 的 funding rate，順便看 open interest。"),
+    ("助手", "BTC funding 0.01%，ETH funding 0.008%；OI 分別上升 3% 與 5%。"),
+    ("用戶", "台積電 2330 跟 NVDA 的 AI 題材哪個比較強？"),
+    ("助手", "NVDA 直接受惠於 datacenter 需求，2330 則受惠於 CoWoS 產能擴張。"),
+]
+
+
+def _session(turns, repeat=30):
+    return [f"{role}: {text} (#{i})" for i in range(repeat) for role, text in turns]
+
+
+def _feed(window, lines, slide=18):
+    """Feed lines the way the router does: the last `slide` lines each turn."""
+    outputs = []
+    for end in range(2, len(lines) + 1, 2):
+        outputs.append(window.sync(lines[max(0, end - slide) : end]))
+    return outputs
+
+
+def test_window_respects_budget_for_every_script():
+    from core.agents.context_budget import HistoryWindow, count_tokens
+
+    for turns in (_ZH_TURNS, _EN_TURNS, _MIXED_TURNS):
+        lines = _session(turns)
+        window = HistoryWindow(max_tokens=400)
+        for rendered in _feed(window, lines):
+            assert count_tokens(rendered) <= 400
+            assert window.tokens <= 400
+        # the latest turn is always kept verbatim
+        assert rendered.endswith(lines[-1])
+        assert "[Earlier in this session]" in rendered
+
+
+def test_window_keeps_fewer_chars_for_cjk_than_english():
+    from core.agents.context_budget import HistoryWindow
+
+    zh = _feed(HistoryWindow(max_tokens=400), _session(_ZH_TURNS))[-1]
+    en = _feed(HistoryWindow(max_tokens=400), _session(_EN_TURNS))[-1]
+    assert len(zh) * 2 < len(en)
+
+
+def test_window_only_counts_new_lines():
+    from unittest.mock import patch
+
+    from core.agents import context_budget
+    from core.agents.context_budget import HistoryWindow
+
+    lines = _session(_MIXED_TURNS, repeat=10)
+    window = HistoryWindow(max_tokens=300)
+    window.sync(lines[:18])
+
+    with patch.object(
+        context_budget, "count_tokens", wraps=context_budget.count_tokens
+    ) as counted:
+        first = window.sync(lines[:18])
+        assert counted.call_count == 0
+        assert window.sync(lines[:18]) is first
+
+        window.sync(lines[2:20])
+        counted_lines = {c.args[0] for c in counted.call_args_list}
+    assert lines[18] in counted_lines and lines[19] in counted_lines
+    assert lines[5] not in counted_lines
+
+
+def test_window_handles_repeated_lines_and_reset():
+    from core.agents.context_budget import HistoryWindow
+
+    window = HistoryWindow(max_tokens=200)
+    window.sync(["用戶: hi", "助手: hello"])
+    rendered = window.sync(["用戶: hi", "助手: hello", "用戶: hi", "助手: hello"])
+    assert rendered.count("用戶: hi") == 2
+    assert window.sync([]) == ""
+    assert window.sync(["用戶: new"]) == "用戶: new"
+
+
+def test_oversized_single_line_is_clipped():
+    from core.agents.context_budget import HistoryWindow, count_tokens
+
+    window = HistoryWindow(max_tokens=100)
+    rendered = window.sync(["用戶: " + "長" * 500])
+    assert count_tokens(rendered) <= 100
+    assert rendered.endswith("…")
+
+
+def test_token_counts_are_cached_per_message():
+    from unittest.mock import patch
+
+    from core.agents import context_budget
+
+    text = "用戶: 快取測試 token cache test"
+    context_budget.count_tokens(text)
+    with patch.object(context_budget, "estimate_tokens") as estimate:
+        context_budget.count_tokens(text)
+    estimate.assert_not_called()
+
+
+# ── tiktoken loading ──────────────────────────────────────────────────────────
+
+
+class _FakeTiktoken:
+    def __init__(self):
+        self.loaded = []
+
+    def get_encoding(self, name):
+        self.loaded.append(name)
+        return type("Encoding", (), {"encode": staticmethod(lambda t: t.split())})
+
+
+async def test_encoder_is_never_loaded_on_the_event_loop():
+    import asyncio
+    import sys
+    from unittest.mock import patch
+
+    from core.agents import context_budget
+
+    tiktoken = _FakeTiktoken()
+    with (
+        patch.dict(sys.modules, {"tiktoken": tiktoken}),
+        patch.dict(context_budget._encoders, clear=True),
+        patch.object(context_budget, "TOKENIZER_MODE", "auto"),
+    ):
+        # Cold cache on the loop: estimate instead of a blocking download
+        assert context_budget._encoder("o200k_base") is None
+        assert context_budget.count_tokens("a b c d e f g h", "gpt-4o") == 4
+        assert tiktoken.loaded == []
+
+        assert await asyncio.to_thread(context_budget.preload_encoders) == {
+            "o200k_base": True
+        }
+        assert tiktoken.loaded == ["o200k_base"]
+        # Estimates are cached under their own key, not reused once loaded
+        assert context_budget.count_tokens("a b c d e f g h", "gpt-4o") == 8
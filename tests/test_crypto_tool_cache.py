@@ -0,0 +1,168 @@
+"""Tests for the shared cache in core/tools/crypto_modules/common.py."""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from core.tools.crypto_modules import common, onchain
+from core.tools.crypto_modules.common import CoinPlatformMap, ToolCache
+
+
+def _response(payload, status=200):
+    resp = MagicMock(status_code=status)
+    resp.json.return_value = payload
+    return resp
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(common, "tool_cache", ToolCache(max_size=64))
+    monkeypatch.setattr(
+        common, "coin_platform_map", CoinPlatformMap(tmp_path / "coins.json")
+    )
+    monkeypatch.setattr(onchain, "coin_platform_map", common.coin_platform_map)
+
+
+class TestToolCache:
+    def test_size_is_bounded_lru(self):
+        cache = ToolCache(max_size=2)
+        cache.set("a", 1, 60)
+        cache.set("b", 2, 60)
+        cache.get("a")
+        cache.set("c", 3, 60)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats["evictions"] == 1
+
+    def test_concurrent_misses_share_one_load(self):
+        cache = ToolCache()
+        calls = []
+        gate = threading.Event()
+
+        def loader():
+            calls.append(1)
+            gate.wait(2)
+            return "v"
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(cache.fetch("k", loader, 60))
+            )
+            for _ in range(8)
+        ]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        gate.set()
+        for t in threads:
+            t.join()
+
+        assert results == ["v"] * 8
+        assert len(calls) == 1
+        assert cache.stats["coalesced"] == 7
+
+    def test_stale_value_is_served_while_refreshing(self):
+        cache = ToolCache()
+        cache.fetch("k", lambda: "old", ttl=0, stale_ttl=60)
+        refreshed = threading.Event()
+
+        def loader():
+            refreshed.set()
+            return "new"
+
+        assert cache.fetch("k", loader, ttl=60) == "old"
+        assert refreshed.wait(2)
+        for _ in range(50):
+            if cache.get("k") == "new":
+                break
+            time.sleep(0.01)
+        assert cache.get("k") == "new"
+
+    def test_failed_refresh_keeps_the_stale_value(self):
+        cache = ToolCache()
+        cache.fetch("k", lambda: "old", ttl=0, stale_ttl=60)
+
+        def boom():
+            raise RuntimeError("upstream down")
+
+        assert cache.fetch("k", boom, ttl=60) == "old"
+        time.sleep(0.05)
+        assert cache.fetch("k", boom, ttl=60) == "old"
+
+    def test_read_side_max_age(self):
+        cache = ToolCache()
+        with patch.object(common.time, "monotonic", return_value=1000.0):
+            cache.set("k", "v", 600)
+        with patch.object(common.time, "monotonic", return_value=1200.0):
+            assert cache.get("k") == "v"
+            assert cache.get("k", max_age=300) == "v"
+            assert cache.get("k", max_age=120) is None
+
+    def test_none_is_not_cached(self):
+        cache = ToolCache()
+        loader = MagicMock(return_value=None)
+        cache.fetch("k", loader, 60)
+        cache.fetch("k", loader, 60)
+        assert loader.call_count == 2
+
+
+class TestCachedEndpoints:
+    def test_fear_and_greed_is_fetched_once(self):
+        from core.tools.crypto_modules.sentiment import get_fear_and_greed_index
+
+        payload = {"data": [{"value": "40", "value_classification": "Fear"}]}
+        with patch.object(common.httpx, "get", return_value=_response(payload)) as get:
+            for _ in range(3):
+                assert "Fear" in get_fear_and_greed_index.invoke({})
+        assert get.call_count == 1
+
+    def test_error_status_is_not_cached(self):
+        with patch.object(
+            common.httpx, "get", return_value=_response({}, status=429)
+        ) as get:
+            assert common.cached_get_json("fear_greed", common.FEAR_GREED_URL) is None
+            assert common.cached_get_json("fear_greed", common.FEAR_GREED_URL) is None
+        assert get.call_count == 2
+
+
+class TestCoinPlatformMap:
+    def _coingecko(self, url, params=None, timeout=None):
+        if url.endswith("/search"):
+            return _response({"coins": [{"id": "chainlink", "symbol": "link"}]})
+        if url.endswith("/coins/chainlink"):
+            return _response(
+                {
+                    "name": "Chainlink",
+                    "platforms": {"ethereum": "0x514910"},
+                    "market_data": {"current_price": {"usd": 14.0}},
+                }
+            )
+        if url.endswith("/simple/price"):
+            return _response({"chainlink": {"usd": 15.0}})
+        return _response({}, status=404)
+
+    def test_chain_info_survives_a_restart(self, tmp_path, monkeypatch):
+        with patch.object(common.httpx, "get", side_effect=self._coingecko) as get:
+            info = onchain._get_token_chain_info("LINK")
+        assert info["chain"] == "ethereum"
+        assert info["price"] == 14.0
+        assert get.call_count == 2
+
+        # New process: empty in-memory cache, map reloaded from disk
+        monkeypatch.setattr(common, "tool_cache", ToolCache())
+        restarted = CoinPlatformMap(tmp_path / "coins.json")
+        monkeypatch.setattr(onchain, "coin_platform_map", restarted)
+        with patch.object(common.httpx, "get", side_effect=self._coingecko) as get:
+            info = onchain._get_token_chain_info("LINK")
+        assert info["chain"] == "ethereum"
+        assert info["price"] == 15.0
+        # Only the price is fetched; search and coin detail are skipped
+        assert [c.args[0].rsplit("/", 1)[1] for c in get.call_args_list] == ["price"]
+
+    def test_old_entries_are_resolved_again(self, tmp_path):
+        coins = CoinPlatformMap(tmp_path / "coins.json", ttl=0)
+        coins.put("LINK", "chainlink", "Chainlink", {})
+        assert coins.get("LINK") is None
@@ -185,5 +185,131 @@ class TestDatabaseBaseNamedParameters:
             mock_cursor.execute.assert_called_once()
 
 
+class TestUnifiedEngineRouting:
+    """Tests for routing DatabaseBase onto the shared async engine"""
+
+    def test_positional_placeholders_converted(self):
+        from core.database.bridge import to_sqlalchemy_sql
+
+        sql, params = to_sqlalchemy_sql(
+            "SELECT * FROM t WHERE a = %s AND b LIKE %s AND c = '5%%'", (1, "x%")
+        )
+
+        assert sql == "SELECT * FROM t WHERE a = :p0 AND b LIKE :p1 AND c = '5%'"
+        assert params == {"p0": 1, "p1": "x%"}
+
+    def test_named_placeholders_converted(self):
+        from core.database.bridge import to_sqlalchemy_sql
+
+        sql, params = to_sqlalchemy_sql(
+            "SELECT * FROM t WHERE a = %(a)s AND b = :b", {"a": 1, "b": 2}
+        )
+
+        assert sql == "SELECT * FROM t WHERE a = :a AND b = :b"
+        assert params == {"a": 1, "b": 2}
+
+    def test_too_few_params_rejected(self):
+        from core.database.bridge import to_sqlalchemy_sql
+
+        with pytest.raises(ValueError):
+            to_sqlalchemy_sql("SELECT %s, %s", (1,))
+
+    def test_flag_off_uses_psycopg2(self, monkeypatch):
+        from core.database.base import DatabaseBase
+
+        monkeypatch.delenv("DB_UNIFIED_ENGINE", raising=False)
+        with (
+            patch("core.database.base.get_connection") as mock_get_conn,
+            patch("core.database.bridge.run_on_engine_loop") as mock_run,
+        ):
+            mock_get_conn.return_value.cursor.return_value.fetchone.return_value = None
+            DatabaseBase.query_one("SELECT 1")
+
+        mock_run.assert_not_called()
+        mock_get_conn.assert_called_once()
+
+    def test_flag_on_routes_to_async_engine(self, monkeypatch):
+        from core.database import bridge
+        from core.database.base import DatabaseBase
+
+        monkeypatch.setenv("DB_UNIFIED_ENGINE", "true")
+        with (
+            patch("core.database.base.get_connection") as mock_get_conn,
+            patch(
+                "core.database.bridge.run_on_engine_loop", return_value=[{"id": 1}]
+            ) as mock_run,
+        ):
+            result = DatabaseBase.query_all("SELECT id FROM t WHERE a = %s", (1,))
+
+        assert result == [{"id": 1}]
+        mock_run.assert_called_once_with(
+            bridge.aquery_all, "SELECT id FROM t WHERE a = %s", (1,)
+        )
+        mock_get_conn.assert_not_called()
+
+    def test_flag_on_maps_integrity_error(self, monkeypatch):
+        from sqlalchemy.exc import IntegrityError
+
+        from core.database.base import DatabaseBase, DuplicateRecordError
+
+        monkeypatch.setenv("DB_UNIFIED_ENGINE", "true")
+        error = IntegrityError("INSERT", {}, Exception("duplicate key value"))
+        with patch("core.database.bridge.run_on_engine_loop", side_effect=error):
+            with pytest.raises(DuplicateRecordError):
+                DatabaseBase.execute("INSERT INTO t (a) VALUES (%s)", (1,))
+
+    def test_sync_shim_runs_on_bound_loop(self):
+        import asyncio
+        import threading
+
+        from core.database import bridge
+
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            bridge.bind_event_loop(loop)
+
+            async def _which_loop(value):
+                return asyncio.get_running_loop(), value
+
+            ran_on, value = bridge.run_on_engine_loop(_which_loop, 42, timeout=5)
+            assert ran_on is loop
+            assert value == 42
+        finally:
+            bridge._bound_loop = None
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+            loop.close()
+
+    async def test_sync_shim_refuses_engine_loop(self):
+        from core.database import bridge
+
+        bridge.bind_event_loop()
+        try:
+            assert bridge.on_engine_loop() is True
+            with pytest.raises(RuntimeError):
+                bridge.run_on_engine_loop(asyncio_sleep_zero)
+        finally:
+            bridge._bound_loop = None
+
+    def test_pool_stats_without_pools(self):
+        from core.database import bridge
+
+        with (
+            patch("core.orm.session._async_engine", None),
+            patch("core.database.connection._connection_pool", None),
+        ):
+            stats = bridge.get_pool_stats()
+
+        assert stats["async_engine"] is None
+        assert stats["psycopg2"] is None
+        assert stats["total_connections"] == 0
+
+
+async def asyncio_sleep_zero():
+    return None
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -2,7 +2,7 @@
 Tests for governance database operations
 """
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 from unittest.mock import Mock, patch
 
 import pytest
@@ -15,7 +15,10 @@ from core.database.governance import (
     check_report_consensus,
     check_user_suspension,
     create_report,
+    delete_activity_logs_before,
     determine_suspension_action,
+    drop_expired_activity_log_partitions,
+    ensure_activity_log_partitions,
     finalize_report,
     get_audit_reputation,
     get_content_author,
@@ -760,6 +763,91 @@ class TestActivityLogging:
         assert result[0]["activity_type"] == "report_submitted"
 
 
+class TestActivityLogPartitions:
+    """Tests for user_activity_logs partition maintenance"""
+
+    def _cursor(self, partitions):
+        cursor = Mock()
+        cursor.fetchone.side_effect = [(True,), (1000,), (2000,)]
+        cursor.fetchall.return_value = partitions
+        return cursor
+
+    def test_ensure_skips_months_already_covered(self):
+        """Months before the last partition's upper bound are not recreated"""
+        cursor = self._cursor(
+            [
+                (
+                    "user_activity_logs_legacy",
+                    "FOR VALUES FROM (MINVALUE) TO ('2026-11-01 00:00:00+00')",
+                ),
+                ("user_activity_logs_default", "DEFAULT"),
+            ]
+        )
+
+        created = ensure_activity_log_partitions(cursor, 2, today=date(2026, 10, 19))
+
+        assert created == ["user_activity_logs_p202611", "user_activity_logs_p202612"]
+        ddl = cursor.execute.call_args_list[-1].args[0]
+        assert "FROM ('2026-12-01 00:00:00+00') TO ('2027-01-01 00:00:00+00')" in ddl
+
+    def test_drop_only_fully_expired_partitions(self):
+        """A partition straddling the cutoff is kept for the chunked delete"""
+        cursor = self._cursor(
+            [
+                (
+                    "user_activity_logs_p202606",
+                    "FOR VALUES FROM ('2026-06-01 00:00:00+00') "
+                    "TO ('2026-07-01 00:00:00+00')",
+                ),
+                (
+                    "user_activity_logs_p202607",
+                    "FOR VALUES FROM ('2026-07-01 00:00:00+00') "
+                    "TO ('2026-08-01 00:00:00+00')",
+                ),
+            ]
+        )
+        cutoff = datetime(2026, 7, 21, tzinfo=timezone.utc)
+
+        dropped = drop_expired_activity_log_partitions(cursor, cutoff)
+
+        assert dropped == [("user_activity_logs_p202606", 1000)]
+        statements = [c.args[0] for c in cursor.execute.call_args_list]
+        assert "DROP TABLE user_activity_logs_p202606" in statements
+        assert not any("p202607" in s for s in statements if "DROP" in s)
+
+    def test_schema_skips_default_partition_before_migration(self):
+        """An unmigrated (plain) user_activity_logs must not break startup"""
+        from core.database.schema import create_governance_tables
+
+        cursor = Mock()
+        cursor.fetchone.return_value = (False,)
+
+        create_governance_tables(cursor)
+
+        statements = [c.args[0] for c in cursor.execute.call_args_list]
+        assert not any("PARTITION OF user_activity_logs" in s for s in statements)
+
+    def test_delete_in_id_chunks(self):
+        """Each id range is deleted and committed separately"""
+        mock_conn = Mock()
+        mock_cursor = Mock()
+        mock_conn.cursor.return_value = mock_cursor
+        mock_cursor.fetchone.return_value = (1, 25)
+        mock_cursor.rowcount = 10
+        cutoff = datetime(2026, 7, 21, tzinfo=timezone.utc)
+
+        deleted = delete_activity_logs_before(mock_conn, cutoff, chunk_size=10)
+
+        deletes = [
+            c.args[1]
+            for c in mock_cursor.execute.call_args_list
+            if c.args[0].startswith("DELETE")
+        ]
+        assert deletes == [(1, 11, cutoff), (11, 21, cutoff), (21, 31, cutoff)]
+        assert deleted == 30
+        assert mock_conn.commit.call_count == 4
+
+
 class TestHelpers:
     """Tests for helper functions"""
 
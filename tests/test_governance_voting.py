@@ -0,0 +1,202 @@
+"""Tests for the single-statement vote path in core/orm/governance_repo.py."""
+
+import asyncio
+import os
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from core.orm.governance_repo import (
+    MIN_VOTES_REQUIRED,
+    GovernanceRepository,
+    _consensus_from_counts,
+)
+
+
+def _session(row):
+    """Session stub whose single execute() returns *row*."""
+    result = MagicMock()
+    result.fetchone.return_value = row
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=result)
+    return session
+
+
+def _row(
+    status="pending",
+    reporter="reporter",
+    vote_id=None,
+    weight=None,
+    approve=None,
+    reject=None,
+    existing=None,
+):
+    return (status, reporter, vote_id, weight, approve, reject, existing)
+
+
+class TestVoteOnReport:
+    @pytest.mark.asyncio
+    async def test_success_returns_consensus_from_same_statement(self):
+        session = _session(_row(vote_id=7, weight=1.5, approve=3, reject=0))
+        result = await GovernanceRepository().vote_on_report(
+            1, "voter", "approve", is_premium=True, session=session
+        )
+
+        assert result["success"] is True
+        assert result["vote_id"] == 7
+        assert result["vote_weight"] == 1.5
+        assert result["consensus"]["decision"] == "approved"
+        session.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_statement_is_idempotent_insert(self):
+        session = _session(_row(vote_id=1, weight=1.0, approve=1, reject=0))
+        await GovernanceRepository().vote_on_report(
+            1, "voter", "reject", is_premium=True, session=session
+        )
+
+        stmt = session.execute.await_args.args[0]
+        sql = str(stmt)
+        assert "ON CONFLICT (report_id, reviewer_user_id) DO NOTHING" in sql
+        assert "FOR UPDATE" in sql
+        params = stmt.compile().params
+        assert (params["approve_inc"], params["reject_inc"]) == (0, 1)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "row, error",
+        [
+            (_row(status=None, reporter=None), "report_not_found"),
+            (_row(status="approved"), "report_not_pending"),
+            (_row(reporter="voter"), "cannot_vote_on_own_report"),
+            (_row(existing="reject"), "already_voted"),
+        ],
+    )
+    async def test_rejections(self, row, error):
+        result = await GovernanceRepository().vote_on_report(
+            1, "voter", "approve", is_premium=True, session=_session(row)
+        )
+        assert result == {
+            "success": False,
+            "error": error,
+            **({"existing_vote": "reject"} if error == "already_voted" else {}),
+        }
+
+    @pytest.mark.asyncio
+    async def test_validation_needs_no_round_trip(self):
+        session = _session(None)
+        repo = GovernanceRepository()
+        assert (await repo.vote_on_report(1, "v", "maybe", True, session))[
+            "error"
+        ] == "invalid_vote_type"
+        assert (await repo.vote_on_report(1, "v", "approve", False, session))[
+            "error"
+        ] == "premium_membership_required"
+        session.execute.assert_not_awaited()
+
+
+class TestConsensusFromCounts:
+    def test_insufficient_votes(self):
+        result = _consensus_from_counts(MIN_VOTES_REQUIRED - 1, 0)
+        assert result["reason"] == "insufficient_votes"
+
+    def test_thresholds(self):
+        assert _consensus_from_counts(7, 3)["decision"] == "approved"
+        assert _consensus_from_counts(3, 7)["decision"] == "rejected"
+        assert _consensus_from_counts(5, 5)["reason"] == "no_clear_consensus"
+
+    def test_vote_weight_tiers(self):
+        weight = GovernanceRepository.calculate_vote_weight
+        assert weight({"reputation_score": 90, "total_reviews": 25}) == 2.0
+        assert weight({"reputation_score": 60, "total_reviews": 12}) == 1.5
+        assert weight({"reputation_score": 90, "total_reviews": 5}) == 1.0
+
+
+_PG_URL = os.getenv("GOVERNANCE_TEST_DATABASE_URL")
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(
+    not _PG_URL, reason="GOVERNANCE_TEST_DATABASE_URL (disposable Postgres) not set"
+)
+class TestConcurrentVoting:
+    """Runs against a throwaway Postgres database; tables are recreated."""
+
+    VOTERS = 40
+
+    @pytest.mark.asyncio
+    async def test_burst_of_voters_counts_each_once(self):
+        from sqlalchemy import func, select
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        from core.orm.models import (
+            AuditReputation,
+            Base,
+            ContentReport,
+            ReportReviewVote,
+            UserActivityLog,
+        )
+        from core.orm.session import _normalize_pg_url
+
+        engine = create_async_engine(_normalize_pg_url(_PG_URL), pool_size=20)
+        tables = [
+            t.__table__
+            for t in (ContentReport, ReportReviewVote, AuditReputation, UserActivityLog)
+        ]
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all, tables=tables)
+            await conn.run_sync(Base.metadata.create_all, tables=tables)
+        factory = async_sessionmaker(engine, expire_on_commit=False)
+
+        async with factory() as s:
+            report = ContentReport(
+                content_type="post",
+                content_id=1,
+                reporter_user_id="reporter",
+                report_type="spam",
+                review_status="pending",
+                approve_count=0,
+                reject_count=0,
+            )
+            s.add(report)
+            await s.commit()
+            report_id = report.id
+
+        repo = GovernanceRepository()
+
+        async def vote(voter, vote_type):
+            async with factory() as s:
+                result = await repo.vote_on_report(
+                    report_id, voter, vote_type, is_premium=True, session=s
+                )
+                await s.commit()
+                return voter, result
+
+        # Every voter votes twice at the same time (double-click / retry)
+        attempts = [
+            vote(f"voter-{i}", "approve" if i % 4 else "reject")
+            for i in range(self.VOTERS)
+            for _ in range(2)
+        ]
+        results = await asyncio.gather(*attempts)
+
+        succeeded = [voter for voter, r in results if r["success"]]
+        duplicates = [r for _, r in results if not r["success"]]
+        assert sorted(succeeded) == sorted(f"voter-{i}" for i in range(self.VOTERS))
+        assert {r["error"] for r in duplicates} == {"already_voted"}
+
+        async with factory() as s:
+            approve, reject = (
+                await s.execute(
+                    select(ContentReport.approve_count, ContentReport.reject_count)
+                )
+            ).one()
+            votes = await s.scalar(select(func.count(ReportReviewVote.id)))
+            logs = await s.scalar(select(func.count(UserActivityLog.id)))
+        assert approve + reject == votes == logs == self.VOTERS
+        assert reject == self.VOTERS // 4
+
+        # The counts each winner saw were strictly increasing: no lost update
+        seen = sorted(r["consensus"]["total_votes"] for _, r in results if r["success"])
+        assert seen == list(range(1, self.VOTERS + 1))
+        await engine.dispose()
@@ -0,0 +1,147 @@
+"""Tests for core/llm_client_pool.py and the credential lookup built on it."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from api.user_llm import resolve_user_llm_credentials
+from core import llm_client_pool as pool_mod
+from core.llm_client_pool import LLMClientPool
+
+
+@pytest.fixture(autouse=True)
+def clean_state(monkeypatch):
+    monkeypatch.setattr(pool_mod, "_redis_checked", True)
+    monkeypatch.setattr(pool_mod, "_redis", None)
+    monkeypatch.setattr(pool_mod, "_sync_redis_checked", True)
+    monkeypatch.setattr(pool_mod, "_sync_redis", None)
+    pool_mod.clear()
+    yield
+    pool_mod.clear()
+
+
+@pytest.fixture
+def repo_keys():
+    mock = AsyncMock(return_value={"openai": "sk-a", "google_gemini": "g-b"})
+    with patch(
+        "core.orm.user_api_keys_repo.user_api_keys_repo.get_user_api_keys", mock
+    ):
+        yield mock
+
+
+@pytest.fixture
+def factory():
+    """Stand-in for create_user_llm_client returning a new object per call."""
+    with patch(
+        "utils.user_client_factory.create_user_llm_client",
+        side_effect=lambda *a, **kw: MagicMock(),
+    ) as mock:
+        yield mock
+
+
+class TestKeyCache:
+    @pytest.mark.asyncio
+    async def test_one_cached_query_for_all_providers(self, repo_keys):
+        user = {"user_id": "u1"}
+        first = await resolve_user_llm_credentials(user, "google_gemini")
+        second = await resolve_user_llm_credentials(user)
+
+        assert first == {"provider": "google_gemini", "api_key": "g-b"}
+        assert second == {"provider": "openai", "api_key": "sk-a"}
+        repo_keys.assert_awaited_once_with("u1")
+
+    @pytest.mark.asyncio
+    async def test_no_key_returns_none(self, repo_keys):
+        repo_keys.return_value = {}
+        assert await resolve_user_llm_credentials({"user_id": "u1"}) is None
+
+    @pytest.mark.asyncio
+    async def test_invalidation_forces_a_reload(self, repo_keys):
+        await pool_mod.get_user_api_keys("u1")
+        pool_mod.invalidate_user_keys_sync("u1")
+        await pool_mod.get_user_api_keys("u1")
+        assert repo_keys.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_load_racing_an_invalidation_is_not_cached(self, repo_keys):
+        async def load(user_id):
+            pool_mod.invalidate_user_keys_sync(user_id)
+            return {"openai": "sk-old"}
+
+        repo_keys.side_effect = load
+        await pool_mod.get_user_api_keys("u1")
+        assert "u1" not in pool_mod._keys
+
+    @pytest.mark.asyncio
+    async def test_invalidations_from_a_thread_while_loading(self, repo_keys):
+        user_ids = [f"u{i}" for i in range(200)]
+
+        def invalidate():
+            for _ in range(20):
+                pool_mod.invalidate_user_keys_sync(*user_ids)
+
+        thread_job = asyncio.create_task(asyncio.to_thread(invalidate))
+        for _ in range(5):
+            for user_id in user_ids:
+                await pool_mod.get_user_api_keys(user_id)
+        await thread_job
+
+        pool_mod.invalidate_user_keys_sync(*user_ids)
+        assert pool_mod.stats()["keys"]["size"] == 0
+
+    def test_deleting_a_key_invalidates(self):
+        from core.database import user_api_keys
+
+        with (
+            patch.object(user_api_keys, "_table_initialized", True),
+            patch.object(user_api_keys, "get_connection"),
+            patch.object(user_api_keys, "invalidate_user_keys_sync") as invalidate,
+        ):
+            assert user_api_keys.delete_user_api_key("u1", "openai")["success"]
+        invalidate.assert_called_once_with("u1")
+
+
+class TestClientPool:
+    def test_same_key_reuses_the_client(self, factory):
+        pool = LLMClientPool()
+        client = pool.get("u1", "openai", "sk-a", "gpt-x")
+        assert pool.get("u1", "openai", "sk-a", "gpt-x") is client
+        assert factory.call_count == 1
+        assert pool.stats()["hits"] == 1
+
+    def test_model_or_key_change_builds_a_new_client(self, factory):
+        pool = LLMClientPool()
+        client = pool.get("u1", "openai", "sk-a", "gpt-x")
+        assert pool.get("u1", "openai", "sk-a", "gpt-y") is not client
+        assert pool.get("u1", "openai", "sk-rotated", "gpt-x") is not client
+        assert factory.call_count == 3
+
+    def test_size_is_bounded_lru(self, factory):
+        pool = LLMClientPool(max_size=2)
+        first = pool.get("u1", "openai", "k1")
+        pool.get("u2", "openai", "k2")
+        pool.get("u1", "openai", "k1")
+        pool.get("u3", "openai", "k3")
+
+        assert len(pool) == 2
+        assert pool.get("u1", "openai", "k1") is first
+        assert pool.stats()["evicted_lru"] == 1
+
+    def test_idle_clients_are_dropped(self, factory, monkeypatch):
+        pool = LLMClientPool(idle_ttl=60)
+        now = [1000.0]
+        monkeypatch.setattr(pool_mod.time, "monotonic", lambda: now[0])
+        pool.get("u1", "openai", "k1")
+        now[0] += 61
+        pool.get("u2", "openai", "k2")
+        assert len(pool) == 1
+        assert pool.stats()["evicted_idle"] == 1
+
+    def test_invalidating_keys_drops_the_users_clients(self, factory):
+        client = pool_mod.get_user_llm_client("u1", "openai", "sk-a")
+        pool_mod.get_user_llm_client("u2", "openai", "sk-b")
+        pool_mod.invalidate_user_keys_sync("u1")
+
+        assert len(pool_mod.llm_client_pool) == 1
+        assert pool_mod.get_user_llm_client("u1", "openai", "sk-a") is not client
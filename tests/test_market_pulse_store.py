@@ -0,0 +1,226 @@
+"""
+Tests for per-symbol Market Pulse persistence (core.database.market_pulse_store).
+"""
+
+import json
+import queue
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from core.database import cache
+from core.database import market_pulse_store as store
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.messages = queue.Queue()
+
+    def subscribe(self, channel):
+        self.redis.subscribers.setdefault(channel, []).append(self)
+
+    def get_message(self, timeout=0.0):
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        for subscribers in self.redis.subscribers.values():
+            if self in subscribers:
+                subscribers.remove(self)
+
+
+class FakeRedis:
+    """Just the commands the store uses, with decode_responses=True semantics."""
+
+    def __init__(self):
+        self.strings = {}
+        self.hashes = {}
+        self.ttls = {}
+        self.subscribers = {}
+        self.published = []
+        self.mget_calls = []
+
+    def set(self, key, value):
+        self.strings[key] = value
+
+    def setex(self, key, ttl, value):
+        self.ttls[key] = ttl
+        self.strings[key] = value
+
+    def expire(self, key, ttl):
+        self.ttls[key] = ttl
+
+    def mget(self, keys):
+        self.mget_calls.append(list(keys))
+        return [self.strings.get(k) for k in keys]
+
+    def hset(self, key, mapping):
+        self.hashes.setdefault(key, {}).update({k: str(v) for k, v in mapping.items()})
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+        for pubsub in self.subscribers.get(channel, []):
+            pubsub.messages.put({"type": "message", "data": message})
+
+    def pipeline(self, transaction=False):
+        return self
+
+    def execute(self):
+        return []
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self)
+
+
+@pytest.fixture
+def redis():
+    fake = FakeRedis()
+    with (
+        patch.object(cache, "_init_redis"),
+        patch.object(cache, "_redis_client", fake),
+        patch.object(cache, "_redis_available", True),
+    ):
+        yield fake
+
+
+@pytest.fixture
+def db():
+    with (
+        patch.object(store.DatabaseBase, "execute") as execute,
+        patch.object(store.DatabaseBase, "query_all", return_value=[]) as query_all,
+        patch.object(cache, "_db_get", return_value=None),
+    ):
+        yield execute, query_all
+
+
+class TestSave:
+    def test_writes_one_entry_per_symbol_plus_index_and_delta(self, redis, db):
+        execute, _ = db
+        versions = store.save_market_pulse_entries(
+            {"BTC": {"price": 1}, "ETH": {"price": 2}}
+        )
+
+        assert set(versions) == {"BTC", "ETH"}
+        record = json.loads(redis.strings["stock_agent:MARKET_PULSE:ETH"])
+        assert record["data"] == {"price": 2}
+        assert record["version"] == versions["ETH"]
+        assert redis.hashes["stock_agent:MARKET_PULSE:index"] == {
+            s: str(v) for s, v in versions.items()
+        }
+        assert redis.published == [(store.DELTA_CHANNEL, json.dumps(versions))]
+        # Redis copies expire so untracked symbols do not linger
+        assert redis.ttls["stock_agent:MARKET_PULSE:ETH"] == store.REDIS_TTL
+        assert redis.ttls["stock_agent:MARKET_PULSE:index"] == store.REDIS_TTL
+
+        # Entries and index merge go to the DB in one statement
+        execute.assert_called_once()
+        keys, payloads, index_key, index = execute.call_args.args[1]
+        assert keys == ["MARKET_PULSE:BTC", "MARKET_PULSE:ETH"]
+        assert json.loads(payloads[0])["data"] == {"price": 1}
+        assert index_key == store.INDEX_KEY
+        assert json.loads(index) == versions
+
+    def test_versions_strictly_increase(self, redis, db):
+        first = store.save_market_pulse_entries({"BTC": {}})["BTC"]
+        second = store.save_market_pulse_entries({"BTC": {}})["BTC"]
+        assert second > first
+
+    def test_empty_save_touches_nothing(self, redis, db):
+        execute, _ = db
+        assert store.save_market_pulse_entries({}) == {}
+        execute.assert_not_called()
+        assert redis.published == []
+
+
+class TestLoad:
+    def test_fetches_only_changed_symbols(self, redis, db):
+        versions = store.save_market_pulse_entries(
+            {f"S{i}": {"i": i} for i in range(5)}
+        )
+        known = dict(versions)
+        known["S3"] = 0
+        del known["S4"]
+
+        entries = store.load_market_pulse_entries(known)
+
+        assert sorted(entries) == ["S3", "S4"]
+        assert entries["S4"]["data"] == {"i": 4}
+        assert redis.mget_calls == [
+            ["stock_agent:MARKET_PULSE:S3", "stock_agent:MARKET_PULSE:S4"]
+        ]
+
+    def test_everything_when_nothing_is_known(self, redis, db):
+        store.save_market_pulse_entries({"BTC": {}, "ETH": {}})
+        assert sorted(store.load_market_pulse_entries()) == ["BTC", "ETH"]
+
+    def test_db_fallback_without_redis(self, db):
+        _, query_all = db
+        record = {"version": 9, "updated_at": "", "data": {"price": 3}}
+        query_all.return_value = [
+            {"key": "MARKET_PULSE:SOL", "value": json.dumps(record)}
+        ]
+        with (
+            patch.object(cache, "_init_redis"),
+            patch.object(cache, "_redis_available", False),
+            patch.object(cache, "_db_get", return_value={"BTC": 1, "SOL": 9}),
+        ):
+            entries = store.load_market_pulse_entries({"BTC": 1})
+
+        assert entries == {"SOL": record}
+        assert query_all.call_args.args[1] == (["MARKET_PULSE:SOL"],)
+
+    def test_partial_redis_index_is_merged_with_db(self, redis, db):
+        # After a Redis flush the hash only holds what was written since
+        redis.hset("stock_agent:MARKET_PULSE:index", mapping={"BTC": 7, "ETH": 3})
+        with patch.object(
+            cache, "_db_get", return_value={"BTC": 5, "ETH": 4, "SOL": 2}
+        ):
+            assert store.load_market_pulse_index() == {"BTC": 7, "ETH": 4, "SOL": 2}
+
+    def test_missing_redis_entries_are_read_from_db(self, redis, db):
+        _, query_all = db
+        redis.set("stock_agent:MARKET_PULSE:BTC", json.dumps({"version": 1}))
+        store.fetch_market_pulse_entries(["BTC", "ETH"])
+        assert query_all.call_args.args[1] == (["MARKET_PULSE:ETH"],)
+
+
+class TestDeltaListener:
+    def test_delivers_published_deltas(self, redis, db):
+        received = []
+        subscribed, got_delta = threading.Event(), threading.Event()
+
+        def on_delta(versions):
+            received.append(versions)
+            # The listener probes the index once right after subscribing
+            (got_delta if versions else subscribed).set()
+
+        store.start_market_pulse_listener(on_delta)
+        try:
+            assert subscribed.wait(2)
+            versions = store.save_market_pulse_entries({"BTC": {}})
+            assert got_delta.wait(2)
+        finally:
+            store.stop_market_pulse_listener()
+
+        assert received[0] is None
+        assert versions in received
+
+    def test_probes_index_without_redis(self):
+        probed = threading.Event()
+        with (
+            patch.object(cache, "_init_redis"),
+            patch.object(cache, "_redis_available", False),
+            patch.object(store, "PROBE_INTERVAL", 0.01),
+        ):
+            store.start_market_pulse_listener(lambda versions: probed.set())
+            try:
+                assert probed.wait(2)
+            finally:
+                store.stop_market_pulse_listener()
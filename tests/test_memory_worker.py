@@ -0,0 +1,413 @@
+"""Tests for core/memory_worker.py and the batched MemoryStore helpers."""
+
+import asyncio
+import os
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from core import memory_worker as mw
+from core.database.memory import MemoryStore
+
+
+def _job(job_id, user_message, kind=mw.KIND_EXTRACT, session="s1", **payload):
+    if kind == mw.KIND_EXTRACT:
+        payload = {
+            "user_message": user_message,
+            "assistant_message": f"reply to {user_message}",
+            "turn_index": job_id,
+            "tools_used": [],
+            **payload,
+        }
+    return {
+        "id": job_id,
+        "user_id": "u1",
+        "session_id": session,
+        "kind": kind,
+        "payload": payload,
+        "provider": "openai",
+        "model": None,
+        "attempts": 1,
+    }
+
+
+def _store():
+    store = MemoryStore.__new__(MemoryStore)
+    store.user_id = "u1"
+    store.session_id = "s1"
+    store.workspace_id = None
+    store._last_consolidated_index = None
+    return store
+
+
+@pytest.fixture
+def queue():
+    """Patch the memory_jobs functions the worker calls."""
+    with (
+        patch("core.database.memory_jobs.claim_memory_jobs") as claim,
+        patch("core.database.memory_jobs.complete_memory_jobs") as complete,
+        patch("core.database.memory_jobs.fail_memory_jobs") as fail,
+        patch.object(
+            mw, "_build_llm", AsyncMock(return_value=(MagicMock(), "openai"))
+        ) as build,
+    ):
+        yield MagicMock(claim=claim, complete=complete, fail=fail, build=build)
+
+
+def _worker():
+    return mw.MemoryWorker(rate_limiter=mw.ProviderRateLimiter(rpm=0))
+
+
+class TestExtractBatching:
+    @pytest.mark.asyncio
+    async def test_pending_turns_share_one_llm_call(self, queue):
+        queue.claim.return_value = [_job(1, "a"), _job(2, "b"), _job(3, "c")]
+        store = MagicMock()
+        store.extract_facts_from_turns = AsyncMock(return_value=True)
+
+        with patch("core.database.memory.get_memory_store", return_value=store):
+            worker = _worker()
+            assert await worker.run_once() == 3
+
+        store.extract_facts_from_turns.assert_awaited_once()
+        turns = store.extract_facts_from_turns.await_args.args[0]
+        assert [t["user_message"] for t in turns] == ["a", "b", "c"]
+        queue.complete.assert_called_once_with([1, 2, 3])
+        assert worker.stats["llm_calls"] == 1
+        assert worker.stats["turns_coalesced"] == 3
+
+    @pytest.mark.asyncio
+    async def test_repeated_message_keeps_latest_turn(self, queue):
+        queue.claim.return_value = [_job(1, "btc?"), _job(2, "eth?"), _job(3, "btc?")]
+        store = MagicMock()
+        store.extract_facts_from_turns = AsyncMock(return_value=True)
+
+        with patch("core.database.memory.get_memory_store", return_value=store):
+            await _worker().run_once()
+
+        turns = store.extract_facts_from_turns.await_args.args[0]
+        assert [(t["user_message"], t["turn_index"]) for t in turns] == [
+            ("eth?", 2),
+            ("btc?", 3),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_failed_extraction_is_retried(self, queue):
+        queue.claim.return_value = [_job(1, "a"), _job(2, "b")]
+        store = MagicMock()
+        store.extract_facts_from_turns = AsyncMock(side_effect=RuntimeError("429"))
+
+        with patch("core.database.memory.get_memory_store", return_value=store):
+            worker = _worker()
+            await worker.run_once()
+
+        ids, error, _, max_attempts = queue.fail.call_args.args
+        assert ids == [1, 2] and "429" in error
+        assert max_attempts == mw.MAX_ATTEMPTS
+        queue.complete.assert_not_called()
+        assert worker.stats["jobs_failed"] == 2
+
+    @pytest.mark.asyncio
+    async def test_missing_credentials_fail_without_retry(self, queue):
+        queue.claim.return_value = [_job(1, "a")]
+        queue.build.return_value = (None, "openai")
+
+        await _worker().run_once()
+
+        assert queue.fail.call_args.args[3] == 1
+
+    @pytest.mark.asyncio
+    async def test_empty_queue(self, queue):
+        queue.claim.return_value = []
+        assert await _worker().run_once() == 0
+        queue.build.assert_not_called()
+
+
+class TestConsolidation:
+    @pytest.mark.asyncio
+    async def test_windows_merged_and_index_advanced(self, queue):
+        queue.claim.return_value = [
+            _job(
+                1,
+                None,
+                kind=mw.KIND_CONSOLIDATE,
+                messages=[{"role": "user", "content": "m0"}],
+                start_index=0,
+                end_index=10,
+            ),
+            _job(
+                2,
+                None,
+                kind=mw.KIND_CONSOLIDATE,
+                messages=[{"role": "user", "content": "m1"}],
+                start_index=10,
+                end_index=20,
+            ),
+        ]
+        store = MagicMock()
+        store.consolidate = AsyncMock(return_value=True)
+
+        with patch("core.database.memory.get_memory_store", return_value=store):
+            await _worker().run_once()
+
+        messages = store.consolidate.await_args.args[0]
+        assert [m["content"] for m in messages] == ["m0", "m1"]
+        store.advance_consolidated_index.assert_called_once_with(20)
+        queue.complete.assert_called_once_with([1, 2])
+
+
+class TestEnqueue:
+    def test_retried_turn_has_same_dedupe_key(self):
+        with patch("core.database.memory_jobs.enqueue_memory_job") as enqueue:
+            mw.enqueue_turn("u1", "s1", "hi", "hello", 1)
+            mw.enqueue_turn("u1", "s1", "hi", "hello", 2)
+            mw.enqueue_turn("u1", "s1", "hi", "different", 3)
+
+        keys = [c.kwargs["dedupe_key"] for c in enqueue.call_args_list]
+        assert keys[0] == keys[1] != keys[2]
+
+    def test_consolidation_window_keyed_by_start(self):
+        with patch("core.database.memory_jobs.enqueue_memory_job") as enqueue:
+            mw.enqueue_consolidation("u1", "s1", [], 0, 20)
+            mw.enqueue_consolidation("u1", "s1", [], 0, 22)
+            mw.enqueue_consolidation("u1", "s1", [], 0, 22, archive_all=True)
+
+        keys = [c.kwargs["dedupe_key"] for c in enqueue.call_args_list]
+        assert keys[0] == keys[1] != keys[2]
+
+    @pytest.mark.asyncio
+    async def test_manager_falls_back_to_inline_extraction(self):
+        from core.agents.manager.memory import MemoryMixin
+
+        class FakeManager(MemoryMixin):
+            user_id = "u1"
+            session_id = "s1"
+
+        mgr = FakeManager()
+        with (
+            patch.object(mgr, "_get_memory_store", return_value=MagicMock()),
+            patch.object(mgr, "_extract_facts_background", AsyncMock()) as inline,
+            patch.object(mw, "QUEUE_ENABLED", True),
+            patch.object(mw, "enqueue_turn", side_effect=RuntimeError("db down")),
+        ):
+            await mgr._enqueue_facts_background("hi", "hello", 1)
+
+        inline.assert_awaited_once_with("hi", "hello", 1, None)
+
+
+class _ScriptedCursor:
+    """Cursor stub answering fetchone() from a list, recording the SQL."""
+
+    def __init__(self, fetchone_results, rows=()):
+        self.sql = []
+        self._results = list(fetchone_results)
+        self._rows = list(rows)
+        self.description = [("id",), ("user_id",), ("payload",)]
+
+    def execute(self, sql, params=None):
+        self.sql.append((sql, params))
+
+    def fetchone(self):
+        return self._results.pop(0)
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        pass
+
+
+def _claim_with(cursor, **kwargs):
+    from contextlib import contextmanager
+
+    from core.database import memory_jobs
+
+    conn = MagicMock()
+    conn.cursor.return_value = cursor
+
+    @contextmanager
+    def fake_transaction():
+        yield conn
+
+    with patch.object(memory_jobs, "transaction", fake_transaction):
+        return memory_jobs.claim_memory_jobs(**kwargs)
+
+
+class TestClaimMemoryJobs:
+    def test_head_query_skips_users_with_running_jobs(self):
+        cursor = _ScriptedCursor([("u1",), (True,)], rows=[(1, "u1", "{}")])
+        assert _claim_with(cursor) == [{"id": 1, "user_id": "u1", "payload": {}}]
+
+        head_sql = cursor.sql[0][0]
+        assert "NOT EXISTS" in head_sql and "status = 'running'" in head_sql
+        assert "pg_try_advisory_xact_lock" in cursor.sql[1][0]
+        assert cursor.sql[2][1] == ("u1", 20)
+
+    def test_user_held_by_another_worker_is_passed_over(self):
+        cursor = _ScriptedCursor(
+            [("u1",), (False,), ("u2",), (True,)], rows=[(5, "u2", "{}")]
+        )
+        jobs = _claim_with(cursor)
+
+        assert [j["user_id"] for j in jobs] == ["u2"]
+        assert cursor.sql[2][1] == (["u1"],)
+        assert cursor.sql[4][1] == ("u2", 20)
+
+    def test_gives_up_after_max_users(self):
+        cursor = _ScriptedCursor([("u1",), (False,), ("u2",), (False,)])
+        assert _claim_with(cursor, max_users=2) == []
+        assert len(cursor.sql) == 4
+
+    def test_failed_jobs_do_not_block_reenqueue(self):
+        from core.database import memory_jobs
+
+        with patch.object(
+            memory_jobs.DatabaseBase, "execute", return_value=1
+        ) as execute:
+            assert memory_jobs.enqueue_memory_job("u1", "s1", "facts", {}, "k1")
+        assert "WHERE status <> 'failed' DO NOTHING" in execute.call_args.args[0]
+
+
+_PG_URL = os.getenv("MEMORY_JOBS_TEST_DATABASE_URL")
+
+
+@pytest.mark.integration
+@pytest.mark.skipif(
+    not _PG_URL, reason="MEMORY_JOBS_TEST_DATABASE_URL (disposable Postgres) not set"
+)
+class TestConcurrentClaims:
+    """Runs against a throwaway Postgres database; memory_jobs is recreated."""
+
+    @pytest.fixture
+    def pg(self):
+        from contextlib import contextmanager
+
+        import psycopg2
+
+        from core.database import memory_jobs
+        from core.database.schema import create_memory_tables
+
+        @contextmanager
+        def pg_transaction():
+            conn = psycopg2.connect(_PG_URL)
+            try:
+                yield conn
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.close()
+
+        def pg_execute(sql, params=None):
+            with pg_transaction() as conn:
+                cur = conn.cursor()
+                cur.execute(sql, params)
+                return cur.rowcount
+
+        with pg_transaction() as conn:
+            cur = conn.cursor()
+            cur.execute("DROP TABLE IF EXISTS memory_jobs")
+            create_memory_tables(cur)
+        with (
+            patch.object(memory_jobs, "transaction", pg_transaction),
+            patch.object(memory_jobs.DatabaseBase, "execute", side_effect=pg_execute),
+        ):
+            yield memory_jobs
+
+    def test_two_workers_never_hold_the_same_user(self, pg):
+        import threading
+
+        for i in range(6):
+            pg.enqueue_memory_job("u1", "s1", "facts", {"i": i}, f"u1-{i}")
+        barrier = threading.Barrier(2)
+        claimed = []
+
+        def claim():
+            barrier.wait()
+            claimed.append(pg.claim_memory_jobs(limit=3))
+
+        threads = [threading.Thread(target=claim) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        batches = [batch for batch in claimed if batch]
+        assert len(batches) == 1
+        assert {job["user_id"] for job in batches[0]} == {"u1"}
+
+        # More turns arriving while u1 is running wait for the batch to finish
+        pg.enqueue_memory_job("u1", "s1", "facts", {"i": 9}, "u1-9")
+        assert pg.claim_memory_jobs() == []
+        pg.complete_memory_jobs([job["id"] for job in batches[0]])
+        assert len(pg.claim_memory_jobs()) == 4
+
+    def test_failed_job_can_be_enqueued_again(self, pg):
+        assert pg.enqueue_memory_job("u1", "s1", "facts", {}, "k1")
+        assert not pg.enqueue_memory_job("u1", "s1", "facts", {}, "k1")
+        jobs = pg.claim_memory_jobs()
+        pg.DatabaseBase.execute(
+            "UPDATE memory_jobs SET status = 'failed' WHERE id = %s",
+            (jobs[0]["id"],),
+        )
+        assert pg.enqueue_memory_job("u1", "s1", "facts", {}, "k1")
+
+
+class TestProviderRateLimiter:
+    @pytest.mark.asyncio
+    async def test_calls_spaced_per_provider(self):
+        limiter = mw.ProviderRateLimiter(rpm=1200)  # 50 ms apart
+        started = time.monotonic()
+        waits = await asyncio.gather(*(limiter.acquire("openai") for _ in range(3)))
+        other = await limiter.acquire("gemini")
+
+        assert time.monotonic() - started >= 0.09
+        assert sorted(waits)[0] == 0 and sorted(waits)[2] >= 0.09
+        assert other == 0
+
+
+class TestMemoryStoreBatching:
+    @pytest.mark.asyncio
+    async def test_coalesced_prompt_lists_every_turn(self):
+        store = _store()
+        llm = MagicMock()
+        llm.invoke.return_value = MagicMock(content='{"facts": []}')
+
+        with patch.object(store, "facts_to_text", return_value=""):
+            ok = await store.extract_facts_from_turns(
+                [
+                    {
+                        "user_message": "I'm Ann",
+                        "assistant_message": "Hi",
+                        "turn_index": 4,
+                    },
+                    {
+                        "user_message": "BTC?",
+                        "assistant_message": "95k",
+                        "turn_index": 5,
+                        "tools_used": ["get_crypto_price"],
+                    },
+                ],
+                llm,
+            )
+
+        assert ok is True
+        prompt = llm.invoke.call_args[0][0][0].content
+        assert "### 第 4 輪" in prompt and "### 第 5 輪" in prompt
+        assert "I'm Ann" in prompt and "get_crypto_price" in prompt
+        assert llm.invoke.call_count == 1
+
+    def test_unchanged_facts_skip_cache_invalidation(self):
+        store = _store()
+        with (
+            patch("core.database.memory.DatabaseBase.execute", return_value=0),
+            patch("core.database.memory._invalidate_memory_cache") as invalidate,
+        ):
+            changed = store.write_facts(
+                [{"key": "name", "value": "Ann", "confidence": "high"}]
+            )
+
+        assert changed == 0
+        invalidate.assert_not_called()
@@ -0,0 +1,201 @@
+"""Tests for bulk notification creation and batched websocket fan-out."""
+
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+
+def _items(n):
+    return [
+        {"user_id": f"user-{i}", "type": "announcement", "title": "T", "body": "B"}
+        for i in range(n)
+    ]
+
+
+class TestOrmCreateNotificationsBulk:
+    @pytest.fixture
+    def fake_session(self):
+        session = MagicMock()
+
+        async def _execute(stmt):
+            params = stmt.compile().params
+            count = sum(1 for key in params if key.startswith("user_id"))
+            # RETURNING order is not guaranteed; hand rows back reversed
+            rows = [
+                SimpleNamespace(
+                    id=params[f"id_m{i}"],
+                    user_id=params[f"user_id_m{i}"],
+                    type="announcement",
+                    title="T",
+                    body="B",
+                    data=None,
+                    is_read=False,
+                    created_at=datetime(2026, 1, 1),
+                )
+                for i in reversed(range(count))
+            ]
+            result = MagicMock()
+            result.fetchall.return_value = rows
+            return result
+
+        session.execute = AsyncMock(side_effect=_execute)
+        return session
+
+    async def test_one_statement_per_chunk(self, fake_session):
+        from core.orm.notifications_repo import notifications_repo
+
+        created = await notifications_repo.create_notifications_bulk(
+            _items(25), chunk_size=10, session=fake_session
+        )
+
+        assert fake_session.execute.await_count == 3
+        assert [n["user_id"] for n in created] == [f"user-{i}" for i in range(25)]
+        assert created[0]["created_at"] == "2026-01-01T00:00:00"
+
+    async def test_progress_reported_per_chunk(self, fake_session):
+        from core.orm.notifications_repo import notifications_repo
+
+        progress = []
+
+        async def on_progress(done, total):
+            progress.append((done, total))
+
+        await notifications_repo.create_notifications_bulk(
+            _items(25), chunk_size=10, on_progress=on_progress, session=fake_session
+        )
+
+        assert progress == [(10, 25), (20, 25), (25, 25)]
+
+    async def test_empty_input_skips_db(self, fake_session):
+        from core.orm.notifications_repo import notifications_repo
+
+        assert await notifications_repo.create_notifications_bulk([]) == []
+        fake_session.execute.assert_not_awaited()
+
+    async def test_announcement_uses_bulk_path(self):
+        from core.orm.notifications_repo import notifications_repo
+
+        with patch.object(
+            notifications_repo,
+            "create_notifications_bulk",
+            new=AsyncMock(return_value=[]),
+        ) as bulk:
+            await notifications_repo.notify_announcement(["a", "b"], "T", "B")
+
+        items = bulk.await_args.args[0]
+        assert [i["user_id"] for i in items] == ["a", "b"]
+        assert all(i["type"] == "announcement" for i in items)
+
+
+class TestLegacyCreateNotificationsBulk:
+    def test_chunks_into_multi_row_inserts(self):
+        from core.database import notifications
+
+        conn = MagicMock()
+        calls = []
+
+        def fake_execute_values(cur, sql, values, **kwargs):
+            calls.append(len(values))
+            assert kwargs["fetch"] is True
+            return [
+                (v[0], v[1], v[2], v[3], v[4], None, False, datetime(2026, 1, 1))
+                for v in reversed(values)
+            ]
+
+        with (
+            patch.object(notifications, "get_connection", return_value=conn),
+            patch.object(notifications, "execute_values", fake_execute_values),
+        ):
+            created = notifications.create_notifications_bulk(_items(7), chunk_size=3)
+
+        assert calls == [3, 3, 1]
+        assert [n["user_id"] for n in created] == [f"user-{i}" for i in range(7)]
+        conn.commit.assert_called_once()
+        conn.close.assert_called_once()
+
+    def test_rolls_back_on_error(self):
+        from core.database import notifications
+
+        conn = MagicMock()
+        with (
+            patch.object(notifications, "get_connection", return_value=conn),
+            patch.object(
+                notifications, "execute_values", side_effect=RuntimeError("boom")
+            ),
+        ):
+            with pytest.raises(RuntimeError):
+                notifications.create_notifications_bulk(_items(2))
+
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
+
+
+class TestPushNotificationsBulk:
+    async def test_only_online_users_receive_grouped_payloads(self):
+        from api.routers.notifications import (
+            NotificationConnectionManager,
+            push_notifications_bulk,
+        )
+
+        manager = NotificationConnectionManager()
+        ws = MagicMock()
+        ws.send_json = AsyncMock()
+        await manager.connect(ws, "user-1")
+
+        notifications = [
+            {"id": "n1", "user_id": "user-1"},
+            {"id": "n2", "user_id": "user-2"},
+            {"id": "n3", "user_id": "user-1"},
+        ]
+        with patch("api.routers.notifications.notification_manager", manager):
+            online = await push_notifications_bulk(notifications)
+
+        assert online == 1
+        sent = [c.args[0]["data"]["id"] for c in ws.send_json.await_args_list]
+        assert sent == ["n1", "n3"]
+
+
+class TestAlertCheckerNotifications:
+    async def test_failed_bulk_insert_keeps_failures_per_alert(self):
+        from api import alert_checker
+
+        alerts = [
+            {
+                "id": i,
+                "user_id": f"user-{i}",
+                "symbol": "AAPL",
+                "market": "us",
+                "condition": "above",
+                "target": 100.0,
+                "repeat": False,
+            }
+            for i in range(3)
+        ]
+
+        def create_one(user_id, *args):
+            if user_id == "user-1":
+                raise RuntimeError("foreign key violation")
+            return {"id": f"n-{user_id}", "user_id": user_id}
+
+        mark = MagicMock()
+        push = AsyncMock()
+        with (
+            patch("core.database.get_active_alerts", return_value=alerts),
+            patch("core.database.mark_alert_triggered", mark),
+            patch(
+                "core.database.notifications.create_notifications_bulk",
+                side_effect=RuntimeError("foreign key violation"),
+            ),
+            patch("core.database.notifications.create_notification", create_one),
+            patch("api.routers.notifications.push_notifications_bulk", push),
+            patch.object(
+                alert_checker, "_fetch_price", AsyncMock(return_value=(150.0, 140.0))
+            ),
+        ):
+            await alert_checker._check_all_alerts()
+
+        pushed = push.await_args.args[0]
+        assert [n["user_id"] for n in pushed] == ["user-0", "user-2"]
+        assert [c.args[0] for c in mark.call_args_list] == [0, 2]
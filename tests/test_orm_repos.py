@@ -49,6 +49,7 @@ class TestNotificationsRepoStructure:
 
     REQUIRED_METHODS = [
         "create_notification",
+        "create_notifications_bulk",
         "get_notifications",
         "get_unread_count",
         "mark_notification_as_read",
@@ -0,0 +1,268 @@
+"""Tests for core/principal_cache.py and its use in get_current_user."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from core import principal_cache
+
+
+def _loader(user=None):
+    return AsyncMock(
+        side_effect=lambda uid: (
+            user if user is not None else {"user_id": uid, "is_active": True}
+        )
+    )
+
+
+class TestPrincipalCache:
+    @pytest.mark.asyncio
+    async def test_second_lookup_served_from_l1(self):
+        loader = _loader()
+        first = await principal_cache.get_principal("u1", loader)
+        second = await principal_cache.get_principal("u1", loader)
+
+        assert first == second == {"user_id": "u1", "is_active": True}
+        assert loader.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_returned_dict_is_a_copy(self):
+        loader = _loader()
+        user = await principal_cache.get_principal("u1", loader)
+        user["role"] = "admin"
+
+        again = await principal_cache.get_principal("u1", loader)
+        assert "role" not in again
+
+    @pytest.mark.asyncio
+    async def test_missing_user_not_cached(self):
+        loader = AsyncMock(return_value=None)
+        assert await principal_cache.get_principal("ghost", loader) is None
+        assert await principal_cache.get_principal("ghost", loader) is None
+        assert loader.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate_forces_reload(self):
+        loader = _loader()
+        await principal_cache.get_principal("u1", loader)
+        await principal_cache.invalidate_principal("u1")
+        await principal_cache.get_principal("u1", loader)
+
+        assert loader.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_sync_invalidate_forces_reload(self):
+        loader = _loader()
+        await principal_cache.get_principal("u1", loader)
+        principal_cache.invalidate_principal_sync("u1")
+        await principal_cache.get_principal("u1", loader)
+
+        assert loader.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_load_racing_invalidation_is_not_cached(self):
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def slow_loader(uid):
+            started.set()
+            await release.wait()
+            return {"user_id": uid, "role": "user"}
+
+        task = asyncio.create_task(principal_cache.get_principal("u1", slow_loader))
+        await started.wait()
+        await principal_cache.invalidate_principal("u1")
+        release.set()
+        await task
+
+        loader = _loader()
+        await principal_cache.get_principal("u1", loader)
+        assert loader.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_thread_invalidations_while_caching(self):
+        loader = _loader()
+        user_ids = [f"u{i}" for i in range(200)]
+
+        def invalidate():
+            for _ in range(20):
+                principal_cache.invalidate_principal_sync(*user_ids)
+
+        thread_job = asyncio.create_task(asyncio.to_thread(invalidate))
+        for _ in range(5):
+            for uid in user_ids:
+                await principal_cache.get_principal(uid, loader)
+        await thread_job
+
+        # Nothing cached before the last invalidation survives it
+        principal_cache.invalidate_principal_sync(*user_ids)
+        assert principal_cache.stats()["l1_size"] == 0
+
+
+class FakeRedis:
+    """The handful of async Redis calls the cache makes, in memory."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, *keys):
+        return [self.data.get(k) for k in keys]
+
+    async def eval(self, script, numkeys, key, version_key, version, ttl, value):
+        assert script is principal_cache._CAS_SETEX
+        if self.data.get(version_key, b"0") != version:
+            return 0
+        self.data[key] = value
+        return 1
+
+    def pipeline(self, transaction=True):
+        redis, ops = self, []
+
+        class Pipe:
+            def incr(self, key):
+                ops.append(lambda: redis._incr(key))
+
+            def expire(self, key, ttl):
+                pass
+
+            def delete(self, *keys):
+                ops.append(lambda: [redis.data.pop(k, None) for k in keys])
+
+            def publish(self, channel, message):
+                pass
+
+            async def execute(self):
+                return [op() for op in ops]
+
+        return Pipe()
+
+    def _incr(self, key):
+        self.data[key] = str(int(self.data.get(key, b"0")) + 1).encode()
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(principal_cache, "_redis", fake)
+    monkeypatch.setattr(principal_cache, "_redis_checked", True)
+    return fake
+
+
+class TestSharedCache:
+    @pytest.mark.asyncio
+    async def test_loaded_principal_is_shared_through_redis(self, redis):
+        await principal_cache.get_principal("u1", _loader())
+        principal_cache.clear()
+
+        loader = _loader()
+        assert (await principal_cache.get_principal("u1", loader))["user_id"] == "u1"
+        loader.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_load_racing_another_workers_invalidation_is_not_shared(self, redis):
+        async def loader(uid):
+            # Another worker commits a suspension and invalidates meanwhile
+            redis._incr("principal:ver:" + uid)
+            redis.data.pop("principal:" + uid, None)
+            return {"user_id": uid, "is_active": True}
+
+        await principal_cache.get_principal("u1", loader)
+        assert "principal:u1" not in redis.data
+
+        # The next load, with nothing racing it, is shared again
+        await principal_cache.get_principal("u2", _loader())
+        assert "principal:u2" in redis.data
+
+    @pytest.mark.asyncio
+    async def test_invalidation_bumps_the_version(self, redis):
+        await principal_cache.get_principal("u1", _loader())
+        await principal_cache.invalidate_principal("u1")
+
+        assert "principal:u1" not in redis.data
+        assert redis.data["principal:ver:u1"] == b"1"
+
+
+class TestInvalidateAfterCommit:
+    @pytest.mark.asyncio
+    async def test_callers_session_invalidates_only_after_commit(self):
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        from core.orm.governance_repo import GovernanceRepository
+
+        repo = GovernanceRepository()
+        session = AsyncSession()
+        with (
+            patch.object(repo, "_apply_suspension_tx", AsyncMock(return_value=True)),
+            patch(
+                "core.orm.governance_repo.invalidate_principal", new=AsyncMock()
+            ) as invalidate,
+        ):
+            assert await repo.apply_suspension("u1", "suspend_3d", session=session)
+            invalidate.assert_not_awaited()
+
+            sync_session = session.sync_session
+            sync_session.dispatch.after_commit(sync_session)
+            await asyncio.sleep(0)
+        invalidate.assert_awaited_once_with("u1")
+
+    @pytest.mark.asyncio
+    async def test_rolled_back_suspension_does_not_invalidate(self):
+        from sqlalchemy.ext.asyncio import AsyncSession
+
+        from core.orm.session import run_after_commit
+
+        callback = AsyncMock()
+        session = AsyncSession()
+        sync_session = session.sync_session
+        run_after_commit(session, callback)
+        sync_session.dispatch.after_rollback(sync_session)
+        sync_session.dispatch.after_commit(sync_session)
+        await asyncio.sleep(0)
+
+        callback.assert_not_awaited()
+
+
+class TestGetCurrentUserCache:
+    @pytest.mark.asyncio
+    async def test_repeated_requests_hit_db_once(self):
+        from api.deps import create_access_token, get_current_user
+
+        token = create_access_token({"sub": "cached-user"})
+        request = MagicMock()
+        request.cookies = {}
+        mocked = AsyncMock(return_value={"user_id": "cached-user", "is_active": True})
+
+        with patch("api.deps.user_repo.get_by_id", new=mocked):
+            for _ in range(5):
+                user = await get_current_user(request, token)
+                assert user["user_id"] == "cached-user"
+
+        assert mocked.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_suspended_user_rejected_after_invalidation(self):
+        from fastapi import HTTPException
+
+        from api.deps import create_access_token, get_current_user
+
+        token = create_access_token({"sub": "soon-suspended"})
+        request = MagicMock()
+        request.cookies = {}
+        active = {"user_id": "soon-suspended", "is_active": True}
+        suspended = {"user_id": "soon-suspended", "is_active": False}
+
+        with patch("api.deps.user_repo.get_by_id", new=AsyncMock(return_value=active)):
+            await get_current_user(request, token)
+
+        await principal_cache.invalidate_principal("soon-suspended")
+
+        with patch(
+            "api.deps.user_repo.get_by_id", new=AsyncMock(return_value=suspended)
+        ):
+            with pytest.raises(HTTPException) as exc_info:
+                await get_current_user(request, token)
+        assert exc_info.value.status_code == 403
@@ -0,0 +1,157 @@
+"""Tests for per-statement query instrumentation (core/database/query_stats.py)."""
+
+import logging
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from core.database.query_stats import QueryStats, fingerprint, instrument_engine
+
+
+class TestFingerprint:
+    def test_literals_and_binds_normalised(self):
+        a = fingerprint("SELECT * FROM users WHERE id = 42 AND name = 'bob'")
+        b = fingerprint("SELECT *   FROM users\nWHERE id = %s AND name = %(name)s")
+        c = fingerprint("SELECT * FROM users WHERE id = $1 AND name = :name")
+
+        assert a == b == c == "SELECT * FROM users WHERE id = ? AND name = ?"
+
+    def test_in_lists_and_multi_row_values_collapse(self):
+        assert fingerprint("SELECT 1 FROM t WHERE id IN (1, 2, 3)") == fingerprint(
+            "SELECT 1 FROM t WHERE id IN (%s)"
+        )
+        assert fingerprint("INSERT INTO t VALUES (1, 'a'), (2, 'b')") == (
+            "INSERT INTO t VALUES (...)"
+        )
+
+    def test_casts_and_identifiers_untouched(self):
+        assert (
+            fingerprint("SELECT data::jsonb FROM t1 -- comment")
+            == "SELECT data::jsonb FROM t1"
+        )
+
+
+class TestQueryStats:
+    def test_percentiles_and_totals(self):
+        stats = QueryStats()
+        for ms in range(1, 101):
+            stats.record("SELECT * FROM t WHERE id = %s", float(ms), rows=1)
+        stats.record("SELECT * FROM t WHERE id = %s", 5.0, error=True, pool_wait_ms=3)
+
+        [row] = stats.snapshot()
+        assert row["calls"] == 101
+        assert row["errors"] == 1
+        assert row["rows"] == 100
+        assert row["p50_ms"] == pytest.approx(50, abs=1)
+        assert row["p99_ms"] == pytest.approx(99, abs=1)
+        assert row["pool_wait_ms"] == 3
+        assert row["hot"] is True
+
+    def test_order_by_and_limit(self):
+        stats = QueryStats()
+        stats.record("SELECT 1", 100.0)
+        for _ in range(5):
+            stats.record("SELECT 2 FROM t", 1.0)
+
+        assert stats.snapshot(order_by="calls")[0]["calls"] == 5
+        assert stats.snapshot(order_by="total_ms")[0]["total_ms"] == 100.0
+        assert len(stats.snapshot(limit=1)) == 1
+
+    def test_fingerprint_cap_folds_into_other(self, monkeypatch):
+        from core.database import query_stats as mod
+
+        monkeypatch.setattr(mod, "MAX_STATEMENTS", 2)
+        stats = QueryStats()
+        for table in ("a", "b", "c", "d"):
+            stats.record(f"SELECT * FROM {table}", 1.0)
+
+        statements = {row["statement"]: row["calls"] for row in stats.snapshot()}
+        assert statements[mod.OTHER_FINGERPRINT] == 2
+        assert len(statements) == 3
+
+    def test_reset(self):
+        stats = QueryStats()
+        stats.record("SELECT 1", 1.0)
+        stats.reset()
+        assert stats.snapshot() == []
+        assert stats.summary()["calls"] == 0
+
+
+class TestEngineInstrumentation:
+    @pytest.fixture
+    def engine(self, monkeypatch):
+        from core.database import query_stats as mod
+
+        fresh = QueryStats()
+        monkeypatch.setattr(mod, "query_stats", fresh)
+        engine = create_engine("sqlite://")
+        instrument_engine(engine)
+        yield engine, fresh
+        engine.dispose()
+
+    def test_statements_recorded(self, engine):
+        engine, stats = engine
+        with engine.connect() as conn:
+            for value in range(3):
+                conn.execute(text("SELECT :v"), {"v": value}).fetchall()
+
+        [row] = [r for r in stats.snapshot() if r["statement"] == "SELECT ?"]
+        assert row["calls"] == 3
+
+    def test_errors_recorded(self, engine):
+        engine, stats = engine
+        with engine.connect() as conn:
+            with pytest.raises(Exception):
+                conn.execute(text("SELECT * FROM missing_table"))
+
+        [row] = stats.snapshot()
+        assert row["errors"] == 1
+
+    def test_slow_query_logged(self, engine, monkeypatch, caplog):
+        engine, _ = engine
+        monkeypatch.setenv("SLOW_QUERY_MS", "0.000001")
+        monkeypatch.setenv("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", "1")
+        with caplog.at_level(logging.WARNING, logger="core.database.query_stats"):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1")).fetchall()
+
+        assert any("Slow query" in r.getMessage() for r in caplog.records)
+
+    def test_slow_query_logging_off_by_default(self, engine, monkeypatch, caplog):
+        engine, _ = engine
+        monkeypatch.delenv("SLOW_QUERY_MS", raising=False)
+        with caplog.at_level(logging.WARNING, logger="core.database.query_stats"):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1")).fetchall()
+
+        assert not any("Slow query" in r.getMessage() for r in caplog.records)
+
+
+class TestPsycopgCursors:
+    def test_dict_cursor_factories_stay_timed(self):
+        from psycopg2.extras import DictCursor, RealDictCursor
+
+        from core.database import query_stats as mod
+
+        for factory in (RealDictCursor, DictCursor):
+            timed = mod.timed_cursor_factory(factory)
+            assert issubclass(timed, factory)
+            assert issubclass(timed, mod._TimedCursorMixin)
+
+    def test_unknown_factory_passes_through(self):
+        from core.database import query_stats as mod
+
+        class Custom(mod.TimedCursor):
+            pass
+
+        assert mod.timed_cursor_factory(Custom) is Custom
+        assert mod.timed_cursor_factory(None) is None
+
+
+class TestAdminQueryStatsRoutes:
+    def test_routes_registered(self):
+        from api.routers.admin_panel import router
+
+        paths = {route.path for route in router.routes}
+        assert "/api/admin/db/queries" in paths
+        assert "/api/admin/db/queries/reset" in paths
@@ -0,0 +1,134 @@
+"""Tests for api/middleware/rate_limit_storage.py."""
+
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from limits import parse
+from limits.storage import MemoryStorage, storage_from_string
+from limits.strategies import MovingWindowRateLimiter
+
+from api.middleware import rate_limit_storage as rls
+from api.middleware.rate_limit import PersistentRateLimiter
+
+
+@pytest.fixture
+def sqlite_uri(tmp_path):
+    return f"sqlite:///{tmp_path / 'limits.sqlite3'}"
+
+
+def _hits(limiter, item, n, key="k"):
+    return sum(limiter.hit(item, key) for _ in range(n))
+
+
+class TestSQLiteStorage:
+    def test_moving_window_is_shared_between_instances(self, sqlite_uri):
+        item = parse("10/minute")
+        first = MovingWindowRateLimiter(storage_from_string(sqlite_uri))
+        second = MovingWindowRateLimiter(storage_from_string(sqlite_uri))
+
+        assert _hits(first, item, 6) == 6
+        assert _hits(second, item, 6) == 4
+        assert first.get_window_stats(item, "k").remaining == 0
+
+    def test_entries_leave_the_window(self, sqlite_uri):
+        item = parse("3/second")
+        limiter = MovingWindowRateLimiter(storage_from_string(sqlite_uri))
+        assert _hits(limiter, item, 5) == 3
+        time.sleep(1.05)
+        assert limiter.hit(item, "k")
+
+    def test_fixed_window_counters(self, sqlite_uri):
+        storage = storage_from_string(sqlite_uri)
+        assert storage.incr("c", 60) == 1
+        assert storage.incr("c", 60, amount=2) == 3
+        assert storage.get("c") == 3
+        storage.clear("c")
+        assert storage.get("c") == 0
+
+
+class TestLeasedStorage:
+    def test_hits_are_decided_locally_after_a_lease(self):
+        storage = rls.LeasedStorage("leased+memory://")
+        limiter = MovingWindowRateLimiter(storage)
+        item = parse("100/minute")
+
+        assert _hits(limiter, item, 60) == 60
+        assert storage.stats["local_hits"] > 40
+        assert storage.stats["leases"] < 20
+
+    def test_workers_together_honour_the_limit(self, sqlite_uri):
+        item = parse("50/minute")
+        workers = [
+            MovingWindowRateLimiter(rls.LeasedStorage(f"leased+{sqlite_uri}"))
+            for _ in range(3)
+        ]
+        admitted = sum(workers[i % 3].hit(item, "k") for i in range(200))
+        assert admitted <= 50
+
+    def test_small_limits_lease_one_token(self):
+        storage = rls.LeasedStorage("leased+memory://")
+        storage.shared = MagicMock(wraps=MemoryStorage())
+        limiter = MovingWindowRateLimiter(storage)
+
+        assert _hits(limiter, parse("5/minute"), 5) == 5
+        sizes = [c.args[3] for c in storage.shared.acquire_entry.call_args_list]
+        assert sizes == [1] * 5
+
+    def test_denied_key_is_blocked_without_backend_calls(self):
+        storage = rls.LeasedStorage("leased+memory://")
+        storage.shared = MagicMock(wraps=MemoryStorage())
+        limiter = MovingWindowRateLimiter(storage)
+        item = parse("5/minute")
+
+        assert _hits(limiter, item, 5) == 5
+        calls = storage.shared.acquire_entry.call_count
+        assert _hits(limiter, item, 100) == 0
+        # One refused lease, then every denial is local
+        assert storage.shared.acquire_entry.call_count == calls + 1
+        assert storage.stats["local_denials"] == 99
+
+    def test_unused_tokens_lapse(self):
+        storage = rls.LeasedStorage("leased+memory://")
+        limiter = MovingWindowRateLimiter(storage)
+        item = parse("100/minute")
+        _hits(limiter, item, 30)
+        lease = storage._leases[item.key_for("k")]
+        assert lease.tokens > 0
+
+        lease.expires_at = time.monotonic() - 1
+        leases = storage.stats["leases"]
+        limiter.hit(item, "k")
+        assert storage.stats["leases"] == leases + 1
+
+    def test_window_stats_exclude_unspent_lease(self):
+        storage = rls.LeasedStorage("leased+memory://")
+        limiter = MovingWindowRateLimiter(storage)
+        item = parse("100/minute")
+        _hits(limiter, item, 30)
+
+        assert limiter.get_window_stats(item, "k").remaining == 70
+
+    def test_clear_drops_local_state(self):
+        storage = rls.LeasedStorage("leased+memory://")
+        limiter = MovingWindowRateLimiter(storage)
+        item = parse("5/minute")
+        _hits(limiter, item, 6)
+
+        storage.reset()
+        assert limiter.hit(item, "k")
+
+
+class TestPersistentRateLimiterWrites:
+    def test_hits_are_written_at_most_once_per_interval(self, tmp_path):
+        storage_file = tmp_path / "rate_limits.json"
+        limiter = PersistentRateLimiter(str(storage_file), persist_interval=60)
+
+        limiter.check_limit("user:1", limit=10, window=3600)
+        assert "user:1" in storage_file.read_text()
+        storage_file.write_text("{}")
+        limiter.check_limit("user:2", limit=10, window=3600)
+        assert storage_file.read_text() == "{}"
+
+        limiter.flush()
+        assert "user:2" in storage_file.read_text()
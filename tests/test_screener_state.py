@@ -0,0 +1,174 @@
+"""
+Tests for the NumPy-backed screener state and the light screener built on it.
+"""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from analysis.screener_state import ScreenerState
+
+
+def _ticker(symbol, last, open24h, volume):
+    return {
+        "instId": symbol,
+        "last": str(last),
+        "open24h": str(open24h),
+        "volCcy24h": str(volume),
+    }
+
+
+@pytest.fixture
+def state():
+    state = ScreenerState("okx", capacity=4)
+    state.load_tickers(
+        [
+            _ticker("BTC-USDT", 110, 100, 9e9),  # +10%
+            _ticker("ETH-USDT", 95, 100, 5e9),  # -5%
+            _ticker("SOL-USDT", 130, 100, 2e9),  # +30%
+            _ticker("DOGE-USDT", 80, 100, 1e9),  # -20%
+            _ticker("TINY-USDT", 500, 100, 10),  # +400%, illiquid
+            _ticker("BAD-USDT", "n/a", 0, ""),
+        ]
+    )
+    return state
+
+
+class TestScreenerState:
+    def test_load_grows_preallocated_arrays(self, state):
+        assert state.size == 6
+        assert state.capacity == 8
+        assert state.index["BTCUSDT"] == 0
+        assert state.change[state.index["SOLUSDT"]] == pytest.approx(30)
+        assert state.price[state.index["BADUSDT"]] == 0
+
+    def test_rankings_match_a_full_sort(self, state):
+        volume, gainers, losers = state.snapshot(limit=3)
+        assert volume["Symbol"].tolist() == ["BTC-USDT", "ETH-USDT", "SOL-USDT"]
+        # TINY is filtered out as illiquid
+        assert gainers["Symbol"].tolist()[:2] == ["SOL-USDT", "BTC-USDT"]
+        assert "TINY-USDT" not in gainers["Symbol"].tolist()
+        assert losers["Symbol"].tolist()[0] == "DOGE-USDT"
+        assert list(volume.columns) == [
+            "Symbol",
+            "Close",
+            "price_change_24h",
+            "Volume",
+            "RSI_14",
+            "signals",
+        ]
+
+    def test_tick_updates_one_row_and_reranks(self, state):
+        version = state.version
+        assert state.update("ETHUSDT", 150)
+        assert state.version == version + 1
+        assert state.change[state.index["ETHUSDT"]] == pytest.approx(50)
+
+        _, gainers, _ = state.snapshot()
+        assert gainers["Symbol"].iloc[0] == "ETH-USDT"
+        assert not state.update("XRP-USDT", 1.0)
+
+    def test_snapshot_is_cached_until_the_next_write(self, state):
+        state.snapshot()
+        cached = state._cache
+        state.snapshot()
+        assert state._cache is cached
+        state.update("BTC-USDT", 120)
+        state.snapshot()
+        assert state._cache is not cached
+
+    def test_reload_keeps_rows_and_drops_delisted(self, state):
+        btc_row = state.index["BTCUSDT"]
+        state.load_tickers([_ticker("BTC-USDT", 120, 100, 9e9)])
+        assert state.index["BTCUSDT"] == btc_row
+        volume, _, _ = state.snapshot()
+        assert volume["Symbol"].tolist() == ["BTC-USDT"]
+
+    def test_target_symbols_and_pulse(self, state):
+        state.pulse = {"ETH": {"signals": ["breakout"], "indicators": {"rsi": 71}}}
+        volume, _, _ = state.snapshot(target_symbols=["ETH-USDT", "BTCUSDT", "NOPE"])
+        assert volume["Symbol"].tolist() == ["BTC-USDT", "ETH-USDT"]
+        eth = volume.set_index("Symbol").loc["ETH-USDT"]
+        assert eth["RSI_14"] == 71
+        assert eth["signals"] == ["breakout"]
+
+    def test_rankings_within_a_symbol_subset(self, state):
+        volume, gainers, losers = state.snapshot_records(
+            limit=3, within=["ETHUSDT", "DOGE-USDT", "NOPE"]
+        )
+        assert [r["Symbol"] for r in volume] == ["ETH-USDT", "DOGE-USDT"]
+        # SOL and BTC gained more but are outside the subset
+        assert [r["Symbol"] for r in gainers] == ["ETH-USDT", "DOGE-USDT"]
+        assert losers[0]["Symbol"] == "DOGE-USDT"
+
+    def test_argpartition_top_k_on_random_data(self):
+        rng = np.random.default_rng(3)
+        tickers = [
+            _ticker(f"C{i}-USDT", rng.uniform(1, 2), 1.5, rng.uniform(1e6, 1e9))
+            for i in range(1000)
+        ]
+        state = ScreenerState("okx")
+        state.load_tickers(tickers)
+        volume, gainers, _ = state.snapshot(limit=10)
+        expected = sorted(tickers, key=lambda t: -float(t["volCcy24h"]))[:10]
+        assert volume["Symbol"].tolist() == [t["instId"] for t in expected]
+        assert gainers["price_change_24h"].is_monotonic_decreasing
+
+
+class TestScreenTopCryptosLight:
+    def test_uses_state_and_refreshes_when_stale(self):
+        from analysis import crypto_screener_light
+
+        fetcher = MagicMock()
+        fetcher.get_tickers.return_value = [
+            _ticker("BTC-USDT", 110, 100, 9e9),
+            _ticker("BTC-USD", 1, 1, 1),
+        ]
+        state = ScreenerState("okx")
+        with (
+            patch.object(
+                crypto_screener_light, "get_screener_state", return_value=state
+            ),
+            patch.object(
+                crypto_screener_light, "get_data_fetcher", return_value=fetcher
+            ),
+        ):
+            volume, gainers, losers, extra = (
+                crypto_screener_light.screen_top_cryptos_light(exchange="okx")
+            )
+            crypto_screener_light.screen_top_cryptos_light(exchange="okx")
+
+        assert fetcher.get_tickers.call_count == 1
+        assert volume["Symbol"].tolist() == ["BTC-USDT"]
+        assert gainers["price_change_24h"].iloc[0] == pytest.approx(10)
+        assert extra.empty
+
+
+class TestScreenerTickerCallback:
+    async def test_tick_updates_state_and_reranks_cache(self, state, monkeypatch):
+        from api import services
+
+        data = {"top_volume": [{"Symbol": "BTC-USDT"}], "last_updated": None}
+        monkeypatch.setattr(services, "cached_screener_result", {"data": data})
+        monkeypatch.setattr(services, "get_screener_state", lambda exchange: state)
+        monkeypatch.setattr(services, "SCREENER_RERANK_INTERVAL", 0.01)
+        monkeypatch.setattr(
+            services,
+            "_screener_ws_symbols",
+            frozenset({"BTCUSDT", "ETHUSDT", "DOGEUSDT"}),
+        )
+
+        await services._screener_ticker_callback(
+            "ETHUSDT", {"last": 150.0, "open24h": 100.0, "volCcy24h": 6e9}
+        )
+        await services._screener_ticker_callback("DOGE-USDT", {"last": 81.0})
+        await asyncio.sleep(0.05)
+
+        assert data["top_gainers"][0]["Symbol"] == "ETH-USDT"
+        assert data["top_gainers"][0]["Close"] == 150.0
+        # SOL gets no ticks, so its refresh-time row is not ranked between refreshes
+        assert "SOL-USDT" not in [r["Symbol"] for r in data["top_gainers"]]
+        assert [r["Symbol"] for r in data["top_volume"]] == ["BTC-USDT"]
+        assert data["last_updated"] is not None
@@ -0,0 +1,176 @@
+"""Tests for the indexed security event store and SecurityMonitor on top of it."""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from core.security_event_store import SecurityEventStore
+from core.security_monitor import (
+    SecurityEvent,
+    SecurityEventType,
+    SecurityMonitor,
+    SeverityLevel,
+)
+
+
+def _event(hours_ago=0.0, event_type="brute_force", severity="high", resolved=False):
+    ts = datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+    return {
+        "event_type": event_type,
+        "severity": severity,
+        "title": "t",
+        "description": "d",
+        "user_id": "u1",
+        "ip_address": "1.2.3.4",
+        "metadata": {"k": 1},
+        "timestamp": ts.isoformat(),
+        "resolved": resolved,
+    }
+
+
+class TestSecurityEventStore:
+    def test_append_is_flushed_by_background_writer(self, tmp_path):
+        store = SecurityEventStore(str(tmp_path / "events.db"))
+        for _ in range(5):
+            store.append(_event())
+        store.flush()
+
+        since = datetime.now(timezone.utc) - timedelta(hours=1)
+        events = store.recent_events(since)
+        assert len(events) == 5
+        assert events[0]["metadata"] == {"k": 1}
+        assert store.metrics()["written"] == 5
+        store.close()
+
+    def test_statistics_match_raw_events(self, tmp_path):
+        store = SecurityEventStore(str(tmp_path / "events.db"))
+        store.append(_event(hours_ago=0.1))
+        store.append(_event(hours_ago=2.5, severity="low", resolved=True))
+        store.append(_event(hours_ago=30, event_type="xss_attempt"))
+        store.append(_event(hours_ago=200))
+        store.flush()
+
+        stats = store.statistics(datetime.now(timezone.utc) - timedelta(days=2))
+        assert stats["total_events"] == 3
+        assert stats["unresolved_events"] == 2
+        assert stats["by_type"] == {"brute_force": 2, "xss_attempt": 1}
+        assert stats["by_severity"] == {"high": 2, "low": 1}
+        store.close()
+
+    def test_statistics_partial_hour_boundary(self, tmp_path):
+        store = SecurityEventStore(str(tmp_path / "events.db"))
+        now = datetime.now(timezone.utc)
+        # Two events in the same hour bucket, one on each side of the cutoff
+        hour_start = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=3)
+        for minutes in (10, 50):
+            event = _event()
+            event["timestamp"] = (hour_start + timedelta(minutes=minutes)).isoformat()
+            store.append(event)
+        store.flush()
+
+        stats = store.statistics(hour_start + timedelta(minutes=30))
+        assert stats["total_events"] == 1
+        store.close()
+
+    def test_delete_before_keeps_counters_consistent(self, tmp_path):
+        store = SecurityEventStore(str(tmp_path / "events.db"))
+        store.append(_event(hours_ago=1))
+        store.append(_event(hours_ago=48))
+        store.append(_event(hours_ago=72))
+        store.flush()
+
+        removed = store.delete_before(datetime.now(timezone.utc) - timedelta(days=1))
+        assert removed == 2
+        since = datetime.now(timezone.utc) - timedelta(days=30)
+        assert store.statistics(since)["total_events"] == 1
+        assert sum(r["total"] for r in store.hourly_counts(since)) == 1
+        store.close()
+
+    def test_import_jsonl_is_idempotent(self, tmp_path):
+        path = tmp_path / "legacy.jsonl"
+        path.write_text(
+            json.dumps(_event())
+            + "\nnot json\n"
+            + json.dumps(_event(hours_ago=3))
+            + "\n"
+        )
+        store = SecurityEventStore(str(tmp_path / "events.db"))
+
+        assert store.import_jsonl([path]) == 2
+        assert store.import_jsonl([path]) == 0
+        since = datetime.now(timezone.utc) - timedelta(days=1)
+        assert store.statistics(since)["total_events"] == 2
+        store.close()
+
+    def test_concurrent_imports_import_each_file_once(self, tmp_path):
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"legacy.jsonl.{i}"
+            path.write_text(
+                "".join(json.dumps(_event(hours_ago=j)) + "\n" for j in range(50))
+            )
+            paths.append(path)
+        db = str(tmp_path / "events.db")
+        stores = [SecurityEventStore(db) for _ in range(4)]
+        barrier = threading.Barrier(len(stores))
+
+        def run(store):
+            barrier.wait()
+            return store.import_jsonl(paths)
+
+        with ThreadPoolExecutor(len(stores)) as pool:
+            counts = list(pool.map(run, stores))
+
+        assert sum(counts) == 150
+        since = datetime.now(timezone.utc) - timedelta(days=3)
+        assert stores[0].statistics(since)["total_events"] == 150
+        for store in stores:
+            store.close()
+
+    def test_legacy_lines_without_resolved_count_as_resolved(self, tmp_path):
+        event = _event()
+        del event["resolved"]
+        path = tmp_path / "legacy.jsonl"
+        path.write_text(json.dumps(event) + "\n" + json.dumps(_event()) + "\n")
+        store = SecurityEventStore(str(tmp_path / "events.db"))
+        store.import_jsonl([path])
+
+        since = datetime.now(timezone.utc) - timedelta(days=1)
+        stats = store.statistics(since)
+        assert (stats["total_events"], stats["unresolved_events"]) == (2, 1)
+        store.close()
+
+
+class TestSecurityMonitorStore:
+    def test_monitor_imports_rotated_backups(self, tmp_path):
+        jsonl = tmp_path / "security_events.jsonl"
+        jsonl.write_text(json.dumps(_event()) + "\n")
+        (tmp_path / "security_events.jsonl.1").write_text(
+            json.dumps(_event(hours_ago=5)) + "\n"
+        )
+
+        monitor = SecurityMonitor(storage_path=str(jsonl))
+        assert monitor.db_path == tmp_path / "security_events.db"
+        assert len(monitor.get_recent_events(hours=24)) == 2
+        monitor.store.close()
+
+    def test_log_event_round_trip(self, tmp_path):
+        monitor = SecurityMonitor(storage_path=str(tmp_path / "events.jsonl"))
+        monitor.alert_dispatcher = None
+        monitor.log_event(
+            SecurityEvent(
+                event_type=SecurityEventType.RATE_LIMIT_EXCEEDED,
+                severity=SeverityLevel.MEDIUM,
+                title="Too many requests",
+                description="d",
+            )
+        )
+        monitor.store.flush()
+
+        events = monitor.get_recent_events(hours=1)
+        assert events[0]["event_type"] == "rate_limit"
+        stats = monitor.get_statistics(days=1)
+        assert stats["by_severity"] == {"medium": 1}
+        assert stats["period_days"] == 1
+        monitor.store.close()
@@ -0,0 +1,185 @@
+"""Tests for token streaming from the manager's synthesis step to /api/analyze."""
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from api.deps import get_current_user
+from api.middleware.rate_limit import limiter
+from api.routers import analysis
+from core.agents.manager.llm import LLMInvokeMixin
+from core.agents.token_tracker import TokenTracker
+
+
+class _StreamingManager(LLMInvokeMixin):
+    def __init__(self, llm):
+        self.llm = llm
+        self._token_tracker = TokenTracker()
+        self.stream_callback = None
+
+
+class _FakeGraphManager:
+    """Stands in for ManagerAgent: the graph streams deltas, then returns."""
+
+    def __init__(self, deltas, final_response=None, gate=None):
+        self.progress_callback = None
+        self.stream_callback = None
+        self.cancelled = False
+        self._deltas = deltas
+        self._final = final_response if final_response is not None else "".join(deltas)
+        self._gate = gate
+        self.graph = MagicMock()
+        self.graph.ainvoke = self._ainvoke
+
+    async def _ainvoke(self, graph_input, config):
+        try:
+            self.progress_callback({"stage": "synthesize", "message": "..."})
+            for delta in self._deltas:
+                await self.stream_callback(delta)
+            if self._gate is not None:
+                await self._gate.wait()
+            return {"final_response": self._final, "task_results": {}}
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+
+def _events(body: str):
+    return [
+        json.loads(line[len("data: ") :])
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+@pytest.fixture
+def analyze_app():
+    app = FastAPI()
+    app.include_router(analysis.router)
+    app.dependency_overrides[get_current_user] = lambda: {
+        "user_id": "stream-user",
+        "membership_tier": "free",
+    }
+    with (
+        patch.object(limiter, "enabled", False),
+        patch.object(
+            analysis,
+            "resolve_user_llm_credentials",
+            AsyncMock(return_value={"provider": "openai", "api_key": "k"}),
+        ),
+        patch.object(analysis, "get_user_llm_client", return_value=MagicMock()),
+        patch.object(analysis, "save_chat_message") as save,
+        patch.object(analysis, "get_chat_history", return_value=[]),
+    ):
+        app.state.save = save
+        yield app
+
+
+async def _post(app, manager):
+    with patch("core.agents.bootstrap.bootstrap", return_value=manager):
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.post(
+                "/api/analyze", json={"message": "hi", "session_id": "s1"}
+            )
+    return _events(response.text)
+
+
+class TestLLMStream:
+    @pytest.mark.asyncio
+    async def test_deltas_forwarded_and_joined(self):
+        manager = _StreamingManager(
+            GenericFakeChatModel(messages=iter([AIMessage(content="alpha beta gamma")]))
+        )
+        received = []
+
+        async def collect(delta):
+            received.append(delta)
+
+        manager.stream_callback = collect
+        content = await manager._llm_stream("prompt")
+
+        assert content == "alpha beta gamma"
+        assert len(received) > 1
+        assert "".join(received) == content
+
+    @pytest.mark.asyncio
+    async def test_without_callback_falls_back_to_invoke(self):
+        manager = _StreamingManager(
+            GenericFakeChatModel(messages=iter([AIMessage(content="whole answer")]))
+        )
+        assert await manager._llm_stream("prompt") == "whole answer"
+
+
+class TestAnalyzeStreaming:
+    @pytest.mark.asyncio
+    async def test_model_deltas_become_content_events(self, analyze_app):
+        manager = _FakeGraphManager(["Hel", "lo ", "world"])
+        events = await _post(analyze_app, manager)
+
+        assert [e["content"] for e in events if "content" in e] == [
+            "Hel",
+            "lo ",
+            "world",
+        ]
+        assert not any(e.get("type") == "content_replace" for e in events)
+        assert events[-1] == {"done": True}
+        assert analyze_app.state.save.call_args.args[:2] == (
+            "assistant",
+            "Hello world",
+        )
+        assert manager.stream_callback is None
+
+    @pytest.mark.asyncio
+    async def test_postprocessed_response_replaces_stream(self, analyze_app):
+        manager = _FakeGraphManager(["raw ", "text"], final_response="clean text")
+        events = await _post(analyze_app, manager)
+
+        replaces = [e for e in events if e.get("type") == "content_replace"]
+        assert replaces == [
+            {"type": "content_replace", "content_replace": "clean text"}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_unstreamed_response_sent_once(self, analyze_app):
+        manager = _FakeGraphManager([], final_response="direct reply")
+        events = await _post(analyze_app, manager)
+
+        assert [e["content"] for e in events if "content" in e] == ["direct reply"]
+
+    @pytest.mark.asyncio
+    async def test_bounded_queue_delivers_everything_in_order(self, analyze_app):
+        deltas = [f"t{i} " for i in range(200)]
+        with patch.object(analysis, "STREAM_QUEUE_MAXSIZE", 2):
+            events = await _post(analyze_app, _FakeGraphManager(deltas))
+
+        assert [e["content"] for e in events if "content" in e] == deltas
+
+    @pytest.mark.asyncio
+    async def test_client_disconnect_cancels_graph(self, analyze_app):
+        gate = asyncio.Event()
+        manager = _FakeGraphManager(["first"], gate=gate)
+        request = MagicMock()
+        body = analysis.QueryRequest(message="hi", session_id="s1")
+
+        with patch("core.agents.bootstrap.bootstrap", return_value=manager):
+            response = await analysis.analyze_crypto.__wrapped__(
+                request, body, {"user_id": "stream-user", "membership_tier": "free"}
+            )
+            stream = response.body_iterator
+            while True:
+                event = json.loads((await stream.__anext__())[len("data: ") :])
+                if "content" in event:
+                    break
+            await stream.aclose()
+            await asyncio.sleep(0)
+
+        assert manager.cancelled is True
+        assert manager.stream_callback is None
@@ -0,0 +1,154 @@
+"""Tests for the versioned config snapshot in core/database/system_config.py."""
+
+import json
+from unittest.mock import MagicMock, Mock, call, patch
+
+import pytest
+
+from core.database import system_config as sc
+
+
+def _conn(rows, version=None):
+    """Mock psycopg2 connection answering the snapshot and version queries."""
+    conn = Mock()
+    cursor = conn.cursor.return_value
+    cursor.fetchall.return_value = rows
+    cursor.fetchone.return_value = (version,)
+    return conn
+
+
+def _rows(version, **values):
+    return [(k, str(v), "int", version) for k, v in values.items()]
+
+
+@pytest.fixture
+def manager():
+    sc.ConfigCacheManager._instance = None
+    sc._cache_manager = None
+    with patch.object(sc, "resolve_redis_url", return_value=(None, "none")):
+        m = sc._get_cache_manager()
+    yield m
+    sc.ConfigCacheManager._instance = None
+    sc._cache_manager = None
+
+
+class TestSnapshotReads:
+    def test_reads_do_no_io_while_watching(self, manager):
+        manager._watching = True
+        with patch.object(
+            sc, "get_connection", return_value=_conn(_rows("v1", a=1))
+        ) as get_conn:
+            assert [sc.get_config("a") for _ in range(100)] == [1] * 100
+            assert sc.get_config("missing", 7) == 7
+        assert get_conn.call_count == 1
+
+    def test_snapshot_expires_without_watcher(self, manager, monkeypatch):
+        monkeypatch.setattr(sc, "MEMORY_CACHE_TTL", 0)
+        with patch.object(
+            sc, "get_connection", return_value=_conn(_rows("v1", a=1))
+        ) as get_conn:
+            sc.get_config("a")
+            sc.get_config("a")
+        assert get_conn.call_count == 2
+
+    def test_snapshot_is_immutable(self, manager):
+        with patch.object(sc, "get_connection", return_value=_conn(_rows("v1", a=1))):
+            snap = manager.snapshot()
+            copy = sc._get_cache_manager().get_all()
+        with pytest.raises(TypeError):
+            snap.values["a"] = 2
+        copy["a"] = 2
+        assert manager.snapshot().values["a"] == 1
+
+    def test_empty_table_has_stable_version(self, manager):
+        with patch.object(sc, "get_connection", return_value=_conn([])):
+            assert manager.snapshot().version == sc._EMPTY_VERSION
+
+
+class TestVersionAnnouncements:
+    def test_known_version_is_ignored(self, manager):
+        with patch.object(
+            sc, "get_connection", return_value=_conn(_rows("v1", a=1))
+        ) as get_conn:
+            manager.snapshot()
+            manager._on_announce("v1")
+        assert get_conn.call_count == 1
+
+    def test_new_version_swaps_the_snapshot(self, manager):
+        with patch.object(sc, "get_connection", return_value=_conn(_rows("v1", a=1))):
+            old = manager.snapshot()
+        with patch.object(sc, "get_connection", return_value=_conn(_rows("v2", a=2))):
+            manager._on_announce("v2")
+        assert manager.snapshot().version == "v2"
+        assert sc.get_config("a") == 2
+        # Readers holding the previous snapshot keep a consistent view
+        assert old.values["a"] == 1
+
+    def test_failed_reload_drops_the_snapshot(self, manager):
+        with patch.object(sc, "get_connection", return_value=_conn(_rows("v1", a=1))):
+            manager.snapshot()
+        with patch.object(sc, "get_connection", side_effect=RuntimeError("down")):
+            manager._on_announce("v2")
+        assert manager._snapshot is None
+
+    def test_redis_snapshot_of_the_same_version_skips_the_database(self, manager):
+        manager._redis_client = MagicMock()
+        manager._redis_client.get.return_value = json.dumps(
+            {"version": "v2", "values": {"a": 2}}
+        )
+        with patch.object(sc, "get_connection") as get_conn:
+            manager._on_announce("v2")
+        get_conn.assert_not_called()
+        assert manager.snapshot().values["a"] == 2
+
+    def test_stale_redis_snapshot_is_replaced(self, manager):
+        manager._redis_client = MagicMock()
+        manager._redis_client.get.return_value = json.dumps(
+            {"version": "v1", "values": {"a": 1}}
+        )
+        with patch.object(sc, "get_connection", return_value=_conn(_rows("v2", a=2))):
+            manager._on_announce("v2")
+        assert manager.snapshot().values["a"] == 2
+        payload = json.loads(manager._redis_client.setex.call_args.args[2])
+        assert payload == {"version": "v2", "values": {"a": 2}}
+
+
+class TestVersionProbe:
+    def test_matching_version_does_not_reload(self, manager):
+        with patch.object(
+            sc, "get_connection", return_value=_conn(_rows("v1", a=1), "v1")
+        ):
+            manager.snapshot()
+            manager._probe()
+        assert manager.stats()["reloads"] == 1
+        assert manager.stats()["stale_probes"] == 0
+
+    def test_missed_change_is_picked_up(self, manager):
+        with patch.object(sc, "get_connection", return_value=_conn(_rows("v1", a=1))):
+            manager.snapshot()
+        with patch.object(
+            sc, "get_connection", return_value=_conn(_rows("v2", a=3), "v2")
+        ):
+            manager._probe()
+        assert manager.stats()["stale_probes"] == 1
+        assert sc.get_config("a") == 3
+
+
+class TestWrites:
+    def test_set_config_notifies_inside_the_transaction(self, manager):
+        parent = Mock()
+        conn = parent.conn
+        cursor = conn.cursor.return_value
+        cursor.fetchone.side_effect = [None, ("v2",)]
+        cursor.fetchall.return_value = _rows("v2", limit_x=5)
+
+        with patch.object(sc, "get_connection", return_value=conn):
+            assert sc.set_config("limit_x", 5, changed_by="admin")
+            assert sc.get_config("limit_x") == 5
+
+        calls = parent.mock_calls
+        notify = call.conn.cursor().execute(
+            "SELECT pg_notify(%s, %s)", (sc.PG_NOTIFY_CHANNEL, "v2")
+        )
+        assert calls.index(notify) < calls.index(call.conn.commit())
+        assert manager.snapshot().version == "v2"
@@ -0,0 +1,212 @@
+"""
+Tests for the Telegram bot's agent work queue, streaming replies, per-chat
+sessions and the shared rate limiter.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from telegram_bot.agent import AgentSessions
+from telegram_bot.rate_limiter import (
+    MAX_PER_MINUTE,
+    SharedTelegramRateLimiter,
+    create_rate_limiter,
+)
+from telegram_bot.streaming import StreamingReply, split_message
+from telegram_bot.work_queue import AgentWorkQueue, QueueFullError
+
+
+class _Agent:
+    """Fake handler: streams the question back in two deltas after a pause."""
+
+    def __init__(self, delay: float = 0.05) -> None:
+        self.delay = delay
+        self.calls: list[tuple[int, str]] = []
+        self.running: dict[int, int] = {}
+        self.max_running_per_chat = 0
+
+    async def __call__(self, chat_id, text, on_delta):
+        self.calls.append((chat_id, text))
+        self.running[chat_id] = self.running.get(chat_id, 0) + 1
+        self.max_running_per_chat = max(
+            self.max_running_per_chat, self.running[chat_id]
+        )
+        try:
+            await on_delta("答：")
+            await asyncio.sleep(self.delay)
+            await on_delta(text)
+            if text == "boom":
+                raise RuntimeError("agent failed")
+            return f"答：{text}"
+        finally:
+            self.running[chat_id] -= 1
+
+
+@pytest.fixture
+async def agent_queue():
+    agent = _Agent()
+    queue = AgentWorkQueue(agent, workers=4, max_pending=10)
+    queue.start()
+    yield agent, queue
+    await queue.stop()
+
+
+class TestAgentWorkQueue:
+    async def test_one_chat_runs_in_order(self, agent_queue):
+        agent, queue = agent_queue
+        answers = await asyncio.gather(
+            *(queue.submit(1, f"q{i}", coalesce=False) for i in range(4))
+        )
+        assert answers == [f"答：q{i}" for i in range(4)]
+        assert [text for _, text in agent.calls] == ["q0", "q1", "q2", "q3"]
+        assert agent.max_running_per_chat == 1
+
+    async def test_repeated_question_in_a_chat_shares_one_run(self, agent_queue):
+        agent, queue = agent_queue
+        seen: list[str] = []
+
+        async def listener(text):
+            seen.append(text)
+
+        answers = await asyncio.gather(
+            queue.submit(1, "BTC price"),
+            queue.submit(1, "  btc   PRICE ", listener),
+        )
+        assert answers == ["答：BTC price"] * 2
+        assert len(agent.calls) == 1
+        assert seen[-1] == "答：BTC price"
+        assert queue.stats()["coalesced"] == 1
+
+    async def test_identical_questions_from_other_chats_run_separately(
+        self, agent_queue
+    ):
+        agent, queue = agent_queue
+        await asyncio.gather(
+            queue.submit(1, "BTC price"),
+            queue.submit(2, "btc price"),
+        )
+        # Each answer comes from the asking chat's own session
+        assert sorted(chat_id for chat_id, _ in agent.calls) == [1, 2]
+        assert queue.stats()["coalesced"] == 0
+
+    async def test_backlog_is_bounded(self):
+        queue = AgentWorkQueue(_Agent(delay=0.2), workers=1, max_pending=2)
+        queue.start()
+        try:
+            first = [
+                asyncio.create_task(queue.submit(c, f"q{c}", coalesce=False))
+                for c in (1, 2)
+            ]
+            await asyncio.sleep(0)
+            with pytest.raises(QueueFullError):
+                await queue.submit(3, "q3")
+            assert await asyncio.gather(*first) == ["答：q1", "答：q2"]
+            assert queue.stats()["rejected"] == 1
+        finally:
+            await queue.stop()
+
+    async def test_failure_reaches_every_asker(self, agent_queue):
+        _, queue = agent_queue
+        results = await asyncio.gather(
+            queue.submit(1, "boom"), queue.submit(2, "boom"), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert queue.stats()["pending"] == 0
+        assert await queue.submit(1, "ok") == "答：ok"
+
+
+class _FakeChat:
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+        self.edits: list[str] = []
+
+    async def send(self, text):
+        self.sent.append(text)
+        return len(self.sent)
+
+    async def edit(self, message, text):
+        self.edits.append(text)
+
+
+class TestStreamingReply:
+    async def test_edits_are_throttled_and_final_text_wins(self):
+        chat = _FakeChat()
+        reply = StreamingReply(chat.send, chat.edit, interval=0.05)
+        for i in range(50):
+            await reply.update("x" * (i + 1))
+            await asyncio.sleep(0.002)
+        await reply.finish("final")
+        # One message, a handful of edits instead of fifty
+        assert len(chat.sent) == 1
+        assert len(chat.edits) < 10
+        assert chat.edits[-1] == "final"
+
+    async def test_long_answer_is_split(self):
+        chat = _FakeChat()
+        reply = StreamingReply(chat.send, chat.edit, interval=0)
+        await reply.finish(("a" * 3000 + "\n") * 3)
+        assert len(chat.sent) == 3
+        assert all(len(part) <= 4096 for part in chat.sent)
+
+    def test_split_prefers_line_breaks(self):
+        assert split_message("ab\ncd", limit=4) == ["ab", "cd"]
+        assert split_message("abcdef", limit=4) == ["abcd", "ef"]
+
+
+class _Graph:
+    def __init__(self) -> None:
+        self.inputs = []
+
+    async def ainvoke(self, graph_input, config):
+        self.inputs.append((graph_input, config))
+        return {"final_response": f"answer {len(self.inputs)}"}
+
+
+class TestAgentSessions:
+    async def test_session_is_reused_per_chat(self):
+        built = []
+
+        def build(chat_id):
+            built.append(chat_id)
+            return SimpleNamespace(graph=_Graph(), stream_callback=None)
+
+        sessions = AgentSessions(build=build)
+        assert await sessions.ask(7, "hi") == "answer 1"
+        assert await sessions.ask(7, "again") == "answer 2"
+        await sessions.ask(8, "hi")
+        assert built == [7, 8]
+
+        graph = sessions.get(7).manager.graph
+        second_input, config = graph.inputs[1]
+        assert config["configurable"]["thread_id"] == "telegram-7"
+        assert "用戶: hi" in second_input.update["history"]
+
+    def test_lru_bound(self):
+        sessions = AgentSessions(build=lambda c: object(), max_size=2)
+        for chat_id in (1, 2, 3):
+            sessions.get(chat_id)
+        assert sessions.stats()["size"] == 2
+        sessions.get(1)
+        assert sessions.stats()["builds"] == 4
+
+
+class TestSharedRateLimiter:
+    def test_replicas_share_the_minute_window(self, tmp_path):
+        uri = f"sqlite:///{tmp_path}/limits.sqlite3"
+        replica_a = SharedTelegramRateLimiter(uri)
+        replica_b = SharedTelegramRateLimiter(uri)
+        for i in range(MAX_PER_MINUTE):
+            limiter = replica_a if i % 2 else replica_b
+            assert limiter.is_allowed(42)[0]
+        allowed, reason = replica_a.is_allowed(42)
+        assert not allowed
+        assert "每分鐘" in reason
+        assert replica_b.get_remaining(42)["minute_remaining"] == 0
+
+        replica_b.reset_user(42)
+        assert replica_a.is_allowed(42)[0]
+
+    def test_memory_opt_out(self):
+        assert not isinstance(create_rate_limiter("memory"), SharedTelegramRateLimiter)
@@ -0,0 +1,144 @@
+"""Tests for core/token_revocation.py and the api.deps blacklist helpers."""
+
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import pytest
+
+from core.token_revocation import BloomFilter, RevokedTokenStore
+
+
+def _h(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def _future(days=1):
+    return datetime.now(timezone.utc) + timedelta(days=days)
+
+
+DB_NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def store():
+    s = RevokedTokenStore()
+    s._redis_checked = True  # no Redis in unit tests
+    with (
+        patch("core.database.revoked_tokens.insert_revoked_tokens"),
+        patch("core.database.revoked_tokens.get_db_now", return_value=DB_NOW),
+    ):
+        yield s
+
+
+class TestBloomFilter:
+    def test_added_digests_are_members(self):
+        bloom = BloomFilter(bits=1 << 16, hashes=7)
+        digests = [_h(f"t{i}") for i in range(200)]
+        for d in digests:
+            bloom.add(d)
+        assert all(d in bloom for d in digests)
+
+    def test_false_positive_rate_is_low(self):
+        bloom = BloomFilter(bits=1 << 16, hashes=7)
+        for i in range(1000):
+            bloom.add(_h(f"in-{i}"))
+        false_hits = sum(_h(f"out-{i}") in bloom for i in range(5000))
+        assert false_hits < 50
+
+
+class TestRevokedTokenStore:
+    def test_unknown_token_needs_no_backend(self, store):
+        with patch("core.database.revoked_tokens.is_revoked_in_db") as db:
+            assert store.is_revoked(_h("never-revoked")) is False
+        db.assert_not_called()
+
+    def test_revoked_token_confirmed_locally(self, store):
+        store.revoke(_h("t1"), _future())
+        with patch("core.database.revoked_tokens.is_revoked_in_db") as db:
+            assert store.is_revoked(_h("t1")) is True
+        db.assert_not_called()
+
+    def test_expired_local_revocation_is_dropped(self, store):
+        store.revoke(_h("t1"), datetime.now(timezone.utc) - timedelta(seconds=1))
+        assert store.is_revoked(_h("t1")) is False
+        assert store.stats()["local_entries"] == 0
+
+    def test_sync_picks_up_other_workers_revocations(self, store):
+        remote = _h("revoked-elsewhere")
+        rows = [(remote, _future(), datetime.now(timezone.utc))]
+        with patch("core.database.revoked_tokens.get_revoked_since", return_value=rows):
+            assert store.sync() == 1
+
+        with patch(
+            "core.database.revoked_tokens.is_revoked_in_db", return_value=True
+        ) as db:
+            assert store.is_revoked(remote) is True
+        db.assert_called_once_with(remote)
+
+    def test_incremental_sync_uses_watermark(self, store):
+        with patch(
+            "core.database.revoked_tokens.get_revoked_since", return_value=[]
+        ) as pull:
+            store.sync()
+            store.sync()
+        assert pull.call_args_list[0].args == (None,)
+        # The watermark comes from the DB clock, not this worker's
+        assert pull.call_args_list[1].args[0] == DB_NOW - timedelta(seconds=5)
+
+    def test_bloom_hit_fails_closed_when_backends_down(self, store):
+        remote = _h("maybe")
+        store._bloom.add(remote)
+        with patch(
+            "core.database.revoked_tokens.is_revoked_in_db",
+            side_effect=RuntimeError("db down"),
+        ):
+            assert store.is_revoked(remote) is True
+
+    def test_startup_window_confirms_misses_but_fails_open(self, store):
+        store.expect_sync()
+        with patch(
+            "core.database.revoked_tokens.is_revoked_in_db", return_value=True
+        ) as db:
+            assert store.is_revoked(_h("revoked-before-start")) is True
+        db.assert_called_once()
+
+        with patch(
+            "core.database.revoked_tokens.is_revoked_in_db",
+            side_effect=RuntimeError("db down"),
+        ):
+            assert store.is_revoked(_h("other")) is False
+
+    def test_import_legacy_file(self, store, tmp_path):
+        path = tmp_path / "revoked_tokens.json"
+        path.write_text(
+            json.dumps(
+                {
+                    _h("live"): _future().isoformat(),
+                    _h("stale"): (
+                        datetime.now(timezone.utc) - timedelta(days=1)
+                    ).isoformat(),
+                }
+            )
+        )
+        with patch("core.database.revoked_tokens.insert_revoked_tokens") as insert:
+            assert store.import_legacy_file(path) == 1
+        assert insert.call_args.args[0][0][0] == _h("live")
+        assert not path.exists()
+        assert (tmp_path / "revoked_tokens.json.imported").exists()
+
+
+class TestDepsBlacklist:
+    def test_revoke_and_check_round_trip(self):
+        from api import deps
+
+        store = RevokedTokenStore()
+        store._redis_checked = True
+        with (
+            patch.object(deps, "revoked_token_store", store),
+            patch("core.database.revoked_tokens.insert_revoked_tokens"),
+        ):
+            deps.revoke_token("refresh-token-value")
+            assert deps.is_token_revoked("refresh-token-value") is True
+            assert deps.is_token_revoked("another-token") is False
@@ -0,0 +1,203 @@
+"""Tests for core/scam_wallet_index.py and the wallet lookups built on it."""
+
+import random
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from core import scam_wallet_index as swi
+from core.orm.scam_tracker_repo import ScamTrackerRepository
+
+_ALPHABET = "ABCDEFGHIJKLMNOPQRSTUVWXYZ234567"
+
+
+def _address(rng):
+    return "G" + "".join(rng.choice(_ALPHABET) for _ in range(55))
+
+
+@pytest.fixture
+def addresses():
+    rng = random.Random(38)
+    return [_address(rng) for _ in range(500)]
+
+
+@pytest.fixture
+def index(addresses):
+    idx = swi.WalletIndex(bloom_bits=1 << 16)
+    idx.load((i, addr, "pending") for i, addr in enumerate(addresses, start=1))
+    idx._watermark = datetime.now(timezone.utc)
+    return idx
+
+
+class TestParseWalletPattern:
+    @pytest.mark.parametrize(
+        "text, expected",
+        [
+            ("gabcd…wxyz", ("GABCD", "WXYZ")),
+            ("GABCD...WXYZ", ("GABCD", "WXYZ")),
+            (" GABCDE ", ("GABCDE", "")),
+            ("…WXYZ", ("", "WXYZ")),
+            ("GAB…", None),
+            ("G…Z", None),
+        ],
+    )
+    def test_forms(self, text, expected):
+        assert swi.parse_wallet_pattern(text) == expected
+
+
+class TestWalletIndex:
+    def test_negative_answer_without_backend(self, index, addresses):
+        assert index.might_contain(addresses[0].lower())
+        rng = random.Random(1)
+        misses = sum(not index.might_contain(_address(rng)) for _ in range(200))
+        assert misses >= 195
+        assert index.stats()["bloom_negative"] == misses
+
+    def test_not_ready_never_answers_negative(self):
+        idx = swi.WalletIndex(bloom_bits=1 << 10)
+        assert idx.might_contain("G" + "A" * 55)
+
+    @pytest.mark.parametrize("chars", [5, 8])
+    def test_prefix_and_suffix_find_the_report(self, index, addresses, chars):
+        target = addresses[123]
+        prefix, suffix = target[:chars], target[-chars:]
+        assert 124 in index.candidates(prefix)
+        assert 124 in index.candidates("", suffix)
+        assert index.candidates(prefix, suffix) == [124]
+
+    def test_pattern_longer_than_key_is_still_a_candidate(self, index, addresses):
+        target = addresses[7]
+        assert 8 in index.candidates(target[:30], target[-30:])
+
+    def test_incremental_add_and_status_ranking(self, index):
+        shared = "GZZZZ" + "A" * 47
+        index.add(shared + "BBBB", 9001, "pending")
+        index.add(shared + "CCCC", 9002, "pending")
+        assert index.candidates("GZZZZ") == [9002, 9001]
+
+        index.update_status(shared + "BBBB", 9001, "verified")
+        assert index.candidates("GZZZZ") == [9001, 9002]
+        assert index.might_contain(shared + "CCCC")
+        # Re-syncing the same row does not duplicate it
+        index.add(shared + "CCCC", 9002, "pending")
+        assert len(index) == 502
+
+    def test_load_replaces_entries(self, index, addresses):
+        index.load([(1, addresses[0], "verified")])
+        assert len(index) == 1
+        assert index.candidates(addresses[1][:8]) == []
+
+    def test_wide_range_is_ranked_before_the_cut(self, index, monkeypatch):
+        monkeypatch.setattr(swi, "MAX_SCAN", 10)
+        # Sorts after every random address, far past the first MAX_SCAN keys
+        index.add("G" + "Z" * 55, 9001, "verified")
+        assert index.candidates("G", limit=3)[0] == 9001
+        assert len(index.candidates("G", limit=100)) == 100
+        assert index.stats()["fuzzy_wide"] == 2
+
+    def test_both_sides_wide_defers_to_the_database(self, index, monkeypatch):
+        monkeypatch.setattr(swi, "MAX_SCAN", 10)
+        assert index.candidates("G", "A") is None
+
+    def test_one_wide_side_returns_the_narrow_range_uncut(self, index, addresses):
+        target = addresses[7]
+        suffix_only = index.candidates("", target[-1:], limit=1000)
+        with patch.object(swi, "MAX_SCAN", len(suffix_only)):
+            ids = index.candidates("G", target[-1:], limit=1)
+        assert sorted(ids) == sorted(suffix_only)
+        assert 8 in ids
+
+
+def _session(rows):
+    result = MagicMock()
+    result.scalars.return_value.unique.return_value.first.return_value = (
+        rows[0] if rows else None
+    )
+    result.scalars.return_value.unique.return_value.all.return_value = rows
+    session = MagicMock()
+    session.execute = AsyncMock(return_value=result)
+    return session
+
+
+class TestRepositorySearch:
+    @pytest.mark.asyncio
+    async def test_unreported_wallet_skips_the_database(self, index):
+        session = _session([])
+        with patch("core.orm.scam_tracker_repo.wallet_index", index):
+            result = await ScamTrackerRepository().search_wallet(
+                "G" + "2" * 55, session=session
+            )
+        assert result is None
+        session.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_reported_wallet_is_one_query(self, index, addresses):
+        report = MagicMock(approve_count=4, reject_count=1, reporter=None)
+        session = _session([report])
+        with patch("core.orm.scam_tracker_repo.wallet_index", index):
+            result = await ScamTrackerRepository().search_wallet(
+                addresses[3], session=session
+            )
+        assert result["net_votes"] == 3
+        session.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_truncated_search_filters_by_candidates(self, index, addresses):
+        target = addresses[42]
+        session = _session([])
+        with patch("core.orm.scam_tracker_repo.wallet_index", index):
+            await ScamTrackerRepository().search_wallets(
+                f"{target[:6]}…{target[-4:]}", session=session
+            )
+        stmt = session.execute.await_args.args[0]
+        params = stmt.compile().params
+        assert f"{target[:6]}%{target[-4:]}" in params.values()
+        assert [43] in params.values()
+
+    @pytest.mark.asyncio
+    async def test_truncated_search_without_candidates(self, index):
+        session = _session([])
+        with patch("core.orm.scam_tracker_repo.wallet_index", index):
+            result = await ScamTrackerRepository().search_wallets(
+                "G2222…2222", session=session
+            )
+        assert result == []
+        session.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_truncated_search_falls_back_to_like(
+        self, index, addresses, monkeypatch
+    ):
+        monkeypatch.setattr(swi, "MAX_SCAN", 0)
+        target = addresses[42]
+        session = _session([])
+        with patch("core.orm.scam_tracker_repo.wallet_index", index):
+            await ScamTrackerRepository().search_wallets(
+                f"{target[:3]}…{target[-2:]}", session=session
+            )
+        stmt = session.execute.await_args.args[0]
+        assert " IN " not in str(stmt)
+        assert f"{target[:3]}%{target[-2:]}" in stmt.compile().params.values()
+
+
+class TestSync:
+    @pytest.mark.asyncio
+    async def test_watermark_comes_from_the_database(self):
+        db_now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        clock = MagicMock()
+        clock.scalar_one.return_value = db_now
+        rows = MagicMock()
+        rows.all.return_value = [(1, "G" + "A" * 55, "pending")]
+        session = MagicMock()
+        session.execute = AsyncMock(side_effect=[clock, rows])
+
+        @asynccontextmanager
+        async def using_session():
+            yield session
+
+        idx = swi.WalletIndex(bloom_bits=1 << 16)
+        with patch("core.orm.session.using_session", using_session):
+            assert await idx.sync() == 1
+        assert idx.stats()["synced_at"] == db_now.isoformat()
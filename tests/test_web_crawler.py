@@ -0,0 +1,261 @@
+"""
+Tests for the futunn crawler's state store, batch summarizer and fetch
+pipeline (web_crawler/crawl_store.py, web_crawler/summarize_futunn_posts.py,
+web_crawler/web_crawler2.py).
+"""
+
+import asyncio
+import io
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(
+    0,
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "web_crawler"
+    ),
+)
+
+from crawl_store import CrawlStore, content_hash  # noqa: E402
+from summarize_futunn_posts import (  # noqa: E402
+    EMPTY_SUMMARY,
+    FAILED_SUMMARY,
+    asummarize_articles,
+)
+
+
+class TestCrawlStore:
+    def test_unseen_skips_marked_urls(self, tmp_path):
+        store = CrawlStore(tmp_path / "state.sqlite3")
+        store.mark("https://a/1", content_hash("one"), "one")
+
+        assert store.unseen(["https://a/1", "https://a/2"]) == ["https://a/2"]
+        assert store.unseen([]) == []
+        store.close()
+
+    def test_unseen_handles_more_urls_than_one_query(self, tmp_path):
+        store = CrawlStore(tmp_path / "state.sqlite3")
+        urls = [f"https://a/{i}" for i in range(1200)]
+        store.mark(urls[700], "h", "")
+
+        assert store.unseen(urls) == urls[:700] + urls[701:]
+        store.close()
+
+    def test_reposts_match_by_content_hash(self, tmp_path):
+        store = CrawlStore(tmp_path / "state.sqlite3")
+        store.mark("https://a/1", content_hash("Same  body\ntext"), "")
+
+        assert store.has_content(content_hash(" Same body text "))
+        assert not store.has_content(content_hash("other body"))
+        store.close()
+
+    def test_state_survives_reopen(self, tmp_path):
+        path = tmp_path / "state.sqlite3"
+        store = CrawlStore(path)
+        store.mark("https://a/1", "h", "")
+        store.close()
+
+        store = CrawlStore(path)
+        assert store.unseen(["https://a/1"]) == []
+        store.close()
+
+
+class FakeChain:
+    """ainvoke-only chain that records how many calls overlap."""
+
+    def __init__(self, fail_on=()):
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+        self.fail_on = set(fail_on)
+
+    async def ainvoke(self, payload):
+        self.calls += 1
+        if payload["title"] in self.fail_on:
+            raise RuntimeError("rate limited")
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return f" summary of {payload['title']} \n"
+
+
+class TestAsummarizeArticles:
+    async def test_keeps_order_and_skips_empty_content(self):
+        chain = FakeChain()
+        rows = [
+            {"title": "A", "content": "body a"},
+            {"title": "B", "content": "   "},
+            {"title": "C", "content": "body c"},
+        ]
+
+        summaries = await asummarize_articles(chain, rows)
+
+        assert summaries == ["summary of A", EMPTY_SUMMARY, "summary of C"]
+        assert chain.calls == 2
+
+    async def test_truncates_content(self):
+        seen = []
+
+        class Chain:
+            async def ainvoke(self, payload):
+                seen.append(payload["content"])
+                return "ok"
+
+        await asummarize_articles(
+            Chain(), [{"content": "x" * 50}], max_content_chars=10
+        )
+        assert seen == ["x" * 10]
+
+    async def test_shared_limiter_bounds_calls_across_batches(self):
+        chain = FakeChain()
+        limiter = asyncio.Semaphore(3)
+        batches = [
+            [{"title": f"{b}-{i}", "content": "body"} for i in range(4)]
+            for b in range(4)
+        ]
+
+        await asyncio.gather(
+            *(
+                asummarize_articles(chain, batch, max_concurrency=4, limiter=limiter)
+                for batch in batches
+            )
+        )
+
+        assert chain.calls == 16
+        assert chain.peak == 3
+
+    async def test_one_failed_call_does_not_fail_the_batch(self):
+        chain = FakeChain(fail_on={"B"})
+        rows = [{"title": t, "content": "body"} for t in "ABC"]
+
+        summaries = await asummarize_articles(chain, rows)
+
+        assert summaries == ["summary of A", FAILED_SUMMARY, "summary of C"]
+
+
+@pytest.fixture
+def crawler():
+    pytest.importorskip("playwright")
+    pytest.importorskip("trafilatura")
+    import web_crawler2
+
+    return web_crawler2
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.closed = False
+        self.url = None
+
+    async def goto(self, url, **kwargs):
+        if url in self.context.broken:
+            raise RuntimeError("net::ERR_CONNECTION_RESET")
+        self.url = url
+
+    async def wait_for_load_state(self, state, timeout):
+        pass
+
+    async def content(self):
+        return f"<html>{self.url}</html>"
+
+    async def title(self):
+        return self.url.rsplit("/", 1)[-1]
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, broken=()):
+        self.pages = []
+        self.broken = set(broken)
+
+    async def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+
+class TestPagePool:
+    async def test_pages_are_reused(self, crawler):
+        context = FakeContext()
+        pool = crawler.PagePool(context, 2)
+        await pool.open()
+
+        for _ in range(5):
+            async with pool.page() as page:
+                await page.goto("https://a/1")
+
+        assert len(context.pages) == 2
+        await pool.close()
+        assert all(page.closed for page in context.pages)
+
+    async def test_failed_page_is_closed_and_replaced(self, crawler):
+        context = FakeContext(broken={"https://a/bad"})
+        pool = crawler.PagePool(context, 1)
+        await pool.open()
+
+        with pytest.raises(RuntimeError):
+            async with pool.page() as page:
+                await page.goto("https://a/bad")
+        async with pool.page() as page:
+            await page.goto("https://a/ok")
+
+        assert context.pages[0].closed
+        assert len(context.pages) == 2 and not context.pages[1].closed
+        await pool.close()
+
+
+class TestCrawlPipeline:
+    async def test_failures_are_counted_and_the_rest_written(
+        self, crawler, tmp_path, monkeypatch
+    ):
+        monkeypatch.setattr(
+            crawler.trafilatura, "extract", lambda html, **kw: f"body of {html}"
+        )
+        links = [{"url": f"https://a/{i}", "title": f"t{i}"} for i in range(6)]
+        context = FakeContext(broken={"https://a/5"})
+        store = CrawlStore(tmp_path / "state.sqlite3")
+        out_fp, summary_fp = io.StringIO(), io.StringIO()
+        args = SimpleNamespace(
+            pages=2,
+            settle_ms=0,
+            summary_batch_size=2,
+            summary_concurrency=2,
+            summary_max_content_chars=100,
+        )
+
+        stats = await crawler.crawl(
+            context,
+            links,
+            args,
+            store,
+            out_fp,
+            summary_fp,
+            FakeChain(fail_on={"2"}),
+        )
+
+        assert stats == {
+            "fetched": 5,
+            "duplicates": 0,
+            "failed": 1,
+            "summary_failed": 1,
+        }
+        written = [json.loads(line) for line in out_fp.getvalue().splitlines()]
+        assert sorted(row["url"] for row in written) == [
+            f"https://a/{i}" for i in range(5)
+        ]
+        summaries = {
+            row["url"]: row["summary"]
+            for row in map(json.loads, summary_fp.getvalue().splitlines())
+        }
+        assert summaries["https://a/2"] == FAILED_SUMMARY
+        assert summaries["https://a/0"] == "summary of 0"
+        assert store.unseen(link["url"] for link in links) == ["https://a/5"]
+        store.close()
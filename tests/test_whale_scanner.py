@@ -0,0 +1,218 @@
+"""Tests for core/whale_scanner.py, fed recorded pages through a local stub server."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from core import whale_scanner as ws
+from core.whale_scanner import (
+    BitcoinMempoolScanner,
+    EvmBlockScanner,
+    WhaleIndex,
+    WhaleTransfer,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures" / "whale"
+PRICES = {"bitcoin": 100_000.0, "ethereum": 3_000.0}
+
+
+def _load(name):
+    return json.loads((FIXTURES / name).read_text())
+
+
+class _StubChain(BaseHTTPRequestHandler):
+    """Replays recorded pages: BTC feed pages in order, ETH heads in order."""
+
+    def do_GET(self):
+        self.server.log.append(("GET", self.path))
+        pages = self.server.btc_pages
+        page = pages.pop(0) if len(pages) > 1 else pages[0]
+        self._reply(page)
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.posts += 1
+        if isinstance(body, list):
+            # Answer batches out of order, as real nodes may
+            self._reply([self._answer(call) for call in reversed(body)])
+        else:
+            self._reply(self._answer(body))
+
+    def _answer(self, call):
+        self.server.log.append((call["method"], call["params"]))
+        rpc = self.server.rpc
+        if call["method"] == "eth_blockNumber":
+            heads = rpc["heads"]
+            result = heads.pop(0) if len(heads) > 1 else heads[0]
+        else:
+            result = rpc["blocks"].get(call["params"][0])
+        return {"jsonrpc": "2.0", "id": call["id"], "result": result}
+
+    def _reply(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubChain)
+    server.btc_pages = [
+        _load("btc_unconfirmed_1.json"),
+        _load("btc_unconfirmed_2.json"),
+    ]
+    server.rpc = _load("eth_rpc.json")
+    server.log = []
+    server.posts = 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join(timeout=2)
+
+
+def _transfer(tx_hash, value_usd, symbol="BTC"):
+    return WhaleTransfer("bitcoin", symbol, tx_hash, value_usd / 1e5, value_usd, 0.0)
+
+
+class TestWhaleIndex:
+    def test_top_is_ordered_by_value_and_filtered(self):
+        index = WhaleIndex()
+        for i, value in enumerate([3e5, 9e6, 1e6, 5e6]):
+            index.add(_transfer(f"h{i}", value))
+        assert [t.value_usd for t in index.top("btc", 2e6)] == [9e6, 5e6]
+        assert index.top("ETH") == []
+
+    def test_ring_drops_the_oldest(self):
+        index = WhaleIndex(capacity=3)
+        for i, value in enumerate([9e6, 1e6, 2e6, 3e6]):
+            index.add(_transfer(f"h{i}", value))
+        # h0 was the largest but the oldest
+        assert [t.tx_hash for t in index.top("BTC", limit=10)] == ["h3", "h2", "h1"]
+        assert [t.tx_hash for t in index.recent("BTC", 2)] == ["h3", "h2"]
+
+    def test_repeated_hash_is_ignored(self):
+        index = WhaleIndex()
+        assert index.add(_transfer("h", 1e6))
+        assert not index.add(_transfer("h", 1e6))
+        assert index.stats()["tokens"] == {"BTC": 1}
+
+
+class TestBitcoinScanner:
+    def test_only_new_transactions_are_ingested(self, stub):
+        index = WhaleIndex()
+        scanner = BitcoinMempoolScanner(
+            index, base_url=stub.url, price_fn=PRICES.get, min_usd=100_000
+        )
+
+        assert scanner.poll() == 2
+        assert scanner.cursor.startswith("c3f1")
+        # Page 2 is read only down to the cursor: e5a3 (30 BTC) is the one whale
+        assert scanner.poll() == 1
+
+        top = index.top("BTC")
+        assert [round(t.amount) for t in top] == [30, 20, 5]
+        assert top[0].value_usd == 3_000_000
+
+    def test_largest_output_is_the_transfer(self, stub):
+        index = WhaleIndex()
+        scanner = BitcoinMempoolScanner(index, base_url=stub.url, price_fn=PRICES.get)
+        scanner.poll()
+        a1 = [t for t in index.top("BTC", limit=10) if t.tx_hash.startswith("a1d9")]
+        assert a1[0].amount == 5.0
+
+
+class TestEvmScanner:
+    def test_block_cursor_walks_forward(self, stub):
+        index = WhaleIndex()
+        scanner = EvmBlockScanner(
+            index, "ethereum", "ETH", "ethereum", stub.url, price_fn=PRICES.get
+        )
+
+        assert scanner.poll() == 1
+        assert scanner.cursor == 0x1506C80
+        assert scanner.poll() == 2
+        assert scanner.cursor == 0x1506C82
+
+        stub.log.clear()
+        assert scanner.poll() == 0
+        assert [m for m, _ in stub.log] == ["eth_blockNumber"]
+
+        top = index.top("ETH")
+        assert [t.tx_hash for t in top] == ["0xcc02", "0xaa01", "0xbb01"]
+        assert top[0].block == 0x1506C82
+
+    def test_lagging_scanner_walks_to_the_head_in_batches(self, stub, monkeypatch):
+        monkeypatch.setattr(ws, "RPC_BATCH_BLOCKS", 4)
+        head = 0x1506C80
+        stub.rpc = {
+            "heads": [hex(head)],
+            "blocks": {hex(n): {"transactions": []} for n in range(head - 9, head + 1)},
+        }
+        scanner = EvmBlockScanner(
+            WhaleIndex(), "ethereum", "ETH", "ethereum", stub.url, price_fn=PRICES.get
+        )
+        scanner.cursor = head - 10
+
+        scanner.poll()
+
+        assert scanner.cursor == head
+        # One head lookup, then 10 blocks in batches of 4, 4 and 2
+        assert stub.posts == 4
+        fetched = [p[0] for m, p in stub.log if m == "eth_getBlockByNumber"]
+        assert sorted(fetched) == [hex(n) for n in range(head - 9, head + 1)]
+
+    def test_a_scanner_far_behind_counts_what_it_skips(self, stub, monkeypatch):
+        monkeypatch.setattr(ws, "MAX_LAG", 2)
+        scanner = EvmBlockScanner(
+            WhaleIndex(), "ethereum", "ETH", "ethereum", stub.url, price_fn=PRICES.get
+        )
+        scanner.cursor = 0x1506C80 - 12
+        scanner.poll()
+
+        fetched = [p[0] for m, p in stub.log if m == "eth_getBlockByNumber"]
+        assert sorted(fetched) == [hex(0x1506C80 - 1), hex(0x1506C80)]
+        assert scanner.stats()["skipped_blocks"] == 10
+
+
+class TestTool:
+    def test_tool_answers_from_the_index(self, stub, monkeypatch):
+        from core.tools.crypto_modules import onchain
+
+        index = WhaleIndex()
+        scanner = BitcoinMempoolScanner(index, base_url=stub.url, price_fn=PRICES.get)
+        scanner.poll()
+        monkeypatch.setattr(ws, "whale_index", index)
+        monkeypatch.setattr(ws, "_scanners", {"BTC": scanner})
+
+        with patch.object(onchain, "_get_token_chain_info") as lookup:
+            out = onchain.get_whale_transactions.invoke(
+                {"symbol": "btc", "min_value_usd": 400_000}
+            )
+        lookup.assert_not_called()
+        assert "20.0000 BTC" in out and "5.0000 BTC" in out
+        assert "Blockchain.com" in out
+
+    def test_scanner_not_ready_falls_back(self, monkeypatch):
+        from core.tools.crypto_modules import onchain
+
+        idle = BitcoinMempoolScanner(WhaleIndex(), price_fn=PRICES.get)
+        monkeypatch.setattr(ws, "_scanners", {"BTC": idle})
+        with (
+            patch.object(onchain, "get_cached_data", return_value=None),
+            patch.object(onchain, "_get_token_chain_info", return_value=None),
+        ):
+            out = onchain.get_whale_transactions.invoke({"symbol": "BTC"})
+        assert "找不到 BTC" in out
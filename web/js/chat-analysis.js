@@ -564,6 +564,11 @@ window.currentAnalysisController = AppStore.get('currentAnalysisController');
                         responseMetadata = data.data || null;
                     }
 
+                    // 串流內容經後端後處理修改時，以最終版本覆蓋
+                    if (data.type === 'content_replace') {
+                        fullContent = data.content_replace || '';
+                    }
+
                     if (data.content) {
                         fullContent += data.content;
                         // 實時更新內容，傳入 isStreaming=true 和當前耗時
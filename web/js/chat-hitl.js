@@ -563,6 +563,10 @@ async function submitHITLAnswer(answer) {
                     }
                 }
 
+                if (data.type === 'content_replace') {
+                    fullContent = data.content_replace || '';
+                }
+
                 if (data.content) {
                     fullContent += data.content;
                     if (ctx.botMsgDiv) {
@@ -0,0 +1,71 @@
+import hashlib
+import sqlite3
+import time
+from pathlib import Path
+from typing import Iterable
+
+DEFAULT_STORE = Path(__file__).with_name("futunn_crawl_state.sqlite3")
+
+
+def content_hash(text: str) -> str:
+    """Hash of the extracted body, whitespace-normalized so reposts collide."""
+    normalized = " ".join((text or "").split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class CrawlStore:
+    """Persistent record of crawled URLs and article body hashes.
+
+    A URL is marked once its article (and summary, when enabled) is ready,
+    right before both are written, so an interrupted run resumes with
+    whatever was left and never writes an article twice.
+    """
+
+    def __init__(self, path: Path = DEFAULT_STORE):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS seen_urls (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT,
+                title TEXT,
+                crawled_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_seen_urls_hash
+                ON seen_urls (content_hash);
+            """
+        )
+
+    def unseen(self, urls: Iterable[str]) -> list[str]:
+        urls = list(urls)
+        if not urls:
+            return []
+        seen = set()
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(urls), 500):
+            chunk = urls[i : i + 500]
+            marks = ",".join("?" * len(chunk))
+            seen.update(
+                row[0]
+                for row in self.conn.execute(
+                    f"SELECT url FROM seen_urls WHERE url IN ({marks})", chunk
+                )
+            )
+        return [u for u in urls if u not in seen]
+
+    def has_content(self, digest: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM seen_urls WHERE content_hash = ? LIMIT 1", (digest,)
+        ).fetchone()
+        return row is not None
+
+    def mark(self, url: str, digest: str, title: str = "") -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO seen_urls VALUES (?, ?, ?, ?)",
+            (url, digest, title, time.time()),
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
@@ -1,4 +1,5 @@
 import argparse
+import asyncio
 import json
 import os
 from pathlib import Path
@@ -149,30 +150,69 @@ def truncate_content(content: str, max_chars: int) -> str:
     return content[:max_chars]
 
 
+EMPTY_SUMMARY = "1) 核心重點：內容不足\n2) 市場影響：內容不足\n3) 風險提醒：內容不足"
+FAILED_SUMMARY = "1) 核心重點：摘要失敗\n2) 市場影響：摘要失敗\n3) 風險提醒：摘要失敗"
+
+
+def build_summary_input(row: dict, max_content_chars: int) -> Optional[dict]:
+    content = (row.get("content") or "").strip()
+    if not content:
+        return None
+    return {
+        "title": (row.get("title") or "").strip(),
+        "url": (row.get("url") or "").strip(),
+        "content": truncate_content(content, max_content_chars),
+    }
+
+
 def summarize_articles(
     chain, rows: list[dict], max_content_chars: int = 6000
 ) -> list[str]:
     summaries: list[str] = []
     for row in rows:
-        url = (row.get("url") or "").strip()
-        title = (row.get("title") or "").strip()
-        content = (row.get("content") or "").strip()
-        if not content:
-            summary = (
-                "1) 核心重點：內容不足\n2) 市場影響：內容不足\n3) 風險提醒：內容不足"
-            )
+        payload = build_summary_input(row, max_content_chars)
+        if payload is None:
+            summary = EMPTY_SUMMARY
         else:
-            summary = chain.invoke(
-                {
-                    "title": title,
-                    "url": url,
-                    "content": truncate_content(content, max_content_chars),
-                }
-            ).strip()
+            summary = chain.invoke(payload).strip()
         summaries.append(summary)
     return summaries
 
 
+async def asummarize_articles(
+    chain,
+    rows: list[dict],
+    max_content_chars: int = 6000,
+    max_concurrency: int = 4,
+    limiter: Optional[asyncio.Semaphore] = None,
+) -> list[str]:
+    """Summarize rows concurrently, up to max_concurrency LLM calls at once.
+
+    Pass a shared limiter to bound calls across several concurrent batches;
+    max_concurrency is then ignored.  A row whose LLM call fails gets
+    FAILED_SUMMARY instead of failing the whole batch.
+    """
+    limiter = limiter or asyncio.Semaphore(max(1, max_concurrency))
+
+    async def summarize(row: dict) -> str:
+        payload = build_summary_input(row, max_content_chars)
+        if payload is None:
+            return EMPTY_SUMMARY
+        async with limiter:
+            return (await chain.ainvoke(payload)).strip()
+
+    results = await asyncio.gather(
+        *(summarize(row) for row in rows), return_exceptions=True
+    )
+    summaries: list[str] = []
+    for row, result in zip(rows, results):
+        if isinstance(result, BaseException):
+            print(f"summary failed: {row.get('url') or row.get('title')} ({result!r})")
+            result = FAILED_SUMMARY
+        summaries.append(result)
+    return summaries
+
+
 def create_summary_chain_from_env(
     system_prompt: str = DEFAULT_SYSTEM_PROMPT,
     temperature: float = 0.2,
@@ -1,14 +1,19 @@
 import argparse
 import asyncio
 import json
+import time
+from contextlib import asynccontextmanager
 from urllib.parse import urlsplit, urlunsplit
 
 import trafilatura
+from crawl_store import DEFAULT_STORE, CrawlStore, content_hash
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from playwright.async_api import async_playwright
 from summarize_futunn_posts import (
     DEFAULT_SYSTEM_PROMPT,
+    FAILED_SUMMARY,
+    asummarize_articles,
     create_summary_chain_from_env,
-    summarize_articles,
 )
 
 MAIN_URL = "https://news.futunn.com/main?chain_id=FBB0EGgLsPxZBN.1klpic0&global_content=%7B%22promote_id%22%3A13766,%22sub_promote_id%22%3A1,%22f%22%3A%22nn%2F%22%7D&lang=zh-cn"
@@ -19,6 +24,9 @@ SCROLL_ROUNDS = 0  # 想抓更多就加大
 LIMIT = 5  # 只抓一篇就設 1；抓全部就 None
 ONLY_POST = True  # True=只抓 /post/；False=也抓 /flash/
 PRESET_URLS = {"main": MAIN_URL}
+PAGE_POOL_SIZE = 4  # 同時開啟的分頁數（重複使用，不再每篇開新分頁）
+SETTLE_MS = 1200  # 等待網路閒置的上限（毫秒）
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}
 
 
 def parse_args():
@@ -86,6 +94,34 @@ def parse_args():
         default=0.2,
         help="LLM temperature for summaries",
     )
+    parser.add_argument(
+        "--summary-concurrency",
+        type=int,
+        default=4,
+        help="Maximum LLM calls in flight across summary batches",
+    )
+    parser.add_argument(
+        "--pages",
+        type=int,
+        default=PAGE_POOL_SIZE,
+        help="Number of browser pages fetching articles concurrently",
+    )
+    parser.add_argument(
+        "--settle-ms",
+        type=int,
+        default=SETTLE_MS,
+        help="Wait at most this long for the network to go idle after load",
+    )
+    parser.add_argument(
+        "--state",
+        default=str(DEFAULT_STORE),
+        help="SQLite file remembering crawled URLs and content hashes",
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Ignore the crawl state and fetch every link again",
+    )
 
     return parser.parse_args()
 
@@ -220,16 +256,221 @@ async def fetch_article_via_playwright(context, url: str):
         await page.close()
 
 
-def process_summary_batch(
-    pending_rows: list[dict],
+async def block_heavy_resources(route):
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class PagePool:
+    """Fixed set of reusable pages; fetchers borrow one at a time."""
+
+    def __init__(self, context, size: int):
+        self.context = context
+        self.size = max(1, size)
+        self._idle: asyncio.Queue = asyncio.Queue()
+
+    async def open(self):
+        for _ in range(self.size):
+            self._idle.put_nowait(await self.context.new_page())
+
+    @asynccontextmanager
+    async def page(self):
+        # None marks a discarded slot; its next borrower opens a fresh page
+        page = await self._idle.get()
+        try:
+            if page is None:
+                page = await self.context.new_page()
+            yield page
+        except BaseException:
+            # A page left mid-navigation is not worth reusing
+            if page is not None:
+                try:
+                    await page.close()
+                except Exception:
+                    pass
+            self._idle.put_nowait(None)
+            raise
+        self._idle.put_nowait(page)
+
+    async def close(self):
+        while not self._idle.empty():
+            page = self._idle.get_nowait()
+            if page is not None:
+                await page.close()
+
+
+async def fetch_article(page, url: str, settle_ms: int = SETTLE_MS):
+    await page.goto(url, wait_until="domcontentloaded", timeout=120000)
+    try:
+        # 圖片/字型/影音已攔截，網路通常很快閒置；不再固定等待
+        await page.wait_for_load_state("networkidle", timeout=settle_ms)
+    except PlaywrightTimeoutError:
+        pass
+
+    html = await page.content()
+    main = trafilatura.extract(html, include_comments=False, include_tables=False) or ""
+    title = ((await page.title()) or "").strip()
+    return {"url": url, "title": title, "content": clean_text(main)}
+
+
+async def fetch_stage(pool, settle_ms, url_queue, article_queue, store, stats):
+    while True:
+        item = await url_queue.get()
+        if item is None:
+            return
+        idx, it = item
+        try:
+            async with pool.page() as page:
+                art = await fetch_article(page, it["url"], settle_ms)
+        except Exception as e:
+            stats["failed"] += 1
+            print(f"[{idx}] fetch failed: {it['url']} ({e})")
+            continue
+        art["title"] = resolve_effective_title(
+            art.get("title", ""), it.get("title", "")
+        )
+        art["_idx"] = idx
+        art["_hash"] = content_hash(art["content"])
+        if art["content"] and store.has_content(art["_hash"]):
+            # 同一篇文章換了網址（轉載）：記下網址但不重複輸出
+            store.mark(art["url"], art["_hash"], art["title"])
+            stats["duplicates"] += 1
+            continue
+        stats["fetched"] += 1
+        await article_queue.put(art)
+
+
+async def summary_stage(
+    article_queue,
+    out_fp,
+    summary_fp,
     summary_chain,
-    summary_max_content_chars: int,
-) -> list[str]:
-    if not pending_rows:
-        return []
-    return summarize_articles(
-        summary_chain, pending_rows, max_content_chars=summary_max_content_chars
+    args,
+    store,
+    total,
+    stats,
+):
+    """Summarize full batches concurrently; write each article once it is done."""
+    # One limit on LLM calls in flight, shared by every batch
+    limiter = asyncio.Semaphore(max(1, args.summary_concurrency))
+    batch_size = args.summary_batch_size if args.summary_batch_size > 0 else 1
+    tasks: set[asyncio.Task] = set()
+
+    async def summarize(batch: list[dict]):
+        if summary_chain is not None:
+            summaries = await asummarize_articles(
+                summary_chain,
+                batch,
+                max_content_chars=args.summary_max_content_chars,
+                limiter=limiter,
+            )
+        else:
+            summaries = ["(skip summary)"] * len(batch)
+
+        for item, summary in zip(batch, summaries):
+            if summary is FAILED_SUMMARY:
+                stats["summary_failed"] += 1
+            # 先記錄再寫檔（中間沒有 await）：中斷後續跑不會重複輸出同一篇
+            store.mark(item["url"], item["_hash"], item["title"])
+            out_fp.write(
+                json.dumps(
+                    {k: v for k, v in item.items() if not k.startswith("_")},
+                    ensure_ascii=False,
+                )
+                + "\n"
+            )
+            fetch_text = item.get("title", "").strip()[:60]
+            one_line_summary = " | ".join(
+                part.strip() for part in summary.splitlines() if part.strip()
+            )
+            print(
+                f"[{item.get('_idx')}/{total}] "
+                f"fetch: {fetch_text} \n"
+                f"summary: {one_line_summary} \n"
+                f"url: {item['url']}"
+                f"\n=================================\n"
+            )
+            if summary_fp is not None:
+                summary_fp.write(
+                    json.dumps(
+                        {
+                            "url": item["url"],
+                            "title": item["title"],
+                            "summary": summary,
+                        },
+                        ensure_ascii=False,
+                    )
+                    + "\n"
+                )
+
+    def done(task: asyncio.Task):
+        tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"summary batch failed: {task.exception()!r}")
+
+    def launch(batch: list[dict]):
+        task = asyncio.create_task(summarize(batch))
+        tasks.add(task)
+        task.add_done_callback(done)
+
+    batch: list[dict] = []
+    while True:
+        art = await article_queue.get()
+        if art is None:
+            break
+        batch.append(art)
+        if len(batch) >= batch_size:
+            launch(batch)
+            batch = []
+    if batch:
+        launch(batch)
+    if tasks:
+        # 單一批次失敗已在 done() 回報，不影響其他批次寫完
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def crawl(context, links, args, store, out_fp, summary_fp, summary_chain):
+    """Fetch links with a page pool while summaries run as a separate stage."""
+    pool = PagePool(context, args.pages)
+    await pool.open()
+    url_queue: asyncio.Queue = asyncio.Queue()
+    article_queue: asyncio.Queue = asyncio.Queue(maxsize=pool.size * 4)
+    for i, it in enumerate(links, 1):
+        url_queue.put_nowait((i, it))
+    for _ in range(pool.size):
+        url_queue.put_nowait(None)
+
+    stats = {"fetched": 0, "duplicates": 0, "failed": 0, "summary_failed": 0}
+    writer = asyncio.create_task(
+        summary_stage(
+            article_queue,
+            out_fp,
+            summary_fp,
+            summary_chain,
+            args,
+            store,
+            len(links),
+            stats,
+        )
     )
+    try:
+        await asyncio.gather(
+            *(
+                fetch_stage(
+                    pool, args.settle_ms, url_queue, article_queue, store, stats
+                )
+                for _ in range(pool.size)
+            )
+        )
+        await article_queue.put(None)
+        await writer
+    finally:
+        if not writer.done():
+            writer.cancel()
+        await pool.close()
+    return stats
 
 
 async def main():
@@ -246,7 +487,6 @@ async def main():
     if limit is not None and limit <= 0:
         limit = None
     only_post = not args.include_flash
-    summary_batch_size = args.summary_batch_size if args.summary_batch_size > 0 else 1
     summary_chain = None
     if not args.skip_summary:
         summary_chain = create_summary_chain_from_env(
@@ -254,101 +494,64 @@ async def main():
             temperature=args.summary_temperature,
         )
 
+    store = CrawlStore(args.state)
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=True)
         context = await browser.new_context(
             locale="zh-CN", viewport={"width": 1280, "height": 720}
         )
+        await context.route("**/*", block_heavy_resources)
         page = await context.new_page()
 
         print(f"target -> {target_url}")
         links = await collect_main_links(
             page, target_url, scroll_rounds=scroll_rounds, only_post=only_post
         )
+        await page.close()
         print(f"links found = {len(links)}")
 
+        if not args.fresh:
+            unseen = set(store.unseen(it["url"] for it in links))
+            skipped = len(links) - len(unseen)
+            links = [it for it in links if it["url"] in unseen]
+            if skipped:
+                print(f"already crawled -> skip {skipped}")
+
         if limit is not None:
             links = links[:limit]
             print(f"limit -> {limit}")
 
         if not links:
             print(
-                "No links found. Consider increasing SCROLL_ROUNDS or try --include-flash"
+                "No new links found. Consider increasing SCROLL_ROUNDS, try --include-flash, or --fresh"
             )
             await browser.close()
+            store.close()
             return
 
-        with open(out_file, "w", encoding="utf-8-sig") as f:
+        # 續跑時附加到既有檔案，不覆蓋先前結果
+        started = time.perf_counter()
+        with open(out_file, "a", encoding="utf-8-sig") as f:
             summary_fp = None
             if not args.skip_summary:
-                summary_fp = open(args.summary_output, "w", encoding="utf-8-sig")
+                summary_fp = open(args.summary_output, "a", encoding="utf-8-sig")
             try:
-                pending_batch: list[dict] = []
-
-                for i, it in enumerate(links, 1):
-                    url = it["url"]
-                    art = await fetch_article_via_playwright(context, url)
-                    art["title"] = resolve_effective_title(
-                        art.get("title", ""), it.get("title", "")
-                    )
-                    art["_idx"] = i
-
-                    f.write(
-                        json.dumps(
-                            {k: v for k, v in art.items() if not k.startswith("_")},
-                            ensure_ascii=False,
-                        )
-                        + "\n"
-                    )
-                    pending_batch.append(art)
-
-                    should_flush = len(pending_batch) >= summary_batch_size or i == len(
-                        links
-                    )
-                    if not should_flush:
-                        continue
-
-                    summaries = []
-                    if summary_chain is not None:
-                        summaries = process_summary_batch(
-                            pending_batch,
-                            summary_chain,
-                            summary_max_content_chars=args.summary_max_content_chars,
-                        )
-                    else:
-                        summaries = ["(skip summary)"] * len(pending_batch)
-
-                    for item, summary in zip(pending_batch, summaries):
-                        fetch_text = item.get("title", "").strip()[:60]
-                        one_line_summary = " | ".join(
-                            part.strip()
-                            for part in summary.splitlines()
-                            if part.strip()
-                        )
-                        print(
-                            f"[{item.get('_idx')}/{len(links)}] "
-                            f"fetch: {fetch_text} \n"
-                            f"summary: {one_line_summary} \n"
-                            f"url: {item['url']}"
-                            f"\n=================================\n"
-                        )
-                        if summary_fp is not None:
-                            summary_fp.write(
-                                json.dumps(
-                                    {
-                                        "url": item["url"],
-                                        "title": item["title"],
-                                        "summary": summary,
-                                    },
-                                    ensure_ascii=False,
-                                )
-                                + "\n"
-                            )
-                    pending_batch.clear()
+                stats = await crawl(
+                    context, links, args, store, f, summary_fp, summary_chain
+                )
             finally:
                 if summary_fp is not None:
                     summary_fp.close()
-
+                store.close()
+        elapsed = time.perf_counter() - started
+        await browser.close()
+
+        print(
+            f"fetched {stats['fetched']} (duplicates {stats['duplicates']}, "
+            f"failed {stats['failed']}, summary failed {stats['summary_failed']}) "
+            f"in {elapsed:.1f}s "
+            f"= {stats['fetched'] * 60 / max(elapsed, 1e-9):.1f} articles/min"
+        )
         print(f"saved -> {out_file}")
         if not args.skip_summary:
             print(f"summaries saved -> {args.summary_output}")